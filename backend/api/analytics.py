@@ -0,0 +1,73 @@
+"""
+Dashboard analytics endpoints
+"""
+from fastapi import APIRouter, HTTPException, Depends, Header, Response, status, Query
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+from api.auth import get_current_user
+from api.etags import resource_etag, etag_matches, not_modified, get_resource_version, INDIVIDUALS_CACHE_CONTROL
+from api.individuals import get_supabase_client, trusted_response
+from db.models import DangerScoreAnalyticsResponse
+from services.analytics_service import AnalyticsService
+
+router = APIRouter()
+
+
+@router.get("/api/analytics/danger-scores", response_model=DangerScoreAnalyticsResponse)
+async def get_danger_score_analytics(
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Only individuals with an interaction at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only individuals with an interaction before this time"),
+    worker_id: Optional[UUID] = Query(None, description="Only individuals this worker interacted with"),
+    by_worker: bool = Query(False, description="One slice per worker instead of an overall slice"),
+    bucket_width: int = Query(10, ge=1, le=100, description="Histogram bucket width in score points"),
+    user_id: str = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Danger score histograms, percentiles and override rate.
+
+    Features:
+    - Calculated (danger_score) and displayed (override if set) scores
+    - Slice by time window (since/until) and worker (worker_id, by_worker)
+    - Computed in the database; cached until the next save (ETag; 304 if unchanged)
+    """
+    try:
+        supabase = get_supabase_client()
+
+        etag = resource_etag(
+            "danger-scores",
+            get_resource_version(supabase, "individuals"),
+            since, until, worker_id, by_worker, bucket_width
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, INDIVIDUALS_CACHE_CONTROL, if_none_match)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = INDIVIDUALS_CACHE_CONTROL
+
+        service = AnalyticsService(supabase)
+        result = await service.get_danger_score_stats(
+            since=since,
+            until=until,
+            worker_id=str(worker_id) if worker_id else None,
+            by_worker=by_worker,
+            bucket_width=bucket_width,
+            cache_key=etag
+        )
+        return trusted_response(result, response)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error computing danger score analytics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to compute danger score analytics: {str(e)}"
+        )
@@ -2,15 +2,17 @@
 Category management endpoints
 Minimal implementation for Task 2.0 prerequisite
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response, BackgroundTasks
 from fastapi.responses import StreamingResponse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
 import csv
 import io
 from supabase import create_client, Client
 from api.auth import get_current_user
-from db.models import CreateCategoryRequest, CategoryResponse
+from api.etags import resource_etag, etag_matches, not_modified, get_resource_version, CATEGORIES_CACHE_CONTROL
+from db.models import CreateCategoryRequest, CategoryResponse, CategoryIndexesResponse
+from services.category_index_service import CategoryIndexService, should_index, unindexable_reason, INDEX_READY
 from datetime import datetime, timezone
 from uuid import uuid4
 
@@ -64,7 +66,9 @@ async def export_csv(user_id: str = Depends(get_current_user)):
                 medical_conditions = ", ".join(medical_conditions)
             
             # Calculate display danger score (override or calculated)
-            danger_score = individual.get("danger_override") or individual.get("danger_score", 0)
+            danger_score = individual.get("danger_override")
+            if danger_score is None:
+                danger_score = individual.get("danger_score", 0)
             
             writer.writerow([
                 individual.get("name", ""),
@@ -105,10 +109,16 @@ async def export_csv(user_id: str = Depends(get_current_user)):
 
 
 @router.get("/api/categories", response_model=Dict[str, List[Dict[str, Any]]])
-async def get_categories(user_id: str = Depends(get_current_user)):
+async def get_categories(
+    response: Response,
+    user_id: str = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get all categories (preset and custom) for dynamic prompt generation.
     Returns categories with their configuration for use in GPT-4o categorization.
+    The ETag follows the categories change counter; If-None-Match gets a 304
+    without fetching the categories.
     """
     try:
         # Initialize Supabase client inside function to ensure env vars are loaded
@@ -117,12 +127,18 @@ async def get_categories(user_id: str = Depends(get_current_user)):
             os.getenv("SUPABASE_SERVICE_KEY")  # Use service key for full access
         )
         
+        etag = resource_etag("categories", get_resource_version(supabase, "categories"))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, CATEGORIES_CACHE_CONTROL, if_none_match)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CATEGORIES_CACHE_CONTROL
+        
         # Fetch all categories from database
-        response = supabase.table("categories").select("*").order("created_at").execute()
+        result = supabase.table("categories").select("*").order("created_at").execute()
         
         # Format response
         categories = []
-        for category in response.data:
+        for category in result.data:
             # Parse options if they exist (for select types)
             cat_data = {
                 "id": category["id"],
@@ -146,6 +162,7 @@ async def get_categories(user_id: str = Depends(get_current_user)):
 @router.post("/api/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_category(
     request: CreateCategoryRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user)
 ):
     """
@@ -157,6 +174,12 @@ async def create_category(
     - Category names must be unique (case insensitive)
     - Single-select options must be list of {label, value} objects
     - Multi-select options must be list of strings
+    
+    With create_index (default: for high-priority categories), number,
+    single_select and multi_select categories get an index on their data key
+    for search filters, built in the background after the response. If the
+    index can't be registered (e.g. a name with spaces, which isn't a filter
+    key) the category is still created and index_error says why.
     """
     try:
         # Initialize Supabase client
@@ -200,6 +223,25 @@ async def create_category(
         
         # Return created category
         created = result.data[0]
+        
+        index_status = None
+        index_error = None
+        if should_index(created["type"], created["priority"], request.create_index):
+            index_service = CategoryIndexService(supabase)
+            entry = None
+            index_error = unindexable_reason(created["name"])
+            if index_error is None:
+                try:
+                    entry = index_service.register(created["name"], created["type"])
+                except Exception as e:
+                    # The category is saved; without the index filters are just slower
+                    print(f"Error registering index for category {created['name']}: {str(e)}")
+                    index_error = f"Failed to register index: {str(e)}"
+            if entry:
+                index_status = entry.status
+                if entry.status != INDEX_READY:
+                    background_tasks.add_task(index_service.build, entry.category_name)
+        
         return CategoryResponse(
             id=created["id"],
             name=created["name"],
@@ -211,7 +253,9 @@ async def create_category(
             auto_trigger=created["auto_trigger"],
             options=created["options"],
             created_at=created["created_at"],
-            updated_at=created["updated_at"]
+            updated_at=created["updated_at"],
+            index_status=index_status,
+            index_error=index_error
         )
         
     except HTTPException:
@@ -232,4 +276,27 @@ async def create_category(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create category: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/api/categories/indexes", response_model=CategoryIndexesResponse)
+async def get_category_indexes(user_id: str = Depends(get_current_user)):
+    """
+    List managed category indexes with their build status, size on disk and
+    usage (index scans and tuples read since the last stats reset).
+    Unused indexes only slow down saves and are candidates for removal.
+    """
+    try:
+        supabase: Client = create_client(
+            os.getenv("SUPABASE_URL"),
+            os.getenv("SUPABASE_SERVICE_KEY")
+        )
+        
+        indexes = CategoryIndexService(supabase).list_indexes()
+        return CategoryIndexesResponse(indexes=indexes)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch category indexes: {str(e)}"
+        )
@@ -0,0 +1,199 @@
+"""
+Response compression and MessagePack content negotiation
+
+Field devices pull search results and interaction histories over cellular
+links, so responses are shrunk on the way out by two ASGI middlewares:
+- MessagePackMiddleware re-encodes JSON bodies as MessagePack when the
+  Accept header prefers it (optional: pip install msgpack)
+- CompressionMiddleware applies brotli (optional: pip install brotli) or
+  gzip to bodies above a size threshold, per Accept-Encoding
+
+Each re-encoding suffixes the ETag (api/etags.representation_etag), so the
+JSON, MessagePack and compressed bodies of a resource never share a strong
+validator. Streaming responses (CSV export) pass through untouched.
+"""
+import os
+import gzip
+from typing import Dict
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+
+from api.etags import representation_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+COMPRESSIBLE_TYPES = ("application/json", MSGPACK_MEDIA_TYPE, "text/")
+
+
+def parse_quality_list(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept / Accept-Encoding header into {token: q}
+
+    Example: "br;q=1.0, gzip;q=0.5, *;q=0" -> {"br": 1.0, "gzip": 0.5, "*": 0.0}
+    """
+    qualities = {}
+    for item in header.split(","):
+        token, *params = [part.strip() for part in item.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        qualities[token.lower()] = q
+    return qualities
+
+
+def prefers_msgpack(accept: str) -> bool:
+    """Whether the client asked for MessagePack at least as strongly as JSON"""
+    if not accept:
+        return False
+    qualities = parse_quality_list(accept)
+    msgpack_q = max(qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    json_q = qualities.get("application/json", qualities.get("application/*", qualities.get("*/*", 0.0)))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Best supported content coding for an Accept-Encoding header ("" for identity)"""
+    if not accept_encoding:
+        return ""
+    qualities = parse_quality_list(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    candidates = [("br", 2)] if brotli else []
+    candidates.append(("gzip", 1))
+    # Highest q wins; brotli breaks ties (smaller output for JSON)
+    best = max(candidates, key=lambda c: (qualities.get(c[0], wildcard), c[1]))
+    return best[0] if qualities.get(best[0], wildcard) > 0 else ""
+
+
+def tag_representation(headers: MutableHeaders, representation: str) -> None:
+    """Suffix the response's ETag (if any) with the representation it now has"""
+    if "etag" in headers:
+        headers["etag"] = representation_etag(headers["etag"], representation)
+
+
+def add_vary(headers: MutableHeaders, field: str) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["vary"] = field
+    elif field.lower() not in [v.strip().lower() for v in vary.split(",")]:
+        headers["vary"] = f"{vary}, {field}"
+
+
+class _BufferedResponseMiddleware:
+    """
+    Base class for middlewares that rewrite a complete response body
+
+    The body is collected and passed to transform() once the response is
+    complete; a response that streams (more_body on its first chunk) is
+    forwarded as-is.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def transform(self, request_headers: Headers, status: int, headers: MutableHeaders, body: bytes) -> bytes:
+        raise NotImplementedError
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start = None
+        streaming = False
+
+        async def buffered_send(message):
+            nonlocal start, streaming
+            if streaming:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body" and message.get("more_body", False):
+                streaming = True
+                await send(start)
+                await send(message)
+            elif message["type"] == "http.response.body":
+                headers = MutableHeaders(raw=list(start["headers"]))
+                body = self.transform(request_headers, start["status"], headers, message.get("body", b""))
+                if "content-length" in headers:
+                    headers["content-length"] = str(len(body))
+                await send({**start, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": body})
+            else:
+                await send(message)
+
+        await self.app(scope, receive, buffered_send)
+
+
+class MessagePackMiddleware(_BufferedResponseMiddleware):
+    """Serve JSON responses as MessagePack to clients whose Accept prefers it"""
+
+    def transform(self, request_headers: Headers, status: int, headers: MutableHeaders, body: bytes) -> bytes:
+        if not headers.get("content-type", "").startswith("application/json"):
+            return body
+        add_vary(headers, "Accept")
+        if msgpack is None or not body or not prefers_msgpack(request_headers.get("accept", "")):
+            return body
+
+        headers["content-type"] = MSGPACK_MEDIA_TYPE
+        tag_representation(headers, "msgpack")
+        return msgpack.packb(orjson.loads(body))
+
+
+class CompressionMiddleware(_BufferedResponseMiddleware):
+    """Brotli/gzip compression of responses of at least `minimum_size` bytes"""
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 5):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def transform(self, request_headers: Headers, status: int, headers: MutableHeaders, body: bytes) -> bytes:
+        if status in (204, 304) or "content-encoding" in headers:
+            return body
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return body
+        add_vary(headers, "Accept-Encoding")
+        if len(body) < self.minimum_size:
+            return body
+
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding == "br":
+            body = brotli.compress(body, quality=self.brotli_quality)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=self.gzip_level)
+        else:
+            return body
+
+        headers["content-encoding"] = encoding
+        tag_representation(headers, encoding)
+        headers["content-length"] = str(len(body))
+        return body
+
+
+def compression_settings() -> Dict[str, int]:
+    """CompressionMiddleware arguments from the environment"""
+    return {
+        "minimum_size": int(os.getenv("COMPRESSION_MIN_SIZE", "500")),
+        "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    }
@@ -0,0 +1,134 @@
+"""
+ETag helpers for conditional requests
+
+Version ETags ("vN") are used with If-Match for optimistic concurrency on
+writes; If-None-Match on reads is answered with 304 so unchanged responses
+cost neither the full query nor the payload.
+
+The response middlewares (api/compression.py) re-encode bodies as
+MessagePack and brotli/gzip, so the ETag the endpoint computes is suffixed
+per representation (e.g. '"v3-msgpack-gzip"'); validators compare the
+endpoint's part.
+"""
+import os
+import hashlib
+from typing import Any, Optional
+from fastapi import Response, status
+from supabase import Client
+
+
+def version_etag(version: int) -> str:
+    """Strong ETag for a versioned record, e.g. '"v3"'"""
+    return f'"v{version}"'
+
+
+# Suffixes added inside the quotes, in the order the middlewares add them
+REPRESENTATION_SUFFIXES = ("-msgpack", "-br", "-gzip")
+
+
+def representation_etag(etag: str, representation: str) -> str:
+    """ETag of a re-encoded body, e.g. ('"v3"', "gzip") -> '"v3-gzip"'"""
+    return f'{etag[:-1]}-{representation}"'
+
+
+def base_etag(tag: str) -> str:
+    """Opaque tag without the W/ prefix and representation suffixes"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in reversed(REPRESENTATION_SUFFIXES):
+        if tag.endswith(f'{suffix}"'):
+            tag = tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def parse_if_match(header: Optional[str]) -> Optional[int]:
+    """
+    Expected record version from an If-Match header
+    
+    Returns:
+        The version, or None if the header is absent or "*" (any version)
+    
+    Raises:
+        ValueError: If the header isn't a single version ETag
+    """
+    if header is None or header.strip() == "*":
+        return None
+    
+    tag = header.strip()
+    if not tag.startswith("W/"):
+        tag = base_etag(tag)  # Same version in any representation
+    if len(tag) < 4 or not (tag.startswith('"v') and tag.endswith('"')) or not tag[2:-1].isdigit():
+        raise ValueError(f"If-Match must be a single version ETag like '\"v3\"', got: {header}")
+    return int(tag[2:-1])
+
+
+def resource_etag(*parts: Any) -> str:
+    """Strong ETag for a response derived from a resource version and query parameters"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    The tag of an If-None-Match header that matches the current ETag
+    
+    Uses the weak comparison RFC 9110 requires for If-None-Match, so
+    W/"x" matches "x" (proxies may weaken ETags when compressing), and
+    ignores representation suffixes: the client's copy is the same data in
+    the encoding it negotiated.
+    
+    Returns:
+        The client's tag ("*" matches as `etag`), or None if none matches
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    
+    for tag in if_none_match.split(","):
+        if base_etag(tag) == base_etag(etag):
+            return tag.strip()
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the current ETag (see matching_etag)"""
+    return matching_etag(if_none_match, etag) is not None
+
+
+def not_modified(etag: str, cache_control: str, if_none_match: Optional[str] = None) -> Response:
+    """
+    Empty 304 response carrying the validators the client needs to keep its copy
+    
+    The ETag is the client's matching tag, i.e. that of the representation
+    it holds, which the middlewares leave alone on a 304.
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": matching_etag(if_none_match, etag) or etag, "Cache-Control": cache_control}
+    )
+
+
+def get_resource_version(supabase: Client, resource: str) -> int:
+    """
+    Current change counter of a resource (migrations 009, 022)
+    
+    A sum over a few shard rows; read it before the data it validates, so a
+    concurrent write can make the ETag older than the body (the next
+    conditional request then gets a full response). Writes bump it in their
+    own transaction, so it's never newer than the visible data.
+    """
+    response = supabase.table("resource_versions") \
+        .select("version") \
+        .eq("resource", resource) \
+        .execute()
+    return int(response.data[0]["version"]) if response.data else 0
+
+
+# Cache-Control policies. Responses hold personal data, so only the client may
+# cache them (private). Categories change rarely and may be reused briefly
+# without asking; individual data must be revalidated every time, which is a
+# cheap 304 when unchanged.
+CATEGORIES_CACHE_CONTROL = f"private, max-age={int(os.getenv('CATEGORIES_MAX_AGE', '60'))}"
+INDIVIDUALS_CACHE_CONTROL = "private, no-cache"
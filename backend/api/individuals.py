@@ -2,25 +2,52 @@
 Individual management API endpoints
 """
 import os
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Header, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
 from uuid import UUID
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime, timezone
 from supabase import create_client, Client
 
 from api.auth import get_current_user
+from api.etags import (
+    version_etag,
+    parse_if_match,
+    resource_etag,
+    etag_matches,
+    not_modified,
+    get_resource_version,
+    INDIVIDUALS_CACHE_CONTROL
+)
 from db.models import (
     SaveIndividualRequest,
     SaveIndividualResponse,
+    BatchSaveItem,
+    BatchSaveIndividualsRequest,
+    BatchSaveIndividualsResponse,
+    BatchItemResult,
     LocationData,
     SearchIndividualsResponse,
     IndividualDetailResponse,
     DangerOverrideRequest,
     DangerOverrideResponse,
-    InteractionsResponse
+    InteractionsResponse,
+    FacetsResponse,
+    NearbyIndividualsResponse
+)
+from services.individual_service import (
+    IndividualService,
+    IndividualNotFoundError,
+    ConcurrentUpdateError,
+    parse_fields,
+    parse_filters,
+    DETAIL_FIELDS,
+    SUMMARY_FIELDS,
+    VALIDATE_DB_MODELS
 )
-from services.individual_service import IndividualService
-from services.validation_helper import validate_categorized_data
+from services.location_service import LocationService
+from services.validation_helper import validate_categorized_data, ValidationResult
 
 
 router = APIRouter()
@@ -33,6 +60,31 @@ def get_current_user_name(user_id: str = Depends(get_current_user)) -> str:
     return "Demo User"
 
 
+def validation_error_detail(validation_result: ValidationResult) -> str:
+    """Combine missing required fields and validation errors into one message"""
+    error_detail = []
+    if validation_result.missing_required:
+        error_detail.append(f"Missing required fields: {validation_result.missing_required}")
+    if validation_result.validation_errors:
+        for error in validation_result.validation_errors:
+            error_detail.append(f"{error['field']}: {error['message']}")
+    return ". ".join(error_detail)
+
+
+def trusted_response(result: Any, response: Optional[Response] = None) -> Any:
+    """
+    Send a response model the service built from database rows directly,
+    without FastAPI validating it against response_model a second time
+    (unless VALIDATE_DB_MODELS is set)
+    """
+    if VALIDATE_DB_MODELS or not isinstance(result, BaseModel):
+        return result
+    return ORJSONResponse(
+        result.model_dump(mode="json", warnings=False),
+        headers=dict(response.headers) if response else None
+    )
+
+
 def get_supabase_client() -> Client:
     """Get Supabase client instance"""
     url = os.getenv("SUPABASE_URL")
@@ -174,35 +226,42 @@ def get_supabase_client() -> Client:
 @router.post("/api/individuals", response_model=SaveIndividualResponse)
 async def save_individual(
     request: SaveIndividualRequest,
+    response: Response,
     user_id: str = Depends(get_current_user),
-    user_name: str = Depends(get_current_user_name)
+    user_name: str = Depends(get_current_user_name),
+    if_match: Optional[str] = Header(None)
 ):
     """
     Save new individual or update existing (merge).
     
     Flow:
-    1. Validate merge_with_id exists (if provided)
-    2. Fetch categories for validation
-    3. Validate data using validation_helper
-    4. Use individual_service to save
-    5. Return individual and interaction records
+    1. Fetch categories for validation
+    2. Validate data using validation_helper
+    3. Use individual_service to save (one atomic write; a missing
+       merge_with_id is reported by the write as 404, a merge whose
+       expected_updated_at is stale as 409)
+    4. Return individual and interaction records, with the new version
+       as the ETag
+    
+    A merge sent with If-Match (the ETag from GET) that is based on an older
+    version is field-level merged with the changes made since; 409 only if
+    both changed the same field differently.
     """
     try:
+        try:
+            expected_version = parse_if_match(if_match)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
         # Get Supabase client
         supabase = get_supabase_client()
         
         # Initialize service
         service = IndividualService(supabase)
         
-        # If merge_with_id provided, verify it exists first
-        if request.merge_with_id:
-            existing = await service.get_individual_by_id(request.merge_with_id)
-            if not existing:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Individual not found: {request.merge_with_id}"
-                )
-        
         # Fetch categories for validation
         categories_response = supabase.table("categories").select("*").execute()
         categories = categories_response.data
@@ -212,17 +271,9 @@ async def save_individual(
         
         # If validation fails, return error with details
         if not validation_result.is_valid:
-            # Combine missing required and validation errors
-            error_detail = []
-            if validation_result.missing_required:
-                error_detail.append(f"Missing required fields: {validation_result.missing_required}")
-            if validation_result.validation_errors:
-                for error in validation_result.validation_errors:
-                    error_detail.append(f"{error['field']}: {error['message']}")
-            
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=". ".join(error_detail)
+                detail=validation_error_detail(validation_result)
             )
         
         # Save individual using service
@@ -233,14 +284,30 @@ async def save_individual(
             merge_with_id=request.merge_with_id,
             location=request.location,
             transcription=request.transcription,
-            audio_url=request.audio_url
+            audio_url=request.audio_url,
+            expected_updated_at=request.expected_updated_at,
+            categories=categories,
+            expected_version=expected_version if request.merge_with_id else None
         )
         
+        result = SaveIndividualResponse.model_validate(result)
+        response.headers["ETag"] = version_etag(result.individual.version)
         return result
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
+    except IndividualNotFoundError as e:
+        # Merge target reported missing by the write itself
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ConcurrentUpdateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "conflicting_fields": e.fields} if e.fields else str(e)
+        )
     except ValueError as e:
         # Handle validation errors from service
         raise HTTPException(
@@ -256,14 +323,116 @@ async def save_individual(
         )
 
 
+@router.post("/api/individuals/batch", response_model=BatchSaveIndividualsResponse)
+async def save_individuals_batch(
+    request: BatchSaveIndividualsRequest,
+    user_id: str = Depends(get_current_user),
+    user_name: str = Depends(get_current_user_name)
+):
+    """
+    Save up to 100 new individuals or merges in one request.
+    
+    Used by devices syncing records captured offline. All items are
+    validated against one category snapshot and written in one database
+    call and transaction, so the request makes a fixed handful of database
+    round trips regardless of batch size.
+    
+    Invalid items, missing merge targets (404) and merges whose
+    expected_version is stale and can't be field-level merged (409) don't
+    fail the batch; each item gets its own status_code and error in the
+    response.
+    """
+    try:
+        supabase = get_supabase_client()
+        service = IndividualService(supabase)
+        
+        # One category snapshot for validation and danger scores
+        categories = supabase.table("categories").select("*").execute().data
+        
+        results = []
+        valid_items = {}
+        for index, item in enumerate(request.items):
+            try:
+                parsed = BatchSaveItem.model_validate(item)
+            except ValidationError as e:
+                results.append(BatchItemResult(
+                    index=index,
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    error="; ".join(error["msg"] for error in e.errors())
+                ))
+                continue
+            
+            validation_result = validate_categorized_data(parsed.data, categories)
+            if not validation_result.is_valid:
+                results.append(BatchItemResult(
+                    index=index,
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    error=validation_error_detail(validation_result)
+                ))
+                continue
+            
+            valid_items[index] = parsed
+        
+        if valid_items:
+            results.extend(await service.save_individuals_batch(
+                user_id=user_id,
+                user_name=user_name,
+                items=valid_items,
+                categories=categories
+            ))
+        
+        results.sort(key=lambda r: r.index)
+        saved = sum(1 for r in results if r.status_code == status.HTTP_200_OK)
+        
+        return BatchSaveIndividualsResponse(
+            results=results,
+            saved=saved,
+            failed=len(results) - saved
+        )
+        
+    except Exception as e:
+        print(f"Error saving individuals batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save individuals batch: {str(e)}"
+        )
+
+
+def request_filters(request: Request, supabase: Client) -> Optional[dict]:
+    """
+    parse_filters() of the request's filter[<category>]= parameters
+    
+    Raises:
+        HTTPException: 400 on invalid filters
+    """
+    filter_params = {k: v for k, v in request.query_params.items() if k.startswith("filter[")}
+    if not filter_params:
+        return None
+    
+    # Category types decide how each filter is applied
+    categories = supabase.table("categories").select("name, type").execute()
+    try:
+        return parse_filters(filter_params, {c["name"]: c["type"] for c in categories.data})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.get("/api/individuals", response_model=SearchIndividualsResponse)
 async def search_individuals(
+    request: Request,
+    response: Response,
     search: Optional[str] = Query(None, description="Search term for name and data fields"),
     limit: int = Query(20, ge=1, le=100, description="Maximum results per page"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
-    sort_by: str = Query("last_seen", pattern="^(last_seen|danger_score|name)$", description="Sort field"),
+    name_prefix: Optional[str] = Query(None, max_length=100, description="Only names starting with this (case-insensitive)"),
+    sort_by: str = Query("last_seen", pattern="^(last_seen|danger_score|display_score|name)$", description="Sort field"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
-    user_id: str = Depends(get_current_user)
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(SUMMARY_FIELDS)}"),
+    user_id: str = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Search and list individuals.
@@ -271,13 +440,39 @@ async def search_individuals(
     Features:
     - Search across name and all JSONB data fields
     - Pagination with limit/offset
-    - Sorting by last_seen (default), danger_score, or name
+    - name_prefix= for type-ahead lookup by name
+    - filter[<category>]=<value> structured filters, e.g.
+      filter[veteran_status]=Yes, filter[height]=60..72 (number range, either
+      end optional), filter[substance_abuse_history]=Mild,Severe (contains all),
+      filter[display_score]=70..
+    - Sorting by last_seen (default), danger_score, display_score, or name
     - Returns abbreviated addresses for display
+    - fields= returns only those attributes of each individual
+    - ETag from the individuals change counter and the query; 304 if unchanged
     """
     try:
+        try:
+            selected_fields = parse_fields(fields, SUMMARY_FIELDS)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
         # Get Supabase client
         supabase = get_supabase_client()
         
+        filters = request_filters(request, supabase)
+        
+        etag = resource_etag(
+            "individuals", get_resource_version(supabase, "individuals"),
+            search, limit, offset, sort_by, sort_order, selected_fields, name_prefix, filters
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, INDIVIDUALS_CACHE_CONTROL, if_none_match)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = INDIVIDUALS_CACHE_CONTROL
+        
         # Initialize service
         service = IndividualService(supabase)
         
@@ -287,11 +482,19 @@ async def search_individuals(
             limit=limit,
             offset=offset,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            fields=selected_fields,
+            name_prefix=name_prefix,
+            filters=filters
         )
         
-        return result
+        if isinstance(result, dict):
+            # Partial items don't fit the response model; already plain data
+            return ORJSONResponse(result, headers=dict(response.headers))
+        return trusted_response(result, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
         # Log error for debugging
         print(f"Error searching individuals: {str(e)}")
@@ -301,10 +504,138 @@ async def search_individuals(
         )
 
 
+@router.get("/api/individuals/facets", response_model=FacetsResponse)
+async def get_individual_facets(
+    request: Request,
+    response: Response,
+    search: Optional[str] = Query(None, description="Search term for name and data fields"),
+    user_id: str = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Count individuals per option of every single_select / multi_select category.
+    
+    Takes the same search= and filter[<category>]= parameters as search to
+    count only matching individuals; without them the counts are maintained
+    on save and read directly. Responses are cached per individuals and
+    categories version (ETag; 304 if unchanged).
+    """
+    try:
+        supabase = get_supabase_client()
+        filters = request_filters(request, supabase)
+        
+        etag = resource_etag(
+            "facets",
+            get_resource_version(supabase, "individuals"),
+            get_resource_version(supabase, "categories"),
+            search, filters
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, INDIVIDUALS_CACHE_CONTROL, if_none_match)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = INDIVIDUALS_CACHE_CONTROL
+        
+        service = IndividualService(supabase)
+        result = await service.get_facets(filters=filters, search=search, cache_key=etag)
+        return trusted_response(result, response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error computing facets: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to compute facets: {str(e)}"
+        )
+
+
+@router.get("/api/individuals/nearby", response_model=NearbyIndividualsResponse)
+async def get_individuals_nearby(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of search center"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude of search center"),
+    radius_m: float = Query(500, gt=0, le=50000, description="Search radius in metres"),
+    since: Optional[datetime] = Query(None, description="Only individuals last seen at or after this time"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum results"),
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Find individuals whose last-known location is within a radius.
+    
+    Results are ordered nearest first and include distance_m.
+    """
+    try:
+        supabase = get_supabase_client()
+        service = LocationService(supabase)
+        
+        result = await service.find_within_radius(
+            latitude=lat,
+            longitude=lng,
+            radius_m=radius_m,
+            since=since,
+            limit=limit
+        )
+        return trusted_response(result)
+        
+    except Exception as e:
+        print(f"Error finding individuals near ({lat}, {lng}): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to find nearby individuals: {str(e)}"
+        )
+
+
+@router.get("/api/individuals/within", response_model=NearbyIndividualsResponse)
+async def get_individuals_within_bbox(
+    min_lat: float = Query(..., ge=-90, le=90, description="South edge"),
+    min_lng: float = Query(..., ge=-180, le=180, description="West edge"),
+    max_lat: float = Query(..., ge=-90, le=90, description="North edge"),
+    max_lng: float = Query(..., ge=-180, le=180, description="East edge"),
+    since: Optional[datetime] = Query(None, description="Only individuals last seen at or after this time"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum results"),
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Find individuals whose last-known location is inside a bounding box.
+    
+    Results are ordered by most recently seen.
+    """
+    try:
+        supabase = get_supabase_client()
+        service = LocationService(supabase)
+        
+        result = await service.find_within_bbox(
+            min_latitude=min_lat,
+            min_longitude=min_lng,
+            max_latitude=max_lat,
+            max_longitude=max_lng,
+            since=since,
+            limit=limit
+        )
+        return trusted_response(result)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        print(f"Error finding individuals in bounding box: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to find individuals in area: {str(e)}"
+        )
+
+
 @router.get("/api/individuals/{individual_id}", response_model=IndividualDetailResponse)
 async def get_individual(
     individual_id: UUID,
-    user_id: str = Depends(get_current_user)
+    response: Response,
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma-separated subset of: {', '.join(DETAIL_FIELDS)}, or data.<key> for single data fields"
+    ),
+    user_id: str = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Get individual details with recent interactions.
@@ -313,15 +644,50 @@ async def get_individual(
     - Full individual data with all fields
     - Last 10 interactions (summary only)
     - Calculated display danger score
+    - ETag header with the individual's version (send back as If-Match,
+      or as If-None-Match to get a 304 if it hasn't changed)
     - 404 if individual not found
+    
+    fields= (e.g. "name,display_score" or "name,data.height") fetches only
+    those columns / JSONB keys; interactions only with recent_interactions.
     """
     try:
+        try:
+            selected_fields = parse_fields(fields, DETAIL_FIELDS, allow_data_keys=True)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
         # Get Supabase client
         supabase = get_supabase_client()
         
         # Initialize service
         service = IndividualService(supabase)
         
+        # Every change, including new interactions, bumps the version, so
+        # revalidation needs only the version column
+        if if_none_match:
+            version = await service.get_individual_version(individual_id)
+            if version is not None and etag_matches(if_none_match, version_etag(version)):
+                return not_modified(version_etag(version), INDIVIDUALS_CACHE_CONTROL, if_none_match)
+        
+        if selected_fields is not None:
+            partial = await service.get_individual_fields(individual_id, selected_fields + ["version"])
+            if not partial:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Individual not found: {individual_id}"
+                )
+            version = partial["individual"].pop("version")
+            if "version" in selected_fields:
+                partial["individual"]["version"] = version
+            return ORJSONResponse(partial, headers={
+                "ETag": version_etag(version),
+                "Cache-Control": INDIVIDUALS_CACHE_CONTROL
+            })
+        
         # Get individual details
         result = await service.get_individual_by_id(individual_id)
         
@@ -331,7 +697,12 @@ async def get_individual(
                 detail=f"Individual not found: {individual_id}"
             )
         
-        return result
+        if not isinstance(result, IndividualDetailResponse):
+            # The service builds the model (db_model); a plain dict is validated here
+            result = IndividualDetailResponse.model_validate(result)
+        response.headers["ETag"] = version_etag(result.individual.version)
+        response.headers["Cache-Control"] = INDIVIDUALS_CACHE_CONTROL
+        return trusted_response(result, response)
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -349,7 +720,9 @@ async def get_individual(
 async def update_danger_override(
     individual_id: UUID,
     request: DangerOverrideRequest,
-    user_id: str = Depends(get_current_user)
+    response: Response,
+    user_id: str = Depends(get_current_user),
+    if_match: Optional[str] = Header(None)
 ):
     """
     Update manual danger score override.
@@ -358,20 +731,39 @@ async def update_danger_override(
     - Set danger_override to provided value (0-100)
     - Pass null to remove override
     - Returns all danger scores for UI update
+    - With If-Match, only updates if the version still matches (else 412)
     - 404 if individual not found
     """
     try:
+        try:
+            expected_version = parse_if_match(if_match)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
         # Get Supabase client
         supabase = get_supabase_client()
         
         # Update the danger_override field
-        update_result = supabase.table("individuals").update({
+        update_query = supabase.table("individuals").update({
             "danger_override": request.danger_override,
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }).eq("id", str(individual_id)).execute()
+        }).eq("id", str(individual_id))
+        if expected_version is not None:
+            update_query = update_query.eq("version", expected_version)
+        update_result = update_query.execute()
         
         # Check if individual was found and updated
         if not update_result.data:
+            if expected_version is not None:
+                exists = supabase.table("individuals").select("id").eq("id", str(individual_id)).execute()
+                if exists.data:
+                    raise HTTPException(
+                        status_code=status.HTTP_412_PRECONDITION_FAILED,
+                        detail=f"Individual {individual_id} has changed since version {expected_version}"
+                    )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Individual not found: {individual_id}"
@@ -383,10 +775,13 @@ async def update_danger_override(
         # Calculate display score
         display_score = individual["danger_override"] if individual["danger_override"] is not None else individual["danger_score"]
         
+        version = individual.get("version", 1)
+        response.headers["ETag"] = version_etag(version)
         return DangerOverrideResponse(
             danger_score=individual["danger_score"],
             danger_override=individual["danger_override"],
-            display_score=display_score
+            display_score=display_score,
+            version=version
         )
         
     except HTTPException:
@@ -0,0 +1,47 @@
+"""
+Map API endpoints - clustered last-known locations per map tile
+"""
+from fastapi import APIRouter, HTTPException, Depends, status
+
+from api.auth import get_current_user
+from api.individuals import get_supabase_client
+from db.models import MapTileResponse
+from services.location_service import LocationService
+
+
+router = APIRouter()
+
+
+@router.get("/api/map/tiles/{z}/{x}/{y}", response_model=MapTileResponse)
+async def get_map_tile(
+    z: int,
+    x: int,
+    y: int,
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Get pre-clustered last-known positions for a Web Mercator tile.
+    
+    Features:
+    - Grid aggregation with count and max danger score per cell
+    - Cells with one individual include its id for tap-through
+    - Results cached per tile (MAP_TILE_CACHE_SECONDS)
+    - 400 if tile coordinates are out of range
+    """
+    try:
+        supabase = get_supabase_client()
+        service = LocationService(supabase)
+        
+        return await service.get_tile_clusters(z, x, y)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        print(f"Error getting map tile {z}/{x}/{y}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get map tile: {str(e)}"
+        )
@@ -0,0 +1,46 @@
+"""
+Delta sync endpoint for the mobile app's offline cache
+"""
+from fastapi import APIRouter, HTTPException, Depends, status, Query
+from typing import Optional
+
+from api.auth import get_current_user
+from api.individuals import get_supabase_client
+from db.models import SyncResponse
+from services.sync_service import SyncService
+
+router = APIRouter()
+
+
+@router.get("/api/sync", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous sync; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000, description="Maximum changes per page"),
+    user_id: str = Depends(get_current_user)
+):
+    """
+    Changed individuals, new interactions and category changes since a cursor.
+    
+    Features:
+    - Each changed entity once, with its current row
+    - Tombstones (deleted: true) for removed entities
+    - Paged: call again with the returned cursor while has_more is true
+    - Compressed like other responses (Accept-Encoding)
+    """
+    try:
+        supabase = get_supabase_client()
+        service = SyncService(supabase)
+        
+        return await service.get_changes(since=since, limit=limit)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        print(f"Error syncing changes since {since}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to sync changes: {str(e)}"
+        )
@@ -2,15 +2,19 @@
 Audio transcription and categorization endpoints
 """
 import os
-from fastapi import APIRouter, HTTPException, Depends
+import base64
+from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from supabase import create_client, Client
 
 from api.auth import get_current_user
 from services.openai_service import OpenAIService
+from services.http_clients import get_openai_service
 from services.danger_calculator import calculate_danger_score
 from services.validation_helper import validate_categorized_data
+from services.transcription_jobs import TranscriptionJobQueue, build_job_queue
+from services.rate_limit import ProviderUnavailableError
 
 
 router = APIRouter()
@@ -29,13 +33,30 @@ class TranscribeResponse(BaseModel):
     potential_matches: List[Dict[str, Any]]
 
 
-@router.post("/api/transcribe", response_model=TranscribeResponse)
-async def transcribe_audio_endpoint(
+class TranscriptionJobResponse(BaseModel):
+    id: str
+    status: str  # queued | processing | completed | failed
+    attempts: int
+    result: Optional[TranscribeResponse] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
+def decode_audio_data(audio_data: str) -> bytes:
+    """Audio bytes of a base64 data URL ("data:audio/m4a;base64,...")"""
+    return base64.b64decode(audio_data.split(',')[1])  # Remove data URL prefix
+
+
+async def run_transcription(
     request: TranscribeRequest,
-    user_id: str = Depends(get_current_user)
-):
+    openai_service: OpenAIService,
+    audio_file: Optional[str] = None
+) -> TranscribeResponse:
     """
-    Transcribe audio and extract categorized data
+    Transcription pipeline shared by the synchronous endpoint and job workers
+    
+    Jobs pass their stored recording as `audio_file` instead of audio_data.
     
     Process:
     1. Fetch all categories
@@ -44,93 +65,198 @@ async def transcribe_audio_endpoint(
     4. Validate required fields
     5. Find potential duplicates
     6. Return complete results (no streaming)
+    
+    Raises:
+        ValueError: For invalid input (missing/invalid audio)
+        Exception: For provider or network errors
+    """
+    # 1. Fetch all categories (simplified for testing)
+    categories = [
+        {"name": "Name", "type": "text", "is_required": True},
+        {"name": "Age", "type": "number", "is_required": False},
+        {"name": "Height", "type": "number", "is_required": False},
+        {"name": "Weight", "type": "number", "is_required": False},
+        {"name": "Gender", "type": "text", "is_required": False},
+        {"name": "Medical Conditions", "type": "text", "is_required": False},
+        {"name": "Location", "type": "text", "is_required": False}
+    ]
+    
+    # 2. Transcribe audio
+    if audio_file:
+        transcription = await openai_service.transcribe_audio_file(audio_file)
+    elif request.audio_data:
+        # Handle base64 audio data
+        import tempfile
+        
+        # Decode base64 audio data
+        audio_data = decode_audio_data(request.audio_data)
+        
+        # Create temporary file
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.m4a') as temp_file:
+            temp_file.write(audio_data)
+            temp_file_path = temp_file.name
+        
+        try:
+            # Transcribe from temporary file
+            transcription = await openai_service.transcribe_audio_file(temp_file_path)
+        finally:
+            # Clean up temporary file
+            os.unlink(temp_file_path)
+    elif request.audio_url:
+        # Handle audio URL
+        transcription = await openai_service.transcribe_audio(request.audio_url)
+    else:
+        raise ValueError("Either audio_url or audio_data must be provided")
+    
+    # 3. Categorize transcription
+    categorized_data = await openai_service.categorize_transcription(transcription, categories)
+    
+    # 4. Validate categorized data
+    validation_result = validate_categorized_data(categorized_data, categories)
+    missing_required = validation_result.missing_required
+    
+    # Note: We could also return validation_errors in the response if needed
+    # For now, we'll just log them for debugging
+    if validation_result.validation_errors:
+        print(f"Validation errors: {validation_result.validation_errors}")
+    
+    # 5. Find potential duplicates (simplified for testing)
+    potential_matches = []
+    
+    # Only search if we have a name (check both capitalized and lowercase)
+    name = categorized_data.get("Name") or categorized_data.get("name")
+    if name:
+        
+        # Simple mock duplicate detection for testing
+        if name.lower() in ["john", "jane", "mike"]:
+            potential_matches = [
+                {
+                    "id": "mock-123",
+                    "name": name,
+                    "confidence": 85
+                }
+            ]
+    
+    # 6. Return complete results
+    return TranscribeResponse(
+        transcription=transcription,
+        categorized_data=categorized_data,
+        missing_required=missing_required,
+        potential_matches=potential_matches
+    )
+
+
+@router.post("/api/transcribe", response_model=TranscribeResponse)
+async def transcribe_audio_endpoint(
+    request: TranscribeRequest,
+    user_id: str = Depends(get_current_user),
+    openai_service: OpenAIService = Depends(get_openai_service)
+):
+    """
+    Transcribe audio and extract categorized data
+    
+    Runs the full pipeline (see run_transcription) within the request.
+    For bulk uploads use POST /api/transcribe/jobs instead.
     """
     try:
-        # Initialize services
-        openai_service = OpenAIService()
+        # Initialize services (OpenAI client is shared across requests)
         supabase: Client = create_client(
             os.getenv("SUPABASE_URL"),
             os.getenv("SUPABASE_ANON_KEY")  # Use anon key for now
         )
         
-        # 1. Fetch all categories (simplified for testing)
-        categories = [
-            {"name": "Name", "type": "text", "is_required": True},
-            {"name": "Age", "type": "number", "is_required": False},
-            {"name": "Height", "type": "number", "is_required": False},
-            {"name": "Weight", "type": "number", "is_required": False},
-            {"name": "Gender", "type": "text", "is_required": False},
-            {"name": "Medical Conditions", "type": "text", "is_required": False},
-            {"name": "Location", "type": "text", "is_required": False}
-        ]
-        
-        # 2. Transcribe audio
-        if request.audio_data:
-            # Handle base64 audio data
-            import base64
-            import tempfile
-            
-            # Decode base64 audio data
-            audio_data = base64.b64decode(request.audio_data.split(',')[1])  # Remove data URL prefix
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.m4a') as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-            
-            try:
-                # Transcribe from temporary file
-                transcription = await openai_service.transcribe_audio_file(temp_file_path)
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_file_path)
-        elif request.audio_url:
-            # Handle audio URL
-            transcription = await openai_service.transcribe_audio(request.audio_url)
-        else:
-            raise HTTPException(status_code=400, detail="Either audio_url or audio_data must be provided")
-        
-        # 3. Categorize transcription
-        categorized_data = await openai_service.categorize_transcription(transcription, categories)
-        
-        # 4. Validate categorized data
-        validation_result = validate_categorized_data(categorized_data, categories)
-        missing_required = validation_result.missing_required
-        
-        # Note: We could also return validation_errors in the response if needed
-        # For now, we'll just log them for debugging
-        if validation_result.validation_errors:
-            print(f"Validation errors: {validation_result.validation_errors}")
-        
-        # 5. Find potential duplicates (simplified for testing)
-        potential_matches = []
-        
-        # Only search if we have a name (check both capitalized and lowercase)
-        name = categorized_data.get("Name") or categorized_data.get("name")
-        if name:
-            
-            # Simple mock duplicate detection for testing
-            if name.lower() in ["john", "jane", "mike"]:
-                potential_matches = [
-                    {
-                        "id": "mock-123",
-                        "name": name,
-                        "confidence": 85
-                    }
-                ]
-        
-        # 6. Return complete results
-        return TranscribeResponse(
-            transcription=transcription,
-            categorized_data=categorized_data,
-            missing_required=missing_required,
-            potential_matches=potential_matches
-        )
+        return await run_transcription(request, openai_service)
         
     except ValueError as e:
         # Handle validation errors from services
         raise HTTPException(status_code=400, detail=str(e))
+    except ProviderUnavailableError as e:
+        # Rate limit queue full or circuit open: ask the client to retry later
+        raise HTTPException(
+            status_code=503,
+            detail=f"Transcription service busy: {str(e)}",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))}
+        )
     except Exception as e:
         # Log error for debugging
         print(f"Transcription error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+
+
+# Background job queue for bulk/offline uploads
+_job_queue: Optional[TranscriptionJobQueue] = None
+
+
+async def process_transcription_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: run the pipeline for a queued request"""
+    payload = dict(payload)
+    audio_file = payload.pop("audio_file", None)
+    request = TranscribeRequest(**payload)
+    result = await run_transcription(request, get_openai_service(), audio_file=audio_file)
+    return result.model_dump()
+
+
+def get_job_queue() -> TranscriptionJobQueue:
+    """Return the process-wide job queue (workers are started in the lifespan)"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = build_job_queue(process_transcription_job)
+    return _job_queue
+
+
+def job_to_response(job: Dict[str, Any]) -> TranscriptionJobResponse:
+    return TranscriptionJobResponse(
+        id=job["id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        result=job["result"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+
+@router.post(
+    "/api/transcribe/jobs",
+    response_model=TranscriptionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def create_transcription_job(
+    request: TranscribeRequest,
+    user_id: str = Depends(get_current_user),
+    queue: TranscriptionJobQueue = Depends(get_job_queue)
+):
+    """
+    Queue a recording for background transcription
+    
+    Returns immediately with a job id; poll GET /api/transcribe/jobs/{id}
+    for the result (same shape as POST /api/transcribe). audio_data is
+    stored decoded, as a file, until the job is done.
+    """
+    if not request.audio_data and not request.audio_url:
+        raise HTTPException(status_code=400, detail="Either audio_url or audio_data must be provided")
+    try:
+        audio = decode_audio_data(request.audio_data) if request.audio_data else None
+    except (ValueError, IndexError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid audio_data: {str(e)}")
+    
+    try:
+        provider = os.getenv("TRANSCRIPTION_BACKEND", "openai").lower()
+        job = await queue.enqueue(user_id, provider, request.model_dump(exclude={"audio_data"}), audio=audio)
+        return job_to_response(job)
+    except Exception as e:
+        print(f"Error queueing transcription job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to queue transcription: {str(e)}")
+
+
+@router.get("/api/transcribe/jobs/{job_id}", response_model=TranscriptionJobResponse)
+async def get_transcription_job(
+    job_id: str,
+    user_id: str = Depends(get_current_user),
+    queue: TranscriptionJobQueue = Depends(get_job_queue)
+):
+    """Get status (queued/processing/completed/failed) and result of a job"""
+    job = await queue.get(job_id)
+    if not job or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail=f"Transcription job not found: {job_id}")
+    return job_to_response(job)
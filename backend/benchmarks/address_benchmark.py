@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark address abbreviation against the original backtracking regex
+
+Times the original `re.search` street pattern and the current
+IndividualService.abbreviate_address on:
+- adversarial inputs: long word runs with no street suffix, which make the
+  nested `(?:\\w+\\s+)+` quantifier rescan the tail from every word (quadratic)
+- a realistic search page mix where shelter/hotspot addresses repeat
+
+Usage (from backend/):
+    python -m benchmarks.address_benchmark
+    python -m benchmarks.address_benchmark --words 500 1000 2000 4000
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.individual_service import IndividualService, _abbreviate_address
+
+LEGACY_STREET_PATTERN = r'(\d+\s+)?((?:\w+\s+)+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Way|Place|Pl))'
+
+HOTSPOT_ADDRESSES = [
+    "Market Street & 5th Street, San Francisco, CA",
+    "123 Golden Gate Avenue, San Francisco, CA 94102",
+    "Civic Center Plaza, San Francisco, CA",
+    "1 Embarcadero Center, San Francisco, CA 94111",
+    "Golden Gate Park, San Francisco",
+    "525 Ellis Street, San Francisco, CA 94109",
+    "Mission St & 16th St, San Francisco, CA",
+    "Union Square, San Francisco, CA 94108",
+]
+
+
+def legacy_abbreviate(full_address: str) -> str:
+    """The original uncompiled, uncached implementation"""
+    if not full_address:
+        return ""
+    if " & " in full_address:
+        return full_address.split(",")[0].replace(" Street", "").strip()
+    street_match = re.search(LEGACY_STREET_PATTERN, full_address)
+    if street_match:
+        return street_match.group(2).strip()
+    parts = full_address.split(",")
+    if parts[0] and len(parts[0]) <= 30:
+        return parts[0].strip()
+    return full_address[:30].strip() + "..."
+
+
+def adversarial_address(words: int) -> str:
+    """Many words without a street suffix, ending in punctuation"""
+    return "near the " + "corner of the big blue building " * (words // 6) + "!"
+
+
+def time_call(func, inputs: list, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for address in inputs:
+            func(address)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", nargs="+", type=int, default=[250, 500, 1000, 2000])
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the realistic mix")
+    args = parser.parse_args()
+
+    service = IndividualService(None)
+
+    print("### Adversarial: long addresses without a street suffix ###")
+    print(f"{'Words':>8} {'Legacy':>12} {'Current':>12} {'Speedup':>10}")
+    for words in args.words:
+        address = adversarial_address(words)
+        assert legacy_abbreviate(address) == service.abbreviate_address(address)
+        legacy = time_call(legacy_abbreviate, [address])
+        _abbreviate_address.cache_clear()
+        current = time_call(service.abbreviate_address, [address])
+        print(f"{words:>8} {legacy * 1000:>10.2f}ms {current * 1000:>10.3f}ms {legacy / current:>9.0f}x")
+
+    print(f"\n### Realistic: {args.rows} rows drawn from {len(HOTSPOT_ADDRESSES)} hotspot addresses ###")
+    random.seed(0)
+    rows = [random.choice(HOTSPOT_ADDRESSES) for _ in range(args.rows)]
+    _abbreviate_address.cache_clear()
+    legacy = time_call(legacy_abbreviate, rows)
+    current = time_call(service.abbreviate_address, rows)
+    print(f"Legacy:  {legacy * 1e6 / len(rows):.2f}us/row")
+    print(f"Current: {current * 1e6 / len(rows):.2f}us/row ({_abbreviate_address.cache_info()})")
+
+
+if __name__ == "__main__":
+    main()
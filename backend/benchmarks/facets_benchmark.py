@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark facet counts (GET /api/individuals/facets) at dashboard scale
+
+Loads --individuals rows with three select categories into a throwaway
+schema, then reports:
+- the cost the facet trigger (015, sharded by 021) adds to a save
+  (single-row data updates before and after applying it)
+- category_facets() unfiltered (maintained counts), filtered (grouped over
+  the matching rows), and a full GROUP BY over every individual - what
+  computing the unfiltered counts on demand would cost
+
+Usage (from backend/, needs psycopg2):
+    TEST_DATABASE_URL=postgresql://... python -m benchmarks.facets_benchmark --individuals 100000
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.save_individual_benchmark import apply_schema, MIGRATIONS_DIR
+
+SEARCH_MIGRATIONS = [
+    "011_individual_summaries.sql",
+    "012_search_sort_indexes.sql",
+    "013_search_filters.sql",
+    "014_category_indexes.sql",
+]
+FACET_MIGRATIONS = [
+    "015_category_facets.sql",
+    "018_category_filter_indexes.sql",
+    "021_sharded_facet_counts.sql",
+]
+CATEGORIES = [
+    ("veteran_status", "single_select"),
+    ("housing_priority", "single_select"),
+    ("substance_abuse_history", "multi_select"),
+]
+
+
+def run_migration(conn, name: str) -> None:
+    with conn.cursor() as cur, open(os.path.join(MIGRATIONS_DIR, name)) as f:
+        cur.execute(f.read())
+
+
+def load(conn, count: int, seed: int = 15) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        data = {
+            "name": f"Person {i}",
+            "height": rng.randint(48, 84),
+            "veteran_status": rng.choice(["Yes", "No", "Unknown"]),
+            "housing_priority": rng.choice(["Low", "Medium", "High", "Critical"]),
+            "substance_abuse_history": rng.sample(["None", "Mild", "Moderate", "Severe"], rng.randint(0, 2))
+        }
+        rows.append((data["name"], json.dumps(data), rng.randint(0, 100)))
+    with conn.cursor() as cur:
+        execute_values(cur, "INSERT INTO individuals (name, data, danger_score) VALUES %s RETURNING id",
+                       rows, page_size=1000)
+        ids = [row[0] for row in cur.fetchall()]
+        cur.execute("ANALYZE")
+    return ids
+
+
+def time_updates(conn, ids: list, updates: int) -> float:
+    """ms per single-row data update"""
+    rng = random.Random(updates)
+    with conn.cursor() as cur:
+        start = time.perf_counter()
+        for individual_id in rng.sample(ids, updates):
+            cur.execute(
+                "UPDATE individuals SET data = jsonb_set(data, '{housing_priority}', %s) WHERE id = %s",
+                (json.dumps(rng.choice(["Low", "Critical"])), individual_id)
+            )
+        return (time.perf_counter() - start) * 1000 / updates
+
+
+def time_query(conn, sql: str, params=(), iterations: int = 5) -> float:
+    """Best-of ms for a query"""
+    best = float("inf")
+    with conn.cursor() as cur:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            cur.execute(sql, params)
+            cur.fetchall()
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--individuals", type=int, default=100000)
+    parser.add_argument("--updates", type=int, default=500, help="Saves timed before/after the facet trigger")
+    args = parser.parse_args()
+
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        sys.exit("Set TEST_DATABASE_URL to a disposable Postgres database")
+
+    conn = psycopg2.connect(url)
+    conn.autocommit = True
+    schema = f"bench_{uuid.uuid4().hex[:12]}"
+    apply_schema(conn, schema)
+    try:
+        with conn.cursor() as cur:
+            execute_values(cur, "INSERT INTO categories (name, type) VALUES %s", CATEGORIES)
+        for migration in SEARCH_MIGRATIONS:
+            run_migration(conn, migration)
+        ids = load(conn, args.individuals)
+
+        before = time_updates(conn, ids, args.updates)
+        for migration in FACET_MIGRATIONS:
+            run_migration(conn, migration)
+        after = time_updates(conn, ids, args.updates)
+        print(f"{args.individuals} individuals")
+        print(f"save: {before:.3f} ms without facet trigger, {after:.3f} ms with\n")
+
+        filtered = (json.dumps({"veteran_status": "Yes"}), json.dumps([{"key": "height", "op": "gte", "value": 70}]))
+        cases = [
+            ("unfiltered (maintained)", "SELECT * FROM category_facets()", ()),
+            ("filtered (grouped)", "SELECT * FROM category_facets(%s, %s)", filtered),
+            ("unfiltered, on demand", """
+                SELECT v.category, v.value, count(*)
+                FROM individuals i CROSS JOIN LATERAL facet_values(i.data) v
+                GROUP BY v.category, v.value""", ()),
+        ]
+        print(f"{'query':<26}{'ms':>10}")
+        for name, sql, params in cases:
+            print(f"{name:<26}{time_query(conn, sql, params):>10.1f}")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
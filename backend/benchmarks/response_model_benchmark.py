@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark response model construction and serialization
+
+For a search page (SearchIndividualsResponse) and an individual with
+recent interactions (IndividualDetailResponse), built from DB-shaped rows
+(UUIDs and timestamps as strings, as PostgREST returns them), compares:
+- validated: models built with validation, then FastAPI's response_model
+  handling (serialize_response: dump, re-validate, jsonable_encoder) and
+  ORJSONResponse rendering - the previous path
+- trusted: models built with model_construct and dumped straight to
+  ORJSONResponse (services.individual_service.db_model + trusted_response)
+
+Usage (from backend/):
+    python -m benchmarks.response_model_benchmark
+    python -m benchmarks.response_model_benchmark --rows 20 --iterations 2000
+"""
+import os
+import sys
+import time
+import argparse
+from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from db.models import (
+    IndividualSummary,
+    SearchIndividualsResponse,
+    IndividualResponse,
+    InteractionSummary,
+    IndividualDetailResponse
+)
+
+
+def summary_rows(count: int):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid4()),
+            "name": "John Doe",
+            "danger_score": i % 100,
+            "danger_override": None,
+            "display_score": i % 100,
+            "last_seen": (now - timedelta(minutes=i)).isoformat(),
+            "last_location": {"latitude": 37.78, "longitude": -122.41, "address": "123 Market St"}
+        }
+        for i in range(count)
+    ]
+
+
+def detail_rows(interactions: int):
+    now = datetime.now(timezone.utc).isoformat()
+    individual = {
+        "id": str(uuid4()), "name": "John Doe", "danger_score": 40, "danger_override": None,
+        "display_score": 40, "created_at": now, "updated_at": now, "version": 3,
+        "data": {"name": "John Doe", "height": 72, "weight": 180, "skin_color": "Light",
+                 "substance_abuse_history": ["Mild"], "veteran_status": "Yes"}
+    }
+    summaries = [
+        {"id": str(uuid4()), "created_at": now, "user_name": "Demo User",
+         "location": {"latitude": 37.78, "longitude": -122.41, "address": "123 Market St, San Francisco"},
+         "has_transcription": True}
+        for _ in range(interactions)
+    ]
+    return individual, summaries
+
+
+def build_search(rows, build):
+    return build(SearchIndividualsResponse, individuals=[build(IndividualSummary, **row) for row in rows],
+                 total=len(rows), offset=0, limit=len(rows))
+
+
+def build_detail(individual, summaries, build):
+    return build(IndividualDetailResponse, individual=build(IndividualResponse, **individual),
+                 recent_interactions=[build(InteractionSummary, **row) for row in summaries])
+
+
+def validated(model, **values):
+    return model(**values)
+
+
+def constructed(model, **values):
+    return model.model_construct(**values)
+
+
+def run_sync(coroutine):
+    """Drive a coroutine that never suspends (no event loop overhead in timings)"""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("coroutine suspended")
+
+
+def fastapi_path(field):
+    """What FastAPI does with a returned model when response_model is set"""
+    def render(model):
+        content = run_sync(serialize_response(field=field, response_content=model))
+        return ORJSONResponse(content).body
+    return render
+
+
+def trusted_path(model):
+    return ORJSONResponse(model.model_dump(mode="json", warnings=False)).body
+
+
+def time_ms(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Search results per page")
+    parser.add_argument("--interactions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    rows = summary_rows(args.rows)
+    individual, summaries = detail_rows(args.interactions)
+    cases = [
+        (f"search ({args.rows} rows)", lambda build: build_search(rows, build),
+         create_response_field(name="search", type_=SearchIndividualsResponse)),
+        (f"detail ({args.interactions} interactions)", lambda build: build_detail(individual, summaries, build),
+         create_response_field(name="detail", type_=IndividualDetailResponse)),
+    ]
+
+    print(f"{'case':<28}{'path':<11}{'build ms':>10}{'respond ms':>12}{'total ms':>10}")
+    for name, build, field in cases:
+        for path, builder, respond in (("validated", validated, fastapi_path(field)),
+                                       ("trusted", constructed, trusted_path)):
+            model = build(builder)
+            assert respond(model)
+            build_ms = time_ms(lambda: build(builder), args.iterations)
+            respond_ms = time_ms(lambda: respond(model), args.iterations)
+            print(f"{name:<28}{path:<11}{build_ms:>10.3f}{respond_ms:>12.3f}{build_ms + respond_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark the atomic save_individual function against the previous flow
+
+The previous IndividualService.save_individual merged with three separate
+PostgREST requests (fetch existing, update individual, insert interaction);
+the save_individual database function (migration 006) does all of it in one
+transaction and one round trip. Runs both against a disposable Postgres in a
+throwaway schema, optionally adding a simulated network round-trip time per
+request.
+
+Usage (from backend/, needs psycopg2):
+    TEST_DATABASE_URL=postgresql://... python -m benchmarks.save_individual_benchmark --rtt-ms 20
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import Json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.individual_service import IndividualService
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "supabase", "migrations"
+)
+# Migrations needed by save_individual (002-005 add demo data / need PostGIS)
+MIGRATIONS = [
+    "001_initial_schema.sql",
+    "006_atomic_save_individual.sql",
+    "007_conditional_merge.sql",
+    "008_individual_versions.sql",
+    "017_batch_save_individuals.sql",
+    "024_prune_individual_versions.sql",
+]
+
+
+class CountingCursor(psycopg2.extensions.cursor):
+    """Counts statements (= round trips in autocommit mode) and simulates latency"""
+
+    def execute(self, query, vars=None):
+        self.connection.round_trips += 1
+        if self.connection.rtt:
+            time.sleep(self.connection.rtt)
+        return super().execute(query, vars)
+
+
+class CountingConnection(psycopg2.extensions.connection):
+    round_trips = 0
+    rtt = 0.0
+
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault("cursor_factory", CountingCursor)
+        return super().cursor(*args, **kwargs)
+
+
+def apply_schema(conn, schema: str) -> None:
+    """Create a fresh schema with the tables and function, and use it for this session"""
+    with conn.cursor() as cur:
+        # Stand-in for Supabase's auth schema referenced by interactions.user_id
+        cur.execute("CREATE SCHEMA IF NOT EXISTS auth")
+        cur.execute("CREATE TABLE IF NOT EXISTS auth.users (id UUID PRIMARY KEY)")
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(f"SET search_path TO {schema}, public")
+        for name in MIGRATIONS:
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                cur.execute(f.read())
+
+
+def rpc_save(conn, data: dict, user_id: str, merge_with_id=None, location=None, expected_updated_at=None,
+             expected_version=None) -> dict:
+    """One call to the save_individual function"""
+    with conn.cursor() as cur:
+        cur.execute(
+            """SELECT save_individual(
+                   p_name := %s, p_data := %s, p_danger_score := %s,
+                   p_user_id := %s, p_user_name := %s,
+                   p_merge_with_id := %s, p_location := %s,
+                   p_expected_updated_at := %s, p_expected_version := %s)""",
+            (data.get("name", "Unknown"), Json(data), 0, user_id, "Demo User",
+             merge_with_id, Json(location) if location else None, expected_updated_at, expected_version)
+        )
+        return cur.fetchone()[0]
+
+
+def rpc_save_batch(conn, items: list, user_id: str) -> list:
+    """One call to the save_individuals_batch function (items as sent by IndividualService)"""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT save_individuals_batch(p_user_id := %s, p_user_name := %s, p_items := %s)",
+            (user_id, "Demo User", Json([
+                {"index": index, "name": item["data"].get("name", "Unknown"), "danger_score": 0, **item}
+                for index, item in enumerate(items)
+            ]))
+        )
+        return cur.fetchone()[0]
+
+
+def legacy_save(conn, data: dict, user_id: str, merge_with_id=None) -> dict:
+    """The previous flow: one autocommitted request per step"""
+    with conn.cursor() as cur:
+        if merge_with_id:
+            cur.execute("SELECT data FROM individuals WHERE id = %s", (merge_with_id,))
+            existing = cur.fetchone()
+            if existing is None:
+                raise ValueError(f"Individual not found: {merge_with_id}")
+            changes = IndividualService(None).get_changed_fields(existing[0], data)
+            cur.execute(
+                """UPDATE individuals SET name = %s, danger_score = %s, data = %s, updated_at = NOW()
+                   WHERE id = %s RETURNING id""",
+                (data.get("name", "Unknown"), 0, Json(data), merge_with_id)
+            )
+        else:
+            changes = data
+            cur.execute(
+                "INSERT INTO individuals (name, danger_score, data) VALUES (%s, %s, %s) RETURNING id",
+                (data.get("name", "Unknown"), 0, Json(data))
+            )
+        individual_id = cur.fetchone()[0]
+        cur.execute(
+            """INSERT INTO interactions (individual_id, user_id, user_name, changes)
+               VALUES (%s, %s, %s, %s) RETURNING id""",
+            (individual_id, user_id, "Demo User", Json(changes))
+        )
+        return {"individual_id": individual_id, "interaction_id": cur.fetchone()[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saves", type=int, default=200, help="Merges per implementation")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="Simulated network round trip per request")
+    args = parser.parse_args()
+
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        sys.exit("Set TEST_DATABASE_URL to a disposable Postgres database")
+
+    conn = psycopg2.connect(url, connection_factory=CountingConnection)
+    conn.autocommit = True
+    schema = f"bench_{uuid.uuid4().hex[:12]}"
+    apply_schema(conn, schema)
+    try:
+        user_id = str(uuid.uuid4())
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO auth.users (id) VALUES (%s)", (user_id,))
+        data = {"name": "Jane Smith", "height": 65, "weight": 140, "skin_color": "Dark"}
+        individual_id = rpc_save(conn, data, user_id)["individual"]["id"]
+
+        conn.rtt = args.rtt_ms / 1000
+        print(f"{args.saves} merges per implementation, simulated RTT {args.rtt_ms:.1f}ms")
+        print(f"{'Implementation':<16} {'Round trips':>12} {'ms/save':>10}")
+        for name, save in (("legacy (3 req)", legacy_save), ("save_individual", rpc_save)):
+            conn.round_trips = 0
+            start = time.perf_counter()
+            for i in range(args.saves):
+                save(conn, {**data, "weight": 140 + i}, user_id, merge_with_id=individual_id)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<16} {conn.round_trips / args.saves:>12.1f} {elapsed * 1000 / args.saves:>10.2f}")
+    finally:
+        conn.rtt = 0
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
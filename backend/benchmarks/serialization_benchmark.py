@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark response size and serialization time for a search page
+
+Serializes a 100-item SearchIndividualsResponse the way FastAPI does
+(jsonable_encoder, then the response class) with:
+- JSONResponse (stdlib json, the previous default)
+- ORJSONResponse (the current default)
+- MessagePack (Accept: application/msgpack, needs pip install msgpack)
+
+and reports bytes on the wire uncompressed, gzip'd and brotli'd (needs
+pip install brotli) at the CompressionMiddleware defaults.
+
+Usage (from backend/):
+    python -m benchmarks.serialization_benchmark
+    python -m benchmarks.serialization_benchmark --items 20 --iterations 2000
+"""
+import os
+import sys
+import gzip
+import time
+import random
+import argparse
+from uuid import uuid4
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from api.compression import brotli, msgpack
+from db.models import IndividualSummary, SearchIndividualsResponse
+
+NAMES = ["John Doe", "Jane Smith", "Robert Johnson", "Maria Garcia", "James Wilson", "Sarah Chen"]
+STREETS = ["Market St", "Mission St", "Golden Gate Ave", "Ellis St", "Howard St", "Folsom St"]
+
+
+def search_page(items: int, seed: int = 7) -> SearchIndividualsResponse:
+    """A realistic search page: abbreviated addresses, full timestamps, coordinates"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    individuals = []
+    for _ in range(items):
+        danger_score = rng.randint(0, 100)
+        override = rng.choice([None, None, None, rng.randint(0, 100)])
+        individuals.append(IndividualSummary(
+            id=uuid4(),
+            name=rng.choice(NAMES),
+            danger_score=danger_score,
+            danger_override=override,
+            display_score=override if override is not None else danger_score,
+            last_seen=now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+            last_location={
+                "latitude": 37.7 + rng.random() * 0.1,
+                "longitude": -122.5 + rng.random() * 0.1,
+                "address": f"{rng.randint(1, 2000)} {rng.choice(STREETS)}"
+            }
+        ))
+    return SearchIndividualsResponse(individuals=individuals, total=items, offset=0, limit=items)
+
+
+def serializers():
+    """(name, fn(response model) -> bytes) for each available format"""
+    formats = [
+        ("json (stdlib)", lambda page: JSONResponse(jsonable_encoder(page)).body),
+        ("orjson", lambda page: ORJSONResponse(jsonable_encoder(page)).body),
+    ]
+    if msgpack is not None:
+        # What MessagePackMiddleware does: re-encode the orjson body
+        formats.append((
+            "msgpack",
+            lambda page: msgpack.packb(orjson.loads(ORJSONResponse(jsonable_encoder(page)).body))
+        ))
+    return formats
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    page = search_page(args.items)
+    print(f"SearchIndividualsResponse with {args.items} items, {args.iterations} iterations\n")
+    header = f"{'format':<15}{'serialize ms':>14}{'bytes':>9}{'gzip':>9}{'gzip ms':>9}"
+    if brotli is not None:
+        header += f"{'br':>9}{'br ms':>9}"
+    print(header)
+
+    for name, serialize in serializers():
+        body = serialize(page)
+        row = f"{name:<15}{time_per_call(lambda: serialize(page), args.iterations):>14.3f}{len(body):>9}"
+        row += f"{len(gzip.compress(body, 6)):>9}"
+        row += f"{time_per_call(lambda: gzip.compress(body, 6), args.iterations):>9.3f}"
+        if brotli is not None:
+            row += f"{len(brotli.compress(body, quality=5)):>9}"
+            row += f"{time_per_call(lambda: brotli.compress(body, quality=5), args.iterations):>9.3f}"
+        print(row)
+
+    if msgpack is None or brotli is None:
+        print("\n(pip install msgpack brotli for the remaining formats)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark transcription backends on the demo recordings
+
+Compares real-time factor (processing seconds / audio seconds) and word error
+rate against the reference scripts in mobile/assets/demo-audio.
+
+Usage (from backend/):
+    python -m benchmarks.transcription_benchmark                 # all backends
+    python -m benchmarks.transcription_benchmark --backends local
+
+The "openai" backend needs OPENAI_API_KEY; "local" needs faster-whisper.
+"""
+import os
+import re
+import sys
+import time
+import glob
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from services.audio_utils import get_m4a_duration
+from services.transcription_backends import get_transcription_backend
+
+DEMO_AUDIO_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "mobile", "assets", "demo-audio"
+)
+
+
+def normalize_words(text: str) -> list:
+    """Lowercase and strip punctuation so WER only counts word differences"""
+    return re.sub(r"[^a-z0-9' ]", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein distance over words divided by reference length"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            cost = 0 if ref_word == hyp_word else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        previous = current
+    return previous[-1] / len(ref)
+
+
+async def benchmark_backend(name: str, samples: list) -> dict:
+    """Transcribe every sample with one backend and collect timings"""
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY") or "unused")
+    backend = get_transcription_backend(client, name)
+
+    # Warm up once so the local model load isn't counted as inference time
+    await backend.transcribe(samples[0]["audio"])
+
+    total_audio = 0.0
+    total_elapsed = 0.0
+    wers = []
+    for sample in samples:
+        start = time.perf_counter()
+        text = await backend.transcribe(sample["audio"])
+        elapsed = time.perf_counter() - start
+
+        wer = word_error_rate(sample["reference"], text)
+        total_audio += sample["duration"]
+        total_elapsed += elapsed
+        wers.append(wer)
+        print(f"   {os.path.basename(sample['audio'])}: {elapsed:.2f}s "
+              f"(RTF {elapsed / sample['duration']:.3f}), WER {wer:.1%}")
+
+    return {
+        "backend": name,
+        "rtf": total_elapsed / total_audio,
+        "wer": sum(wers) / len(wers)
+    }
+
+
+def load_samples() -> list:
+    """Demo recordings with their reference text; skips files without a readable duration"""
+    samples = []
+    for audio_path in sorted(glob.glob(os.path.join(DEMO_AUDIO_DIR, "*.m4a"))):
+        duration = get_m4a_duration(audio_path)
+        if not duration:
+            print(f"   ⚠️ Skipping {os.path.basename(audio_path)}: can't read its duration")
+            continue
+        with open(audio_path.replace(".m4a", ".txt")) as f:
+            reference = f.read()
+        samples.append({
+            "audio": audio_path,
+            "reference": reference,
+            "duration": duration
+        })
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["openai", "local"])
+    args = parser.parse_args()
+
+    load_dotenv()
+    samples = load_samples()
+    if not samples:
+        print(f"No demo recordings with a readable duration in {DEMO_AUDIO_DIR}")
+        return
+    print(f"Loaded {len(samples)} demo recordings "
+          f"({sum(s['duration'] for s in samples):.1f}s of audio)")
+
+    results = []
+    for name in args.backends:
+        print(f"\n### Backend: {name} ###")
+        try:
+            results.append(await benchmark_backend(name, samples))
+        except Exception as e:
+            print(f"   ❌ Skipped: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"{'Backend':<10} {'RTF':>8} {'WER':>8}")
+    for r in results:
+        print(f"{r['backend']:<10} {r['rtf']:>8.3f} {r['wer']:>8.1%}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
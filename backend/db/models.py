@@ -22,6 +22,7 @@ class SaveIndividualRequest(BaseModel):
     location: Optional[LocationData] = None
     transcription: Optional[str] = None  # Original audio transcription if voice entry
     audio_url: Optional[str] = None  # Reference to audio file
+    expected_updated_at: Optional[datetime] = None  # Merge only if unchanged since this updated_at
     
     @field_validator('data')
     def validate_required_fields(cls, v):
@@ -33,6 +34,19 @@ class SaveIndividualRequest(BaseModel):
         return v
 
 
+class BatchSaveItem(SaveIndividualRequest):
+    """One item of a batch save"""
+    # Version (ETag) the item's data is based on; stands in for If-Match
+    expected_version: Optional[int] = None
+
+
+class BatchSaveIndividualsRequest(BaseModel):
+    """Request to save several individuals/interactions at once (offline sync)"""
+    # Each item has the BatchSaveItem shape; items are validated one by
+    # one so a bad item fails on its own instead of rejecting the whole batch
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=100)
+
+
 class DangerOverrideRequest(BaseModel):
     """Request to update danger score override"""
     danger_override: Optional[int] = Field(None, ge=0, le=100)
@@ -50,6 +64,33 @@ class IndividualSummary(BaseModel):
     last_location: Optional[Dict[str, Any]]  # Simplified location with abbreviated address
 
 
+class NearbyIndividual(IndividualSummary):
+    """Individual summary from a location query"""
+    distance_m: Optional[float] = None  # Metres from query point (radius queries only)
+
+
+class NearbyIndividualsResponse(BaseModel):
+    """Individuals whose last-known location matched a radius/bbox query"""
+    individuals: List[NearbyIndividual]
+
+
+class MapCluster(BaseModel):
+    """Aggregated last-known positions in one grid cell of a map tile"""
+    latitude: float  # Centroid of the cell's points
+    longitude: float
+    count: int
+    max_danger_score: int  # Highest display score in the cell
+    individual_id: Optional[UUID] = None  # Set when the cell holds a single individual
+
+
+class MapTileResponse(BaseModel):
+    """Clusters for one Web Mercator tile"""
+    z: int
+    x: int
+    y: int
+    clusters: List[MapCluster]
+
+
 class IndividualResponse(BaseModel):
     """Full individual data"""
     id: UUID
@@ -60,6 +101,7 @@ class IndividualResponse(BaseModel):
     data: Dict[str, Any]  # All categorized fields
     created_at: datetime
     updated_at: datetime
+    version: int = 1  # Bumped on every change; sent as the ETag
 
 
 class InteractionSummary(BaseModel):
@@ -87,6 +129,21 @@ class SaveIndividualResponse(BaseModel):
     interaction: InteractionSummary
 
 
+class BatchItemResult(BaseModel):
+    """Outcome of one item in a batch save"""
+    index: int  # Position in the request's items
+    status_code: int  # 200 saved, 400/422 invalid, 404 merge target not found, 409 conflict
+    result: Optional[SaveIndividualResponse] = None
+    error: Optional[str] = None
+
+
+class BatchSaveIndividualsResponse(BaseModel):
+    """Per-item results of a batch save, in request order"""
+    results: List[BatchItemResult]
+    saved: int
+    failed: int
+
+
 class SearchIndividualsResponse(BaseModel):
     """Paginated search results"""
     individuals: List[IndividualSummary]
@@ -95,6 +152,57 @@ class SearchIndividualsResponse(BaseModel):
     limit: int
 
 
+class FacetValue(BaseModel):
+    """Number of individuals with one option of a category"""
+    value: str
+    count: int
+
+
+class CategoryFacet(BaseModel):
+    """Option counts of a single_select / multi_select category, most common first"""
+    category: str
+    type: str
+    values: List[FacetValue]
+
+
+class FacetsResponse(BaseModel):
+    """Response for GET /api/individuals/facets"""
+    facets: List[CategoryFacet]
+
+
+class ScoreHistogramBucket(BaseModel):
+    """Number of individuals with a score in [start, end] (end exclusive but for the last bucket)"""
+    start: int
+    end: int
+    count: int
+
+
+class ScoreDistribution(BaseModel):
+    """Distribution of one score over a slice of individuals"""
+    mean: Optional[float] = None
+    percentiles: Dict[str, float]  # "p25", "p50", "p75", "p90", "p99"
+    histogram: List[ScoreHistogramBucket]
+
+
+class DangerScoreStats(BaseModel):
+    """Danger score distribution of one slice (all individuals, or one worker's)"""
+    user_id: Optional[UUID] = None  # Worker; None for the overall slice
+    user_name: Optional[str] = None
+    individuals: int
+    overrides: int  # Individuals with a manual danger override
+    override_rate: float  # overrides / individuals
+    danger_score: ScoreDistribution  # Calculated score
+    display_score: ScoreDistribution  # Override if set, else calculated
+
+
+class DangerScoreAnalyticsResponse(BaseModel):
+    """Response for GET /api/analytics/danger-scores"""
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    bucket_width: int
+    slices: List[DangerScoreStats]
+
+
 class IndividualDetailResponse(BaseModel):
     """Individual details with recent interactions"""
     individual: IndividualResponse
@@ -106,6 +214,7 @@ class DangerOverrideResponse(BaseModel):
     danger_score: int  # Original calculated score
     danger_override: Optional[int]  # Manual override if set
     display_score: int  # What UI should show
+    version: int = 1  # New version (ETag) after the update
 
 
 class InteractionsResponse(BaseModel):
@@ -113,6 +222,21 @@ class InteractionsResponse(BaseModel):
     interactions: List[InteractionDetail]
 
 
+class SyncChange(BaseModel):
+    """Latest state of one changed entity since the client's cursor"""
+    entity: str  # individual | interaction | category
+    id: UUID
+    deleted: bool  # Tombstone: remove from the local replica
+    record: Optional[Dict[str, Any]] = None  # Current row (None when deleted)
+
+
+class SyncResponse(BaseModel):
+    """One page of changes for the mobile app's offline replica"""
+    changes: List[SyncChange]
+    cursor: str  # Pass as ?since= on the next sync
+    has_more: bool  # Another page is available right away
+
+
 # Category Models
 class CreateCategoryRequest(BaseModel):
     """Request to create a new custom category"""
@@ -123,6 +247,7 @@ class CreateCategoryRequest(BaseModel):
     auto_trigger: Optional[bool] = False
     is_required: Optional[bool] = False
     options: Optional[List[Any]] = None  # List[Dict] for single_select, List[str] for multi_select
+    create_index: Optional[bool] = None  # Index the key for filters; default: high priority only
     
     @field_validator('name')
     def capitalize_name(cls, v):
@@ -172,4 +297,25 @@ class CategoryResponse(BaseModel):
     auto_trigger: bool
     options: Optional[List[Any]]
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+    index_status: Optional[str] = None  # Managed filter index: pending | ready | failed
+    index_error: Optional[str] = None  # Why an index was wanted but not registered
+
+
+class CategoryIndexInfo(BaseModel):
+    """A managed per-category index, with size and usage once built"""
+    category_name: str
+    index_name: str
+    method: str  # btree | gin
+    status: str  # pending | ready | failed
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    ready_at: Optional[datetime] = None
+    size_bytes: Optional[int] = None
+    scans: Optional[int] = None  # Index scans since the last stats reset
+    tuples_read: Optional[int] = None
+
+
+class CategoryIndexesResponse(BaseModel):
+    """Response for GET /api/categories/indexes"""
+    indexes: List[CategoryIndexInfo]
\ No newline at end of file
@@ -2,14 +2,59 @@
 Main FastAPI application for SF Homeless Outreach Voice Transcription App
 """
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="SF Homeless Outreach API", version="0.1.0")
+from services.http_clients import init_clients, close_clients
+from services.metrics import metrics
+from api.compression import MessagePackMiddleware, CompressionMiddleware, compression_settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients and job workers on startup, stop them on shutdown"""
+    await init_clients()
+    
+    job_queue = None
+    if os.getenv("TRANSCRIPTION_JOBS_WORKERS", "true").lower() == "true":
+        from api.transcription import get_job_queue
+        job_queue = get_job_queue()
+        await job_queue.start()
+    
+    # Category indexes queued by migrations, built concurrently (see migration 018)
+    index_builds = None
+    if os.getenv("SUPABASE_DB_URL"):
+        from api.individuals import get_supabase_client
+        from services.category_index_service import CategoryIndexService
+        index_builds = asyncio.create_task(
+            asyncio.to_thread(CategoryIndexService(get_supabase_client()).build_pending)
+        )
+    
+    yield
+    
+    if index_builds:
+        # Only stops waiting: the build thread can't be interrupted, and an
+        # index it doesn't finish stays pending and is rebuilt on next start
+        index_builds.cancel()
+        await asyncio.gather(index_builds, return_exceptions=True)
+    if job_queue:
+        await job_queue.stop()
+    await close_clients()
+
+
+app = FastAPI(
+    title="SF Homeless Outreach API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # CORS configuration for hackathon demo
 app.add_middleware(
@@ -20,11 +65,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Smaller responses for cellular clients: MessagePack if the Accept header
+# asks for it, then brotli/gzip (the last middleware added runs outermost)
+app.add_middleware(MessagePackMiddleware)
+if os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true":
+    app.add_middleware(CompressionMiddleware, **compression_settings())
+
 @app.get("/health")
 async def health_check():
     """Simple health check endpoint"""
     return {"status": "ok"}
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters for this worker (e.g. audio pre-processing savings)"""
+    return metrics.snapshot()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -36,10 +92,13 @@ async def root():
     }
 
 # Import API routers
-from api import categories, transcription, individuals, export
+from api import categories, transcription, individuals, export, maps, sync, analytics
 
 # Register routers
 app.include_router(categories.router)
 app.include_router(transcription.router)
 app.include_router(individuals.router)
-app.include_router(export.router)
\ No newline at end of file
+app.include_router(export.router)
+app.include_router(maps.router)
+app.include_router(sync.router)
+app.include_router(analytics.router)
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Analytics service - danger score distributions for the dashboard
+
+Histograms, percentiles and override rate are computed in the database by
+danger_score_stats() (migration 016) over individual_summaries, so no
+individuals are downloaded. Responses are cached per individuals version,
+so any save invalidates them.
+"""
+import os
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from supabase import Client
+
+from db.models import (
+    ScoreHistogramBucket,
+    ScoreDistribution,
+    DangerScoreStats,
+    DangerScoreAnalyticsResponse
+)
+from services.individual_service import ResponseCache, db_model, naive_utc
+
+
+# Order of the percentile arrays returned by danger_score_stats()
+PERCENTILES = ("p25", "p50", "p75", "p90", "p99")
+MAX_SCORE = 100
+
+analytics_cache = ResponseCache(max_entries=int(os.getenv("ANALYTICS_CACHE_SIZE", "64")))
+
+
+def histogram_buckets(counts: Optional[Dict[str, int]], bucket_width: int) -> List[ScoreHistogramBucket]:
+    """Every bucket from 0 to 100, including empty ones (the database only returns non-empty buckets)"""
+    counts = counts or {}
+    return [
+        db_model(
+            ScoreHistogramBucket,
+            start=start,
+            end=min(start + bucket_width, MAX_SCORE),
+            count=counts.get(str(start), 0)
+        )
+        for start in range(0, MAX_SCORE, bucket_width)
+    ]
+
+
+def score_distribution(mean: Optional[float], percentiles: Optional[List[float]],
+                       histogram: Optional[Dict[str, int]], bucket_width: int) -> ScoreDistribution:
+    return db_model(
+        ScoreDistribution,
+        mean=round(mean, 2) if mean is not None else None,
+        percentiles=dict(zip(PERCENTILES, percentiles or [])),
+        histogram=histogram_buckets(histogram, bucket_width)
+    )
+
+
+class AnalyticsService:
+    """Service for dashboard analytics"""
+
+    def __init__(self, supabase_client: Client):
+        self.supabase = supabase_client
+
+    async def get_danger_score_stats(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        worker_id: Optional[str] = None,
+        by_worker: bool = False,
+        bucket_width: int = 10,
+        cache_key: Optional[str] = None
+    ) -> DangerScoreAnalyticsResponse:
+        """
+        Danger score distribution, overall or per worker
+
+        Without a window or worker every individual is counted; otherwise
+        the individuals with an interaction in [since, until) (by that
+        worker). by_worker returns one slice per worker, largest first.
+        Results are cached under cache_key.
+        """
+        # interactions.created_at is a UTC TIMESTAMP: compare in naive UTC
+        since, until = naive_utc(since), naive_utc(until)
+        if since and until and since >= until:
+            raise ValueError("since must be before until")
+        if not 1 <= bucket_width <= MAX_SCORE:
+            raise ValueError(f"bucket_width must be between 1 and {MAX_SCORE}")
+
+        if cache_key is not None:
+            cached = analytics_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response = self.supabase.rpc("danger_score_stats", {
+            "p_since": since.isoformat() if since else None,
+            "p_until": until.isoformat() if until else None,
+            "p_user_id": worker_id,
+            "p_by_worker": by_worker,
+            "p_bucket_width": bucket_width
+        }).execute()
+
+        slices = [self._slice(row, bucket_width) for row in response.data or []]
+        if not slices and not by_worker:
+            # Nothing matched: an empty overall slice rather than none
+            slices = [self._slice({"individuals": 0, "overrides": 0}, bucket_width)]
+
+        result = db_model(
+            DangerScoreAnalyticsResponse,
+            since=since,
+            until=until,
+            bucket_width=bucket_width,
+            slices=slices
+        )
+        if cache_key is not None:
+            analytics_cache.set(cache_key, result)
+        return result
+
+    def _slice(self, row: Dict[str, Any], bucket_width: int) -> DangerScoreStats:
+        individuals = row["individuals"]
+        return db_model(
+            DangerScoreStats,
+            user_id=row.get("user_id"),
+            user_name=row.get("user_name"),
+            individuals=individuals,
+            overrides=row["overrides"],
+            override_rate=round(row["overrides"] / individuals, 4) if individuals else 0.0,
+            danger_score=score_distribution(
+                row.get("mean_danger_score"), row.get("danger_score_percentiles"),
+                row.get("danger_score_histogram"), bucket_width
+            ),
+            display_score=score_distribution(
+                row.get("mean_display_score"), row.get("display_score_percentiles"),
+                row.get("display_score_histogram"), bucket_width
+            )
+        )
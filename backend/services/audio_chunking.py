@@ -0,0 +1,119 @@
+"""
+Split long recordings at silence for parallel transcription
+
+Long audio is cut near every `target_seconds` at the quietest frame in a
+search window, each chunk is extended by a short overlap so words at a cut
+aren't lost, and the chunk transcripts are stitched back together with the
+duplicated overlap words removed.
+"""
+import os
+import re
+import tempfile
+from array import array
+from typing import List, Optional, Tuple
+
+from services.audio_preprocessing import SAMPLE_RATE, FRAME_MS, frame_energies, encode_m4a
+
+
+def chunking_settings() -> dict:
+    """Chunking configuration from environment"""
+    return {
+        "enabled": os.getenv("TRANSCRIPTION_CHUNKING", "true").lower() == "true",
+        "min_duration": float(os.getenv("TRANSCRIPTION_CHUNK_MIN_SECONDS", "45")),
+        "target_seconds": float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "30")),
+        "overlap_seconds": float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", "1.0")),
+        "concurrency": int(os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", "4")),
+    }
+
+
+def split_at_silence(
+    samples: array,
+    sample_rate: int = SAMPLE_RATE,
+    target_seconds: float = 30.0,
+    search_seconds: float = 5.0,
+    overlap_seconds: float = 1.0,
+    energies: Optional[List[float]] = None
+) -> List[Tuple[int, int]]:
+    """
+    Choose chunk boundaries at the quietest point near each target length
+
+    Args:
+        samples: Mono 16-bit PCM
+        target_seconds: Desired chunk length
+        search_seconds: How far either side of the target to look for silence
+        overlap_seconds: Extra audio appended to each chunk past its cut
+        energies: Frame energies of `samples` if already computed (pre-processing)
+
+    Returns:
+        List of (start_sample, end_sample) ranges, in order
+    """
+    frame_size = sample_rate * FRAME_MS // 1000
+    if energies is None:
+        energies = frame_energies(samples, frame_size)
+    total_frames = len(energies)
+
+    target = max(1, int(target_seconds * 1000 / FRAME_MS))
+    search = int(search_seconds * 1000 / FRAME_MS)
+    overlap = int(overlap_seconds * sample_rate)
+
+    cuts = [0]
+    # Stop once the remainder fits in one chunk without leaving a tiny tail
+    while total_frames - cuts[-1] > target * 1.5:
+        low = cuts[-1] + max(1, target - search)
+        high = min(total_frames, cuts[-1] + target + search)
+        window = energies[low:high]
+        cuts.append(low + window.index(min(window)))
+    cuts.append(total_frames)
+
+    total = len(samples)
+    return [
+        (cuts[i] * frame_size, min(total, cuts[i + 1] * frame_size + overlap))
+        for i in range(len(cuts) - 1)
+    ]
+
+
+def write_chunks(samples: array, ranges: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE) -> List[str]:
+    """Encode each sample range to its own temporary M4A; caller deletes them"""
+    paths = []
+    try:
+        for start, end in ranges:
+            fd, path = tempfile.mkstemp(suffix=".m4a")
+            os.close(fd)
+            paths.append(path)
+            encode_m4a(samples[start:end], path, sample_rate)
+    except Exception:
+        for path in paths:
+            os.unlink(path)
+        raise
+    return paths
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = 12) -> str:
+    """
+    Join chunk transcripts, dropping words repeated across the overlap
+
+    For each pair of neighbours, the longest run of words ending the previous
+    transcript that also starts the next one (ignoring case/punctuation) is
+    removed from the next one.
+    """
+    words: List[str] = []
+    for text in texts:
+        next_words = text.split()
+        if not next_words:
+            continue
+
+        limit = min(max_overlap_words, len(words), len(next_words))
+        overlap = 0
+        for size in range(limit, 0, -1):
+            tail = [_normalize(w) for w in words[-size:]]
+            head = [_normalize(w) for w in next_words[:size]]
+            if tail == head:
+                overlap = size
+                break
+        words.extend(next_words[overlap:])
+
+    return " ".join(words)
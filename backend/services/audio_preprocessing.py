@@ -0,0 +1,238 @@
+"""
+Audio pre-processing before speech-to-text
+
+Whisper bills per audio second and field recordings carry long silences at
+whatever bitrate the phone used. Before upload we:
+1. Decode the M4A to 16 kHz mono PCM (ffmpeg)
+2. Trim leading/trailing silence and shorten long internal pauses (energy VAD)
+3. Re-encode as low-bitrate mono AAC/M4A
+
+Requires the ffmpeg binary (FFMPEG_PATH, default "ffmpeg" on PATH).
+"""
+import os
+import sys
+import math
+import shutil
+import tempfile
+import subprocess
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Tuple, Optional
+
+from services.metrics import metrics
+
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+@dataclass
+class PreprocessResult:
+    """Processed file plus size/duration before and after"""
+    path: str
+    original_bytes: int
+    processed_bytes: int
+    original_seconds: float
+    processed_seconds: float
+    # Decoded PCM of the file at `path` and its frame energies, reused for chunking
+    samples: Optional[array] = field(default=None, repr=False)
+    energies: Optional[List[float]] = field(default=None, repr=False)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.processed_bytes
+
+    @property
+    def seconds_saved(self) -> float:
+        return self.original_seconds - self.processed_seconds
+
+
+def ffmpeg_path() -> Optional[str]:
+    return shutil.which(os.getenv("FFMPEG_PATH", "ffmpeg"))
+
+
+def preprocessing_enabled() -> bool:
+    """AUDIO_PREPROCESSING=auto (default: on if ffmpeg is installed), true or false"""
+    setting = os.getenv("AUDIO_PREPROCESSING", "auto").lower()
+    if setting == "auto":
+        return ffmpeg_path() is not None
+    return setting == "true"
+
+
+def decode_to_pcm(file_path: str, sample_rate: int = SAMPLE_RATE) -> array:
+    """Decode any ffmpeg-readable file to mono signed 16-bit samples"""
+    result = subprocess.run(
+        [ffmpeg_path(), "-nostdin", "-v", "error", "-i", file_path,
+         "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-"],
+        capture_output=True,
+        check=True
+    )
+    samples = array("h")
+    samples.frombytes(result.stdout)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def encode_m4a(samples: array, out_path: str, sample_rate: int = SAMPLE_RATE, bitrate: str = "32k") -> None:
+    """Encode mono 16-bit samples as AAC in an M4A container"""
+    if sys.byteorder == "big":
+        samples = array("h", samples)
+        samples.byteswap()
+    subprocess.run(
+        [ffmpeg_path(), "-nostdin", "-v", "error", "-y",
+         "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "-",
+         "-c:a", "aac", "-b:a", bitrate, "-f", "ipod", out_path],
+        input=samples.tobytes(),
+        capture_output=True,
+        check=True
+    )
+
+
+def frame_energies(samples: array, frame_size: int) -> List[float]:
+    """RMS energy of each fixed-size frame"""
+    energies = []
+    for start in range(0, len(samples), frame_size):
+        frame = samples[start:start + frame_size]
+        energies.append(math.sqrt(sum(s * s for s in frame) / len(frame)))
+    return energies
+
+
+def find_speech_segments(
+    samples: array,
+    sample_rate: int = SAMPLE_RATE,
+    min_energy: float = 300.0,
+    noise_factor: float = 3.0,
+    padding_ms: int = 200,
+    max_pause_ms: int = 700,
+    energies: Optional[List[float]] = None
+) -> List[Tuple[int, int]]:
+    """
+    Energy-based voice activity detection
+
+    A frame is speech when its RMS exceeds both `min_energy` and
+    `noise_factor` x the noise floor (10th percentile frame energy).
+    Speech runs separated by pauses shorter than `max_pause_ms` are merged,
+    and every kept segment gets `padding_ms` on each side. Segments start on
+    a frame boundary and end on one or at the end of `samples`.
+
+    Returns:
+        List of (start_sample, end_sample) ranges to keep
+    """
+    frame_size = sample_rate * FRAME_MS // 1000
+    if energies is None:
+        energies = frame_energies(samples, frame_size)
+    if not energies:
+        return []
+
+    noise_floor = sorted(energies)[len(energies) // 10]
+    threshold = max(min_energy, noise_floor * noise_factor)
+
+    pad = padding_ms // FRAME_MS
+    max_gap = max_pause_ms // FRAME_MS
+
+    segments: List[List[int]] = []
+    for i, energy in enumerate(energies):
+        if energy < threshold:
+            continue
+        if segments and i - segments[-1][1] <= max_gap:
+            segments[-1][1] = i
+        else:
+            segments.append([i, i])
+
+    total = len(samples)
+    return [
+        (max(0, (start - pad) * frame_size), min(total, (end + 1 + pad) * frame_size))
+        for start, end in segments
+    ]
+
+
+def trim_silence(samples: array, sample_rate: int = SAMPLE_RATE, **vad_options) -> array:
+    """Keep only the speech segments found by find_speech_segments"""
+    frame_size = sample_rate * FRAME_MS // 1000
+    return keep_speech(samples, frame_energies(samples, frame_size), sample_rate, **vad_options)[0]
+
+
+def keep_speech(
+    samples: array, energies: List[float], sample_rate: int = SAMPLE_RATE, **vad_options
+) -> Tuple[array, List[float]]:
+    """
+    trim_silence for precomputed frame energies
+
+    Segments are whole frames (but for a short last one), so the energies of
+    the trimmed audio are those of the kept frames.
+
+    Returns:
+        The trimmed samples and their frame energies
+    """
+    frame_size = sample_rate * FRAME_MS // 1000
+    trimmed = array("h")
+    kept: List[float] = []
+    for start, end in find_speech_segments(samples, sample_rate, energies=energies, **vad_options):
+        trimmed.extend(samples[start:end])
+        kept.extend(energies[start // frame_size:-(-end // frame_size)])
+    return trimmed, kept
+
+
+def preprocess_audio(file_path: str, min_seconds: float = 1.0) -> PreprocessResult:
+    """
+    Decode, trim and re-encode an audio file for upload
+
+    Falls back to the original file (path unchanged) when trimming leaves
+    less than `min_seconds` of audio or the re-encoded file isn't smaller.
+    The caller owns (and must delete) a returned path that differs from
+    `file_path`.
+
+    Raises:
+        RuntimeError: If ffmpeg isn't installed
+        subprocess.CalledProcessError: If ffmpeg can't decode/encode the file
+    """
+    if not ffmpeg_path():
+        raise RuntimeError("Audio pre-processing requires ffmpeg")
+
+    original_bytes = os.path.getsize(file_path)
+    samples = decode_to_pcm(file_path)
+    original_seconds = len(samples) / SAMPLE_RATE
+    energies = frame_energies(samples, SAMPLE_RATE * FRAME_MS // 1000)
+
+    unchanged = PreprocessResult(
+        file_path, original_bytes, original_bytes, original_seconds, original_seconds, samples, energies
+    )
+
+    trimmed, trimmed_energies = keep_speech(samples, energies)
+    processed_seconds = len(trimmed) / SAMPLE_RATE
+    if processed_seconds < min_seconds:
+        return unchanged
+
+    fd, out_path = tempfile.mkstemp(suffix=".m4a")
+    os.close(fd)
+    try:
+        encode_m4a(trimmed, out_path)
+    except Exception:
+        os.unlink(out_path)
+        raise
+
+    processed_bytes = os.path.getsize(out_path)
+    if processed_bytes >= original_bytes:
+        os.unlink(out_path)
+        return unchanged
+
+    return PreprocessResult(
+        out_path, original_bytes, processed_bytes, original_seconds, processed_seconds, trimmed, trimmed_energies
+    )
+
+
+def record_preprocess_metrics(result: PreprocessResult) -> None:
+    """Log per-request savings and add them to the /metrics counters"""
+    metrics.increment("audio_preprocess.requests")
+    metrics.increment("audio_preprocess.bytes_in", result.original_bytes)
+    metrics.increment("audio_preprocess.bytes_out", result.processed_bytes)
+    metrics.increment("audio_preprocess.bytes_saved", result.bytes_saved)
+    metrics.increment("audio_preprocess.seconds_in", result.original_seconds)
+    metrics.increment("audio_preprocess.seconds_out", result.processed_seconds)
+    metrics.increment("audio_preprocess.seconds_saved", result.seconds_saved)
+    print(
+        f"Audio pre-processing saved {result.bytes_saved} bytes "
+        f"({result.original_bytes} -> {result.processed_bytes}) and "
+        f"{result.seconds_saved:.1f}s ({result.original_seconds:.1f}s -> {result.processed_seconds:.1f}s)"
+    )
@@ -0,0 +1,56 @@
+"""
+Audio file helpers (M4A/MP4 container inspection)
+"""
+import struct
+from typing import Optional
+
+
+def _iter_boxes(data: bytes, start: int, end: int):
+    """Yield (box_type, payload_start, box_end) for MP4 boxes in data[start:end]"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            # 64-bit extended size
+            if offset + 16 > end:
+                return
+            size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            # Box extends to end of file
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+
+def get_m4a_duration(file_path: str) -> Optional[float]:
+    """
+    Read audio duration in seconds from the M4A movie header (moov/mvhd)
+
+    Args:
+        file_path: Path to local M4A file
+
+    Returns:
+        Duration in seconds, or None if the header can't be parsed
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    for box_type, payload, box_end in _iter_boxes(data, 0, len(data)):
+        if box_type != b"moov":
+            continue
+        for child_type, child_payload, _ in _iter_boxes(data, payload, box_end):
+            if child_type != b"mvhd":
+                continue
+            version = data[child_payload]
+            if version == 1:
+                timescale, duration = struct.unpack(">IQ", data[child_payload + 20:child_payload + 32])
+            else:
+                timescale, duration = struct.unpack(">II", data[child_payload + 12:child_payload + 20])
+            if not timescale:
+                return None
+            return duration / timescale
+    return None
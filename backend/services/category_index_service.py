@@ -0,0 +1,148 @@
+"""
+Category index service - managed indexes for custom category filters
+
+Filters on a category's JSONB key (filter[<category>]=, see
+individual_service.parse_filters) stay fast as the table grows if the key
+has its own index. Indexes are registered in the category_indexes table
+(migration 014) when a category is created and built afterwards in the
+background, so creating a category never waits for an index build.
+
+Builds use CREATE INDEX CONCURRENTLY (migration 018), which can't run in a
+transaction and so not through an RPC: it runs on a direct database
+connection (SUPABASE_DB_URL, needs psycopg2) and doesn't block saves. A
+build holds a per-category advisory lock, so two processes (startup
+build_pending and a create_category task) never build the same index.
+"""
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional, List
+from supabase import Client
+
+from db.models import CategoryIndexInfo
+
+
+INDEX_PENDING = "pending"
+INDEX_READY = "ready"
+INDEX_FAILED = "failed"
+
+# Category types that get an index: btree for number/single_select, GIN for multi_select
+INDEXED_TYPES = ("number", "single_select", "multi_select")
+
+# Names usable in a data->key filter path (register_category_index's check)
+INDEX_KEY = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+def should_index(category_type: str, priority: Optional[str], requested: Optional[bool]) -> bool:
+    """Whether to provision an index: as requested, else for high-priority categories"""
+    if category_type not in INDEXED_TYPES:
+        return False
+    return requested if requested is not None else priority == "high"
+
+
+def unindexable_reason(category_name: str) -> Optional[str]:
+    """Why a category that should be indexed can't be, or None"""
+    if not INDEX_KEY.match(category_name):
+        return (f"Category name '{category_name}' isn't a filter key (letters, digits and "
+                f"underscores only); filters on it use the data column's GIN index")
+    return None
+
+
+def build_concurrently(category_name: str) -> bool:
+    """
+    Build a registered index outside a transaction on a direct database connection
+    
+    Returns:
+        False if another process holds the category's build lock (and so is
+        building the index and will record the outcome)
+    """
+    database_url = os.getenv("SUPABASE_DB_URL")
+    if not database_url:
+        raise RuntimeError("SUPABASE_DB_URL is not set; can't build indexes concurrently")
+    import psycopg2
+    
+    conn = psycopg2.connect(database_url)
+    try:
+        conn.autocommit = True  # CONCURRENTLY can't run inside a transaction block
+        with conn.cursor() as cur:
+            # Try-lock: a waiting session would hold a snapshot that the other
+            # build's CREATE INDEX CONCURRENTLY has to wait out. Released when
+            # the connection closes.
+            cur.execute("SELECT pg_try_advisory_lock(hashtext('category_index:' || %s))", (category_name,))
+            if not cur.fetchone()[0]:
+                return False
+            # Looked up under the lock: an in-progress build's index is invalid
+            # too, and drop_invalid would otherwise drop it mid-build
+            cur.execute(
+                "SELECT drop_invalid, create_index FROM category_index_statements(%s)",
+                (category_name,)
+            )
+            for statement in cur.fetchone():
+                if statement:
+                    cur.execute(statement)
+        return True
+    finally:
+        conn.close()
+
+
+class CategoryIndexService:
+    """Registry, background builds and stats for per-category indexes"""
+
+    def __init__(self, supabase_client: Client):
+        self.supabase = supabase_client
+
+    def register(self, category_name: str, category_type: str) -> Optional[CategoryIndexInfo]:
+        """
+        Register a pending index for a category
+
+        Returns None if the category can't be indexed (type, or a name that
+        isn't a valid filter key).
+        """
+        response = self.supabase.rpc("register_category_index", {
+            "p_category_name": category_name,
+            "p_type": category_type
+        }).execute()
+        return CategoryIndexInfo(**response.data[0]) if response.data else None
+
+    def build(self, category_name: str) -> None:
+        """
+        Build a registered index concurrently (run as a background task)
+        
+        Failures are recorded on the registry entry rather than raised.
+        """
+        try:
+            if not build_concurrently(category_name):
+                print(f"Index for category {category_name} is being built by another process")
+                return
+            self.supabase.table("category_indexes") \
+                .update({
+                    "status": INDEX_READY,
+                    "error": None,
+                    "ready_at": datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+                }) \
+                .eq("category_name", category_name) \
+                .execute()
+        except Exception as e:
+            print(f"Error building index for category {category_name}: {str(e)}")
+            self.supabase.table("category_indexes") \
+                .update({"status": INDEX_FAILED, "error": str(e)}) \
+                .eq("category_name", category_name) \
+                .execute()
+    
+    def build_pending(self) -> None:
+        """Build every index still pending (e.g. queued by a migration)"""
+        try:
+            response = self.supabase.table("category_indexes") \
+                .select("category_name") \
+                .eq("status", INDEX_PENDING) \
+                .execute()
+        except Exception as e:
+            print(f"Error listing pending category indexes: {str(e)}")
+            return
+        for row in response.data or []:
+            self.build(row["category_name"])
+    
+    def list_indexes(self) -> List[CategoryIndexInfo]:
+        """Managed indexes with size and usage counts"""
+        response = self.supabase.rpc("category_index_stats", {}).execute()
+        return [CategoryIndexInfo(**row) for row in response.data or []]
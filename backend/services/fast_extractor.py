@@ -0,0 +1,220 @@
+"""
+Rule-based fast-path extraction run before GPT-4o categorization
+
+Pulls trivially stated fields (name, height, weight, age, exact option labels)
+out of a transcription with a confidence score per field. OpenAIService only
+sends the fields that weren't confidently extracted to the LLM.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ExtractedField:
+    """A value pulled from the transcription by a deterministic rule"""
+    value: Any
+    confidence: float  # 0.0 - 1.0
+
+
+# Default confidence needed to trust a rule instead of asking the LLM
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12
+}
+_NUM = r"\b(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")(?![\d\w])"
+
+# Heights: 5'10", 5' 10, 5 foot 10, six feet, 5 feet 4 inches
+HEIGHT_FEET_INCHES = re.compile(
+    _NUM + r"\s*(?:'|’|feet|foot|ft\.?)(?:\s*(?:and\s+)?" + _NUM + r"(?:\s*(?:\"|”|''|inches|inch|in\b))?)?",
+    re.I
+)
+HEIGHT_INCHES = re.compile(r"\b(\d{2})\s*(?:inches|inch)\b", re.I)
+# A measurement is only a height with context: "is 6 feet", "height about
+# 6'", "6 feet tall"; feet and inches together ("5 foot 10") need none
+HEIGHT_BEFORE = re.compile(
+    r"\b(?:height|is|he's|she's|they're|stands?|standing|measures?)"
+    r"(?:\s+(?:about|around|maybe|roughly|approximately|probably|like|of))*\s*:?\s*$",
+    re.I
+)
+HEIGHT_AFTER = re.compile(r"^\s*(?:tall|high|in height)\b", re.I)
+# Distances and sizes: "6 feet away", "5 feet from the door", "68 inches wide"
+NOT_HEIGHT_AFTER = re.compile(
+    r"^\s*(?:away|from|off|apart|behind|back|ahead|long|wide|deep|down|up|over|across|of)\b",
+    re.I
+)
+WEIGHT = re.compile(r"\b(\d{2,3})\s*(?:pounds|pound|lbs|lb)\b", re.I)
+AGE = re.compile(r"\b(\d{1,3})\s*(?:years?|yrs?)[\s-]*old\b|\bage[ds]?\s*(?:of\s*)?(\d{1,3})\b", re.I)
+
+# Name introductions, strongest first
+_NAME = r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)"
+NAME_PATTERNS = [
+    (re.compile(r"\b(?:named|name is|name's|goes by)\s+" + _NAME), 0.95),
+    (re.compile(r"\b(?:[Mm]et|[Ss]aw|[Tt]alked to|[Ss]poke with)\s+" + _NAME + r"\b"), 0.9),
+    # Also "called Dispatch", "called 911": below the default threshold
+    (re.compile(r"\bcalled\s+" + _NAME), 0.8),
+    (re.compile(r"^\s*" + _NAME + r"(?=\s+(?:by|at|near|is|was|on|outside)\b|,)"), 0.8),
+]
+NOT_NAMES = {"Someone", "Somebody", "Him", "Her", "Them", "A", "An", "The", "This", "He", "She"}
+
+# Words within this many tokens of an option label tie it to its category
+KEYWORD_WINDOW = 3
+
+
+def _to_int(token: str) -> Optional[int]:
+    token = token.lower()
+    if token.isdigit():
+        return int(token)
+    return NUMBER_WORDS.get(token)
+
+
+def _normalize_name(name: str) -> str:
+    return name.strip().lower().replace(" ", "_")
+
+
+def _is_height(text: str, match: re.Match, feet_and_inches: bool = False) -> bool:
+    """Whether a feet/inches measurement describes the person's height"""
+    after = text[match.end():]
+    if NOT_HEIGHT_AFTER.match(after):
+        return False
+    return feet_and_inches or bool(HEIGHT_AFTER.match(after) or HEIGHT_BEFORE.search(text[:match.start()]))
+
+
+def extract_height(text: str) -> Optional[ExtractedField]:
+    """Height in total inches"""
+    for match in HEIGHT_FEET_INCHES.finditer(text):
+        feet = _to_int(match.group(1))
+        inches = _to_int(match.group(2)) if match.group(2) else 0
+        if feet is None or inches is None:
+            continue
+        if 4 <= feet <= 7 and 0 <= inches < 12 and _is_height(text, match, bool(match.group(2))):
+            return ExtractedField(feet * 12 + inches, 0.95)
+
+    for match in HEIGHT_INCHES.finditer(text):
+        if 48 <= int(match.group(1)) <= 96 and _is_height(text, match):
+            return ExtractedField(int(match.group(1)), 0.9)
+    return None
+
+
+def extract_weight(text: str) -> Optional[ExtractedField]:
+    """Weight in pounds"""
+    match = WEIGHT.search(text)
+    if match:
+        weight = int(match.group(1))
+        if 50 <= weight <= 500:
+            return ExtractedField(weight, 0.95)
+    return None
+
+
+def extract_age(text: str) -> Optional[ExtractedField]:
+    """Age in years"""
+    match = AGE.search(text)
+    if match:
+        age = int(match.group(1) or match.group(2))
+        if 0 < age < 120:
+            return ExtractedField(age, 0.95)
+    return None
+
+
+def extract_name(text: str) -> Optional[ExtractedField]:
+    """Person's name from common introduction phrasings"""
+    for pattern, confidence in NAME_PATTERNS:
+        match = pattern.search(text)
+        if match and match.group(1).split()[0] not in NOT_NAMES:
+            return ExtractedField(match.group(1), confidence)
+    return None
+
+
+def _label_positions(tokens: List[str], label: str) -> List[int]:
+    """Token indices where a (possibly multi-word) label starts"""
+    label_tokens = label.lower().split()
+    size = len(label_tokens)
+    return [
+        i for i in range(len(tokens) - size + 1)
+        if tokens[i:i + size] == label_tokens
+    ]
+
+
+def _near_keyword(tokens: List[str], position: int, keywords: set) -> bool:
+    start = max(0, position - KEYWORD_WINDOW)
+    window = tokens[start:position + KEYWORD_WINDOW + 1]
+    return any(token in keywords for token in window)
+
+
+def extract_options(text: str, category: dict) -> Optional[ExtractedField]:
+    """
+    Match exact option labels for single/multi-select categories
+
+    A label next to a word from the category name ("dark skin" for
+    skin_color) is trusted; a lone label elsewhere gets low confidence.
+    """
+    options = category.get("options") or []
+    labels = [opt["label"] if isinstance(opt, dict) else opt for opt in options]
+    if not labels:
+        return None
+
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    keywords = set(_normalize_name(category["name"]).split("_"))
+
+    matched = []
+    near_keyword = False
+    for label in labels:
+        positions = _label_positions(tokens, label)
+        if positions:
+            matched.append(label)
+            near_keyword = near_keyword or any(
+                _near_keyword(tokens, p, keywords) for p in positions
+            )
+
+    if not matched:
+        return None
+
+    confidence = 0.9 if near_keyword else 0.6
+    if category["type"] == "single_select":
+        if len(matched) > 1:
+            return None  # Ambiguous, let the LLM decide
+        return ExtractedField(matched[0], confidence)
+    return ExtractedField(matched, confidence)
+
+
+FIELD_EXTRACTORS = {
+    "name": extract_name,
+    "height": extract_height,
+    "weight": extract_weight,
+    "age": extract_age,
+}
+
+
+def extract_fields(transcription: str, categories: list) -> Dict[str, ExtractedField]:
+    """
+    Run deterministic extractors for every category that has one
+
+    Args:
+        transcription: Plain text transcription
+        categories: Category definitions (name, type, options)
+
+    Returns:
+        Dict of category name -> ExtractedField for fields that were found
+    """
+    results = {}
+    if not transcription:
+        return results
+
+    for cat in categories:
+        field = None
+        extractor = FIELD_EXTRACTORS.get(_normalize_name(cat["name"]))
+        if extractor:
+            field = extractor(transcription)
+        elif cat["type"] in ("single_select", "multi_select"):
+            field = extract_options(transcription, cat)
+
+        if field is not None:
+            if cat["type"] == "number":
+                # Floats, as the LLM path returns numbers
+                field.value = float(field.value)
+            results[cat["name"]] = field
+
+    return results
@@ -0,0 +1,85 @@
+"""
+Application-scoped HTTP clients shared across requests
+
+One httpx connection pool is created in the FastAPI lifespan and reused for
+audio downloads and OpenAI API calls, so keep-alive connections and TLS
+sessions survive between voice entries.
+"""
+import os
+import importlib.util
+from typing import Optional
+
+import httpx
+
+from services.openai_service import OpenAIService
+
+
+# Module-level singletons, managed by init_clients()/close_clients()
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_service: Optional[OpenAIService] = None
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (installed via httpx[http2])"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """
+    Create the shared httpx client with tuned connection limits
+
+    Environment overrides:
+        HTTP_MAX_CONNECTIONS: Total connections in the pool (default 50)
+        HTTP_MAX_KEEPALIVE: Idle connections kept open (default 20)
+        HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 60)
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "50")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    )
+    # Whisper/GPT-4o calls can take a while; connect should fail fast
+    timeout = httpx.Timeout(60.0, connect=10.0)
+
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=timeout,
+        http2=http2_available()
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared httpx client, creating it if the lifespan hasn't run"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = build_http_client()
+    return _http_client
+
+
+def get_openai_service() -> OpenAIService:
+    """
+    FastAPI dependency returning the shared OpenAIService
+
+    Created lazily so the app can start without OPENAI_API_KEY configured
+    (AsyncOpenAI refuses to construct without a key).
+    """
+    global _openai_service
+    if _openai_service is None:
+        _openai_service = OpenAIService(http_client=get_http_client())
+    return _openai_service
+
+
+async def init_clients() -> None:
+    """Create shared clients at application startup"""
+    get_http_client()
+    if os.getenv("OPENAI_API_KEY"):
+        get_openai_service()
+
+
+async def close_clients() -> None:
+    """Close shared clients at application shutdown"""
+    global _http_client, _openai_service
+    _openai_service = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
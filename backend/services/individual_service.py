@@ -1,14 +1,21 @@
 """
 Individual management service - handles business logic for individuals
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Union
 from uuid import UUID
 from datetime import datetime, timezone
+from functools import lru_cache
+import os
 import re
+import sys
+import json
+import threading
+from collections import OrderedDict
 from supabase import Client
+from postgrest.exceptions import APIError
 
 from db.models import (
-    SaveIndividualRequest,
+    BatchSaveItem,
     IndividualResponse,
     InteractionSummary,
     IndividualSummary,
@@ -17,12 +24,331 @@ from db.models import (
     DangerOverrideResponse,
     InteractionsResponse,
     InteractionDetail,
+    FacetValue,
+    CategoryFacet,
+    FacetsResponse,
     SaveIndividualResponse,
-    LocationData
+    LocationData,
+    BatchItemResult
 )
 from services.danger_calculator import calculate_danger_score
 
 
+# SQLSTATEs raised by the save_individual database function
+NOT_FOUND_ERRCODE = "P0002"
+CONFLICT_ERRCODE = "40001"
+
+
+class IndividualNotFoundError(ValueError):
+    """Merge target doesn't exist"""
+
+
+class ConcurrentUpdateError(Exception):
+    """Individual changed since the caller read it"""
+    
+    def __init__(self, message: str, fields: Optional[List[str]] = None):
+        super().__init__(message)
+        self.fields = fields or []
+
+
+# Conflict-merge-retry rounds before giving up on a busy individual
+MAX_MERGE_ATTEMPTS = 3
+
+
+# Rows read back from our own database already have the right types, so hot
+# response models are built with model_construct (no validation) and sent by
+# the routes without FastAPI re-validating them. Set VALIDATE_DB_MODELS=true
+# (debugging, tests of new columns) to validate both steps again.
+VALIDATE_DB_MODELS = os.getenv("VALIDATE_DB_MODELS", "false").lower() == "true"
+
+
+def db_model(model, **values):
+    """Build a response model from trusted database values"""
+    if VALIDATE_DB_MODELS:
+        return model(**values)
+    return model.model_construct(**values)
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamp as naive UTC, like the TIMESTAMP columns it's compared with"""
+    if value and value.tzinfo:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def display_score(row: Dict[str, Any]) -> int:
+    """danger_override if set (0 included), else danger_score: COALESCE in the summaries"""
+    if row.get("danger_override") is not None:
+        return row["danger_override"]
+    return row["danger_score"]
+
+
+# Attributes selectable with ?fields= (plus "data.<key>" for single JSONB keys
+# on the detail endpoint)
+DETAIL_FIELDS = (
+    "id", "name", "danger_score", "danger_override", "display_score",
+    "data", "created_at", "updated_at", "version", "recent_interactions"
+)
+SUMMARY_FIELDS = (
+    "id", "name", "danger_score", "danger_override", "display_score",
+    "last_seen", "last_location"
+)
+# sort_by -> individual_summaries column; each has an (x, id) index (migration 012)
+SORT_COLUMNS = {
+    "last_seen": "last_seen",
+    "danger_score": "danger_score",
+    "display_score": "display_score",  # COALESCE(danger_override, danger_score)
+    "name": "name_key"                 # lower(name): case-insensitive
+}
+_DATA_KEY = re.compile(r"^data\.([A-Za-z0-9_]+)$")
+_FILTER_PARAM = re.compile(r"^filter\[(.+)\]$")
+_FILTER_KEY = re.compile(r"^[A-Za-z0-9_]+$")  # Usable in a data->key filter path
+# Score columns filterable by range alongside the categories
+SCORE_FILTERS = ("danger_score", "display_score")
+
+# JSONB sorts null < strings < numbers < booleans, so a data->key range is
+# always closed on both ends to match numbers only; saved data is parsed
+# JSON, which holds no number beyond the float range
+JSON_NUMBER_MAX = sys.float_info.max
+
+
+def parse_fields(fields: Optional[str], allowed: Tuple[str, ...], allow_data_keys: bool = False) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ?fields= value
+    
+    Returns:
+        Requested fields in order (duplicates removed), or None for all fields
+    
+    Raises:
+        ValueError: On unknown fields
+    """
+    if fields is None or not fields.strip():
+        return None
+    
+    requested = []
+    for field in (f.strip() for f in fields.split(",")):
+        if not field or field in requested:
+            continue
+        if field not in allowed and not (allow_data_keys and _DATA_KEY.match(field)):
+            raise ValueError(f"Unknown field '{field}'; allowed: {', '.join(allowed)}")
+        requested.append(field)
+    return requested
+
+
+def _select_columns(fields: List[str]) -> str:
+    """
+    PostgREST select list on individuals for the requested detail fields
+    
+    display_score needs both score columns; "data.<key>" selects just that
+    JSONB key, aliased as data__<key>.
+    """
+    columns = []
+    for field in fields:
+        data_key = _DATA_KEY.match(field)
+        if data_key:
+            needed = [f"data__{data_key.group(1)}:data->{data_key.group(1)}"]
+        elif field == "display_score":
+            needed = ["danger_score", "danger_override"]
+        elif field == "recent_interactions":
+            needed = []
+        else:
+            needed = [field]
+        columns.extend(c for c in needed if c not in columns)
+    return ", ".join(columns)
+
+
+def _project(row: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Requested fields of a DB row, in request order, without building models"""
+    result = {}
+    for field in fields:
+        data_key = _DATA_KEY.match(field)
+        if data_key:
+            if "data" not in fields:
+                result.setdefault("data", {})[data_key.group(1)] = row.get(f"data__{data_key.group(1)}")
+        elif field == "display_score":
+            result[field] = display_score(row)
+        elif field in row:
+            result[field] = row[field]
+    return result
+
+
+def _filter_number(value: str, name: str) -> Union[int, float]:
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"Filter '{name}' expects a number, got '{value}'")
+    return int(number) if number.is_integer() else number
+
+
+def parse_filters(params: Dict[str, str], category_types: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Structured search filters from filter[<name>]=<value> query parameters
+    
+    - single_select / text / date: exact value
+    - multi_select: comma-separated values, all of which must be present
+    - number, danger_score / display_score: "min..max" (either end optional,
+      inclusive) or an exact value
+    
+    Returns:
+        {"contains": {...}, "conditions": [(column, operator, value)]} or None
+        if there are no filters. Select and number categories are filtered on
+        their own key, the expressions their managed indexes are built on
+        (see category_index_service): data->>key = value (single_select),
+        data->key @> [values] (multi_select), data->key compared as JSONB
+        between two numbers, so nulls and strings never match (number;
+        an open end is bounded by +/-JSON_NUMBER_MAX). Other exact values, and
+        keys that can't be a PostgREST path, become containment on the whole
+        data column (GIN-indexed).
+    
+    Raises:
+        ValueError: On unknown or non-filterable categories and bad values
+    """
+    contains = {}
+    conditions = []
+    for param, value in params.items():
+        match = _FILTER_PARAM.match(param)
+        if not match:
+            continue
+        name = match.group(1)
+        field_type = "score" if name in SCORE_FILTERS else category_types.get(name)
+        if field_type is None:
+            raise ValueError(f"Unknown filter category '{name}'")
+        keyed = bool(_FILTER_KEY.match(name))
+        
+        low, separator, high = value.partition("..")
+        if field_type == "single_select" and keyed:
+            conditions.append((f"data->>{name}", "eq", value))
+        elif field_type in ("single_select", "text", "date"):
+            contains[name] = value
+        elif field_type == "multi_select":
+            values = [v.strip() for v in value.split(",") if v.strip()]
+            if keyed:
+                conditions.append((f"data->{name}", "contains", values))
+            else:
+                contains[name] = values
+        elif field_type in ("number", "score") and not separator:
+            number = _filter_number(value, name)
+            if field_type == "score":
+                conditions.append((name, "eq", number))
+            elif keyed:
+                conditions.append((f"data->{name}", "eq", number))
+            else:
+                contains[name] = number
+        elif field_type in ("number", "score"):
+            if field_type == "number" and not keyed:
+                raise ValueError(f"Category '{name}' can't be range-filtered")
+            if not low and not high:
+                raise ValueError(f"Filter '{name}' range needs at least one bound")
+            column = name if field_type == "score" else f"data->{name}"
+            for operator, bound, limit in (("gte", low, -JSON_NUMBER_MAX), ("lte", high, JSON_NUMBER_MAX)):
+                if bound:
+                    # A bare number is also valid JSON for the data->key comparison
+                    conditions.append((column, operator, _filter_number(bound, name)))
+                elif field_type == "number":
+                    conditions.append((column, operator, limit))
+        else:
+            raise ValueError(f"Category '{name}' of type {field_type} can't be filtered")
+    
+    if not contains and not conditions:
+        return None
+    return {"contains": contains, "conditions": conditions}
+
+
+# Address abbreviation patterns, compiled once. Each is linear-time: word and
+# whitespace classes are disjoint, so no input can make them backtrack.
+_WORD_RUN = re.compile(r'\w+(?:\s+\w+)*')  # Words separated only by whitespace
+_WORD = re.compile(r'\w+')
+_DIGITS = re.compile(r'\d+')
+_STREET_SUFFIX = re.compile(r'Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Way|Place|Pl')
+
+
+def _extract_street(full_address: str) -> Optional[str]:
+    r"""
+    Find the main street name, e.g. "123 Golden Gate Avenue, SF" -> "Golden Gate Avenue"
+    
+    Single-pass equivalent of re.search(r'(\d+\s+)?((?:\w+\s+)+(?:Street|St|...))').group(2):
+    within the first run of whitespace-separated words that has a street suffix
+    after its first word, take everything up to the last such suffix, skipping
+    a leading house number if a suffix follows the word after it.
+    """
+    for run in _WORD_RUN.finditer(full_address):
+        words = list(_WORD.finditer(run.group()))
+        last = None
+        for index in range(len(words) - 1, 0, -1):
+            suffix = _STREET_SUFFIX.match(words[index].group())
+            if suffix:
+                last = index
+                break
+        if last is None:
+            continue
+        
+        first = 1 if last >= 2 and _DIGITS.fullmatch(words[0].group()) else 0
+        start = run.start() + words[first].start()
+        end = run.start() + words[last].start() + suffix.end()
+        return full_address[start:end].strip()
+    return None
+
+
+@lru_cache(maxsize=int(os.getenv("ADDRESS_CACHE_SIZE", "4096")))
+def _abbreviate_address(full_address: str) -> str:
+    """Abbreviate a non-empty address (addresses repeat heavily, so results are cached)"""
+    # Strategy 1: Already has cross-street format
+    if " & " in full_address:
+        # "Market Street & 5th Street, SF" -> "Market Street & 5th"
+        parts = full_address.split(",")[0]
+        # Remove "Street" from second part for brevity
+        parts = parts.replace(" Street", "")
+        return parts.strip()
+    
+    # Strategy 2: Extract main street
+    street = _extract_street(full_address)
+    if street:
+        return street
+    
+    # Strategy 3: First significant part (before comma)
+    parts = full_address.split(",")
+    if parts[0] and len(parts[0]) <= 30:
+        return parts[0].strip()
+    
+    # Strategy 4: Truncate
+    return full_address[:30].strip() + "..."
+
+
+class ResponseCache:
+    """
+    Per-process LRU of computed responses (facets, analytics)
+    
+    Keys include the resource versions the response depends on (its ETag),
+    so a save or category change simply stops old entries being hit.
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+facet_cache = ResponseCache(max_entries=int(os.getenv("FACET_CACHE_SIZE", "256")))
+
+
 class IndividualService:
     """Service for managing individuals and interactions"""
     
@@ -64,33 +390,12 @@ class IndividualService:
         2. Extract main street name
         3. Use first part before comma
         4. Truncate if too long
+        
+        Results are memoized by full address (see _abbreviate_address).
         """
         if not full_address:
             return ""
-        
-        # Strategy 1: Already has cross-street format
-        if " & " in full_address:
-            # "Market Street & 5th Street, SF" -> "Market Street & 5th"
-            parts = full_address.split(",")[0]
-            # Remove "Street" from second part for brevity
-            parts = parts.replace(" Street", "")
-            return parts.strip()
-        
-        # Strategy 2: Extract main street
-        street_match = re.search(
-            r'(\d+\s+)?((?:\w+\s+)+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Way|Place|Pl))',
-            full_address
-        )
-        if street_match:
-            return street_match.group(2).strip()
-        
-        # Strategy 3: First significant part (before comma)
-        parts = full_address.split(",")
-        if parts[0] and len(parts[0]) <= 30:
-            return parts[0].strip()
-        
-        # Strategy 4: Truncate
-        return full_address[:30].strip() + "..."
+        return _abbreviate_address(full_address)
     
     async def save_individual(
         self,
@@ -100,117 +405,160 @@ class IndividualService:
         merge_with_id: Optional[UUID] = None,
         location: Optional[LocationData] = None,
         transcription: Optional[str] = None,
-        audio_url: Optional[str] = None
+        audio_url: Optional[str] = None,
+        expected_updated_at: Optional[datetime] = None,
+        categories: Optional[List[Dict[str, Any]]] = None,
+        expected_version: Optional[int] = None
     ) -> SaveIndividualResponse:
         """
         Save a new individual or update existing (merge).
         
         Logic:
         1. Calculate danger score
-        2. If merge_with_id: update existing individual
-        3. Else: create new individual
-        4. Create interaction record with changes only
-        5. Return both records
+        2. Call the save_individual database function, which in one
+           transaction:
+           - merges with a single conditional update (no prior existence
+             check), guarded by expected_updated_at/expected_version if
+             given, or creates a new individual
+           - creates the interaction record with changes only
+        3. If the version guard failed, field-level merge this request's
+           changes with the ones made since expected_version and retry
+        4. Return both records
+        
+        Args:
+            expected_updated_at: updated_at the caller last saw; the merge
+                fails with ConcurrentUpdateError if it has changed since
+            categories: Category definitions if the caller already fetched them
+            expected_version: Version (ETag) the caller's data is based on
+        
+        Raises:
+            IndividualNotFoundError: If merge_with_id doesn't exist
+            ConcurrentUpdateError: If the individual changed since
+                expected_updated_at, or changed the same fields differently
+                since expected_version
         """
         # Calculate danger score
-        # First fetch categories to get danger weights
-        categories_response = self.supabase.table("categories").select("*").execute()
-        categories = categories_response.data
-        danger_score = calculate_danger_score(data, categories)
-        
-        # Prepare location dict if provided
-        location_dict = None
-        if location:
-            location_dict = {
-                "latitude": location.latitude,
-                "longitude": location.longitude,
-                "address": location.address
-            }
-        
-        # Extract name for individual record
-        name = data.get("name", "Unknown")
-        
-        if merge_with_id:
-            # Verify individual exists
-            existing_response = self.supabase.table("individuals") \
-                .select("*") \
-                .eq("id", str(merge_with_id)) \
-                .single() \
-                .execute()
-            
-            if not existing_response.data:
-                raise ValueError(f"Individual not found: {merge_with_id}")
-            
-            existing_individual = existing_response.data
-            
-            # Get changes only
-            changes = self.get_changed_fields(existing_individual.get("data", {}), data)
-            
-            # Update existing individual
-            update_response = self.supabase.table("individuals") \
-                .update({
-                    "name": name,
-                    "danger_score": danger_score,
-                    "data": data,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }) \
-                .eq("id", str(merge_with_id)) \
-                .execute()
-            
-            individual = update_response.data[0]
-            
-            # Create interaction with changes only
-            interaction_response = self.supabase.table("interactions") \
-                .insert({
-                    "individual_id": str(merge_with_id),
-                    "user_id": user_id,
-                    "user_name": user_name,
-                    "transcription": transcription,
-                    "audio_url": audio_url,
-                    "location": location_dict,
-                    "changes": changes
-                }) \
-                .execute()
-            
-            interaction = interaction_response.data[0]
-            
+        # Fetch categories to get danger weights unless the caller has them
+        if categories is None:
+            categories_response = self.supabase.table("categories").select("*").execute()
+            categories = categories_response.data
+        
+        expected_updated_at = naive_utc(expected_updated_at)
+        
+        for _ in range(MAX_MERGE_ATTEMPTS):
+            try:
+                response = self.supabase.rpc("save_individual", {
+                    "p_name": data.get("name", "Unknown"),
+                    "p_data": data,
+                    "p_danger_score": calculate_danger_score(data, categories),
+                    "p_user_id": user_id,
+                    "p_user_name": user_name,
+                    "p_merge_with_id": str(merge_with_id) if merge_with_id else None,
+                    "p_location": self._location_dict(location),
+                    "p_transcription": transcription,
+                    "p_audio_url": audio_url,
+                    "p_expected_updated_at": expected_updated_at.isoformat() if expected_updated_at else None,
+                    "p_expected_version": expected_version
+                }).execute()
+                break
+            except APIError as e:
+                if e.code == NOT_FOUND_ERRCODE:
+                    raise IndividualNotFoundError(f"Individual not found: {merge_with_id}")
+                if e.code != CONFLICT_ERRCODE:
+                    raise
+                if expected_version is None or expected_updated_at is not None:
+                    raise ConcurrentUpdateError(
+                        f"Individual {merge_with_id} was modified by another update; reload and retry"
+                    )
+                data, expected_version = self._merge_concurrent_changes(merge_with_id, expected_version, data)
         else:
-            # Create new individual
-            individual_response = self.supabase.table("individuals") \
-                .insert({
-                    "name": name,
-                    "danger_score": danger_score,
-                    "data": data
-                }) \
-                .execute()
-            
-            individual = individual_response.data[0]
-            
-            # Create interaction with all data (first interaction)
-            interaction_response = self.supabase.table("interactions") \
-                .insert({
-                    "individual_id": individual["id"],
-                    "user_id": user_id,
-                    "user_name": user_name,
-                    "transcription": transcription,
-                    "audio_url": audio_url,
-                    "location": location_dict,
-                    "changes": data  # All data for first interaction
-                }) \
-                .execute()
-            
-            interaction = interaction_response.data[0]
+            raise ConcurrentUpdateError(
+                f"Individual {merge_with_id} is being updated too frequently; reload and retry"
+            )
         
-        # Format response
+        individual = response.data["individual"]
+        interaction = response.data["interaction"]
+        return self._format_save_response(individual, interaction)
+    
+    def _merge_concurrent_changes(
+        self,
+        individual_id: UUID,
+        base_version: int,
+        data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Three-way merge of a stale write with the individual's current data.
+        
+        Both sides are diffed against the data at base_version with
+        get_changed_fields. Fields only one side changed (or both changed
+        to the same value) merge cleanly; the caller's changes are applied
+        on top of the current data.
+        
+        Returns:
+            (merged data, current version to guard the retry with)
+        
+        Raises:
+            IndividualNotFoundError: If the individual no longer exists
+            ConcurrentUpdateError: If both sides changed a field differently,
+                or the base version isn't available
+        """
+        current_response = self.supabase.table("individuals") \
+            .select("id, data, version") \
+            .eq("id", str(individual_id)) \
+            .execute()
+        if not current_response.data:
+            raise IndividualNotFoundError(f"Individual not found: {individual_id}")
+        current = current_response.data[0]
+        
+        base_response = self.supabase.table("individual_versions") \
+            .select("data") \
+            .eq("individual_id", str(individual_id)) \
+            .eq("version", base_version) \
+            .execute()
+        if not base_response.data:
+            raise ConcurrentUpdateError(
+                f"Version {base_version} of individual {individual_id} is unknown; reload and retry"
+            )
+        base = base_response.data[0]["data"]
+        
+        ours = self.get_changed_fields(base, data)
+        theirs = self.get_changed_fields(base, current["data"])
+        conflicts = sorted(key for key in ours if key in theirs and ours[key] != theirs[key])
+        if conflicts:
+            raise ConcurrentUpdateError(
+                f"Individual {individual_id} was modified by another update; "
+                f"conflicting fields: {', '.join(conflicts)}",
+                fields=conflicts
+            )
+        
+        return {**current["data"], **ours}, current["version"]
+    
+    def _location_dict(self, location: Optional[LocationData]) -> Optional[Dict[str, Any]]:
+        """LocationData -> JSONB value stored on the interaction"""
+        if not location:
+            return None
+        return {
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "address": location.address
+        }
+    
+    def _format_save_response(
+        self,
+        individual: Dict[str, Any],
+        interaction: Dict[str, Any]
+    ) -> SaveIndividualResponse:
+        """Build the save response from the written individual and interaction rows"""
         individual_resp = IndividualResponse(
             id=individual["id"],
             name=individual["name"],
             danger_score=individual["danger_score"],
             danger_override=individual.get("danger_override"),
-            display_score=individual.get("danger_override") or individual["danger_score"],
+            display_score=display_score(individual),
             data=individual["data"],
             created_at=individual["created_at"],
-            updated_at=individual["updated_at"]
+            updated_at=individual["updated_at"],
+            version=individual.get("version", 1)
         )
         
         interaction_resp = InteractionSummary(
@@ -226,125 +574,186 @@ class IndividualService:
             interaction=interaction_resp
         )
     
+    async def save_individuals_batch(
+        self,
+        user_id: str,
+        user_name: str,
+        items: Dict[int, BatchSaveItem],
+        categories: List[Dict[str, Any]]
+    ) -> List[BatchItemResult]:
+        """
+        Save many validated individuals/merges in one database call.
+        
+        The save_individuals_batch database function (migration 017) runs
+        save_individual for every item in one transaction, so an item's
+        individual and interaction are written together or not at all.
+        Merges are the same conditional update as a single save (a deleted
+        target is reported as 404, never recreated), guarded by the item's
+        expected_updated_at / expected_version.
+        
+        Several items may merge into the same individual; they are applied
+        in order and each interaction records the changes relative to the
+        previous item. As with a single save, a stale expected_updated_at is
+        a 409, and an item whose expected_version is stale is field-level
+        merged and retried (see save_individual); 409 if that conflicts.
+        
+        Args:
+            items: Request index -> already-validated request
+            categories: Category snapshot used for danger scores
+        
+        Returns:
+            Results for the given indexes, in index order
+        """
+        response = self.supabase.rpc("save_individuals_batch", {
+            "p_user_id": user_id,
+            "p_user_name": user_name,
+            "p_items": [
+                {
+                    "index": index,
+                    "name": request.data.get("name", "Unknown"),
+                    "data": request.data,
+                    "danger_score": calculate_danger_score(request.data, categories),
+                    "merge_with_id": str(request.merge_with_id) if request.merge_with_id else None,
+                    "location": self._location_dict(request.location),
+                    "transcription": request.transcription,
+                    "audio_url": request.audio_url,
+                    "expected_updated_at": naive_utc(request.expected_updated_at).isoformat()
+                    if request.merge_with_id and request.expected_updated_at else None,
+                    "expected_version": request.expected_version if request.merge_with_id else None
+                }
+                for index, request in sorted(items.items())
+            ]
+        }).execute()
+        
+        results: List[BatchItemResult] = []
+        for saved in response.data:
+            index = saved["index"]
+            request = items[index]
+            
+            if "individual" in saved:
+                results.append(BatchItemResult(
+                    index=index,
+                    status_code=200,
+                    result=self._format_save_response(saved["individual"], saved["interaction"])
+                ))
+            elif saved["errcode"] == NOT_FOUND_ERRCODE:
+                results.append(BatchItemResult(
+                    index=index,
+                    status_code=404,
+                    error=f"Individual not found: {request.merge_with_id}"
+                ))
+            else:
+                results.append(await self._retry_batch_conflict(user_id, user_name, index, request, categories))
+        
+        return results
+    
+    async def _retry_batch_conflict(
+        self,
+        user_id: str,
+        user_name: str,
+        index: int,
+        request: BatchSaveItem,
+        categories: List[Dict[str, Any]]
+    ) -> BatchItemResult:
+        """Batch item whose precondition failed: field-level merge and retry it on its own"""
+        if request.expected_version is None or request.expected_updated_at is not None:
+            return BatchItemResult(
+                index=index,
+                status_code=409,
+                error=f"Individual {request.merge_with_id} was modified by another update; reload and retry"
+            )
+        try:
+            result = await self.save_individual(
+                user_id=user_id,
+                user_name=user_name,
+                data=request.data,
+                merge_with_id=request.merge_with_id,
+                location=request.location,
+                transcription=request.transcription,
+                audio_url=request.audio_url,
+                categories=categories,
+                expected_version=request.expected_version
+            )
+            return BatchItemResult(index=index, status_code=200, result=result)
+        except IndividualNotFoundError as e:
+            return BatchItemResult(index=index, status_code=404, error=str(e))
+        except ConcurrentUpdateError as e:
+            return BatchItemResult(index=index, status_code=409, error=str(e))
+    
     async def search_individuals(
         self,
         search: Optional[str] = None,
         limit: int = 20,
         offset: int = 0,
         sort_by: str = "last_seen",
-        sort_order: str = "desc"
-    ) -> SearchIndividualsResponse:
+        sort_order: str = "desc",
+        fields: Optional[List[str]] = None,
+        name_prefix: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Union[SearchIndividualsResponse, Dict[str, Any]]:
         """
         Search individuals across all fields.
         
-        Search strategy:
-        1. If search term: query name AND JSONB data fields
-        2. Join with interactions for last_seen
-        3. Apply sorting and pagination
+        Reads the individual_summaries table (migration 011), which triggers
+        keep equal to the list-view projection (last_seen, last_location
+        with abbreviated address, display_score), so a page is one indexed
+        query with the count, sorting and pagination done in the database:
+        1. If search term: match name AND JSONB data fields
+        2. If name_prefix: names starting with it, case-insensitively
+           If filters (see parse_filters): conditions on data keys and
+           score columns, containment on data
+        3. Sort by last_seen (default), danger_score, display_score or name
+           (see SORT_COLUMNS; each is an index scan)
+        4. Paginate
+        
+        With `fields` (see parse_fields), only those columns are selected and
+        the page is returned as plain dicts instead of models.
         """
+        columns = ", ".join(fields) if fields is not None else ", ".join(SUMMARY_FIELDS)
+        
         try:
-            # Build base query
-            query = self.supabase.table("individuals").select("*")
+            query = self.supabase.table("individual_summaries").select(columns, count="exact")
             
-            # Apply search if provided
             if search:
-                # Search in name field first (simpler approach)
-                search_term = f"%{search}%"
-                query = query.ilike("name", search_term)
+                # search_text is lower(name + data)
+                query = query.ilike("search_text", f"%{search.lower()}%")
             
-            # Execute query
-            response = query.execute()
-            individuals = response.data
+            if name_prefix:
+                # LIKE on the lowercased name uses its text_pattern_ops index
+                # (ILIKE can't); escape the prefix's own wildcards
+                prefix = re.sub(r"([\\%_])", r"\\\1", name_prefix.lower())
+                query = query.like("name_key", f"{prefix}%")
             
-            # If search provided, also search in JSONB data
-            if search:
-                # Get all individuals and filter by JSONB data
-                all_response = self.supabase.table("individuals").select("*").execute()
-                all_individuals = all_response.data
-                
-                # Filter by JSONB data containing search term
-                jsonb_matches = []
-                for ind in all_individuals:
-                    if ind["id"] not in [i["id"] for i in individuals]:  # Avoid duplicates
-                        data_str = str(ind.get("data", {}))
-                        if search.lower() in data_str.lower():
-                            jsonb_matches.append(ind)
-                
-                # Combine results
-                individuals.extend(jsonb_matches)
-                
-                # Remove duplicates
-                seen_ids = set()
-                unique_individuals = []
-                for ind in individuals:
-                    if ind["id"] not in seen_ids:
-                        seen_ids.add(ind["id"])
-                        unique_individuals.append(ind)
-                individuals = unique_individuals
+            if filters:
+                if filters["contains"]:
+                    query = query.contains("data", filters["contains"])
+                for column, operator, value in filters["conditions"]:
+                    if operator == "contains":
+                        # As JSON: a list would be sent as a Postgres array literal
+                        value = json.dumps(value)
+                    query = getattr(query, operator)(column, value)
             
-            # Get total count
-            total = len(individuals)
-            
-            # Apply sorting
-            if sort_by == "last_seen":
-                # Get last interaction for each individual
-                for ind in individuals:
-                    last_interaction = self.supabase.table("interactions") \
-                        .select("created_at, location") \
-                        .eq("individual_id", ind["id"]) \
-                        .order("created_at", desc=True) \
-                        .limit(1) \
-                        .execute()
-                    
-                    if last_interaction.data:
-                        ind["_last_seen"] = last_interaction.data[0]["created_at"]
-                        ind["_last_location"] = last_interaction.data[0].get("location")
-                    else:
-                        ind["_last_seen"] = ind["created_at"]
-                        ind["_last_location"] = None
-                
-                # Sort by last_seen
-                individuals.sort(
-                    key=lambda x: x["_last_seen"],
-                    reverse=(sort_order == "desc")
-                )
-            elif sort_by == "danger_score":
-                individuals.sort(
-                    key=lambda x: x["danger_score"],
-                    reverse=(sort_order == "desc")
-                )
-            else:  # sort by name
-                individuals.sort(
-                    key=lambda x: x["name"],
-                    reverse=(sort_order == "desc")
-                )
+            # id breaks ties so pages don't overlap
+            descending = sort_order == "desc"
+            response = query \
+                .order(SORT_COLUMNS[sort_by], desc=descending) \
+                .order("id", desc=descending) \
+                .range(offset, offset + limit - 1) \
+                .execute()
+            rows = response.data or []
+            total = response.count if response.count is not None else len(rows)
             
-            # Apply pagination
-            paginated = individuals[offset:offset + limit]
+            if fields is not None:
+                return {
+                    "individuals": rows,
+                    "total": total,
+                    "offset": offset,
+                    "limit": limit
+                }
             
-            # Format results
-            results = []
-            for ind in paginated:
-                # Calculate display score
-                display_score = ind.get("danger_override") or ind["danger_score"]
-                
-                # Get last location with abbreviated address
-                last_location = ind.get("_last_location")
-                if last_location and last_location.get("address"):
-                    last_location["address"] = self.abbreviate_address(last_location["address"])
-                
-                results.append(IndividualSummary(
-                    id=ind["id"],
-                    name=ind["name"],
-                    danger_score=ind["danger_score"],
-                    danger_override=ind.get("danger_override"),
-                    display_score=display_score,
-                    last_seen=ind.get("_last_seen", ind["created_at"]),
-                    last_location=last_location
-                ))
-            
-            return SearchIndividualsResponse(
-                individuals=results,
+            return db_model(
+                SearchIndividualsResponse,
+                individuals=[db_model(IndividualSummary, **row) for row in rows],
                 total=total,
                 offset=offset,
                 limit=limit
@@ -360,6 +769,100 @@ class IndividualService:
                 limit=limit
             )
     
+    async def get_facets(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        search: Optional[str] = None,
+        cache_key: Optional[str] = None
+    ) -> FacetsResponse:
+        """
+        Option counts per single_select / multi_select category
+        
+        Without filters/search these are the counts maintained on save
+        (migrations 015, 021); otherwise they're grouped over the matching
+        individuals in the database. Results are cached under cache_key.
+        """
+        if cache_key is not None:
+            cached = facet_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        conditions = [
+            self._facet_condition(column, operator, value)
+            for column, operator, value in (filters["conditions"] if filters else [])
+        ]
+        response = self.supabase.rpc("category_facets", {
+            "p_contains": filters["contains"] or None if filters else None,
+            "p_conditions": conditions or None,
+            "p_search": search or None
+        }).execute()
+        
+        # Rows are ordered by category, then count
+        facets: List[CategoryFacet] = []
+        for row in response.data or []:
+            if not facets or facets[-1].category != row["category"]:
+                facets.append(db_model(CategoryFacet, category=row["category"], type=row["type"], values=[]))
+            facets[-1].values.append(db_model(FacetValue, value=row["value"], count=row["count"]))
+        
+        result = db_model(FacetsResponse, facets=facets)
+        if cache_key is not None:
+            facet_cache.set(cache_key, result)
+        return result
+    
+    def _facet_condition(self, column: str, operator: str, value: Any) -> Dict[str, Any]:
+        """A parse_filters condition as category_facets() takes it"""
+        if column.startswith("data->>"):
+            target = {"text_key": column[len("data->>"):]}
+        elif column.startswith("data->"):
+            target = {"key": column[len("data->"):]}
+        else:
+            target = {"column": column}
+        return {**target, "op": operator, "value": value}
+    
+    async def get_individual_version(self, individual_id: UUID) -> Optional[int]:
+        """Current version of an individual (cheap revalidation of cached details)"""
+        response = self.supabase.table("individuals") \
+            .select("version") \
+            .eq("id", str(individual_id)) \
+            .execute()
+        return response.data[0]["version"] if response.data else None
+    
+    async def get_individual_fields(self, individual_id: UUID, fields: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Selected fields of an individual (see parse_fields)
+        
+        Only the requested columns / JSONB keys are fetched, interactions only
+        if recent_interactions is requested, and no response models are built.
+        """
+        response = self.supabase.table("individuals") \
+            .select(_select_columns(fields)) \
+            .eq("id", str(individual_id)) \
+            .execute()
+        if not response.data:
+            return None
+        
+        result = {"individual": _project(response.data[0], fields)}
+        
+        if "recent_interactions" in fields:
+            interactions_response = self.supabase.table("interactions") \
+                .select("id, created_at, user_name, location, transcription") \
+                .eq("individual_id", str(individual_id)) \
+                .order("created_at", desc=True) \
+                .limit(10) \
+                .execute()
+            result["recent_interactions"] = [
+                {
+                    "id": i["id"],
+                    "created_at": i["created_at"],
+                    "user_name": i["user_name"],
+                    "location": i.get("location"),
+                    "has_transcription": bool(i.get("transcription"))
+                }
+                for i in interactions_response.data
+            ]
+        
+        return result
+    
     async def get_individual_by_id(self, individual_id: UUID) -> Optional[IndividualDetailResponse]:
         """Get individual details with recent interactions"""
         # Get individual
@@ -402,19 +905,22 @@ class IndividualService:
             interactions_response = interactions_query
         
         # Format response
-        individual_resp = IndividualResponse(
+        individual_resp = db_model(
+            IndividualResponse,
             id=individual["id"],
             name=individual["name"],
             danger_score=individual["danger_score"],
             danger_override=individual.get("danger_override"),
-            display_score=individual.get("danger_override") or individual["danger_score"],
+            display_score=display_score(individual),
             data=individual["data"],
             created_at=individual["created_at"],
-            updated_at=individual["updated_at"]
+            updated_at=individual["updated_at"],
+            version=individual.get("version", 1)
         )
         
         interaction_summaries = [
-            InteractionSummary(
+            db_model(
+                InteractionSummary,
                 id=i["id"],
                 created_at=i["created_at"],
                 user_name=i["user_name"],
@@ -424,7 +930,8 @@ class IndividualService:
             for i in interactions_response.data
         ]
         
-        return IndividualDetailResponse(
+        return db_model(
+            IndividualDetailResponse,
             individual=individual_resp,
             recent_interactions=interaction_summaries
         )
@@ -465,7 +972,7 @@ class IndividualService:
         return DangerOverrideResponse(
             danger_score=individual["danger_score"],
             danger_override=individual.get("danger_override"),
-            display_score=individual.get("danger_override") or individual["danger_score"]
+            display_score=display_score(individual)
         )
     
     async def get_interactions(
@@ -0,0 +1,193 @@
+"""
+Location service - radius, bounding-box and map tile queries over last-known positions
+
+Queries run in Postgres (PostGIS functions from migrations 004/005) against
+the GiST-indexed last-seen projection on `individuals`, so cost depends on
+the number of matches rather than the number of interactions. Map tiles are
+aggregated into grid cells server-side and cached per tile.
+"""
+import os
+import math
+import time
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime
+from supabase import Client
+
+from db.models import NearbyIndividual, NearbyIndividualsResponse, MapCluster, MapTileResponse
+from services.individual_service import IndividualService, db_model, display_score, naive_utc
+
+
+MAX_TILE_ZOOM = 20
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    Bounding box of a Web Mercator (slippy map) tile
+
+    Returns:
+        (min_lat, min_lng, max_lat, max_lng)
+
+    Raises:
+        ValueError: If the tile coordinates are out of range
+    """
+    if not 0 <= z <= MAX_TILE_ZOOM:
+        raise ValueError(f"Zoom must be between 0 and {MAX_TILE_ZOOM}")
+    n = 2 ** z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tile {x}/{y} out of range for zoom {z}")
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+class TileCache:
+    """Per-process TTL cache of aggregated tiles keyed by (z, x, y)"""
+
+    def __init__(self, ttl: float, max_entries: int = 5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[int, int, int], Tuple[float, MapTileResponse]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[int, int, int]) -> Optional[MapTileResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: Tuple[int, int, int], value: MapTileResponse) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+tile_cache = TileCache(ttl=float(os.getenv("MAP_TILE_CACHE_SECONDS", "60")))
+
+
+class LocationService:
+    """Geospatial lookups of individuals by last-known location"""
+
+    def __init__(self, supabase_client: Client):
+        self.supabase = supabase_client
+
+    def _format_results(self, rows: List[Dict[str, Any]]) -> NearbyIndividualsResponse:
+        """Convert RPC rows to list-view summaries with abbreviated addresses"""
+        formatter = IndividualService(self.supabase)
+        results = []
+        for row in rows:
+            last_location = row.get("last_location")
+            if last_location and last_location.get("address"):
+                last_location = {
+                    **last_location,
+                    "address": formatter.abbreviate_address(last_location["address"])
+                }
+
+            results.append(db_model(
+                NearbyIndividual,
+                id=row["id"],
+                name=row["name"],
+                danger_score=row["danger_score"],
+                danger_override=row.get("danger_override"),
+                display_score=display_score(row),
+                last_seen=row["last_seen"],
+                last_location=last_location,
+                distance_m=row.get("distance_m")
+            ))
+
+        return db_model(NearbyIndividualsResponse, individuals=results)
+
+    async def find_within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_m: float,
+        since: Optional[datetime] = None,
+        limit: int = 100
+    ) -> NearbyIndividualsResponse:
+        """Individuals last seen within `radius_m` metres of a point, nearest first"""
+        response = self.supabase.rpc("individuals_within_radius", {
+            "lat": latitude,
+            "lng": longitude,
+            "radius_m": radius_m,
+            "seen_since": naive_utc(since).isoformat() if since else None,
+            "max_results": limit
+        }).execute()
+
+        return self._format_results(response.data or [])
+
+    async def find_within_bbox(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+        since: Optional[datetime] = None,
+        limit: int = 100
+    ) -> NearbyIndividualsResponse:
+        """Individuals last seen inside a bounding box, most recently seen first"""
+        if min_latitude > max_latitude or min_longitude > max_longitude:
+            raise ValueError("Bounding box minimums must not exceed maximums")
+
+        response = self.supabase.rpc("individuals_within_bbox", {
+            "min_lat": min_latitude,
+            "min_lng": min_longitude,
+            "max_lat": max_latitude,
+            "max_lng": max_longitude,
+            "seen_since": naive_utc(since).isoformat() if since else None,
+            "max_results": limit
+        }).execute()
+
+        return self._format_results(response.data or [])
+
+    async def get_tile_clusters(self, z: int, x: int, y: int) -> MapTileResponse:
+        """
+        Clustered last-known positions for one map tile
+
+        The tile is divided into MAP_TILE_GRID_SIZE x MAP_TILE_GRID_SIZE cells;
+        each occupied cell returns its count, centroid and highest display
+        danger score (plus the individual's id when the cell holds only one).
+
+        Raises:
+            ValueError: If the tile coordinates are out of range
+        """
+        key = (z, x, y)
+        cached = tile_cache.get(key)
+        if cached is not None:
+            return cached
+
+        min_lat, min_lng, max_lat, max_lng = tile_bounds(z, x, y)
+        response = self.supabase.rpc("location_clusters", {
+            "min_lat": min_lat,
+            "min_lng": min_lng,
+            "max_lat": max_lat,
+            "max_lng": max_lng,
+            "grid_size": int(os.getenv("MAP_TILE_GRID_SIZE", "8"))
+        }).execute()
+
+        clusters = [
+            MapCluster(
+                latitude=row["latitude"],
+                longitude=row["longitude"],
+                count=row["count"],
+                max_danger_score=row["max_danger_score"],
+                individual_id=row.get("individual_id")
+            )
+            for row in response.data or []
+        ]
+        tile = MapTileResponse(z=z, x=x, y=y, clusters=clusters)
+        tile_cache.set(key, tile)
+        return tile
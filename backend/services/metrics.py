@@ -0,0 +1,29 @@
+"""
+In-process metrics counters, exposed at GET /metrics
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """Thread-safe named counters (per worker process)"""
+
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = Metrics()
@@ -2,22 +2,159 @@
 OpenAI API integration for Whisper transcription and GPT-4o categorization
 """
 import os
+import asyncio
 import httpx
 import tempfile
 import json
 import re
 from typing import Optional, List, Dict, Any
+import openai
 from openai import AsyncOpenAI
 from urllib.parse import urlparse
 
+from services.transcription_backends import TranscriptionBackend, get_transcription_backend
+from services.fast_extractor import extract_fields, DEFAULT_MIN_CONFIDENCE
+from services.rate_limit import ProviderUnavailableError, get_openai_guard, estimate_tokens
+from services.audio_preprocessing import (
+    SAMPLE_RATE,
+    preprocess_audio,
+    preprocessing_enabled,
+    record_preprocess_metrics,
+    decode_to_pcm,
+    ffmpeg_path
+)
+from services.audio_chunking import chunking_settings, split_at_silence, write_chunks, stitch_transcripts
+from services.audio_utils import get_m4a_duration
+
 
 class OpenAIService:
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        transcription_backend: Optional[TranscriptionBackend] = None
+    ):
+        """
+        Args:
+            client: Pre-built AsyncOpenAI client (mainly for tests)
+            http_client: Shared httpx client used for OpenAI calls and audio
+                         downloads. When omitted, each download opens its own
+                         short-lived client.
+            transcription_backend: Speech-to-text backend. Defaults to the one
+                                   selected by TRANSCRIPTION_BACKEND.
+        """
+        self.http_client = http_client
+        self.client = client or AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=http_client
+        )
+        self.transcription_backend = transcription_backend or get_transcription_backend(self.client)
+    
+    async def _download_audio(self, audio_url: str) -> bytes:
+        """Download audio bytes, reusing the shared connection pool if available"""
+        try:
+            if self.http_client is not None:
+                response = await self.http_client.get(audio_url, timeout=30.0)
+            else:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(audio_url, timeout=30.0)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise ValueError("Audio file not found")
+            raise Exception(f"Failed to download audio: {e}")
+        except httpx.TimeoutException:
+            raise Exception("Network timeout while downloading audio")
+        
+        return response.content
+    
+    async def _transcribe_file(self, file_path: str) -> str:
+        """Trim and re-encode audio (when enabled), then send it to the STT backend"""
+        result = None
+        if preprocessing_enabled():
+            try:
+                # ffmpeg + VAD are CPU-bound; keep them off the event loop
+                result = await asyncio.to_thread(preprocess_audio, file_path)
+                record_preprocess_metrics(result)
+            except Exception as e:
+                print(f"Audio pre-processing failed, sending original file: {str(e)}")
+        
+        upload_path = result.path if result else file_path
+        try:
+            chunk_paths = await self._split_long_audio(
+                upload_path, result.samples if result else None, result.energies if result else None
+            )
+            if chunk_paths:
+                return await self._transcribe_chunks(chunk_paths)
+            return await self.transcription_backend.transcribe(upload_path)
+        finally:
+            if upload_path != file_path and os.path.exists(upload_path):
+                os.unlink(upload_path)
+    
+    async def _split_long_audio(self, file_path: str, samples=None, energies=None) -> Optional[List[str]]:
+        """
+        Split recordings longer than TRANSCRIPTION_CHUNK_MIN_SECONDS at silence
+        
+        `samples` and their frame `energies` come from pre-processing when it
+        ran, so the recording is neither decoded nor scanned twice.
+        
+        Returns:
+            Temporary chunk file paths, or None to transcribe the file whole
+        """
+        settings = chunking_settings()
+        if not settings["enabled"] or not ffmpeg_path():
+            return None
+        
+        duration = len(samples) / SAMPLE_RATE if samples is not None else get_m4a_duration(file_path)
+        if not duration or duration < settings["min_duration"]:
+            return None
+        
+        try:
+            if samples is None:
+                samples, energies = await asyncio.to_thread(decode_to_pcm, file_path), None
+            ranges = await asyncio.to_thread(
+                split_at_silence,
+                samples,
+                target_seconds=settings["target_seconds"],
+                overlap_seconds=settings["overlap_seconds"],
+                energies=energies
+            )
+            if len(ranges) < 2:
+                return None
+            return await asyncio.to_thread(write_chunks, samples, ranges)
+        except Exception as e:
+            print(f"Audio chunking failed, transcribing whole file: {str(e)}")
+            return None
+    
+    async def _transcribe_chunks(self, chunk_paths: List[str]) -> str:
+        """Transcribe chunks concurrently and stitch the results in order"""
+        semaphore = asyncio.Semaphore(chunking_settings()["concurrency"])
+        
+        async def transcribe_chunk(path: str) -> str:
+            async with semaphore:
+                return await self.transcription_backend.transcribe(path)
+        
+        try:
+            texts = await asyncio.gather(*(transcribe_chunk(p) for p in chunk_paths))
+        finally:
+            for path in chunk_paths:
+                if os.path.exists(path):
+                    os.unlink(path)
+        
+        return stitch_transcripts(texts)
+    
+    def _rejected_audio_error(self, error: openai.BadRequestError) -> ValueError:
+        """Map a Whisper 400 response to a user-facing validation error"""
+        message = str(error)
+        if "Audio file is too short" in message:
+            return ValueError("Audio must be at least 10 seconds long")
+        elif "Audio file is too long" in message:
+            return ValueError("Audio must be less than 2 minutes")
+        return ValueError(f"Audio rejected by transcription service: {message}")
         
     async def transcribe_audio(self, audio_url: str) -> str:
         """
-        Transcribe audio from Supabase URL using OpenAI Whisper API
+        Transcribe audio from Supabase URL using the configured STT backend
         
         Args:
             audio_url: Public URL to M4A audio file in Supabase Storage
@@ -39,20 +176,11 @@ class OpenAIService:
             raise ValueError("URL must be from Supabase Storage")
             
         # Download audio file to temporary location
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(audio_url, timeout=30.0)
-                response.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    raise ValueError("Audio file not found")
-                raise Exception(f"Failed to download audio: {e}")
-            except httpx.TimeoutException:
-                raise Exception("Network timeout while downloading audio")
+        audio_bytes = await self._download_audio(audio_url)
                 
         # Save to temporary file
         with tempfile.NamedTemporaryFile(suffix=".m4a", delete=False) as tmp_file:
-            tmp_file.write(response.content)
+            tmp_file.write(audio_bytes)
             tmp_path = tmp_file.name
             
         try:
@@ -63,26 +191,17 @@ class OpenAIService:
                 if b'ftyp' not in header:
                     raise ValueError("File is not in M4A format")
             
-            # Send to Whisper API
-            with open(tmp_path, 'rb') as audio_file:
-                transcript = await self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
+            # Pre-process and send to configured speech-to-text backend
+            transcript = await self._transcribe_file(tmp_path)
                 
             # Note: Duration validation would happen on frontend
             # Backend accepts whatever audio Whisper can process
             # Frontend enforces 10-second minimum and 2-minute maximum
             
-            return transcript.strip()
+            return transcript
             
-        except Exception as e:
-            if "Audio file is too short" in str(e):
-                raise ValueError("Audio must be at least 10 seconds long")
-            elif "Audio file is too long" in str(e):
-                raise ValueError("Audio must be less than 2 minutes")
-            raise
+        except openai.BadRequestError as e:
+            raise self._rejected_audio_error(e)
             
         finally:
             # Clean up temporary file
@@ -91,7 +210,7 @@ class OpenAIService:
     
     async def transcribe_audio_file(self, file_path: str) -> str:
         """
-        Transcribe audio from local file using OpenAI Whisper API
+        Transcribe audio from local file using the configured STT backend
         
         Args:
             file_path: Path to local M4A audio file
@@ -115,26 +234,20 @@ class OpenAIService:
                 if b'ftyp' not in header:
                     raise ValueError("File is not in M4A format")
             
-            # Send to Whisper API
-            with open(file_path, 'rb') as audio_file:
-                transcript = await self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
-                
-            return transcript.strip()
+            # Pre-process and send to configured speech-to-text backend
+            return await self._transcribe_file(file_path)
             
-        except Exception as e:
-            if "Audio file is too short" in str(e):
-                raise ValueError("Audio must be at least 10 seconds long")
-            elif "Audio file is too long" in str(e):
-                raise ValueError("Audio must be less than 2 minutes")
-            raise
+        except openai.BadRequestError as e:
+            raise self._rejected_audio_error(e)
                 
     async def categorize_transcription(self, transcription: str, categories: list) -> dict:
         """
-        Extract structured data from transcription using GPT-4o
+        Extract structured data from transcription
+        
+        Rule-based extraction runs first; only fields it can't fill with
+        confidence >= FAST_PATH_MIN_CONFIDENCE are sent to GPT-4o. When every
+        required field is confidently extracted the LLM call is skipped
+        entirely (disable with FAST_PATH_SKIP_LLM=false).
         
         Args:
             transcription: Plain text transcription from Whisper
@@ -143,6 +256,50 @@ class OpenAIService:
         Returns:
             Dict with extracted data for each category
             
+        Raises:
+            Exception: For API errors or invalid responses
+        """
+        min_confidence = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE))
+        skip_llm = os.getenv("FAST_PATH_SKIP_LLM", "true").lower() == "true"
+        
+        extracted = extract_fields(transcription, categories)
+        confident = {
+            name: field.value
+            for name, field in extracted.items()
+            if field.confidence >= min_confidence
+        }
+        
+        remaining = [cat for cat in categories if cat['name'] not in confident]
+        required = [cat['name'] for cat in categories if cat.get('is_required')]
+        required_done = bool(required) and all(name in confident for name in required)
+        
+        if not remaining or (skip_llm and required_done):
+            return {cat['name']: confident.get(cat['name']) for cat in categories}
+        
+        try:
+            llm_data = await self._categorize_with_llm(transcription, remaining)
+        except ProviderUnavailableError as e:
+            # Degrade to rule-based values rather than failing the whole entry
+            print(f"Skipping GPT-4o categorization: {str(e)}")
+            llm_data = {}
+        
+        # Keep category order; rule-based values win over LLM values
+        return {
+            cat['name']: confident[cat['name']] if cat['name'] in confident else llm_data.get(cat['name'])
+            for cat in categories
+        }
+    
+    async def _categorize_with_llm(self, transcription: str, categories: list) -> dict:
+        """
+        Extract structured data from transcription using GPT-4o
+        
+        Args:
+            transcription: Plain text transcription from Whisper
+            categories: Category definitions still needing extraction
+            
+        Returns:
+            Dict with extracted data for each category
+            
         Raises:
             Exception: For API errors or invalid responses
         """
@@ -187,15 +344,18 @@ Transcription: {transcription}
 Return JSON only."""
 
         try:
-            # Call GPT-4o API
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a data extraction assistant. Extract only explicitly stated information from transcriptions. Return valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent extraction
-                response_format={"type": "json_object"}  # Force JSON response
+            # Call GPT-4o API (queued behind the shared rate limiter)
+            response = await get_openai_guard("gpt-4o").run(
+                lambda: self.client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": "You are a data extraction assistant. Extract only explicitly stated information from transcriptions. Return valid JSON only."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,  # Lower temperature for more consistent extraction
+                    response_format={"type": "json_object"}  # Force JSON response
+                ),
+                tokens=estimate_tokens(prompt, completion_tokens=500)
             )
             
             # Parse JSON response
@@ -251,6 +411,8 @@ Return JSON only."""
                 
             return processed_data
             
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to categorize transcription: {str(e)}")
             
@@ -327,15 +489,18 @@ Consider name similarity, physical attributes, and other characteristics.
 Return only a number 0-100."""
 
             try:
-                # Call GPT-4o for comparison
-                response = await self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a data comparison assistant. Compare individuals based on their attributes and return only a confidence score as a number."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,  # Lower temperature for consistent scoring
-                    max_tokens=10  # We only need a number
+                # Call GPT-4o for comparison (queued behind the shared rate limiter)
+                response = await get_openai_guard("gpt-4o").run(
+                    lambda: self.client.chat.completions.create(
+                        model="gpt-4o",
+                        messages=[
+                            {"role": "system", "content": "You are a data comparison assistant. Compare individuals based on their attributes and return only a confidence score as a number."},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.3,  # Lower temperature for consistent scoring
+                        max_tokens=10  # We only need a number
+                    ),
+                    tokens=estimate_tokens(prompt, completion_tokens=10)
                 )
                 
                 # Parse confidence score
@@ -352,6 +517,10 @@ Return only a number 0-100."""
                         "confidence": confidence,
                         "data": existing.get('data', {})
                     })
+            except ProviderUnavailableError as e:
+                # Provider saturated or down: return the matches we have
+                print(f"Stopping duplicate comparison early: {str(e)}")
+                break
             except Exception as e:
                 # Log error but continue with other comparisons
                 print(f"Error comparing with {existing.get('name', 'Unknown')}: {str(e)}")
@@ -0,0 +1,237 @@
+"""
+Async rate limiting and circuit breaking for outbound provider calls
+"""
+import os
+import asyncio
+import time
+from typing import Optional, Dict, Callable, Awaitable, Any
+
+
+class ProviderUnavailableError(Exception):
+    """Provider call not attempted: rate limit wait too long or circuit open"""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitTimeout(ProviderUnavailableError):
+    """Waiting for rate limit capacity would exceed the caller's deadline"""
+
+
+class CircuitOpenError(ProviderUnavailableError):
+    """Provider has failed repeatedly; calls are short-circuited for a while"""
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` acquisitions per `per` seconds
+
+    Callers await acquire(); when the bucket is empty they sleep until enough
+    tokens have refilled instead of failing. With a deadline, callers that
+    would have to wait past it fail fast with RateLimitTimeout.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: Optional[float] = None):
+        self.rate = rate
+        self.per = per
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1, deadline: Optional[float] = None) -> None:
+        """
+        Wait until `amount` tokens are available, then take them
+
+        Args:
+            amount: Tokens to take (clamped to bucket capacity)
+            deadline: time.monotonic() value after which to give up
+
+        Raises:
+            RateLimitTimeout: If capacity won't be available before deadline
+        """
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) * self.per / self.rate
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    raise RateLimitTimeout("Rate limit capacity unavailable before deadline", retry_after=wait)
+                await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing provider
+
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half-open after `reset_timeout` seconds, letting one trial call
+    through; a success closes the circuit, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError unless a call may proceed
+
+        Returns:
+            True if this call took the half-open trial slot; it must then
+            release() it when done
+        """
+        state = self.state
+        if state == self.OPEN:
+            retry_after = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError("Provider circuit open after repeated failures", retry_after=retry_after)
+        if state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                raise CircuitOpenError("Provider circuit half-open, trial call in progress", retry_after=1)
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Free a half-open trial slot without recording an outcome"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        # Leaves the trial slot to its owner: a call started before the
+        # circuit opened may fail while another caller's trial is running
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """Errors that indicate provider trouble (vs. a bad request from us)"""
+    import openai
+    return isinstance(error, (
+        openai.RateLimitError,
+        openai.APIConnectionError,  # Includes APITimeoutError
+        openai.InternalServerError
+    ))
+
+
+class ProviderGuard:
+    """
+    Requests/min and tokens/min buckets plus a circuit breaker for one provider
+
+    Args:
+        requests_per_minute: Request bucket size/refill
+        tokens_per_minute: Token bucket size/refill (None to skip)
+        max_wait: Seconds a call may queue for capacity before failing
+        breaker: Circuit breaker shared by all calls through this guard
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        max_wait: float = 10.0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.requests = RateLimiter(requests_per_minute)
+        self.tokens = RateLimiter(tokens_per_minute) if tokens_per_minute else None
+        self.max_wait = max_wait
+        self.breaker = breaker or CircuitBreaker()
+
+    async def run(self, call: Callable[[], Awaitable[Any]], tokens: int = 0) -> Any:
+        """
+        Run `call` once capacity is available and the circuit allows it
+
+        Raises:
+            RateLimitTimeout / CircuitOpenError: Call was not attempted
+            Exception: Whatever `call` raised
+        """
+        trial = self.breaker.before_call()
+        deadline = time.monotonic() + self.max_wait
+        try:
+            await self.requests.acquire(1, deadline)
+            if self.tokens and tokens:
+                await self.tokens.acquire(tokens, deadline)
+
+            try:
+                result = await call()
+            except Exception as e:
+                if _is_provider_failure(e):
+                    self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return result
+        finally:
+            # Free the half-open trial slot if this call took it, whatever
+            # the outcome (including a rate limit timeout or cancellation)
+            if trial:
+                self.breaker.release()
+
+
+# Process-wide guards keyed by model, shared by every OpenAIService instance
+_guards: Dict[str, ProviderGuard] = {}
+
+# Defaults per model: (requests/min, tokens/min)
+MODEL_LIMITS = {
+    "whisper-1": (50, None),
+    "gpt-4o": (500, 30000),
+}
+
+
+def get_openai_guard(model: str) -> ProviderGuard:
+    """
+    Return the shared guard for an OpenAI model
+
+    Environment overrides (model name upper-cased, '-' -> '_'):
+        OPENAI_RPM_<MODEL>, OPENAI_TPM_<MODEL>
+        OPENAI_MAX_WAIT_SECONDS, OPENAI_BREAKER_FAILURES, OPENAI_BREAKER_RESET_SECONDS
+    """
+    guard = _guards.get(model)
+    if guard is None:
+        suffix = model.upper().replace("-", "_")
+        default_rpm, default_tpm = MODEL_LIMITS.get(model, (60, None))
+        tpm = os.getenv(f"OPENAI_TPM_{suffix}", default_tpm)
+        guard = ProviderGuard(
+            requests_per_minute=float(os.getenv(f"OPENAI_RPM_{suffix}", default_rpm)),
+            tokens_per_minute=float(tpm) if tpm else None,
+            max_wait=float(os.getenv("OPENAI_MAX_WAIT_SECONDS", "10")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("OPENAI_BREAKER_FAILURES", "5")),
+                reset_timeout=float(os.getenv("OPENAI_BREAKER_RESET_SECONDS", "30"))
+            )
+        )
+        _guards[model] = guard
+    return guard
+
+
+def estimate_tokens(*texts: str, completion_tokens: int = 0) -> int:
+    """Rough token count (~4 characters per token) for TPM budgeting"""
+    return sum(len(t) for t in texts) // 4 + completion_tokens
@@ -0,0 +1,76 @@
+"""
+Sync service - delta changes for the mobile app's offline replica
+
+Changes come from the sync_changes table (migration 010), which keeps the
+latest change per individual, interaction and category, including deletes.
+A cursor is an opaque "<txid>.<seq>" position in that log; see the
+migration for why it isn't a timestamp.
+"""
+from typing import Optional, Tuple
+from supabase import Client
+
+from db.models import SyncChange, SyncResponse
+
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[int, int]:
+    """
+    Decode a sync cursor (None or empty means a full sync)
+
+    Raises:
+        ValueError: If the cursor wasn't issued by this API
+    """
+    if not cursor:
+        return 0, 0
+    try:
+        txid, seq = (int(part) for part in cursor.split("."))
+    except ValueError:
+        raise ValueError(f"Invalid sync cursor: {cursor}")
+    if txid < 0 or seq < 0:
+        raise ValueError(f"Invalid sync cursor: {cursor}")
+    return txid, seq
+
+
+class SyncService:
+    """Paged delta sync of individuals, interactions and categories"""
+
+    def __init__(self, supabase_client: Client):
+        self.supabase = supabase_client
+
+    async def get_changes(self, since: Optional[str] = None, limit: int = 500) -> SyncResponse:
+        """
+        Changes after `since`, oldest first
+
+        Each entity appears once with its current row, or as a tombstone if
+        it was deleted. Keep syncing with the returned cursor while has_more
+        is true.
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        txid, seq = parse_cursor(since)
+
+        # One extra row tells us whether another page is waiting
+        response = self.supabase.rpc("sync_changes_since", {
+            "p_since_txid": txid,
+            "p_since_seq": seq,
+            "p_limit": limit + 1
+        }).execute()
+        rows = response.data or []
+
+        page = rows[:limit]
+        if page:
+            txid, seq = page[-1]["txid"], page[-1]["seq"]
+
+        return SyncResponse(
+            changes=[
+                SyncChange(
+                    entity=row["entity"],
+                    id=row["entity_id"],
+                    deleted=row["deleted"],
+                    record=row.get("record")
+                )
+                for row in page
+            ],
+            cursor=f"{txid}.{seq}",
+            has_more=len(rows) > limit
+        )
@@ -0,0 +1,144 @@
+"""
+Pluggable speech-to-text backends for OpenAIService
+
+Backends:
+- "openai": OpenAI Whisper API (default)
+- "local": CPU-only faster-whisper model, loaded once per worker process
+
+Select with the TRANSCRIPTION_BACKEND environment variable.
+"""
+import os
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Tuple, Any
+from openai import AsyncOpenAI
+
+from services.rate_limit import get_openai_guard
+
+
+class TranscriptionBackend(ABC):
+    """Base interface: transcribe a local audio file to plain text"""
+
+    name = "base"
+
+    @abstractmethod
+    async def transcribe(self, file_path: str) -> str:
+        ...
+
+
+class WhisperAPIBackend(TranscriptionBackend):
+    """OpenAI Whisper API (whisper-1)"""
+
+    name = "openai"
+
+    def __init__(self, client: AsyncOpenAI, model: str = "whisper-1"):
+        self.client = client
+        self.model = model
+
+    async def _create_transcription(self, file_path: str) -> str:
+        with open(file_path, 'rb') as audio_file:
+            return await self.client.audio.transcriptions.create(
+                model=self.model,
+                file=audio_file,
+                response_format="text"
+            )
+
+    async def transcribe(self, file_path: str) -> str:
+        # Shared requests/min limiter and circuit breaker for the Whisper API
+        transcript = await get_openai_guard(self.model).run(
+            lambda: self._create_transcription(file_path)
+        )
+        return transcript.strip()
+
+
+# Loaded models keyed by (model_size, device, compute_type), shared per worker
+_local_models: Dict[Tuple[str, str, str], Any] = {}
+_local_models_lock = threading.Lock()
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Local faster-whisper model running on CPU
+
+    Requires the optional faster-whisper package (pip install faster-whisper).
+    The model is quantized (int8 by default) and loaded on first use, then
+    reused by every request handled by this worker.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_size: Optional[str] = None,
+        compute_type: Optional[str] = None,
+        cpu_threads: Optional[int] = None,
+        language: Optional[str] = "en"
+    ):
+        self.model_size = model_size or os.getenv("LOCAL_WHISPER_MODEL", "base.en")
+        self.compute_type = compute_type or os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+        self.cpu_threads = cpu_threads or int(os.getenv("LOCAL_WHISPER_THREADS", "0"))
+        self.language = language
+
+    def _get_model(self):
+        """Load the model once per (size, compute_type) and cache it"""
+        key = (self.model_size, "cpu", self.compute_type)
+        model = _local_models.get(key)
+        if model is not None:
+            return model
+
+        with _local_models_lock:
+            model = _local_models.get(key)
+            if model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise RuntimeError(
+                        "Local transcription requires faster-whisper: pip install faster-whisper"
+                    )
+                model = WhisperModel(
+                    self.model_size,
+                    device="cpu",
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads
+                )
+                _local_models[key] = model
+        return model
+
+    def _transcribe_sync(self, file_path: str) -> str:
+        model = self._get_model()
+        segments, _info = model.transcribe(
+            file_path,
+            language=self.language,
+            beam_size=1,  # Greedy decoding keeps CPU latency down
+            vad_filter=True
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    async def transcribe(self, file_path: str) -> str:
+        # Model inference is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(self._transcribe_sync, file_path)
+
+
+def get_transcription_backend(
+    client: AsyncOpenAI,
+    name: Optional[str] = None
+) -> TranscriptionBackend:
+    """
+    Build the configured transcription backend
+
+    Args:
+        client: AsyncOpenAI client used by the API backend
+        name: Backend name; defaults to TRANSCRIPTION_BACKEND env var ("openai")
+
+    Raises:
+        ValueError: For unknown backend names
+    """
+    name = (name or os.getenv("TRANSCRIPTION_BACKEND", "openai")).lower()
+
+    if name == "openai":
+        return WhisperAPIBackend(client)
+    elif name == "local":
+        return LocalWhisperBackend()
+
+    raise ValueError(f"Unknown transcription backend: {name}")
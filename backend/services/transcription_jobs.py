@@ -0,0 +1,321 @@
+"""
+Background transcription job queue
+
+Recordings uploaded in bulk (e.g. after a device regains connectivity) are
+stored as jobs in SQLite and processed by a pool of async workers, so API
+workers return immediately and throughput is bounded by provider rate limits
+rather than request timeouts. Uploaded audio is kept as a file next to the
+database (the job's payload holds its path) until the job is done. The queue
+runs the blocking store calls in a thread, off the event loop.
+"""
+import os
+import json
+import random
+import sqlite3
+import asyncio
+import threading
+from uuid import uuid4
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+
+from services.rate_limit import RateLimiter
+
+
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobStore:
+    """SQLite-backed job table; safe to share between threads of one process"""
+
+    def __init__(self, db_path: Optional[str] = None, audio_dir: Optional[str] = None):
+        self.db_path = db_path or os.getenv("TRANSCRIPTION_JOBS_DB", "transcription_jobs.db")
+        self.audio_dir = audio_dir or os.getenv(
+            "TRANSCRIPTION_JOBS_AUDIO_DIR",
+            os.path.join(os.path.dirname(os.path.abspath(self.db_path)), "transcription_jobs_audio")
+        )
+        os.makedirs(self.audio_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS transcription_jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_ready ON transcription_jobs(status, next_attempt_at)"
+            )
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def audio_path(self, job_id: str) -> str:
+        return os.path.join(self.audio_dir, f"{job_id}.audio")
+
+    def _remove_audio(self, job_id: str) -> None:
+        try:
+            os.remove(self.audio_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def create(
+        self, user_id: str, provider: str, payload: Dict[str, Any], audio: Optional[bytes] = None
+    ) -> Dict[str, Any]:
+        """Queue a job; `audio` is written to a file whose path goes in payload["audio_file"]"""
+        now = _now().isoformat()
+        job_id = str(uuid4())
+        if audio is not None:
+            with open(self.audio_path(job_id), "wb") as f:
+                f.write(audio)
+            payload = {**payload, "audio_file": self.audio_path(job_id)}
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO transcription_jobs
+                   (id, user_id, provider, status, payload, attempts, next_attempt_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)""",
+                (job_id, user_id, provider, JOB_QUEUED, json.dumps(payload), now, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM transcription_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest ready job to processing and return it"""
+        now = _now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """SELECT * FROM transcription_jobs
+                       WHERE status = ? AND next_attempt_at <= ?
+                       ORDER BY next_attempt_at LIMIT 1""",
+                    (JOB_QUEUED, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    """UPDATE transcription_jobs
+                       SET status = ?, attempts = attempts + 1, updated_at = ?
+                       WHERE id = ?""",
+                    (JOB_PROCESSING, now, row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = self._row_to_job(row)
+        job["status"] = JOB_PROCESSING
+        job["attempts"] += 1
+        return job
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE transcription_jobs SET status = ?, result = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (JOB_COMPLETED, json.dumps(result), _now().isoformat(), job_id)
+            )
+        self._remove_audio(job_id)
+
+    def fail(self, job_id: str, error: str, retry_at: Optional[datetime] = None) -> None:
+        """Record a failure; requeue for retry_at if given, else mark failed"""
+        now = _now().isoformat()
+        with self._lock:
+            if retry_at is not None:
+                self._conn.execute(
+                    """UPDATE transcription_jobs
+                       SET status = ?, error = ?, next_attempt_at = ?, updated_at = ?
+                       WHERE id = ?""",
+                    (JOB_QUEUED, error, retry_at.isoformat(), now, job_id)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE transcription_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (JOB_FAILED, error, now, job_id)
+                )
+        if retry_at is None:
+            self._remove_audio(job_id)
+
+    def requeue_stale(self) -> int:
+        """Return jobs left in processing by a crashed worker to the queue"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE transcription_jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (JOB_QUEUED, _now().isoformat(), JOB_PROCESSING)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class TranscriptionJobQueue:
+    """
+    Pool of async workers draining the job store
+
+    Args:
+        store: Job persistence
+        handler: Coroutine taking a job payload and returning a JSON-able result.
+                 ValueError means the input is bad and is not retried.
+        concurrency: Number of concurrent workers
+        max_attempts: Attempts before a job is marked failed
+        backoff_base: Seconds before the first retry; doubles per attempt
+        backoff_max: Upper bound on retry delay
+        rate_limits: Provider name -> jobs per minute
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: JobHandler,
+        concurrency: int = 2,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 300.0,
+        rate_limits: Optional[Dict[str, float]] = None,
+        poll_interval: float = 1.0
+    ):
+        self.store = store
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.limiters = {
+            provider: RateLimiter(per_minute)
+            for provider, per_minute in (rate_limits or {}).items()
+        }
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+
+    async def enqueue(
+        self, user_id: str, provider: str, payload: Dict[str, Any], audio: Optional[bytes] = None
+    ) -> Dict[str, Any]:
+        job = await asyncio.to_thread(self.store.create, user_id, provider, payload, audio)
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given attempt count"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def start(self) -> None:
+        requeued = await asyncio.to_thread(self.store.requeue_stale)
+        if requeued:
+            print(f"Requeued {requeued} interrupted transcription jobs")
+        self._workers = [
+            asyncio.create_task(self._worker_loop()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker_loop(self) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim_next)
+            except Exception as e:
+                print(f"Failed to claim a transcription job: {str(e)}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_job(job)
+
+    async def run_job(self, job: Dict[str, Any]) -> None:
+        """
+        Process one claimed job, recording success, retry or failure
+
+        Never raises, so a worker outlives a failing store. A job whose
+        outcome couldn't be recorded stays in processing until the next
+        start() requeues it.
+        """
+        try:
+            await self._process(job)
+        except Exception as e:
+            print(f"Failed to record transcription job {job['id']}: {str(e)}")
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        limiter = self.limiters.get(job["provider"])
+        if limiter:
+            await limiter.acquire()
+
+        try:
+            result = await self.handler(job["payload"])
+        except ValueError as e:
+            # Bad input (wrong format, missing file) won't succeed on retry
+            await asyncio.to_thread(self.store.fail, job["id"], str(e))
+        except Exception as e:
+            print(f"Transcription job {job['id']} attempt {job['attempts']} failed: {str(e)}")
+            if job["attempts"] >= self.max_attempts:
+                await asyncio.to_thread(self.store.fail, job["id"], str(e))
+            else:
+                retry_at = _now() + timedelta(seconds=self.retry_delay(job["attempts"]))
+                await asyncio.to_thread(self.store.fail, job["id"], str(e), retry_at)
+        else:
+            await asyncio.to_thread(self.store.complete, job["id"], result)
+
+
+def rate_limits_from_env() -> Dict[str, float]:
+    """Per-provider jobs/minute, e.g. TRANSCRIPTION_JOBS_RATE_LIMIT_OPENAI=50"""
+    prefix = "TRANSCRIPTION_JOBS_RATE_LIMIT_"
+    return {
+        key[len(prefix):].lower(): float(value)
+        for key, value in os.environ.items()
+        if key.startswith(prefix)
+    }
+
+
+def build_job_queue(handler: JobHandler) -> TranscriptionJobQueue:
+    """Create the queue from environment configuration"""
+    return TranscriptionJobQueue(
+        store=JobStore(),
+        handler=handler,
+        concurrency=int(os.getenv("TRANSCRIPTION_JOBS_CONCURRENCY", "2")),
+        max_attempts=int(os.getenv("TRANSCRIPTION_JOBS_MAX_ATTEMPTS", "5")),
+        backoff_base=float(os.getenv("TRANSCRIPTION_JOBS_BACKOFF_BASE", "2")),
+        rate_limits=rate_limits_from_env() or {"openai": 50}
+    )
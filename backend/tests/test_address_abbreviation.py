@@ -0,0 +1,49 @@
+"""
+Tests for the precompiled, memoized address abbreviation
+"""
+import re
+import time
+import random
+
+from services.individual_service import IndividualService, _abbreviate_address, _extract_street
+from benchmarks.address_benchmark import LEGACY_STREET_PATTERN, adversarial_address
+
+
+class TestAddressAbbreviation:
+    
+    def test_matches_legacy_regex(self):
+        """Single-pass street extraction agrees with the original regex"""
+        tokens = ["123", "4", "Main", "Street", "St", "Stockton", "Ave", "Avenue", "Dr",
+                  "Way", "Pl", "Place", "Rd", "Blvd", "Market", "5th", "_", "é"]
+        separators = [" ", "  ", ", ", "-", "\t", "#", "\n"]
+        rng = random.Random(42)
+        for _ in range(20000):
+            address = "".join(
+                rng.choice(tokens) + rng.choice(separators) for _ in range(rng.randint(1, 8))
+            )
+            if rng.random() < 0.5:
+                address = address.rstrip()
+            legacy = re.search(LEGACY_STREET_PATTERN, address)
+            expected = legacy.group(2).strip() if legacy else None
+            assert _extract_street(address) == expected, address
+    
+    def test_house_number_skipped(self):
+        assert _extract_street("525 Ellis Street, San Francisco") == "Ellis Street"
+        assert _extract_street("123 Street") == "123 Street"
+    
+    def test_adversarial_input_is_linear(self):
+        """Long suffix-less addresses no longer trigger quadratic backtracking"""
+        address = adversarial_address(5000)
+        start = time.perf_counter()
+        result = IndividualService(None).abbreviate_address(address)
+        assert time.perf_counter() - start < 0.1
+        assert result.endswith("...")
+    
+    def test_repeated_addresses_are_cached(self):
+        _abbreviate_address.cache_clear()
+        service = IndividualService(None)
+        for _ in range(5):
+            assert service.abbreviate_address("525 Ellis Street, San Francisco, CA") == "Ellis Street"
+        info = _abbreviate_address.cache_info()
+        assert info.misses == 1
+        assert info.hits == 4
@@ -0,0 +1,132 @@
+"""
+Tests for chunked parallel transcription of long recordings
+"""
+import os
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+from services.audio_chunking import split_at_silence, stitch_transcripts
+from services.audio_preprocessing import SAMPLE_RATE, FRAME_MS, frame_energies, ffmpeg_path
+from services.openai_service import OpenAIService
+from tests.test_audio_preprocessing import tone, silence
+
+
+class TestSplitAtSilence:
+    
+    def test_cuts_inside_pauses(self):
+        # Speech with a pause around 28-29s and 58-59s
+        samples = tone(28) + silence(1) + tone(29) + silence(1) + tone(25)
+        ranges = split_at_silence(samples, target_seconds=30, overlap_seconds=0)
+        
+        assert len(ranges) == 3
+        cut1 = ranges[0][1] / SAMPLE_RATE
+        cut2 = ranges[1][1] / SAMPLE_RATE
+        assert 28 <= cut1 <= 29
+        assert 58 <= cut2 <= 59
+        assert ranges[0][1] == ranges[1][0]
+    
+    def test_overlap_extends_chunk_end(self):
+        samples = tone(28) + silence(1) + tone(40)
+        ranges = split_at_silence(samples, target_seconds=30, overlap_seconds=1.0)
+        assert ranges[0][1] - ranges[1][0] == SAMPLE_RATE
+    
+    def test_short_audio_single_chunk(self):
+        assert len(split_at_silence(tone(40), target_seconds=30)) == 1
+
+
+class TestStitchTranscripts:
+    
+    def test_removes_overlap_words(self):
+        texts = [
+            "Met John near Market Street. About 45",
+            "about 45 years old, 6 feet tall,",
+            "6 feet tall, maybe 180 pounds."
+        ]
+        assert stitch_transcripts(texts) == (
+            "Met John near Market Street. About 45 years old, 6 feet tall, maybe 180 pounds."
+        )
+    
+    def test_no_overlap(self):
+        assert stitch_transcripts(["one two", "", "three four"]) == "one two three four"
+
+
+class TestParallelChunkTranscription:
+    
+    @pytest.mark.asyncio
+    async def test_chunks_transcribed_concurrently_in_order(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TRANSCRIPTION_CHUNK_CONCURRENCY", "3")
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"chunk{i}.m4a"
+            path.write_bytes(b"x")
+            paths.append(str(path))
+        
+        in_flight = 0
+        peak = 0
+        
+        async def transcribe(path):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 * (3 - paths.index(path)))  # Finish out of order
+            in_flight -= 1
+            return {paths[0]: "alpha beta", paths[1]: "beta gamma", paths[2]: "delta"}[path]
+        
+        backend = Mock()
+        backend.transcribe = transcribe
+        service = OpenAIService(client=Mock(), transcription_backend=backend)
+        
+        assert await service._transcribe_chunks(paths) == "alpha beta gamma delta"
+        assert peak == 3
+        assert not any(os.path.exists(p) for p in paths)
+    
+    @pytest.mark.asyncio
+    async def test_short_audio_not_chunked(self, monkeypatch):
+        service = OpenAIService(client=Mock(), transcription_backend=Mock())
+        with patch("services.openai_service.ffmpeg_path", return_value="/usr/bin/ffmpeg"):
+            assert await service._split_long_audio("a.m4a", tone(10)) is None
+    
+    @pytest.mark.asyncio
+    async def test_split_reuses_preprocessing_energies(self):
+        """Energies from pre-processing aren't recomputed for the split"""
+        service = OpenAIService(client=Mock(), transcription_backend=Mock())
+        samples = tone(28) + silence(1) + tone(40)
+        energies = frame_energies(samples, SAMPLE_RATE * FRAME_MS // 1000)
+        
+        with patch("services.openai_service.ffmpeg_path", return_value="/usr/bin/ffmpeg"), \
+             patch("services.audio_chunking.frame_energies") as recomputed, \
+             patch("services.openai_service.write_chunks", side_effect=lambda s, ranges: ranges):
+            ranges = await service._split_long_audio("a.m4a", samples, energies)
+        
+        recomputed.assert_not_called()
+        assert ranges == split_at_silence(samples, target_seconds=30, overlap_seconds=1.0)
+    
+    @pytest.mark.asyncio
+    async def test_split_runs_off_event_loop(self):
+        service = OpenAIService(client=Mock(), transcription_backend=Mock())
+        threads = []
+        
+        def split(samples, **kwargs):
+            threads.append(threading.current_thread())
+            return [(0, 1), (1, 2)]
+        
+        with patch("services.openai_service.ffmpeg_path", return_value="/usr/bin/ffmpeg"), \
+             patch("services.openai_service.split_at_silence", side_effect=split), \
+             patch("services.openai_service.write_chunks", return_value=["a.wav", "b.wav"]):
+            assert await service._split_long_audio("a.m4a", tone(70)) == ["a.wav", "b.wav"]
+        assert threads and threads[0] is not threading.main_thread()
+    
+    @pytest.mark.skipif(not ffmpeg_path(), reason="ffmpeg not installed")
+    @pytest.mark.asyncio
+    async def test_long_audio_split_into_files(self):
+        service = OpenAIService(client=Mock(), transcription_backend=Mock())
+        samples = tone(28) + silence(1) + tone(40)
+        paths = await service._split_long_audio("unused.m4a", samples)
+        try:
+            assert len(paths) == 2
+            assert all(os.path.getsize(p) > 0 for p in paths)
+        finally:
+            for p in paths:
+                os.unlink(p)
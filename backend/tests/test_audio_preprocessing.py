@@ -0,0 +1,148 @@
+"""
+Tests for audio pre-processing (silence trimming / re-encoding)
+"""
+import os
+import math
+import pytest
+from array import array
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, AsyncMock, patch
+
+from main import app
+from services.metrics import metrics
+from services.openai_service import OpenAIService
+from services.audio_preprocessing import (
+    SAMPLE_RATE,
+    FRAME_MS,
+    PreprocessResult,
+    find_speech_segments,
+    frame_energies,
+    keep_speech,
+    trim_silence,
+    ffmpeg_path,
+    encode_m4a,
+    preprocess_audio
+)
+
+
+def tone(seconds, amplitude=8000, freq=220):
+    count = int(seconds * SAMPLE_RATE)
+    return array("h", (int(amplitude * math.sin(2 * math.pi * freq * i / SAMPLE_RATE)) for i in range(count)))
+
+
+def silence(seconds, noise=20):
+    count = int(seconds * SAMPLE_RATE)
+    return array("h", ((noise if i % 2 else -noise) for i in range(count)))
+
+
+class TestVoiceActivityDetection:
+    
+    def test_trims_leading_and_trailing_silence(self):
+        samples = silence(2) + tone(1) + silence(3)
+        trimmed = trim_silence(samples)
+        # 1s of speech plus 200ms padding on each side
+        assert 1.3 <= len(trimmed) / SAMPLE_RATE <= 1.5
+    
+    def test_short_pauses_kept_long_pauses_shortened(self):
+        samples = tone(1) + silence(0.3) + tone(1) + silence(5) + tone(1)
+        segments = find_speech_segments(samples)
+        assert len(segments) == 2  # 0.3s pause merged, 5s pause split
+        trimmed_seconds = len(trim_silence(samples)) / SAMPLE_RATE
+        assert trimmed_seconds < 4.5
+    
+    def test_all_silence(self):
+        assert trim_silence(silence(2)) == array("h")
+    
+    @pytest.mark.parametrize("samples", [
+        silence(2) + tone(1) + silence(3),
+        tone(1) + silence(0.3) + tone(1) + silence(5) + tone(1.01),  # Short last frame kept
+    ])
+    def test_kept_energies_are_those_of_trimmed_audio(self, samples):
+        frame_size = SAMPLE_RATE * FRAME_MS // 1000
+        trimmed, energies = keep_speech(samples, frame_energies(samples, frame_size))
+        
+        assert trimmed == trim_silence(samples)
+        assert energies == frame_energies(trimmed, frame_size)
+    
+    def test_preprocess_computes_energies_once(self, tmp_path):
+        source = tmp_path / "padded.m4a"
+        source.write_bytes(b"\0" * 100000)
+        samples = silence(2) + tone(1) + silence(3)
+        
+        def encode(trimmed, out_path, **kwargs):
+            with open(out_path, "wb") as f:
+                f.write(b"\0" * 100)
+        
+        with patch("services.audio_preprocessing.ffmpeg_path", return_value="/usr/bin/ffmpeg"), \
+             patch("services.audio_preprocessing.decode_to_pcm", return_value=samples), \
+             patch("services.audio_preprocessing.encode_m4a", side_effect=encode), \
+             patch("services.audio_preprocessing.frame_energies", wraps=frame_energies) as energies:
+            result = preprocess_audio(str(source))
+        os.unlink(result.path)
+        
+        assert energies.call_count == 1
+        assert result.energies == frame_energies(result.samples, SAMPLE_RATE * FRAME_MS // 1000)
+
+
+class TestOpenAIServicePreprocessing:
+    
+    @pytest.mark.asyncio
+    async def test_uploads_processed_file_and_records_metrics(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AUDIO_PREPROCESSING", "true")
+        metrics.reset()
+        original = tmp_path / "in.m4a"
+        original.write_bytes(b"\x00\x00\x00\x18ftypM4A " + b"\x00" * 1000)
+        processed = tmp_path / "out.m4a"
+        processed.write_bytes(b"small")
+        result = PreprocessResult(str(processed), 1012, 5, 60.0, 42.5)
+        
+        backend = Mock()
+        backend.transcribe = AsyncMock(return_value="hello")
+        service = OpenAIService(client=Mock(), transcription_backend=backend)
+        
+        with patch("services.openai_service.preprocess_audio", return_value=result):
+            assert await service.transcribe_audio_file(str(original)) == "hello"
+        
+        backend.transcribe.assert_awaited_once_with(str(processed))
+        assert not processed.exists()  # Temp output cleaned up
+        assert original.exists()
+        snapshot = metrics.snapshot()
+        assert snapshot["audio_preprocess.bytes_saved"] == 1007
+        assert snapshot["audio_preprocess.seconds_saved"] == 17.5
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_to_original_on_failure(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AUDIO_PREPROCESSING", "true")
+        original = tmp_path / "in.m4a"
+        original.write_bytes(b"\x00\x00\x00\x18ftypM4A ")
+        backend = Mock()
+        backend.transcribe = AsyncMock(return_value="hello")
+        service = OpenAIService(client=Mock(), transcription_backend=backend)
+        
+        with patch("services.openai_service.preprocess_audio", side_effect=RuntimeError("no ffmpeg")):
+            await service.transcribe_audio_file(str(original))
+        
+        backend.transcribe.assert_awaited_once_with(str(original))
+    
+    def test_metrics_endpoint(self):
+        metrics.reset()
+        metrics.increment("audio_preprocess.bytes_saved", 100)
+        response = TestClient(app).get("/metrics")
+        assert response.json() == {"audio_preprocess.bytes_saved": 100}
+
+
+@pytest.mark.skipif(not ffmpeg_path(), reason="ffmpeg not installed")
+class TestFfmpegRoundTrip:
+    
+    def test_preprocess_trims_and_shrinks(self, tmp_path):
+        source = tmp_path / "padded.m4a"
+        encode_m4a(silence(3) + tone(2) + silence(3), str(source), bitrate="128k")
+        
+        result = preprocess_audio(str(source))
+        try:
+            assert result.path != str(source)
+            assert result.processed_seconds < 3
+            assert result.seconds_saved > 5
+            assert result.bytes_saved > 0
+        finally:
+            os.unlink(result.path)
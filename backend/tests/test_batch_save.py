@@ -0,0 +1,201 @@
+"""
+Tests for POST /api/individuals/batch
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, AsyncMock, patch
+from uuid import uuid4
+from datetime import datetime, timezone
+
+from main import app
+from api.auth import get_current_user
+from db.models import SaveIndividualResponse
+from services.individual_service import ConcurrentUpdateError
+
+
+def mock_get_current_user():
+    return "test-user-123"
+
+
+app.dependency_overrides[get_current_user] = mock_get_current_user
+
+
+CATEGORIES = [
+    {"name": "name", "type": "text", "is_required": True},
+    {"name": "height", "type": "number", "is_required": True, "danger_weight": 0},
+    {"name": "weight", "type": "number", "is_required": True, "danger_weight": 0},
+    {"name": "skin_color", "type": "single_select", "is_required": True,
+     "options": [{"label": "Light", "value": 0}, {"label": "Medium", "value": 0}, {"label": "Dark", "value": 0}]}
+]
+
+
+def person(name, **extra):
+    return {"name": name, "height": 70, "weight": 170, "skin_color": "Light", **extra}
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeSupabase:
+    """
+    Categories plus the save_individuals_batch RPC: `outcomes` maps item
+    index -> (errcode, message) for items the function reports as failed;
+    other items are echoed back as saved
+    """
+    
+    def __init__(self, outcomes=None):
+        self.outcomes = outcomes or {}
+        self.categories = MagicMock()
+        self.categories.select.return_value.execute.return_value.data = CATEGORIES
+        self.rpc = MagicMock(side_effect=self._rpc)
+    
+    def table(self, name):
+        assert name == "categories", f"unexpected table access: {name}"
+        return self.categories
+    
+    def _rpc(self, name, params):
+        assert name == "save_individuals_batch"
+        results = []
+        for item in params["p_items"]:
+            if item["index"] in self.outcomes:
+                errcode, message = self.outcomes[item["index"]]
+                results.append({"index": item["index"], "errcode": errcode, "error": message})
+                continue
+            individual_id = item["merge_with_id"] or str(uuid4())
+            results.append({
+                "index": item["index"],
+                "individual": {
+                    "id": individual_id, "name": item["name"], "danger_score": item["danger_score"],
+                    "danger_override": None, "data": item["data"], "created_at": now(),
+                    "updated_at": now(), "version": (item["expected_version"] or 0) + 1
+                },
+                "interaction": {
+                    "id": str(uuid4()), "individual_id": individual_id, "created_at": now(),
+                    "user_name": params["p_user_name"], "location": item["location"],
+                    "transcription": item["transcription"]
+                }
+            })
+        return MagicMock(execute=MagicMock(return_value=MagicMock(data=results)))
+    
+    def sent_items(self):
+        return self.rpc.call_args[0][1]["p_items"]
+
+
+class TestBatchSave:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    def post(self, client, supabase, items):
+        with patch('api.individuals.get_supabase_client', return_value=supabase):
+            return client.post("/api/individuals/batch", json={"items": items})
+    
+    def test_one_database_call(self, client):
+        existing_id = str(uuid4())
+        supabase = FakeSupabase()
+        items = [{"data": person(f"Person {i}")} for i in range(20)]
+        items.append({"data": person("John Doe", weight=180), "merge_with_id": existing_id, "expected_version": 3,
+                      "location": {"latitude": 37.78, "longitude": -122.41, "address": "Market St"}})
+        
+        response = self.post(client, supabase, items)
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["saved"] == 21
+        assert body["failed"] == 0
+        assert [r["index"] for r in body["results"]] == list(range(21))
+        
+        assert supabase.categories.select.call_count == 1
+        assert supabase.rpc.call_count == 1
+        sent = supabase.sent_items()
+        assert [item["index"] for item in sent] == list(range(21))
+        assert sent[0]["merge_with_id"] is None and sent[0]["data"] == person("Person 0")
+        assert sent[20]["merge_with_id"] == existing_id
+        assert sent[20]["expected_version"] == 3
+        assert sent[20]["location"]["address"] == "Market St"
+        assert body["results"][20]["result"]["individual"]["id"] == existing_id
+        assert body["results"][20]["result"]["individual"]["version"] == 4
+        assert body["results"][20]["result"]["interaction"]["location"]["address"] == "Market St"
+    
+    def test_invalid_items_reported_individually(self, client):
+        supabase = FakeSupabase(outcomes={3: ("P0002", "Individual not found")})
+        ghost = str(uuid4())
+        items = [
+            {"data": person("Valid")},
+            {"data": {"name": "Missing fields"}},
+            {"data": person("Too tall", height=400)},
+            {"data": person("Ghost"), "merge_with_id": ghost}
+        ]
+        
+        response = self.post(client, supabase, items)
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["saved"] == 1
+        assert body["failed"] == 3
+        assert [r["status_code"] for r in body["results"]] == [200, 422, 400, 404]
+        assert "Missing required fields" in body["results"][1]["error"]
+        assert "height" in body["results"][2]["error"]
+        assert body["results"][3]["error"] == f"Individual not found: {ghost}"
+        # Only valid items reach the database
+        assert [item["index"] for item in supabase.sent_items()] == [0, 3]
+    
+    def test_conflict_without_version_reported(self, client):
+        supabase = FakeSupabase(outcomes={0: ("40001", "modified by another update")})
+        
+        response = self.post(client, supabase, [{"data": person("Jane"), "merge_with_id": str(uuid4())}])
+        
+        assert response.json()["results"][0]["status_code"] == 409
+        assert supabase.rpc.call_count == 1
+    
+    def test_expected_updated_at_applied_per_item(self, client):
+        existing_id = str(uuid4())
+        supabase = FakeSupabase(outcomes={1: ("40001", "modified by another update")})
+        items = [
+            {"data": person("Jane"), "expected_updated_at": "2025-01-15T12:00:00+02:00"},
+            {"data": person("Jane", weight=150), "merge_with_id": existing_id,
+             "expected_updated_at": "2025-01-15T12:00:00+02:00", "expected_version": 4},
+        ]
+        
+        with patch("services.individual_service.IndividualService.save_individual", new=AsyncMock()) as save:
+            response = self.post(client, supabase, items)
+        
+        sent = supabase.sent_items()
+        # Only merges are guarded; sent as naive UTC like the column
+        assert sent[0]["expected_updated_at"] is None
+        assert sent[1]["expected_updated_at"] == "2025-01-15T10:00:00"
+        # A stale updated_at is a conflict, not field-level merged
+        assert response.json()["results"][1]["status_code"] == 409
+        save.assert_not_called()
+    
+    def test_stale_version_merged_and_retried(self, client):
+        existing_id = str(uuid4())
+        supabase = FakeSupabase(outcomes={0: ("40001", "modified by another update")})
+        
+        with patch("services.individual_service.IndividualService.save_individual",
+                   new=AsyncMock(side_effect=[SaveIndividualResponse.model_validate({
+                       "individual": {"id": existing_id, "name": "Jane", "danger_score": 0, "danger_override": None,
+                                      "display_score": 0, "data": person("Jane"), "created_at": now(),
+                                      "updated_at": now(), "version": 6},
+                       "interaction": {"id": str(uuid4()), "created_at": now(), "user_name": "Demo User",
+                                       "location": None, "has_transcription": False}
+                   }), ConcurrentUpdateError("conflicting fields: weight")])) as save:
+            response = self.post(client, supabase, [
+                {"data": person("Jane", height=64), "merge_with_id": existing_id, "expected_version": 4},
+            ])
+            conflicting = self.post(client, supabase, [
+                {"data": person("Jane", weight=150), "merge_with_id": existing_id, "expected_version": 4},
+            ])
+        
+        assert response.json()["results"][0]["status_code"] == 200
+        assert response.json()["results"][0]["result"]["individual"]["version"] == 6
+        assert save.call_args_list[0].kwargs["expected_version"] == 4
+        assert conflicting.json()["results"][0]["status_code"] == 409
+        assert "weight" in conflicting.json()["results"][0]["error"]
+    
+    def test_batch_size_limits(self, client):
+        supabase = FakeSupabase()
+        assert self.post(client, supabase, []).status_code == 422
+        assert self.post(client, supabase, [{"data": person("x")}] * 101).status_code == 422
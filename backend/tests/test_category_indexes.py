@@ -0,0 +1,329 @@
+"""
+Tests for managed category indexes (migration 014, GET /api/categories/indexes)
+
+Endpoint and service tests mock Supabase; the DB tests (skipped unless
+TEST_DATABASE_URL is set) run the registry functions against Postgres.
+"""
+import os
+import json
+import uuid
+import random
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+
+from main import app
+from api.auth import get_current_user
+from services.category_index_service import CategoryIndexService, should_index, build_concurrently
+from services.individual_service import parse_filters
+from tests.test_search_filters import postgrest_query
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+ENTRY = {
+    "category_name": "housing_priority",
+    "index_name": "idx_individual_summaries_data_housing_priority",
+    "method": "btree",
+    "status": "pending",
+    "error": None,
+    "created_at": "2025-01-15T10:00:00",
+    "ready_at": None
+}
+
+
+def category_row(**overrides):
+    now = datetime.now(timezone.utc).isoformat()
+    row = {
+        "id": str(uuid.uuid4()), "name": "Housing_priority", "type": "single_select",
+        "priority": "high", "danger_weight": 0, "auto_trigger": False, "is_required": False,
+        "is_preset": False, "options": [{"label": "Critical", "value": "Critical"}],
+        "created_at": now, "updated_at": now
+    }
+    row.update(overrides)
+    return row
+
+
+def supabase_client(rpc_results):
+    """Supabase mock with no duplicate category, an insert echoing category_row() and RPC results by name"""
+    supabase = MagicMock()
+    supabase.table.return_value.select.return_value.ilike.return_value.execute.return_value.data = []
+    supabase.table.return_value.insert.return_value.execute.return_value.data = [category_row()]
+
+    def rpc(name, params):
+        result = rpc_results.get(name)
+        call = MagicMock()
+        if isinstance(result, Exception):
+            call.execute.side_effect = result
+        else:
+            call.execute.return_value = MagicMock(data=result)
+        return call
+
+    supabase.rpc.side_effect = rpc
+    return supabase
+
+
+class TestShouldIndex:
+
+    def test_defaults_to_high_priority(self):
+        assert should_index("number", "high", None)
+        assert not should_index("number", "medium", None)
+
+    def test_explicit_request(self):
+        assert should_index("multi_select", "low", True)
+        assert not should_index("single_select", "high", False)
+
+    def test_unindexed_types(self):
+        assert not should_index("text", "high", True)
+        assert not should_index("location", "high", None)
+
+
+class TestCategoryIndexEndpoints:
+
+    @pytest.fixture
+    def client(self):
+        app.dependency_overrides[get_current_user] = lambda: "test-user"
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+
+    def test_create_category_provisions_index_in_background(self, client):
+        supabase = supabase_client({"register_category_index": [ENTRY]})
+        with patch("api.categories.create_client", return_value=supabase), \
+             patch("services.category_index_service.build_concurrently", return_value=True) as build:
+            response = client.post("/api/categories", json={
+                "name": "housing_priority", "type": "single_select", "priority": "high",
+                "options": [{"label": "Critical", "value": "Critical"}]
+            })
+
+        assert response.status_code == 201
+        assert response.json()["index_status"] == "pending"
+        # TestClient runs background tasks before returning
+        supabase.rpc.assert_called_once_with(
+            "register_category_index", {"p_category_name": "Housing_priority", "p_type": "single_select"}
+        )
+        build.assert_called_once_with("housing_priority")
+        update = supabase.table.return_value.update.call_args[0][0]
+        assert update["status"] == "ready" and update["ready_at"]
+
+    def test_create_category_without_index(self, client):
+        supabase = supabase_client({})
+        with patch("api.categories.create_client", return_value=supabase):
+            response = client.post("/api/categories", json={
+                "name": "housing_priority", "type": "single_select", "priority": "high",
+                "options": [{"label": "Critical", "value": "Critical"}], "create_index": False
+            })
+
+        assert response.status_code == 201
+        assert response.json()["index_status"] is None
+        supabase.rpc.assert_not_called()
+
+    def test_name_with_spaces_reports_why_unindexed(self, client):
+        supabase = supabase_client({})
+        supabase.table.return_value.insert.return_value.execute.return_value.data = [
+            category_row(name="Housing priority")
+        ]
+        with patch("api.categories.create_client", return_value=supabase):
+            response = client.post("/api/categories", json={
+                "name": "housing priority", "type": "single_select", "priority": "high",
+                "options": [{"label": "Critical", "value": "Critical"}]
+            })
+
+        assert response.status_code == 201
+        body = response.json()
+        assert body["index_status"] is None
+        assert "isn't a filter key" in body["index_error"]
+        supabase.rpc.assert_not_called()
+
+    def test_registration_failure_still_creates_category(self, client):
+        supabase = supabase_client({"register_category_index": Exception("permission denied")})
+        with patch("api.categories.create_client", return_value=supabase):
+            response = client.post("/api/categories", json={
+                "name": "housing_priority", "type": "number", "priority": "high"
+            })
+
+        assert response.status_code == 201
+        assert response.json()["index_status"] is None
+        assert "permission denied" in response.json()["index_error"]
+
+    def test_list_indexes(self, client):
+        supabase = supabase_client({"category_index_stats": [
+            {**ENTRY, "status": "ready", "size_bytes": 16384, "scans": 12, "tuples_read": 40}
+        ]})
+        with patch("api.categories.create_client", return_value=supabase):
+            response = client.get("/api/categories/indexes")
+
+        assert response.status_code == 200
+        index = response.json()["indexes"][0]
+        assert (index["status"], index["size_bytes"], index["scans"]) == ("ready", 16384, 12)
+
+
+class TestBuild:
+
+    def test_failure_recorded(self):
+        supabase = supabase_client({})
+
+        with patch("services.category_index_service.build_concurrently", side_effect=Exception("lock timeout")):
+            CategoryIndexService(supabase).build("housing_priority")
+
+        supabase.table.assert_called_with("category_indexes")
+        supabase.table.return_value.update.assert_called_with({"status": "failed", "error": "lock timeout"})
+        supabase.table.return_value.update.return_value.eq.assert_called_with("category_name", "housing_priority")
+
+    def test_build_in_progress_elsewhere(self):
+        supabase = supabase_client({})
+
+        with patch("services.category_index_service.build_concurrently", return_value=False):
+            CategoryIndexService(supabase).build("housing_priority")
+
+        # The process building it records the outcome
+        supabase.table.return_value.update.assert_not_called()
+
+    def test_needs_direct_connection(self, monkeypatch):
+        monkeypatch.delenv("SUPABASE_DB_URL", raising=False)
+        supabase = supabase_client({})
+
+        CategoryIndexService(supabase).build("housing_priority")
+
+        update = supabase.table.return_value.update.call_args[0][0]
+        assert update["status"] == "failed" and "SUPABASE_DB_URL" in update["error"]
+
+    def test_build_pending(self):
+        supabase = supabase_client({})
+        supabase.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+            {"category_name": "veteran_status"}, {"category_name": "housing_priority"}
+        ]
+
+        with patch.object(CategoryIndexService, "build") as build:
+            CategoryIndexService(supabase).build_pending()
+
+        supabase.table.return_value.select.return_value.eq.assert_called_with("status", "pending")
+        assert [c.args[0] for c in build.call_args_list] == ["veteran_status", "housing_priority"]
+
+
+def migrate(conn, *names):
+    from benchmarks.save_individual_benchmark import MIGRATIONS_DIR
+    with conn.cursor() as cur:
+        for name in names:
+            with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                cur.execute(f.read())
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestCategoryIndexesInDatabase:
+
+    @pytest.fixture
+    def conn(self, monkeypatch):
+        psycopg2 = pytest.importorskip("psycopg2")
+        from psycopg2.extras import RealDictCursor
+        from benchmarks.save_individual_benchmark import apply_schema
+
+        connection = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+        connection.autocommit = True
+        schema = f"test_{uuid.uuid4().hex[:12]}"
+        # The builder's direct connection, in the test schema
+        separator = "&" if "?" in DATABASE_URL else "?"
+        monkeypatch.setenv("SUPABASE_DB_URL", f"{DATABASE_URL}{separator}options=-csearch_path%3D{schema},public")
+        apply_schema(connection, schema)
+        with connection.cursor() as cur:
+            cur.execute("""INSERT INTO categories (name, type, priority) VALUES
+                ('weight', 'number', 'high'), ('veteran_status', 'single_select', 'low'),
+                ('substance_abuse_history', 'multi_select', 'low')""")
+            migrate(connection, "011_individual_summaries.sql", "012_search_sort_indexes.sql",
+                               "013_search_filters.sql", "014_category_indexes.sql", "015_category_facets.sql")
+            rng = random.Random(18)
+            for i in range(2000):
+                data = {
+                    "name": f"Person {i}",
+                    "veteran_status": "Yes" if i % 400 == 0 else rng.choice(["No", "Unknown"]),
+                    "substance_abuse_history": ["Severe"] if i % 400 == 0 else ["None"]
+                }
+                cur.execute("INSERT INTO individuals (name, data) VALUES (%s, %s)", (data["name"], json.dumps(data)))
+            cur.execute("ANALYZE individual_summaries")
+        yield connection
+        with connection.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        connection.close()
+
+    def rpc(self, conn, name, *args):
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT * FROM {name}({', '.join(['%s'] * len(args))})", args)
+            return cur.fetchall()
+
+    def build(self, conn, category_name):
+        """What CategoryIndexService.build runs, on a separate direct connection"""
+        statements, = self.rpc(conn, "category_index_statements", category_name)
+        assert "CONCURRENTLY" in statements["create_index"]
+        assert build_concurrently(category_name)
+
+    def explain(self, conn, params):
+        where, values = postgrest_query(parse_filters(params, {
+            "veteran_status": "single_select", "substance_abuse_history": "multi_select"
+        }))
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE individual_summaries")
+            cur.execute(f"EXPLAIN SELECT id FROM individual_summaries WHERE {where}", values)
+            return "\n".join(row["QUERY PLAN"] for row in cur.fetchall())
+
+    def test_existing_index_registered(self, conn):
+        migrate(conn, "018_category_filter_indexes.sql")
+
+        entry, = self.rpc(conn, "category_index_stats")
+        assert (entry["category_name"], entry["status"], entry["method"]) == ("weight", "ready", "btree")
+        assert entry["size_bytes"] > 0
+
+    def test_filters_use_managed_indexes(self, conn):
+        migrate(conn, "018_category_filter_indexes.sql")
+        for name, category_type in (("veteran_status", "single_select"), ("substance_abuse_history", "multi_select")):
+            entry, = self.rpc(conn, "register_category_index", name, category_type)
+            self.build(conn, name)
+
+            # The query search_individuals actually sends
+            explained = self.explain(conn, {f"filter[{name}]": "Yes" if name == "veteran_status" else "Severe"})
+            assert entry["index_name"] in explained, explained
+
+        assert self.rpc(conn, "register_category_index", "Housing priority", "number") == []
+        assert self.rpc(conn, "register_category_index", "notes", "text") == []
+
+    def test_unusable_single_select_index_rebuilt(self, conn):
+        """014 indexed single_selects on data->'key'; 018 drops those and queues them again"""
+        entry, = self.rpc(conn, "register_category_index", "veteran_status", "single_select")
+        assert self.rpc(conn, "build_category_index", "veteran_status")[0]["status"] == "ready"
+
+        migrate(conn, "018_category_filter_indexes.sql")
+
+        stats = {row["category_name"]: row for row in self.rpc(conn, "category_index_stats")}
+        assert stats["veteran_status"]["status"] == "pending"
+        assert stats["veteran_status"]["size_bytes"] is None
+        assert stats["weight"]["status"] == "ready"
+
+        self.build(conn, "veteran_status")
+        assert entry["index_name"] in self.explain(conn, {"filter[veteran_status]": "Yes"})
+
+    def test_build_locked_per_category(self, conn):
+        """A build in progress elsewhere (its index still invalid) isn't dropped and redone"""
+        migrate(conn, "018_category_filter_indexes.sql")
+        entry, = self.rpc(conn, "register_category_index", "veteran_status", "single_select")
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE INDEX {entry['index_name']} ON individual_summaries ((data->>'veteran_status'))")
+            cur.execute("UPDATE pg_index SET indisvalid = false WHERE indexrelid = %s::regclass",
+                        (entry["index_name"],))
+            cur.execute("SELECT pg_advisory_lock(hashtext('category_index:veteran_status'))")
+            invalid = "SELECT indisvalid FROM pg_index WHERE indexrelid = %s::regclass"
+
+            assert not build_concurrently("veteran_status")
+            cur.execute(invalid, (entry["index_name"],))
+            assert cur.fetchone()["indisvalid"] is False
+
+            cur.execute("SELECT pg_advisory_unlock(hashtext('category_index:veteran_status'))")
+            # Lock free: the leftover invalid index is dropped and rebuilt
+            assert build_concurrently("veteran_status")
+            cur.execute(invalid, (entry["index_name"],))
+            assert cur.fetchone()["indisvalid"] is True
+
+    def test_build_unregistered(self, conn):
+        psycopg2 = pytest.importorskip("psycopg2")
+        migrate(conn, "018_category_filter_indexes.sql")
+
+        with pytest.raises(psycopg2.Error) as exc:
+            self.rpc(conn, "category_index_statements", "nope")
+        assert exc.value.pgcode == "P0002"
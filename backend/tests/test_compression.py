@@ -0,0 +1,143 @@
+"""
+Tests for response compression and MessagePack negotiation
+"""
+import gzip
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from api import compression
+from api.compression import (
+    CompressionMiddleware,
+    MessagePackMiddleware,
+    choose_encoding,
+    prefers_msgpack
+)
+
+msgpack = pytest.importorskip("msgpack")
+
+ITEMS = [{"id": i, "name": "John Doe", "address": "123 Market St"} for i in range(50)]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI(default_response_class=ORJSONResponse)
+    
+    @app.get("/items")
+    async def items():
+        return {"items": ITEMS}
+    
+    @app.get("/tagged")
+    async def tagged(response: Response):
+        response.headers["ETag"] = '"abc"'
+        return {"items": ITEMS}
+    
+    @app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": '"abc-msgpack-gzip"'})
+    
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+    
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"a," * 500, b"b," * 500]), media_type="text/csv")
+    
+    app.add_middleware(MessagePackMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app)
+
+
+def get_raw(client, path, **headers):
+    """GET without httpx's transparent decompression"""
+    with client.stream("GET", path, headers=headers) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestNegotiation:
+    
+    def test_choose_encoding(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("") == ""
+        assert choose_encoding("identity") == ""
+        assert choose_encoding("gzip;q=0, *;q=0") == ""
+    
+    def test_brotli_preferred(self, monkeypatch):
+        monkeypatch.setattr(compression, "brotli", object())
+        assert choose_encoding("gzip, br") == "br"
+        assert choose_encoding("gzip, br;q=0.5") == "gzip"
+    
+    def test_prefers_msgpack(self):
+        assert prefers_msgpack("application/msgpack")
+        assert prefers_msgpack("application/x-msgpack, application/json;q=0.5")
+        assert not prefers_msgpack("application/json")
+        assert not prefers_msgpack("application/json, application/msgpack;q=0.5")
+        assert not prefers_msgpack("*/*")
+
+
+class TestMiddleware:
+    
+    def test_gzip_above_threshold(self, client):
+        response, body = get_raw(client, "/items", **{"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) == len(body)
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert gzip.decompress(body).startswith(b'{"items":[')
+    
+    def test_small_responses_not_compressed(self, client):
+        response, body = get_raw(client, "/small", **{"Accept-Encoding": "gzip"})
+        
+        assert "content-encoding" not in response.headers
+        assert body == b'{"status":"ok"}'
+    
+    def test_identity_when_not_accepted(self, client):
+        response, body = get_raw(client, "/items", **{"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+    
+    def test_streaming_passes_through(self, client):
+        response, body = get_raw(client, "/stream", **{"Accept-Encoding": "gzip"})
+        
+        assert "content-encoding" not in response.headers
+        assert body == b"a," * 500 + b"b," * 500
+    
+    def test_msgpack(self, client):
+        response = client.get("/items", headers={"Accept": "application/msgpack"})
+        
+        assert response.headers["content-type"] == "application/msgpack"
+        assert "Accept" in response.headers["vary"]
+        assert msgpack.unpackb(response.content) == {"items": ITEMS}
+    
+    def test_msgpack_compressed(self, client):
+        response, body = get_raw(client, "/items", **{"Accept": "application/msgpack", "Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert msgpack.unpackb(gzip.decompress(body)) == {"items": ITEMS}
+    
+    def test_json_by_default(self, client):
+        response = client.get("/items")
+        
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"items": ITEMS}
+
+
+class TestRepresentationEtags:
+    """Each body encoding gets its own strong ETag (RFC 9110 8.8.3)"""
+    
+    @pytest.mark.parametrize("headers, etag", [
+        ({"Accept-Encoding": "identity"}, '"abc"'),
+        ({"Accept-Encoding": "gzip"}, '"abc-gzip"'),
+        ({"Accept": "application/msgpack", "Accept-Encoding": "identity"}, '"abc-msgpack"'),
+        ({"Accept": "application/msgpack", "Accept-Encoding": "gzip"}, '"abc-msgpack-gzip"'),
+    ])
+    def test_etag_per_representation(self, client, headers, etag):
+        response, _ = get_raw(client, "/tagged", **headers)
+        assert response.headers["etag"] == etag
+    
+    def test_not_modified_etag_untouched(self, client):
+        response, _ = get_raw(client, "/not-modified", **{"Accept": "application/msgpack", "Accept-Encoding": "gzip"})
+        
+        assert response.status_code == 304
+        assert response.headers["etag"] == '"abc-msgpack-gzip"'
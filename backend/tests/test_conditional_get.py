@@ -0,0 +1,281 @@
+"""
+Tests for ETag / If-None-Match handling on read endpoints
+Tests with mocked Supabase and auth; the DB tests (skipped unless
+TEST_DATABASE_URL is set) check the resource version counters (migrations 019, 022)
+"""
+import os
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from main import app
+from api.auth import get_current_user
+from api.etags import etag_matches, parse_if_match, representation_etag, resource_etag, version_etag
+from db.models import SearchIndividualsResponse
+
+
+def mock_get_current_user():
+    return "test-user-123"
+
+
+app.dependency_overrides[get_current_user] = mock_get_current_user
+
+CATEGORY = {
+    "id": str(uuid4()), "name": "height", "type": "number", "is_required": True, "is_preset": True,
+    "priority": "high", "danger_weight": 0, "auto_trigger": False, "options": None
+}
+
+
+def fake_supabase(resource_version, rows=None):
+    """Supabase mock: resource_versions lookups return `resource_version`, other tables `rows`"""
+    supabase = MagicMock()
+    
+    def table(name):
+        query = MagicMock()
+        for method in ("select", "eq", "order"):
+            getattr(query, method).return_value = query
+        data = [{"version": resource_version}] if name == "resource_versions" else rows or []
+        query.execute.return_value = MagicMock(data=data)
+        return query
+    
+    supabase.table.side_effect = table
+    return supabase
+
+
+def tables_queried(supabase):
+    return [call.args[0] for call in supabase.table.call_args_list]
+
+
+class TestEtagMatching:
+    
+    def test_matches(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+    
+    def test_no_match(self):
+        assert not etag_matches(None, '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+    
+    def test_representations_match(self):
+        """The client's copy may be the MessagePack / compressed body of the same data"""
+        assert etag_matches('"abc-gzip"', '"abc"')
+        assert etag_matches('W/"abc-msgpack-br"', '"abc"')
+        assert not etag_matches('"abd-gzip"', '"abc"')
+        assert representation_etag('"abc-msgpack"', "gzip") == '"abc-msgpack-gzip"'
+        assert parse_if_match('"v3-msgpack-gzip"') == 3
+    
+    def test_resource_etag_depends_on_all_parts(self):
+        assert resource_etag("individuals", 3, "jo") == resource_etag("individuals", 3, "jo")
+        assert resource_etag("individuals", 3, "jo") != resource_etag("individuals", 4, "jo")
+        assert resource_etag("individuals", 3, "jo") != resource_etag("individuals", 3, "joe")
+
+
+class TestCategoriesConditionalGet:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    def test_returns_etag_and_cache_control(self, client):
+        with patch("api.categories.create_client", return_value=fake_supabase(5, [CATEGORY])):
+            response = client.get("/api/categories")
+        
+        assert response.status_code == 200
+        assert response.headers["ETag"] == resource_etag("categories", 5)
+        assert response.headers["Cache-Control"].startswith("private, max-age=")
+    
+    def test_not_modified_skips_query(self, client):
+        supabase = fake_supabase(5, [CATEGORY])
+        with patch("api.categories.create_client", return_value=supabase):
+            response = client.get("/api/categories", headers={"If-None-Match": resource_etag("categories", 5)})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert tables_queried(supabase) == ["resource_versions"]
+    
+    def test_not_modified_echoes_client_representation(self, client):
+        """A 304 keeps the validator of the representation the client holds"""
+        gzipped = representation_etag(resource_etag("categories", 5), "gzip")
+        with patch("api.categories.create_client", return_value=fake_supabase(5, [CATEGORY])):
+            response = client.get("/api/categories", headers={"If-None-Match": gzipped, "Accept-Encoding": "gzip"})
+        
+        assert response.status_code == 304
+        assert response.headers["ETag"] == gzipped
+    
+    def test_changed_categories_refetched(self, client):
+        with patch("api.categories.create_client", return_value=fake_supabase(6, [CATEGORY])):
+            response = client.get("/api/categories", headers={"If-None-Match": resource_etag("categories", 5)})
+        
+        assert response.status_code == 200
+        assert response.json()["categories"][0]["name"] == "height"
+        assert response.headers["ETag"] == resource_etag("categories", 6)
+
+
+class TestIndividualsConditionalGet:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    def test_detail_not_modified(self, client):
+        supabase = fake_supabase(0, [{"version": 3}])
+        with patch("api.individuals.get_supabase_client", return_value=supabase), \
+             patch("api.individuals.IndividualService.get_individual_by_id") as get_by_id:
+            response = client.get(f"/api/individuals/{uuid4()}", headers={"If-None-Match": version_etag(3)})
+        
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"v3"'
+        assert response.headers["Cache-Control"] == "private, no-cache"
+        get_by_id.assert_not_called()
+    
+    def test_detail_changed(self, client):
+        supabase = fake_supabase(0, [{"version": 4}])
+        with patch("api.individuals.get_supabase_client", return_value=supabase), \
+             patch("api.individuals.IndividualService.get_individual_by_id") as get_by_id:
+            get_by_id.return_value = {
+                "individual": {
+                    "id": str(uuid4()), "name": "John", "danger_score": 10, "danger_override": None,
+                    "display_score": 10, "data": {}, "created_at": "2024-01-15T10:00:00",
+                    "updated_at": "2024-01-15T10:00:00", "version": 4
+                },
+                "recent_interactions": []
+            }
+            response = client.get(f"/api/individuals/{uuid4()}", headers={"If-None-Match": version_etag(3)})
+        
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"v4"'
+    
+    def test_search_not_modified(self, client):
+        supabase = fake_supabase(9)
+        etag = resource_etag("individuals", 9, "john", 20, 0, "last_seen", "desc", None, None, None)
+        with patch("api.individuals.get_supabase_client", return_value=supabase), \
+             patch("api.individuals.IndividualService.search_individuals") as search:
+            response = client.get("/api/individuals?search=john", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        search.assert_not_called()
+    
+    def test_search_etag_varies_with_query(self, client):
+        with patch("api.individuals.get_supabase_client", return_value=fake_supabase(9)), \
+             patch("api.individuals.IndividualService.search_individuals") as search:
+            search.return_value = SearchIndividualsResponse(individuals=[], total=0, offset=0, limit=20)
+            first = client.get("/api/individuals?search=john")
+            second = client.get("/api/individuals?search=jane")
+        
+        assert first.status_code == second.status_code == 200
+        assert first.headers["ETag"] != second.headers["ETag"]
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+class TestResourceVersionsInDatabase:
+    
+    @pytest.fixture
+    def conns(self):
+        psycopg2 = pytest.importorskip("psycopg2")
+        from benchmarks.save_individual_benchmark import apply_schema, MIGRATIONS_DIR
+        
+        url = os.getenv("TEST_DATABASE_URL")
+        admin = psycopg2.connect(url)
+        admin.autocommit = True
+        schema = f"test_{uuid.uuid4().hex[:12]}"
+        apply_schema(admin, schema)
+        with admin.cursor() as cur:
+            with open(os.path.join(MIGRATIONS_DIR, "009_resource_versions.sql")) as f:
+                cur.execute(f.read())
+            cur.execute("INSERT INTO individuals (name) VALUES ('Before')")
+            with open(os.path.join(MIGRATIONS_DIR, "019_resource_version_sequences.sql")) as f:
+                cur.execute(f.read())
+            cur.execute("INSERT INTO individuals (name) VALUES ('Between')")
+            with open(os.path.join(MIGRATIONS_DIR, "022_sharded_resource_versions.sql")) as f:
+                cur.execute(f.read())
+        # Two writers (lock_timeout 1s) that bump different shards
+        writers, shards, spare = [], set(), []
+        while len(writers) < 2:
+            conn = psycopg2.connect(url)
+            with conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {schema}, public")
+                cur.execute("SET lock_timeout = '1s'")
+                cur.execute("SELECT pg_backend_pid() % 16")
+                shard = cur.fetchone()[0]
+            conn.commit()
+            (spare if shard in shards else writers).append(conn)
+            shards.add(shard)
+        yield admin, writers
+        for conn in writers + spare:
+            conn.close()
+        with admin.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
+    
+    def version(self, conn, resource="individuals"):
+        with conn.cursor() as cur:
+            cur.execute("SELECT version FROM resource_versions WHERE resource = %s", (resource,))
+            return cur.fetchone()[0]
+    
+    def test_continues_past_previous_version(self, conns):
+        """009 -> 1, 019 -> 2, a write -> 3, 022 -> 4"""
+        admin, _ = conns
+        assert self.version(admin) == 4
+        assert self.version(admin, "categories") == 2
+    
+    def test_bumped_on_commit(self, conns):
+        admin, (writer, _) = conns
+        before = self.version(admin)
+        
+        with writer.cursor() as cur:
+            cur.execute("INSERT INTO individuals (name) VALUES ('Jane')")
+            assert self.version(admin) == before
+        writer.commit()
+        
+        assert self.version(admin) > before
+        assert self.version(admin, "categories") == 2
+    
+    def test_visible_with_data(self, conns):
+        """While the writer commits, readers see either the old version and data or both new"""
+        admin, (writer, _) = conns
+        before = self.version(admin)
+        
+        with writer.cursor() as cur:
+            cur.execute("INSERT INTO individuals (name) VALUES ('Jane')")
+        with admin.cursor() as cur:
+            cur.execute("SELECT count(*) FROM individuals WHERE name = 'Jane'")
+            assert cur.fetchone()[0] == 0
+        assert self.version(admin) == before
+        writer.commit()
+        with admin.cursor() as cur:
+            cur.execute("SELECT count(*) FROM individuals WHERE name = 'Jane'")
+            assert cur.fetchone()[0] == 1
+        assert self.version(admin) > before
+    
+    def test_rollback_not_bumped(self, conns):
+        admin, (writer, _) = conns
+        before = self.version(admin)
+        
+        with writer.cursor() as cur:
+            cur.execute("INSERT INTO individuals (name) VALUES ('Jane')")
+        writer.rollback()
+        
+        assert self.version(admin) == before
+    
+    def test_concurrent_writers_dont_wait(self, conns):
+        """Two open write transactions (lock_timeout 1s) don't queue on a shared counter"""
+        admin, (first, second) = conns
+        before = self.version(admin)
+        
+        with first.cursor() as cur:
+            cur.execute("INSERT INTO individuals (name) VALUES ('First')")
+        with second.cursor() as cur:
+            cur.execute("INSERT INTO individuals (name) VALUES ('Second')")
+        second.commit()
+        first.commit()
+        
+        assert self.version(admin) == before + 2
+
+
+def teardown_module():
+    app.dependency_overrides.clear()
@@ -0,0 +1,264 @@
+"""
+Tests for GET /api/analytics/danger-scores (danger score distributions)
+
+Service and endpoint tests mock Supabase; the DB tests (skipped unless
+TEST_DATABASE_URL is set) check danger_score_stats() from migration 016.
+"""
+import os
+import uuid
+import random
+import statistics
+import pytest
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+
+from main import app
+from api.auth import get_current_user
+from services.analytics_service import AnalyticsService, analytics_cache
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+WORKER_ID = "11111111-1111-1111-1111-111111111111"
+
+STATS_ROW = {
+    "user_id": None,
+    "user_name": None,
+    "individuals": 40,
+    "overrides": 6,
+    "mean_danger_score": 41.234,
+    "mean_display_score": 45.5,
+    "danger_score_percentiles": [20.0, 40.0, 60.0, 80.0, 98.0],
+    "display_score_percentiles": [25.0, 45.0, 65.0, 85.0, 100.0],
+    "danger_score_histogram": {"0": 10, "40": 20, "90": 10},
+    "display_score_histogram": {"20": 30, "90": 10}
+}
+
+app.dependency_overrides[get_current_user] = lambda: "test-user"
+
+
+def fake_supabase(rows=(STATS_ROW,)):
+    """Supabase mock: danger_score_stats RPC returning rows, resource version 1"""
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.return_value = MagicMock(data=list(rows))
+    supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = \
+        MagicMock(data=[{"version": 1}])
+    return supabase
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    analytics_cache.clear()
+    yield
+    analytics_cache.clear()
+
+
+class TestGetDangerScoreStats:
+
+    @pytest.mark.asyncio
+    async def test_overall_distribution(self):
+        supabase = fake_supabase()
+
+        result = await AnalyticsService(supabase).get_danger_score_stats()
+
+        supabase.rpc.assert_called_once_with("danger_score_stats", {
+            "p_since": None, "p_until": None, "p_user_id": None, "p_by_worker": False, "p_bucket_width": 10
+        })
+        overall, = result.slices
+        assert (overall.individuals, overall.overrides, overall.override_rate) == (40, 6, 0.15)
+        assert overall.danger_score.mean == 41.23
+        assert overall.danger_score.percentiles == {"p25": 20.0, "p50": 40.0, "p75": 60.0, "p90": 80.0, "p99": 98.0}
+        # Empty buckets filled in, last one up to 100
+        histogram = [(b.start, b.end, b.count) for b in overall.danger_score.histogram]
+        assert len(histogram) == 10
+        assert histogram[0] == (0, 10, 10) and histogram[1] == (10, 20, 0)
+        assert histogram[-1] == (90, 100, 10)
+        assert sum(b.count for b in overall.display_score.histogram) == 40
+
+    @pytest.mark.asyncio
+    async def test_window_and_worker_passed_to_database(self):
+        supabase = fake_supabase()
+        since, until = datetime(2025, 1, 1), datetime(2025, 2, 1)
+
+        result = await AnalyticsService(supabase).get_danger_score_stats(
+            since=since, until=until, worker_id=WORKER_ID, by_worker=True, bucket_width=25
+        )
+
+        supabase.rpc.assert_called_once_with("danger_score_stats", {
+            "p_since": "2025-01-01T00:00:00", "p_until": "2025-02-01T00:00:00",
+            "p_user_id": WORKER_ID, "p_by_worker": True, "p_bucket_width": 25
+        })
+        assert [b.start for b in result.slices[0].danger_score.histogram] == [0, 25, 50, 75]
+
+    @pytest.mark.asyncio
+    async def test_aware_window_sent_as_naive_utc(self):
+        supabase = fake_supabase()
+        pacific = timezone(timedelta(hours=-8))
+
+        await AnalyticsService(supabase).get_danger_score_stats(
+            since=datetime(2025, 1, 1, tzinfo=pacific), until=datetime(2025, 1, 2, tzinfo=timezone.utc)
+        )
+
+        params = supabase.rpc.call_args[0][1]
+        assert (params["p_since"], params["p_until"]) == ("2025-01-01T08:00:00", "2025-01-02T00:00:00")
+
+    @pytest.mark.asyncio
+    async def test_no_individuals(self):
+        result = await AnalyticsService(fake_supabase(rows=[])).get_danger_score_stats()
+
+        empty, = result.slices
+        assert (empty.individuals, empty.override_rate, empty.danger_score.mean) == (0, 0.0, None)
+        assert all(b.count == 0 for b in empty.danger_score.histogram)
+
+    @pytest.mark.asyncio
+    async def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            await AnalyticsService(fake_supabase()).get_danger_score_stats(
+                since=datetime(2025, 2, 1), until=datetime(2025, 1, 1)
+            )
+
+    @pytest.mark.asyncio
+    async def test_cached_by_key(self):
+        supabase = fake_supabase()
+        service = AnalyticsService(supabase)
+
+        first = await service.get_danger_score_stats(cache_key='"v1"')
+        second = await service.get_danger_score_stats(cache_key='"v1"')
+        await service.get_danger_score_stats(cache_key='"v2"')
+
+        assert first is second
+        assert supabase.rpc.call_count == 2
+
+
+class TestDangerScoreAnalyticsEndpoint:
+
+    def test_danger_scores(self):
+        with patch("api.analytics.get_supabase_client", return_value=fake_supabase()):
+            response = TestClient(app).get("/api/analytics/danger-scores?since=2025-01-01T00:00:00")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["since"] == "2025-01-01T00:00:00"
+        assert body["slices"][0]["override_rate"] == 0.15
+        assert body["slices"][0]["danger_score"]["histogram"][4] == {"start": 40, "end": 50, "count": 20}
+        assert "ETag" in response.headers
+
+    def test_not_modified(self):
+        supabase = fake_supabase()
+        with patch("api.analytics.get_supabase_client", return_value=supabase):
+            etag = TestClient(app).get("/api/analytics/danger-scores").headers["ETag"]
+            response = TestClient(app).get("/api/analytics/danger-scores", headers={"If-None-Match": etag})
+            other = TestClient(app).get("/api/analytics/danger-scores?by_worker=true",
+                                        headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert other.status_code == 200
+        assert supabase.rpc.call_count == 2
+
+    def test_invalid_parameters(self):
+        with patch("api.analytics.get_supabase_client", return_value=fake_supabase()):
+            client = TestClient(app)
+            backwards = client.get("/api/analytics/danger-scores?since=2025-02-01T00:00:00&until=2025-01-01T00:00:00")
+            bucket = client.get("/api/analytics/danger-scores?bucket_width=0")
+
+        assert backwards.status_code == 400
+        assert bucket.status_code == 422
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestDangerScoreStatsInDatabase:
+
+    @pytest.fixture
+    def conn(self):
+        psycopg2 = pytest.importorskip("psycopg2")
+        from psycopg2.extras import RealDictCursor
+        from benchmarks.save_individual_benchmark import apply_schema, MIGRATIONS_DIR
+
+        connection = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+        connection.autocommit = True
+        schema = f"test_{uuid.uuid4().hex[:12]}"
+        apply_schema(connection, schema)
+        with connection.cursor() as cur:
+            for migration in ("011_individual_summaries.sql", "012_search_sort_indexes.sql",
+                              "013_search_filters.sql", "014_category_indexes.sql",
+                              "015_category_facets.sql", "016_danger_score_stats.sql"):
+                with open(os.path.join(MIGRATIONS_DIR, migration)) as f:
+                    cur.execute(f.read())
+        yield connection
+        with connection.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        connection.close()
+
+    @pytest.fixture
+    def people(self, conn):
+        """200 individuals with scores/overrides, each seen by one or two of three workers in January"""
+        rng = random.Random(16)
+        workers = [str(uuid.uuid4()) for _ in range(3)]
+        people = []
+        with conn.cursor() as cur:
+            for worker in workers:
+                cur.execute("INSERT INTO auth.users (id) VALUES (%s)", (worker,))
+            for i in range(200):
+                danger = rng.randint(0, 100)
+                override = rng.choice([None, None, None, 0, rng.randint(0, 100)])
+                cur.execute(
+                    "INSERT INTO individuals (name, danger_score, danger_override) VALUES (%s, %s, %s) RETURNING id",
+                    (f"Person {i}", danger, override)
+                )
+                individual_id = cur.fetchone()["id"]
+                seen = []
+                for worker in rng.sample(workers, rng.randint(1, 2)):
+                    seen_at = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 30))
+                    cur.execute(
+                        """INSERT INTO interactions (individual_id, user_id, user_name, created_at)
+                           VALUES (%s, %s, %s, %s)""",
+                        (individual_id, worker, f"Worker {workers.index(worker)}", seen_at)
+                    )
+                    seen.append((worker, seen_at))
+                people.append({"danger": danger, "override": override or None, "seen": seen})
+        return workers, people
+
+    def stats(self, conn, since=None, until=None, user_id=None, by_worker=False, bucket_width=10):
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM danger_score_stats(%s, %s, %s, %s, %s)",
+                        (since, until, user_id, by_worker, bucket_width))
+            return cur.fetchall()
+
+    def check(self, row, population, bucket_width=10):
+        danger = sorted(p["danger"] for p in population)
+        display = [p["override"] if p["override"] is not None else p["danger"] for p in population]
+        assert row["individuals"] == len(population)
+        assert row["overrides"] == sum(p["override"] is not None for p in population)
+        assert row["mean_danger_score"] == pytest.approx(statistics.mean(danger))
+        assert row["danger_score_percentiles"][1] == pytest.approx(statistics.median(danger))
+        expected = Counter(min(score, 99) // bucket_width * bucket_width for score in display)
+        assert row["display_score_histogram"] == {str(k): v for k, v in expected.items()}
+
+    def test_overall(self, conn, people):
+        _, population = people
+
+        overall, = self.stats(conn)
+
+        assert overall["user_id"] is None
+        self.check(overall, population)
+        self.check(self.stats(conn, bucket_width=25)[0], population, bucket_width=25)
+
+    def test_time_window(self, conn, people):
+        _, population = people
+        since, until = datetime(2025, 1, 10), datetime(2025, 1, 20)
+
+        window, = self.stats(conn, since=since, until=until)
+
+        self.check(window, [p for p in population if any(since <= at < until for _, at in p["seen"])])
+
+    def test_by_worker(self, conn, people):
+        workers, population = people
+
+        slices = {row["user_id"]: row for row in self.stats(conn, by_worker=True)}
+        single, = self.stats(conn, user_id=workers[0])
+
+        assert set(slices) == set(workers)
+        for worker in workers:
+            self.check(slices[worker], [p for p in population if worker in {w for w, _ in p["seen"]}])
+        assert slices[workers[0]]["user_name"] == "Worker 0"
+        self.check(single, [p for p in population if workers[0] in {w for w, _ in p["seen"]}])
@@ -0,0 +1,284 @@
+"""
+Tests for GET /api/individuals/facets (per-option counts of select categories)
+
+Service and endpoint tests mock Supabase; the DB tests (skipped unless
+TEST_DATABASE_URL is set) check the counts maintained by migrations 015 and 021.
+"""
+import os
+import json
+import uuid
+import random
+import pytest
+from collections import Counter
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+
+from main import app
+from api.auth import get_current_user
+from services.individual_service import IndividualService, facet_cache, parse_filters
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+FACET_ROWS = [
+    {"category": "housing_priority", "type": "single_select", "value": "Critical", "count": 12},
+    {"category": "housing_priority", "type": "single_select", "value": "Low", "count": 3},
+    {"category": "substance_abuse_history", "type": "multi_select", "value": "Mild", "count": 7}
+]
+
+app.dependency_overrides[get_current_user] = lambda: "test-user"
+
+
+def fake_supabase(facet_rows=FACET_ROWS, categories=()):
+    """Supabase mock: category_facets RPC, resource version 1, `categories` rows"""
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.return_value = MagicMock(data=facet_rows)
+
+    def table(name):
+        query = MagicMock()
+        query.select.return_value = query
+        query.eq.return_value = query
+        data = [{"version": 1}] if name == "resource_versions" else list(categories)
+        query.execute.return_value = MagicMock(data=data)
+        return query
+
+    supabase.table.side_effect = table
+    return supabase
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    facet_cache.clear()
+    yield
+    facet_cache.clear()
+
+
+class TestGetFacets:
+
+    @pytest.mark.asyncio
+    async def test_grouped_by_category(self):
+        supabase = fake_supabase()
+
+        result = await IndividualService(supabase).get_facets()
+
+        supabase.rpc.assert_called_once_with(
+            "category_facets", {"p_contains": None, "p_conditions": None, "p_search": None}
+        )
+        assert [(f.category, [(v.value, v.count) for v in f.values]) for f in result.facets] == [
+            ("housing_priority", [("Critical", 12), ("Low", 3)]),
+            ("substance_abuse_history", [("Mild", 7)])
+        ]
+
+    @pytest.mark.asyncio
+    async def test_filters_passed_to_database(self):
+        supabase = fake_supabase()
+        filters = {
+            "contains": {"last_shelter_visit": "2025-01-15"},
+            "conditions": [
+                ("data->>veteran_status", "eq", "Yes"),
+                ("data->substance_abuse_history", "contains", ["Mild"]),
+                ("data->height", "gte", 60),
+                ("display_score", "lte", 80)
+            ]
+        }
+
+        await IndividualService(supabase).get_facets(filters=filters, search="john")
+
+        supabase.rpc.assert_called_once_with("category_facets", {
+            "p_contains": {"last_shelter_visit": "2025-01-15"},
+            "p_conditions": [
+                {"text_key": "veteran_status", "op": "eq", "value": "Yes"},
+                {"key": "substance_abuse_history", "op": "contains", "value": ["Mild"]},
+                {"key": "height", "op": "gte", "value": 60},
+                {"column": "display_score", "op": "lte", "value": 80}
+            ],
+            "p_search": "john"
+        })
+
+    @pytest.mark.asyncio
+    async def test_cached_by_key(self):
+        supabase = fake_supabase()
+        service = IndividualService(supabase)
+
+        first = await service.get_facets(cache_key='"v1"')
+        second = await service.get_facets(cache_key='"v1"')
+        await service.get_facets(cache_key='"v2"')
+
+        assert first is second
+        assert supabase.rpc.call_count == 2
+
+
+class TestFacetsEndpoint:
+
+    def test_facets(self):
+        with patch("api.individuals.get_supabase_client", return_value=fake_supabase()):
+            response = TestClient(app).get("/api/individuals/facets")
+
+        assert response.status_code == 200
+        assert response.json()["facets"][0] == {
+            "category": "housing_priority", "type": "single_select",
+            "values": [{"value": "Critical", "count": 12}, {"value": "Low", "count": 3}]
+        }
+        assert "ETag" in response.headers
+
+    def test_not_modified(self):
+        supabase = fake_supabase()
+        with patch("api.individuals.get_supabase_client", return_value=supabase):
+            etag = TestClient(app).get("/api/individuals/facets").headers["ETag"]
+            response = TestClient(app).get("/api/individuals/facets", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert supabase.rpc.call_count == 1
+
+    def test_invalid_filter(self):
+        supabase = fake_supabase(categories=[{"name": "height", "type": "number"}])
+        with patch("api.individuals.get_supabase_client", return_value=supabase):
+            response = TestClient(app).get("/api/individuals/facets?filter[height]=tall")
+
+        assert response.status_code == 400
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestFacetsInDatabase:
+
+    @pytest.fixture
+    def conn(self):
+        psycopg2 = pytest.importorskip("psycopg2")
+        from psycopg2.extras import RealDictCursor
+        from benchmarks.save_individual_benchmark import apply_schema, MIGRATIONS_DIR
+
+        connection = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+        connection.autocommit = True
+        schema = f"test_{uuid.uuid4().hex[:12]}"
+        apply_schema(connection, schema)
+        with connection.cursor() as cur:
+            cur.execute("""INSERT INTO categories (name, type) VALUES
+                ('veteran_status', 'single_select'), ('substance_abuse_history', 'multi_select'),
+                ('height', 'number')""")
+            for migration in ("011_individual_summaries.sql", "012_search_sort_indexes.sql",
+                              "013_search_filters.sql", "014_category_indexes.sql",
+                              "015_category_facets.sql", "018_category_filter_indexes.sql",
+                              "021_sharded_facet_counts.sql"):
+                with open(os.path.join(MIGRATIONS_DIR, migration)) as f:
+                    cur.execute(f.read())
+        yield connection
+        with connection.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        connection.close()
+
+    def facets(self, conn, filters=None, search=None):
+        """category_facets() called as IndividualService.get_facets calls it"""
+        supabase = MagicMock()
+        conditions = [IndividualService(supabase)._facet_condition(*c) for c in (filters or {}).get("conditions", [])]
+        contains = (filters or {}).get("contains")
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT * FROM category_facets(%s, %s, %s)",
+                (json.dumps(contains) if contains else None, json.dumps(conditions) if conditions else None, search)
+            )
+            return {(r["category"], r["value"]): r["count"] for r in cur.fetchall()}
+
+    def expected(self, people, keep=lambda data: True):
+        counts = Counter()
+        for data in people.values():
+            if not keep(data):
+                continue
+            if data.get("veteran_status") is not None:
+                counts[("veteran_status", data["veteran_status"])] += 1
+            for value in set(data.get("substance_abuse_history", [])):
+                counts[("substance_abuse_history", value)] += 1
+        return dict(counts)
+
+    def test_counts_follow_saves(self, conn):
+        rng = random.Random(15)
+        people = {}
+        with conn.cursor() as cur:
+            for i in range(300):
+                data = {"height": rng.randint(48, 84),
+                        "veteran_status": rng.choice(["Yes", "No", None]),
+                        "substance_abuse_history": rng.sample(["None", "Mild", "Severe"], rng.randint(0, 2))}
+                cur.execute("INSERT INTO individuals (name, data) VALUES (%s, %s) RETURNING id",
+                            (f"Person {i}", json.dumps(data)))
+                people[cur.fetchone()["id"]] = data
+            for individual_id in rng.sample(sorted(people), 60):
+                data = {**people[individual_id], "veteran_status": "Yes", "substance_abuse_history": ["Mild", "Mild"]}
+                cur.execute("UPDATE individuals SET data = %s WHERE id = %s", (json.dumps(data), individual_id))
+                people[individual_id] = data
+            for individual_id in rng.sample(sorted(people), 30):
+                cur.execute("DELETE FROM individuals WHERE id = %s", (individual_id,))
+                del people[individual_id]
+
+        assert self.facets(conn) == self.expected(people)
+        filters = parse_filters({
+            "filter[veteran_status]": "Yes",
+            "filter[substance_abuse_history]": "Mild",
+            "filter[height]": "70.."
+        }, {"veteran_status": "single_select", "substance_abuse_history": "multi_select", "height": "number"})
+        assert self.facets(conn, filters) == self.expected(people, lambda d: (
+            d.get("veteran_status") == "Yes" and "Mild" in d["substance_abuse_history"] and d["height"] >= 70
+        ))
+
+    def test_number_range_skips_missing_values(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("""INSERT INTO individuals (name, data) VALUES
+                ('A', '{"height": 60, "veteran_status": "Yes"}'),
+                ('B', '{"height": null, "veteran_status": "Yes"}'),
+                ('C', '{"height": "short", "veteran_status": "No"}'),
+                ('D', '{"height": true, "veteran_status": "No"}')""")
+        types = {"height": "number"}
+
+        assert self.facets(conn, parse_filters({"filter[height]": "..70"}, types)) == {("veteran_status", "Yes"): 1}
+        assert self.facets(conn, parse_filters({"filter[height]": "50.."}, types)) == {("veteran_status", "Yes"): 1}
+
+    def test_new_category_counted(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("""INSERT INTO individuals (name, data) VALUES
+                ('A', '{"housing_priority": "Critical"}'), ('B', '{"housing_priority": "Critical"}')""")
+            assert self.facets(conn) == {}
+
+            cur.execute("INSERT INTO categories (name, type) VALUES ('housing_priority', 'single_select')")
+
+        assert self.facets(conn) == {("housing_priority", "Critical"): 2}
+
+    @pytest.fixture
+    def writers(self, conn):
+        """Two connections (lock_timeout 1s) whose saves count into different shards"""
+        psycopg2 = pytest.importorskip("psycopg2")
+        with conn.cursor() as cur:
+            cur.execute("SHOW search_path")
+            search_path = cur.fetchone()["search_path"]
+        writers, shards, spare = [], set(), []
+        while len(writers) < 2:
+            writer = psycopg2.connect(DATABASE_URL)
+            with writer.cursor() as cur:
+                cur.execute(f"SET search_path TO {search_path}")
+                cur.execute("SET lock_timeout = '1s'")
+                cur.execute("SELECT facet_count_shard()")
+                shard = cur.fetchone()[0]
+            writer.commit()
+            (spare if shard in shards else writers).append(writer)
+            shards.add(shard)
+        yield writers
+        for writer in writers + spare:
+            writer.close()
+
+    def test_concurrent_saves_dont_wait(self, conn, writers):
+        """Saves of individuals with the same option don't queue on one counter row"""
+        ids = []
+        for i, writer in enumerate(writers):
+            with writer.cursor() as cur:
+                cur.execute("INSERT INTO individuals (name, data) VALUES (%s, %s) RETURNING id",
+                            (f"Person {i}", json.dumps({"veteran_status": "Yes"})))
+                ids.append(cur.fetchone()[0])
+        for writer in writers:
+            writer.commit()
+
+        assert self.facets(conn) == {("veteran_status", "Yes"): 2}
+
+        # Decrements land in another shard than the increments they undo
+        with writers[1].cursor() as cur:
+            cur.execute("UPDATE individuals SET data = %s WHERE id = %s",
+                        (json.dumps({"veteran_status": "No"}), ids[0]))
+            cur.execute("DELETE FROM individuals WHERE id = %s", (ids[1],))
+        writers[1].commit()
+
+        assert self.facets(conn) == {("veteran_status", "No"): 1}
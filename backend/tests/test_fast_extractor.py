@@ -0,0 +1,145 @@
+"""
+Tests for rule-based fast-path extraction before GPT-4o
+"""
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from services.fast_extractor import extract_fields, extract_height, extract_name, DEFAULT_MIN_CONFIDENCE
+from services.openai_service import OpenAIService
+
+
+CATEGORIES = [
+    {"name": "name", "type": "text", "is_required": True},
+    {"name": "height", "type": "number", "is_required": True},
+    {"name": "weight", "type": "number", "is_required": True},
+    {
+        "name": "skin_color", "type": "single_select", "is_required": True,
+        "options": [{"label": "Light", "value": 0}, {"label": "Medium", "value": 0}, {"label": "Dark", "value": 0}]
+    },
+    {"name": "age", "type": "number", "is_required": False},
+    {
+        "name": "substance_abuse_history", "type": "multi_select", "is_required": False,
+        "options": ["None", "Mild", "Moderate", "Severe", "In Recovery"]
+    },
+    {
+        "name": "gender", "type": "single_select", "is_required": False,
+        "options": [{"label": "Male", "value": 0}, {"label": "Female", "value": 0}]
+    }
+]
+
+JOHN = ("Met John near Market Street. About 45 years old, 6 feet tall, maybe 180 pounds. "
+        "Light skin. Shows signs of moderate substance abuse, been on streets 3 months.")
+
+
+def values(extracted):
+    return {name: field.value for name, field in extracted.items()}
+
+
+class TestExtractors:
+    
+    @pytest.mark.parametrize("text,inches", [
+        ("6 feet tall", 72),
+        ("5'10\"", 70),
+        ("5 foot 4, 120 pounds", 64),
+        ("he's six feet", 72),
+        ("height maybe 6'", 72),
+        ("five foot eleven", 71),
+        ("5 feet 4 inches", 64),
+        ("about 68 inches tall", 68),
+    ])
+    def test_height(self, text, inches):
+        assert extract_height(text).value == inches
+    
+    def test_height_not_confused_by_weight(self):
+        assert extract_height("is six feet 180 pounds").value == 72
+        assert extract_height("been out 3 months") is None
+    
+    @pytest.mark.parametrize("text", [
+        "He walked 6 feet away",
+        "Sleeping about 5 feet from the door",
+        "Tent is 7 feet long",
+        "Left 6 feet of rope",
+        "Carrying a sign maybe 60 inches wide",
+        "Found him 6 feet off the path, 5 foot 4 inches away from the cart",
+    ])
+    def test_distances_are_not_heights(self, text):
+        assert extract_height(text) is None
+    
+    def test_called_is_not_a_confident_name(self):
+        assert extract_name("I called Dispatch about him").confidence < DEFAULT_MIN_CONFIDENCE
+        assert extract_name("I called Dispatch, then met John").value == "John"
+    
+    def test_numbers_are_floats(self):
+        result = extract_fields(JOHN, CATEGORIES)
+        assert all(type(result[name].value) is float for name in ("height", "weight", "age"))
+    
+    def test_demo_transcription(self):
+        result = values(extract_fields(JOHN, CATEGORIES))
+        assert result == {
+            "name": "John",
+            "height": 72,
+            "weight": 180,
+            "skin_color": "Light",
+            "age": 45,
+            "substance_abuse_history": ["Moderate"]
+        }
+    
+    def test_ambiguous_single_select_skipped(self):
+        result = extract_fields("light skin or maybe dark skin", CATEGORIES)
+        assert "skin_color" not in result
+    
+    def test_label_without_keyword_is_low_confidence(self):
+        result = extract_fields("Walks with a medium limp", CATEGORIES)
+        assert result["skin_color"].confidence < 0.85
+    
+    def test_capitalized_category_names(self):
+        categories = [{"name": "Height", "type": "number"}, {"name": "Weight", "type": "number"}]
+        assert values(extract_fields("5'4\", 120 lbs", categories)) == {"Height": 64, "Weight": 120}
+
+
+class TestCategorizeFastPath:
+    
+    @pytest.fixture
+    def service(self):
+        client = Mock()
+        client.chat.completions.create = AsyncMock()
+        return OpenAIService(client=client, transcription_backend=Mock())
+    
+    @pytest.mark.asyncio
+    async def test_skips_llm_when_required_fields_confident(self, service, monkeypatch):
+        monkeypatch.delenv("FAST_PATH_SKIP_LLM", raising=False)
+        result = await service.categorize_transcription(JOHN, CATEGORIES)
+        
+        service.client.chat.completions.create.assert_not_called()
+        assert result["height"] == 72
+        assert result["gender"] is None
+        assert list(result) == [cat["name"] for cat in CATEGORIES]
+    
+    @pytest.mark.asyncio
+    async def test_llm_only_asked_for_remaining_fields(self, service, monkeypatch):
+        monkeypatch.setenv("FAST_PATH_SKIP_LLM", "false")
+        response = Mock()
+        response.choices = [Mock(message=Mock(content=json.dumps({"gender": "Male", "height": 10})))]
+        service.client.chat.completions.create.return_value = response
+        
+        result = await service.categorize_transcription(JOHN, CATEGORIES)
+        
+        prompt = service.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        assert "- gender (single_select" in prompt
+        assert "- height (number" not in prompt
+        assert result["gender"] == "Male"
+        assert result["height"] == 72  # Rule-based value kept
+    
+    @pytest.mark.asyncio
+    async def test_missing_required_field_calls_llm(self, service):
+        response = Mock()
+        response.choices = [Mock(message=Mock(content=json.dumps({"name": "Robert", "skin_color": "Medium"})))]
+        service.client.chat.completions.create.return_value = response
+        
+        result = await service.categorize_transcription("Robert, medium skin tone, seems to be a veteran.", CATEGORIES)
+        
+        service.client.chat.completions.create.assert_awaited_once()
+        assert result["name"] == "Robert"
+        assert result["skin_color"] == "Medium"
+        assert result["height"] is None
@@ -46,30 +46,27 @@ class TestGetIndividualsSearch:
                 "name": "John Doe",
                 "danger_score": 75,
                 "danger_override": None,
-                "data": {"name": "John Doe", "height": 72, "weight": 180, "skin_color": "Light"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "display_score": 75,
+                "last_seen": datetime.now(timezone.utc).isoformat(),
+                "last_location": None
             },
             {
                 "id": str(uuid4()),
                 "name": "Jane Smith",
                 "danger_score": 30,
                 "danger_override": None,
-                "data": {"name": "Jane Smith", "height": 65, "weight": 140, "skin_color": "Dark"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "display_score": 30,
+                "last_seen": datetime.now(timezone.utc).isoformat(),
+                "last_location": None
             }
         ]
         
-        # Mock the select query
+        # Mock the summaries query (sorted, then paginated)
         mock_select = MagicMock()
         mock_supabase.table.return_value.select.return_value = mock_select
-        mock_select.execute.return_value.data = mock_individuals
-        
-        # Mock interactions for last_seen
-        mock_supabase.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value.data = [
-            {"created_at": datetime.now(timezone.utc).isoformat(), "location": {"latitude": 37.7749, "longitude": -122.4194}}
-        ]
+        mock_select.order.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=mock_individuals, count=len(mock_individuals)
+        )
         
         response = client.get(
             "/api/individuals",
@@ -93,19 +90,18 @@ class TestGetIndividualsSearch:
                 "name": "John Doe",
                 "danger_score": 75,
                 "danger_override": None,
-                "data": {"name": "John Doe", "height": 72, "weight": 180, "skin_color": "Light"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "display_score": 75,
+                "last_seen": datetime.now(timezone.utc).isoformat(),
+                "last_location": None
             }
         ]
         
-        # Mock search query with or_ condition
+        # Mock search query on the summaries' search text
         mock_select = MagicMock()
         mock_supabase.table.return_value.select.return_value = mock_select
-        mock_select.or_.return_value.execute.return_value.data = mock_individuals
-        
-        # Mock interactions
-        mock_supabase.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value.data = []
+        mock_select.ilike.return_value.order.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=mock_individuals, count=len(mock_individuals)
+        )
         
         response = client.get(
             "/api/individuals?search=John",
@@ -122,7 +118,9 @@ class TestGetIndividualsSearch:
         # Mock empty results for offset 20
         mock_select = MagicMock()
         mock_supabase.table.return_value.select.return_value = mock_select
-        mock_select.execute.return_value.data = []
+        mock_select.order.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=[], count=25
+        )
         
         response = client.get(
             "/api/individuals?limit=10&offset=20",
@@ -144,25 +142,27 @@ class TestGetIndividualsSearch:
                 "name": "High Danger",
                 "danger_score": 90,
                 "danger_override": None,
-                "data": {"name": "High Danger", "height": 70, "weight": 200, "skin_color": "Medium"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "display_score": 90,
+                "last_seen": datetime.now(timezone.utc).isoformat(),
+                "last_location": None
             },
             {
                 "id": str(uuid4()),
                 "name": "Low Danger",
                 "danger_score": 20,
                 "danger_override": None,
-                "data": {"name": "Low Danger", "height": 65, "weight": 150, "skin_color": "Light"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "display_score": 20,
+                "last_seen": datetime.now(timezone.utc).isoformat(),
+                "last_location": None
             }
         ]
         
         # Mock query with order
         mock_select = MagicMock()
         mock_supabase.table.return_value.select.return_value = mock_select
-        mock_select.order.return_value.execute.return_value.data = mock_individuals
+        mock_select.order.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=mock_individuals, count=len(mock_individuals)
+        )
         
         response = client.get(
             "/api/individuals?sort_by=danger_score&sort_order=desc",
@@ -0,0 +1,73 @@
+"""
+Tests for application-scoped HTTP/OpenAI clients
+"""
+import pytest
+import httpx
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, AsyncMock, patch
+
+from main import app
+from services import http_clients
+from services.openai_service import OpenAIService
+
+
+@pytest.fixture(autouse=True)
+def reset_clients(monkeypatch):
+    """Start every test without shared clients"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("TRANSCRIPTION_JOBS_WORKERS", "false")
+    monkeypatch.setattr(http_clients, "_http_client", None)
+    monkeypatch.setattr(http_clients, "_openai_service", None)
+    yield
+
+
+class TestSharedClients:
+    """Shared client lifecycle"""
+    
+    def test_openai_service_is_singleton(self):
+        """Every request gets the same service and connection pool"""
+        first = http_clients.get_openai_service()
+        second = http_clients.get_openai_service()
+        assert first is second
+        assert first.http_client is http_clients.get_http_client()
+    
+    def test_connection_limits_from_env(self, monkeypatch):
+        """Pool limits can be tuned via environment"""
+        monkeypatch.setenv("HTTP_MAX_CONNECTIONS", "7")
+        client = http_clients.build_http_client()
+        pool = client._transport._pool
+        assert pool._max_connections == 7
+    
+    def test_http2_only_when_h2_installed(self):
+        """HTTP/2 is enabled only if the h2 package is importable"""
+        with patch("services.http_clients.importlib.util.find_spec", return_value=None):
+            assert http_clients.http2_available() is False
+            client = http_clients.build_http_client()
+            assert client._transport._pool._http2 is False
+    
+    def test_lifespan_creates_and_closes_clients(self):
+        """Clients are created on startup and closed on shutdown"""
+        with TestClient(app):
+            client = http_clients._http_client
+            assert client is not None
+            assert http_clients._openai_service is not None
+        assert client.is_closed
+        assert http_clients._http_client is None
+        assert http_clients._openai_service is None
+    
+    @pytest.mark.asyncio
+    async def test_download_uses_shared_client(self):
+        """transcribe_audio downloads through the shared pool"""
+        response = Mock()
+        response.content = b"audio"
+        response.raise_for_status = Mock()
+        shared = Mock(spec=httpx.AsyncClient)
+        shared.get = AsyncMock(return_value=response)
+        
+        service = OpenAIService(client=Mock(), http_client=shared)
+        with patch("services.openai_service.httpx.AsyncClient") as per_request:
+            content = await service._download_audio("https://x.supabase.co/a.m4a")
+        
+        assert content == b"audio"
+        shared.get.assert_awaited_once()
+        per_request.assert_not_called()
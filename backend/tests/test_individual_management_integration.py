@@ -11,6 +11,7 @@ import time
 
 from main import app
 from api.auth import get_current_user
+from services.individual_service import IndividualNotFoundError
 
 
 # Mock auth dependency
@@ -390,8 +391,10 @@ class TestIndividualManagementIntegration:
         )
         assert response.status_code == 422
         
-        # Test 4: Merge with non-existent individual
-        mock_service.get_individual_by_id = AsyncMock(return_value=None)
+        # Test 4: Merge with non-existent individual (reported by the write)
+        mock_service.save_individual = AsyncMock(
+            side_effect=IndividualNotFoundError("Individual not found")
+        )
         
         with patch('api.individuals.IndividualService', return_value=mock_service):
             response = client.post(
@@ -7,6 +7,7 @@ from uuid import uuid4
 from datetime import datetime
 from unittest.mock import Mock, MagicMock
 from services.individual_service import IndividualService
+from postgrest.exceptions import APIError
 from db.models import LocationData, SaveIndividualResponse
 
 
@@ -141,10 +142,11 @@ class TestIndividualService:
         table_mock.select.return_value = select_mock
         select_mock.execute.return_value = categories_mock
         
-        # Individual insert call
-        insert_mock = Mock()
-        table_mock.insert.return_value = insert_mock
-        insert_mock.execute.side_effect = [individual_mock, interaction_mock]
+        # Atomic save RPC returns both rows
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data={
+            "individual": individual_mock.data[0],
+            "interaction": interaction_mock.data[0]
+        })
         
         # Test save
         result = await service.save_individual(
@@ -169,8 +171,12 @@ class TestIndividualService:
         assert result.individual.danger_score >= 0
         assert result.interaction.has_transcription is False
         
-        # Verify Supabase calls
-        assert mock_supabase.table.call_count >= 3  # categories, individual, interaction
+        # Verify Supabase calls: categories, then one atomic save
+        assert mock_supabase.table.call_count == 1
+        name, params = mock_supabase.rpc.call_args[0]
+        assert name == "save_individual"
+        assert params["p_merge_with_id"] is None
+        assert params["p_location"]["address"] == "123 Market Street, SF"
     
     @pytest.mark.asyncio
     async def test_save_with_merge(self, service, mock_supabase):
@@ -180,48 +186,36 @@ class TestIndividualService:
         # Mock categories
         mock_supabase.table.return_value.select.return_value.execute.return_value.data = []
         
-        # Mock existing individual
-        mock_supabase.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value.data = {
-            "id": merge_id,
-            "name": "John Doe",
-            "data": {
+        # Mock atomic save RPC (update + interaction with changes only)
+        mock_supabase.rpc.return_value.execute.return_value.data = {
+            "individual": {
+                "id": merge_id,
                 "name": "John Doe",
-                "height": 72,
-                "weight": 180,
-                "skin_color": "Light"
+                "danger_score": 0,
+                "danger_override": None,
+                "data": {
+                    "name": "John Doe",
+                    "height": 73,
+                    "weight": 185,
+                    "skin_color": "Light",
+                    "veteran_status": "Yes"
+                },
+                "created_at": datetime.utcnow().isoformat(),
+                "updated_at": datetime.utcnow().isoformat()
+            },
+            "interaction": {
+                "id": str(uuid4()),
+                "individual_id": merge_id,
+                "changes": {
+                    "height": 73,
+                    "weight": 185,
+                    "veteran_status": "Yes"
+                },
+                "user_name": "Demo User",
+                "created_at": datetime.utcnow().isoformat()
             }
         }
         
-        # Mock update
-        mock_supabase.table.return_value.update.return_value.eq.return_value.execute.return_value.data = [{
-            "id": merge_id,
-            "name": "John Doe",
-            "danger_score": 0,
-            "danger_override": None,
-            "data": {
-                "name": "John Doe",
-                "height": 73,
-                "weight": 185,
-                "skin_color": "Light",
-                "veteran_status": "Yes"
-            },
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
-        }]
-        
-        # Mock interaction with changes only
-        mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [{
-            "id": str(uuid4()),
-            "individual_id": merge_id,
-            "changes": {
-                "height": 73,
-                "weight": 185,
-                "veteran_status": "Yes"
-            },
-            "user_name": "Demo User",
-            "created_at": datetime.utcnow().isoformat()
-        }]
-        
         # Test merge
         result = await service.save_individual(
             user_id="test-user",
@@ -238,6 +232,7 @@ class TestIndividualService:
         
         # Verify same individual ID
         assert str(result.individual.id) == merge_id
+        assert mock_supabase.rpc.call_args[0][1]["p_merge_with_id"] == merge_id
     
     @pytest.mark.asyncio
     async def test_save_merge_not_found(self, service, mock_supabase):
@@ -245,8 +240,11 @@ class TestIndividualService:
         # Mock categories
         mock_supabase.table.return_value.select.return_value.execute.return_value.data = []
         
-        # Mock individual not found
-        mock_supabase.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value.data = None
+        # Mock individual not found (raised by the save_individual function)
+        mock_supabase.rpc.return_value.execute.side_effect = APIError({
+            "code": "P0002",
+            "message": "Individual not found"
+        })
         
         # Test merge should fail
         with pytest.raises(ValueError) as exc:
@@ -261,26 +259,26 @@ class TestIndividualService:
     @pytest.mark.asyncio
     async def test_search_individuals_with_term(self, service, mock_supabase):
         """Test search functionality with search term"""
-        # Mock search results
-        mock_supabase.table.return_value.select.return_value.or_.return_value.execute.return_value.data = [
-            {
+        # Mock search results from the summaries table (address already abbreviated)
+        query = mock_supabase.table.return_value.select.return_value.ilike.return_value
+        query.order.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=[{
                 "id": str(uuid4()),
                 "name": "John Smith",
                 "danger_score": 50,
                 "danger_override": None,
-                "created_at": datetime.utcnow().isoformat()
-            }
-        ]
-        
-        # Mock last interaction
-        mock_supabase.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value.data = [{
-            "created_at": datetime.utcnow().isoformat(),
-            "location": {"latitude": 37.7749, "longitude": -122.4194, "address": "123 Market Street"}
-        }]
+                "display_score": 50,
+                "last_seen": datetime.utcnow().isoformat(),
+                "last_location": {"latitude": 37.7749, "longitude": -122.4194, "address": "Market Street"}
+            }],
+            count=1
+        )
         
         # Test search
         results = await service.search_individuals(search="John", limit=10)
         
+        mock_supabase.table.assert_called_with("individual_summaries")
+        mock_supabase.table.return_value.select.return_value.ilike.assert_called_with("search_text", "%john%")
         assert len(results.individuals) > 0
         assert "John" in results.individuals[0].name
         # Address should be abbreviated
@@ -289,31 +287,47 @@ class TestIndividualService:
     @pytest.mark.asyncio
     async def test_search_individuals_pagination(self, service, mock_supabase):
         """Test search pagination"""
-        # Create 25 mock individuals
+        # Page 2 of 25 individuals
         mock_data = [
             {
                 "id": str(uuid4()),
                 "name": f"Person {i}",
                 "danger_score": i * 10,
                 "danger_override": None,
-                "created_at": datetime.utcnow().isoformat()
+                "display_score": i * 10,
+                "last_seen": datetime.utcnow().isoformat(),
+                "last_location": None
             }
-            for i in range(25)
+            for i in range(10, 20)
         ]
         
-        mock_supabase.table.return_value.select.return_value.execute.return_value.data = mock_data
-        
-        # Mock interactions (empty for simplicity)
-        mock_supabase.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value.execute.return_value.data = []
+        query = mock_supabase.table.return_value.select.return_value.order.return_value.order.return_value
+        query.range.return_value.execute.return_value = MagicMock(data=mock_data, count=25)
         
         # Test pagination
         results = await service.search_individuals(limit=10, offset=10)
         
+        # Paginated in the database
+        query.range.assert_called_with(10, 19)
         assert results.total == 25
         assert results.limit == 10
         assert results.offset == 10
         assert len(results.individuals) == 10
-    
+
+    @pytest.mark.asyncio
+    async def test_search_individuals_name_prefix_and_sort(self, service, mock_supabase):
+        """Test name prefix filter and sorting on the indexed name key"""
+        select = mock_supabase.table.return_value.select.return_value
+        query = select.like.return_value.order.return_value
+        query.order.return_value.range.return_value.execute.return_value = MagicMock(data=[], count=0)
+
+        await service.search_individuals(name_prefix="Jo_%", sort_by="name", sort_order="asc")
+
+        # Wildcards in the prefix are escaped
+        select.like.assert_called_with("name_key", "jo\\_\\%%")
+        select.like.return_value.order.assert_called_with("name_key", desc=False)
+        query.order.assert_called_with("id", desc=False)
+
     @pytest.mark.asyncio
     async def test_get_individual_by_id(self, service, mock_supabase):
         """Test getting individual details"""
@@ -0,0 +1,126 @@
+"""
+Tests for the individual_summaries projection (migrations 011, 013, 023)
+against a real Postgres
+
+Skipped unless TEST_DATABASE_URL is set (see test_save_individual_db.py).
+"""
+import os
+import uuid
+import random
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from benchmarks.save_individual_benchmark import apply_schema, rpc_save, MIGRATIONS_DIR, CountingConnection
+from benchmarks.address_benchmark import HOTSPOT_ADDRESSES
+from services.individual_service import _abbreviate_address
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+DATA = {"name": "Jane Smith", "height": 65, "weight": 140, "skin_color": "Dark"}
+LOCATION = {"latitude": 37.78, "longitude": -122.41, "address": "123 Golden Gate Avenue, San Francisco, CA 94102"}
+
+
+@pytest.fixture
+def conn():
+    connection = psycopg2.connect(DATABASE_URL, connection_factory=CountingConnection)
+    connection.autocommit = True
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    apply_schema(connection, schema)
+    with connection.cursor() as cur:
+        for migration in ("011_individual_summaries.sql", "013_search_filters.sql", "023_display_score_override.sql"):
+            with open(os.path.join(MIGRATIONS_DIR, migration)) as f:
+                cur.execute(f.read())
+    yield connection
+    with connection.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    connection.close()
+
+
+@pytest.fixture
+def user_id(conn):
+    user = str(uuid.uuid4())
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO auth.users (id) VALUES (%s)", (user,))
+    return user
+
+
+def summary(conn, individual_id):
+    with conn.cursor() as cur:
+        cur.execute(
+            """SELECT name, danger_score, danger_override, display_score, last_seen, last_location
+               FROM individual_summaries WHERE id = %s""",
+            (individual_id,)
+        )
+        return cur.fetchone()
+
+
+class TestIndividualSummaries:
+    
+    def test_created_with_abbreviated_location(self, conn, user_id):
+        result = rpc_save(conn, DATA, user_id, location=LOCATION)
+        
+        name, _, _, display_score, last_seen, last_location = summary(conn, result["individual"]["id"])
+        assert name == "Jane Smith"
+        assert last_seen.isoformat() == result["interaction"]["created_at"]
+        assert last_location == {**LOCATION, "address": "Golden Gate Avenue"}
+    
+    def test_merge_and_override_update_summary(self, conn, user_id):
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        rpc_save(conn, {**DATA, "name": "Jane Doe"}, user_id, merge_with_id=individual_id,
+                 location={**LOCATION, "address": "Market Street & 5th Street, San Francisco"})
+        with conn.cursor() as cur:
+            cur.execute("UPDATE individuals SET danger_override = 80 WHERE id = %s", (individual_id,))
+        
+        name, _, danger_override, display_score, _, last_location = summary(conn, individual_id)
+        assert (name, danger_override, display_score) == ("Jane Doe", 80, 80)
+        assert last_location["address"] == "Market & 5th"
+    
+    def test_zero_override_is_displayed(self, conn, user_id):
+        """display_score = COALESCE(danger_override, danger_score): an override of 0 counts"""
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        with conn.cursor() as cur:
+            cur.execute("UPDATE individuals SET danger_score = 70, danger_override = 0 WHERE id = %s",
+                        (individual_id,))
+        assert summary(conn, individual_id)[1:4] == (70, 0, 0)
+        
+        with conn.cursor() as cur:
+            cur.execute("UPDATE individuals SET danger_override = NULL WHERE id = %s", (individual_id,))
+        assert summary(conn, individual_id)[1:4] == (70, None, 70)
+    
+    def test_interaction_delete_recomputes_last_seen(self, conn, user_id):
+        created = rpc_save(conn, DATA, user_id, location=LOCATION)
+        individual_id = created["individual"]["id"]
+        latest = rpc_save(conn, DATA, user_id, merge_with_id=individual_id)
+        assert summary(conn, individual_id)[5] is None  # Latest interaction had no location
+        
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM interactions WHERE id = %s", (latest["interaction"]["id"],))
+        
+        last_seen, last_location = summary(conn, individual_id)[4:]
+        assert last_seen.isoformat() == created["interaction"]["created_at"]
+        assert last_location["address"] == "Golden Gate Avenue"
+    
+    def test_individual_delete_removes_summary(self, conn, user_id):
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO individuals (name, data) VALUES ('Solo', '{}') RETURNING id")
+            individual_id = cur.fetchone()[0]
+            cur.execute("DELETE FROM individuals WHERE id = %s", (individual_id,))
+        assert summary(conn, individual_id) is None
+    
+    def test_abbreviation_matches_python(self, conn):
+        rng = random.Random(11)
+        words = ["123", "5th", "Market", "Street", "St", "Stuff", "Ave", "Golden", "Gate", "Rd", "Place",
+                 "Way", "Blvd", "&", ",", "San", "Francisco", "CA", "94102", "Ellis", "Plaza"]
+        separators = [" ", "", ", ", "  ", "\t"]
+        addresses = HOTSPOT_ADDRESSES + [
+            "".join(rng.choice(words) + rng.choice(separators) for _ in range(rng.randint(1, 12)))
+            for _ in range(5000)
+        ]
+        
+        with conn.cursor() as cur:
+            cur.execute("SELECT a, abbreviate_address(a) FROM unnest(%s::text[]) a", (addresses,))
+            mismatches = [(a, sql) for a, sql in cur.fetchall() if a and sql != _abbreviate_address(a)]
+        assert mismatches == []
@@ -0,0 +1,114 @@
+"""
+Tests for radius and bounding-box queries over last-known locations
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from main import app
+from api.auth import get_current_user
+
+
+def mock_get_current_user():
+    return "test-user-123"
+
+
+app.dependency_overrides[get_current_user] = mock_get_current_user
+
+
+def location_row(name, distance_m=None, danger_override=None):
+    return {
+        "id": str(uuid4()),
+        "name": name,
+        "danger_score": 40,
+        "danger_override": danger_override,
+        "last_seen": "2024-01-15T10:30:00",
+        "last_location": {
+            "latitude": 37.7816,
+            "longitude": -122.4101,
+            "address": "Market Street & 6th Street, San Francisco, CA"
+        },
+        "distance_m": distance_m
+    }
+
+
+class TestLocationQueries:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    @pytest.fixture
+    def mock_supabase(self):
+        with patch('api.individuals.get_supabase_client') as mock:
+            supabase_mock = MagicMock()
+            mock.return_value = supabase_mock
+            yield supabase_mock
+    
+    def test_radius_query_calls_rpc(self, client, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value.data = [
+            location_row("John Doe", distance_m=12.5),
+            location_row("Jane Smith", distance_m=240.0, danger_override=80)
+        ]
+        
+        response = client.get(
+            "/api/individuals/nearby",
+            params={"lat": 37.7816, "lng": -122.4101, "radius_m": 300, "since": "2024-01-08T00:00:00-08:00"}
+        )
+        
+        assert response.status_code == 200
+        individuals = response.json()["individuals"]
+        assert [i["name"] for i in individuals] == ["John Doe", "Jane Smith"]
+        assert individuals[0]["distance_m"] == 12.5
+        assert individuals[1]["display_score"] == 80
+        assert individuals[0]["last_location"]["address"] == "Market & 6th"
+        
+        name, params = mock_supabase.rpc.call_args[0]
+        assert name == "individuals_within_radius"
+        assert params["lat"] == 37.7816
+        assert params["lng"] == -122.4101
+        assert params["radius_m"] == 300
+        assert params["seen_since"] == "2024-01-08T08:00:00"  # Naive UTC, like interactions.created_at
+        assert params["max_results"] == 100
+    
+    def test_radius_query_validates_params(self, client, mock_supabase):
+        assert client.get("/api/individuals/nearby", params={"lat": 95, "lng": 0}).status_code == 422
+        assert client.get(
+            "/api/individuals/nearby", params={"lat": 37.78, "lng": -122.41, "radius_m": 100000}
+        ).status_code == 422
+        mock_supabase.rpc.assert_not_called()
+    
+    def test_bbox_query_calls_rpc(self, client, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value.data = [location_row("John Doe")]
+        
+        response = client.get(
+            "/api/individuals/within",
+            params={"min_lat": 37.77, "min_lng": -122.42, "max_lat": 37.79, "max_lng": -122.40, "limit": 10}
+        )
+        
+        assert response.status_code == 200
+        individuals = response.json()["individuals"]
+        assert len(individuals) == 1
+        assert individuals[0]["distance_m"] is None
+        
+        name, params = mock_supabase.rpc.call_args[0]
+        assert name == "individuals_within_bbox"
+        assert params == {
+            "min_lat": 37.77, "min_lng": -122.42, "max_lat": 37.79, "max_lng": -122.40,
+            "seen_since": None, "max_results": 10
+        }
+    
+    def test_bbox_query_rejects_inverted_box(self, client, mock_supabase):
+        response = client.get(
+            "/api/individuals/within",
+            params={"min_lat": 37.79, "min_lng": -122.42, "max_lat": 37.77, "max_lng": -122.40}
+        )
+        assert response.status_code == 400
+        mock_supabase.rpc.assert_not_called()
+    
+    def test_empty_result(self, client, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value.data = []
+        response = client.get("/api/individuals/nearby", params={"lat": 37.78, "lng": -122.41})
+        assert response.status_code == 200
+        assert response.json() == {"individuals": []}
@@ -0,0 +1,94 @@
+"""
+Tests for clustered map tiles of last-known locations
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from main import app
+from api.auth import get_current_user
+from services.location_service import tile_bounds, tile_cache
+
+
+def mock_get_current_user():
+    return "test-user-123"
+
+
+app.dependency_overrides[get_current_user] = mock_get_current_user
+
+
+class TestTileBounds:
+    
+    def test_world_tile(self):
+        min_lat, min_lng, max_lat, max_lng = tile_bounds(0, 0, 0)
+        assert (min_lng, max_lng) == (-180.0, 180.0)
+        assert round(max_lat, 4) == 85.0511
+        assert round(min_lat, 4) == -85.0511
+    
+    def test_san_francisco_tile_contains_city(self):
+        # Zoom 12 tile covering downtown SF
+        min_lat, min_lng, max_lat, max_lng = tile_bounds(12, 655, 1583)
+        assert min_lat < 37.7816 < max_lat
+        assert min_lng < -122.4101 < max_lng
+    
+    @pytest.mark.parametrize("z,x,y", [(-1, 0, 0), (21, 0, 0), (2, 4, 0), (2, 0, -1)])
+    def test_out_of_range(self, z, x, y):
+        with pytest.raises(ValueError):
+            tile_bounds(z, x, y)
+
+
+class TestMapTileEndpoint:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    @pytest.fixture
+    def mock_supabase(self):
+        tile_cache.clear()
+        with patch('api.maps.get_supabase_client') as mock:
+            supabase_mock = MagicMock()
+            mock.return_value = supabase_mock
+            yield supabase_mock
+        tile_cache.clear()
+    
+    def test_returns_clusters(self, client, mock_supabase):
+        single_id = str(uuid4())
+        mock_supabase.rpc.return_value.execute.return_value.data = [
+            {"cell_x": 1, "cell_y": 2, "count": 14, "latitude": 37.78, "longitude": -122.41,
+             "max_danger_score": 90, "individual_id": None},
+            {"cell_x": 5, "cell_y": 5, "count": 1, "latitude": 37.76, "longitude": -122.39,
+             "max_danger_score": 20, "individual_id": single_id}
+        ]
+        
+        response = client.get("/api/map/tiles/12/655/1583")
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["z"], body["x"], body["y"]) == (12, 655, 1583)
+        assert body["clusters"][0]["count"] == 14
+        assert body["clusters"][0]["max_danger_score"] == 90
+        assert body["clusters"][0]["individual_id"] is None
+        assert body["clusters"][1]["individual_id"] == single_id
+        
+        name, params = mock_supabase.rpc.call_args[0]
+        assert name == "location_clusters"
+        assert params["grid_size"] == 8
+        assert params["min_lat"] < params["max_lat"]
+    
+    def test_tile_is_cached(self, client, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value.data = []
+        
+        assert client.get("/api/map/tiles/12/655/1583").status_code == 200
+        assert client.get("/api/map/tiles/12/655/1583").status_code == 200
+        assert mock_supabase.rpc.call_count == 1
+        
+        # A different tile is a cache miss
+        assert client.get("/api/map/tiles/12/656/1583").status_code == 200
+        assert mock_supabase.rpc.call_count == 2
+    
+    def test_invalid_tile(self, client, mock_supabase):
+        response = client.get("/api/map/tiles/3/8/0")
+        assert response.status_code == 400
+        mock_supabase.rpc.assert_not_called()
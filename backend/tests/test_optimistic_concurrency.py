@@ -0,0 +1,214 @@
+"""
+Tests for version-based optimistic concurrency (ETag / If-Match)
+Tests with mocked Supabase and auth
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+from postgrest.exceptions import APIError
+from uuid import uuid4
+from datetime import datetime, timezone
+
+from main import app
+from api.auth import get_current_user
+from api.etags import version_etag, parse_if_match
+from services.individual_service import IndividualService, ConcurrentUpdateError
+
+
+def mock_get_current_user():
+    return "test-user-123"
+
+
+app.dependency_overrides[get_current_user] = mock_get_current_user
+
+BASE = {"name": "Jane Smith", "height": 65, "weight": 140, "skin_color": "Dark"}
+NOW = datetime.now(timezone.utc).isoformat()
+
+
+def saved(individual_id, data, version):
+    """save_individual RPC result"""
+    return MagicMock(data={
+        "individual": {
+            "id": individual_id, "name": data["name"], "danger_score": 0, "danger_override": None,
+            "data": data, "created_at": NOW, "updated_at": NOW, "version": version
+        },
+        "interaction": {
+            "id": str(uuid4()), "individual_id": individual_id, "user_name": "Demo User",
+            "created_at": NOW, "location": None, "changes": {}
+        }
+    })
+
+
+def fake_supabase(current_data, current_version, rpc_results):
+    """Supabase mock with categories, the current row, the base snapshot and RPC results"""
+    supabase = MagicMock()
+    tables = {
+        "categories": [],
+        "individuals": [{"id": "x", "data": current_data, "version": current_version}],
+        "individual_versions": [{"data": BASE}]
+    }
+    
+    def table(name):
+        query = MagicMock()
+        query.select.return_value = query
+        query.eq.return_value = query
+        query.execute.return_value = MagicMock(data=tables[name])
+        return query
+    
+    supabase.table.side_effect = table
+    supabase.rpc.return_value.execute.side_effect = rpc_results
+    return supabase
+
+
+def conflict():
+    return APIError({"code": "40001", "message": "Individual was modified by another update"})
+
+
+class TestEtagHelpers:
+    
+    def test_round_trip(self):
+        assert version_etag(3) == '"v3"'
+        assert parse_if_match(version_etag(3)) == 3
+    
+    def test_absent_or_wildcard(self):
+        assert parse_if_match(None) is None
+        assert parse_if_match("*") is None
+    
+    @pytest.mark.parametrize("header", ['W/"v3"', "v3", '"3"', '"v3", "v4"', '"vx"'])
+    def test_invalid(self, header):
+        with pytest.raises(ValueError):
+            parse_if_match(header)
+
+
+class TestFieldLevelMerge:
+    
+    @pytest.mark.asyncio
+    async def test_disjoint_changes_merge(self):
+        """Stale write to weight is merged with a concurrent change to height"""
+        individual_id = str(uuid4())
+        theirs = {**BASE, "height": 66}
+        merged = {**BASE, "height": 66, "weight": 150}
+        supabase = fake_supabase(theirs, 2, [conflict(), saved(individual_id, merged, 3)])
+        
+        result = await IndividualService(supabase).save_individual(
+            user_id="u", user_name="Demo User", data={**BASE, "weight": 150},
+            merge_with_id=individual_id, expected_version=1
+        )
+        
+        assert result.individual.version == 3
+        retry = supabase.rpc.call_args_list[1][0][1]
+        assert retry["p_data"] == merged
+        assert retry["p_expected_version"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_same_field_conflicts(self):
+        supabase = fake_supabase({**BASE, "weight": 145}, 2, [conflict()])
+        
+        with pytest.raises(ConcurrentUpdateError) as exc:
+            await IndividualService(supabase).save_individual(
+                user_id="u", user_name="Demo User", data={**BASE, "weight": 150},
+                merge_with_id=uuid4(), expected_version=1
+            )
+        assert exc.value.fields == ["weight"]
+        assert supabase.rpc.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_same_change_on_both_sides_merges(self):
+        individual_id = str(uuid4())
+        data = {**BASE, "weight": 150}
+        supabase = fake_supabase(data, 2, [conflict(), saved(individual_id, data, 3)])
+        
+        result = await IndividualService(supabase).save_individual(
+            user_id="u", user_name="Demo User", data=data,
+            merge_with_id=individual_id, expected_version=1
+        )
+        assert result.individual.data == data
+    
+    @pytest.mark.asyncio
+    async def test_without_version_conflict_is_not_merged(self):
+        supabase = fake_supabase(BASE, 2, [conflict()])
+        
+        with pytest.raises(ConcurrentUpdateError):
+            await IndividualService(supabase).save_individual(
+                user_id="u", user_name="Demo User", data=BASE, merge_with_id=uuid4(),
+                expected_updated_at=datetime(2024, 1, 15, 14, 30)
+            )
+        supabase.table.assert_any_call("categories")
+        assert supabase.rpc.call_count == 1
+
+
+class TestConditionalEndpoints:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    def test_post_returns_etag_and_sends_if_match(self, client):
+        individual_id = str(uuid4())
+        supabase = fake_supabase(BASE, 4, [saved(individual_id, BASE, 5)])
+        
+        with patch('api.individuals.get_supabase_client', return_value=supabase):
+            response = client.post(
+                "/api/individuals",
+                json={"data": BASE, "merge_with_id": individual_id},
+                headers={"If-Match": '"v4"'}
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"v5"'
+        assert supabase.rpc.call_args[0][1]["p_expected_version"] == 4
+    
+    def test_post_conflicting_fields(self, client):
+        supabase = fake_supabase({**BASE, "weight": 145}, 2, [conflict()])
+        
+        with patch('api.individuals.get_supabase_client', return_value=supabase):
+            response = client.post(
+                "/api/individuals",
+                json={"data": {**BASE, "weight": 150}, "merge_with_id": str(uuid4())},
+                headers={"If-Match": '"v1"'}
+            )
+        
+        assert response.status_code == 409
+        assert response.json()["detail"]["conflicting_fields"] == ["weight"]
+    
+    def test_post_invalid_if_match(self, client):
+        with patch('api.individuals.get_supabase_client', return_value=MagicMock()):
+            response = client.post(
+                "/api/individuals",
+                json={"data": BASE, "merge_with_id": str(uuid4())},
+                headers={"If-Match": 'W/"v1"'}
+            )
+        assert response.status_code == 400
+    
+    def test_danger_override_precondition_failed(self, client):
+        supabase = MagicMock()
+        update = supabase.table.return_value.update.return_value
+        update.eq.return_value.eq.return_value.execute.return_value.data = []
+        supabase.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [{"id": "x"}]
+        
+        with patch('api.individuals.get_supabase_client', return_value=supabase):
+            response = client.put(
+                f"/api/individuals/{uuid4()}/danger-override",
+                json={"danger_override": 80},
+                headers={"If-Match": '"v1"'}
+            )
+        
+        assert response.status_code == 412
+        update.eq.return_value.eq.assert_called_with("version", 1)
+    
+    def test_danger_override_returns_new_etag(self, client):
+        supabase = MagicMock()
+        supabase.table.return_value.update.return_value.eq.return_value.execute.return_value.data = [
+            {"danger_score": 20, "danger_override": 80, "version": 7}
+        ]
+        
+        with patch('api.individuals.get_supabase_client', return_value=supabase):
+            response = client.put(f"/api/individuals/{uuid4()}/danger-override", json={"danger_override": 80})
+        
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"v7"'
+        assert response.json()["version"] == 7
+
+
+def teardown_module():
+    app.dependency_overrides.clear()
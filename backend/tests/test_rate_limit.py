@@ -0,0 +1,213 @@
+"""
+Tests for OpenAI rate limiting and circuit breaking
+"""
+import asyncio
+import time
+import httpx
+import openai
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from services import rate_limit
+from services.rate_limit import (
+    RateLimiter,
+    CircuitBreaker,
+    ProviderGuard,
+    RateLimitTimeout,
+    CircuitOpenError
+)
+from services.openai_service import OpenAIService
+
+
+def api_error(cls, status, message="error"):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return cls(message, response=httpx.Response(status, request=request), body=None)
+
+
+@pytest.fixture(autouse=True)
+def reset_guards(monkeypatch):
+    """Each test gets fresh process-wide guards"""
+    monkeypatch.setattr(rate_limit, "_guards", {})
+
+
+class TestRateLimiter:
+    
+    @pytest.mark.asyncio
+    async def test_waits_for_refill(self):
+        limiter = RateLimiter(rate=2, per=0.1)
+        await limiter.acquire()
+        await limiter.acquire()
+        start = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - start >= 0.04
+    
+    @pytest.mark.asyncio
+    async def test_deadline_fails_fast(self):
+        limiter = RateLimiter(rate=1, per=60)
+        await limiter.acquire()
+        start = time.monotonic()
+        with pytest.raises(RateLimitTimeout) as exc:
+            await limiter.acquire(deadline=time.monotonic() + 1)
+        assert time.monotonic() - start < 0.1
+        assert exc.value.retry_after > 50
+
+
+class TestCircuitBreaker:
+    
+    def test_opens_after_threshold_then_half_opens(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.before_call()  # Still closed
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        
+        time.sleep(0.06)
+        breaker.before_call()  # Trial call allowed
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # Only one trial at a time
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestProviderGuard:
+    
+    @pytest.mark.asyncio
+    async def test_provider_errors_trip_breaker(self):
+        guard = ProviderGuard(requests_per_minute=100, breaker=CircuitBreaker(failure_threshold=2))
+        call = AsyncMock(side_effect=api_error(openai.RateLimitError, 429))
+        
+        for _ in range(2):
+            with pytest.raises(openai.RateLimitError):
+                await guard.run(call)
+        with pytest.raises(CircuitOpenError):
+            await guard.run(call)
+        assert call.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_bad_requests_do_not_trip_breaker(self):
+        guard = ProviderGuard(requests_per_minute=100, breaker=CircuitBreaker(failure_threshold=1))
+        call = AsyncMock(side_effect=api_error(openai.BadRequestError, 400))
+        
+        for _ in range(3):
+            with pytest.raises(openai.BadRequestError):
+                await guard.run(call)
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_frees_slot(self):
+        guard = ProviderGuard(requests_per_minute=100,
+                              breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.01))
+        with pytest.raises(openai.RateLimitError):
+            await guard.run(AsyncMock(side_effect=api_error(openai.RateLimitError, 429)))
+        await asyncio.sleep(0.02)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        
+        started = asyncio.Event()
+        
+        async def hang():
+            started.set()
+            await asyncio.sleep(60)
+        
+        trial = asyncio.create_task(guard.run(hang))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        
+        # The next call gets the trial slot instead of "trial call in progress"
+        assert await guard.run(AsyncMock(return_value="ok")) == "ok"
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_only_trial_call_frees_trial_slot(self):
+        guard = ProviderGuard(requests_per_minute=100,
+                              breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.01))
+        finish_early, finish_trial = asyncio.Event(), asyncio.Event()
+        
+        async def early_call():
+            # Started while the circuit was closed, fails with a bad request later
+            await finish_early.wait()
+            raise api_error(openai.BadRequestError, 400)
+        
+        async def trial_call():
+            await finish_trial.wait()
+            return "ok"
+        
+        early = asyncio.create_task(guard.run(early_call))
+        await asyncio.sleep(0)
+        with pytest.raises(openai.RateLimitError):
+            await guard.run(AsyncMock(side_effect=api_error(openai.RateLimitError, 429)))
+        await asyncio.sleep(0.02)
+        trial = asyncio.create_task(guard.run(trial_call))
+        await asyncio.sleep(0)
+        
+        finish_early.set()
+        with pytest.raises(openai.BadRequestError):
+            await early
+        # The early call's exit didn't free the running trial's slot
+        with pytest.raises(CircuitOpenError):
+            await guard.run(AsyncMock(return_value="second trial"))
+        
+        finish_trial.set()
+        assert await trial == "ok"
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+    
+    @pytest.mark.asyncio
+    async def test_token_budget(self):
+        guard = ProviderGuard(requests_per_minute=100, tokens_per_minute=1000, max_wait=0.01)
+        call = AsyncMock(return_value="ok")
+        assert await guard.run(call, tokens=900) == "ok"
+        with pytest.raises(RateLimitTimeout):
+            await guard.run(call, tokens=900)
+
+
+class TestOpenAIServiceDegradation:
+    
+    @pytest.fixture
+    def service(self):
+        client = Mock()
+        client.chat.completions.create = AsyncMock()
+        return OpenAIService(client=client, transcription_backend=Mock())
+    
+    @pytest.mark.asyncio
+    async def test_categorize_falls_back_to_rules_when_circuit_open(self, service, monkeypatch):
+        monkeypatch.setenv("FAST_PATH_SKIP_LLM", "false")
+        rate_limit.get_openai_guard("gpt-4o").breaker.opened_at = time.monotonic()
+        categories = [
+            {"name": "height", "type": "number", "is_required": True},
+            {"name": "gender", "type": "text", "is_required": False}
+        ]
+        
+        result = await service.categorize_transcription("He is 6 feet tall", categories)
+        
+        assert result == {"height": 72, "gender": None}
+        service.client.chat.completions.create.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_find_duplicates_returns_partial_results(self, service):
+        response = Mock()
+        response.choices = [Mock(message=Mock(content="90"))]
+        rate_limit.get_openai_guard("gpt-4o").breaker.failure_threshold = 1
+        # Provider answers once, then starts returning 429s
+        service.client.chat.completions.create = AsyncMock(
+            side_effect=[response, api_error(openai.RateLimitError, 429)]
+        )
+        
+        existing = [{"id": str(i), "name": "John", "data": {}} for i in range(1, 4)]
+        matches = await service.find_duplicates({"name": "John"}, existing)
+        
+        assert [m["id"] for m in matches] == ["1"]
+        # Third comparison short-circuited by the open breaker
+        assert service.client.chat.completions.create.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_whisper_rejection_maps_to_value_error(self, service, tmp_path):
+        audio = tmp_path / "a.m4a"
+        audio.write_bytes(b"\x00\x00\x00\x18ftypM4A ")
+        service.transcription_backend.transcribe = AsyncMock(
+            side_effect=api_error(openai.BadRequestError, 400, "Audio file is too short")
+        )
+        
+        with pytest.raises(ValueError, match="at least 10 seconds"):
+            await service.transcribe_audio_file(str(audio))
@@ -0,0 +1,235 @@
+"""
+Tests for the save_individual database function against a real Postgres
+
+Skipped unless TEST_DATABASE_URL points at a disposable Postgres database
+(it creates an `auth.users` stub and a throwaway schema) and psycopg2 is
+installed, e.g.:
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/test pytest tests/test_save_individual_db.py
+"""
+import os
+import json
+import uuid
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from benchmarks.save_individual_benchmark import (
+    apply_schema,
+    legacy_save,
+    rpc_save,
+    rpc_save_batch,
+    CountingConnection
+)
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+DATA = {"name": "Jane Smith", "height": 65, "weight": 140, "skin_color": "Dark"}
+
+
+@pytest.fixture
+def conn():
+    connection = psycopg2.connect(DATABASE_URL, connection_factory=CountingConnection)
+    connection.autocommit = True
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    apply_schema(connection, schema)
+    yield connection
+    with connection.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    connection.close()
+
+
+@pytest.fixture
+def user_id(conn):
+    user = str(uuid.uuid4())
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO auth.users (id) VALUES (%s)", (user,))
+    return user
+
+
+def count(conn, table):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        return cur.fetchone()[0]
+
+
+def fetch_individual(conn, individual_id):
+    with conn.cursor() as cur:
+        cur.execute("SELECT name, data FROM individuals WHERE id = %s", (individual_id,))
+        return cur.fetchone()
+
+
+class TestSaveIndividualFunction:
+    
+    def test_create(self, conn, user_id):
+        result = rpc_save(conn, DATA, user_id, location={"latitude": 37.78, "longitude": -122.41, "address": "Market St"})
+        
+        assert result["individual"]["name"] == "Jane Smith"
+        assert result["individual"]["data"] == DATA
+        assert result["interaction"]["individual_id"] == result["individual"]["id"]
+        assert result["interaction"]["changes"] == DATA
+        assert result["interaction"]["location"]["address"] == "Market St"
+        assert count(conn, "interactions") == 1
+    
+    def test_merge_records_changed_fields_only(self, conn, user_id):
+        created = rpc_save(conn, DATA, user_id)
+        individual_id = created["individual"]["id"]
+        
+        merged = rpc_save(conn, {**DATA, "weight": 145.0, "height": 65.0, "veteran_status": "Yes"}, user_id,
+                          merge_with_id=individual_id)
+        
+        assert merged["individual"]["id"] == individual_id
+        # 65 == 65.0, as in IndividualService.get_changed_fields
+        assert merged["interaction"]["changes"] == {"weight": 145.0, "veteran_status": "Yes"}
+        assert fetch_individual(conn, individual_id)[1]["veteran_status"] == "Yes"
+        assert count(conn, "individuals") == 1
+        assert count(conn, "interactions") == 2
+    
+    def test_merge_not_found(self, conn, user_id):
+        with pytest.raises(psycopg2.Error) as exc:
+            rpc_save(conn, DATA, user_id, merge_with_id=str(uuid.uuid4()))
+        assert exc.value.pgcode == "P0002"
+        assert count(conn, "interactions") == 0
+    
+    def test_merge_with_current_updated_at(self, conn, user_id):
+        created = rpc_save(conn, DATA, user_id)["individual"]
+        
+        merged = rpc_save(conn, {**DATA, "weight": 150}, user_id,
+                          merge_with_id=created["id"], expected_updated_at=created["updated_at"])
+        assert merged["interaction"]["changes"] == {"weight": 150}
+    
+    def test_stale_merge_rejected(self, conn, user_id):
+        """A merge based on an outdated read fails instead of overwriting"""
+        created = rpc_save(conn, DATA, user_id)["individual"]
+        rpc_save(conn, {**DATA, "weight": 150}, user_id, merge_with_id=created["id"])
+        
+        with pytest.raises(psycopg2.Error) as exc:
+            rpc_save(conn, {**DATA, "height": 66}, user_id,
+                     merge_with_id=created["id"], expected_updated_at=created["updated_at"])
+        assert exc.value.pgcode == "40001"
+        assert fetch_individual(conn, created["id"])[1]["weight"] == 150
+        assert count(conn, "interactions") == 2
+    
+    def test_merge_bumps_version_and_snapshots(self, conn, user_id):
+        created = rpc_save(conn, DATA, user_id)["individual"]
+        assert created["version"] == 1
+        
+        merged = rpc_save(conn, {**DATA, "weight": 150}, user_id,
+                          merge_with_id=created["id"], expected_version=1)["individual"]
+        assert merged["version"] == 2
+        
+        with conn.cursor() as cur:
+            cur.execute("SELECT version, data FROM individual_versions WHERE individual_id = %s ORDER BY version",
+                        (created["id"],))
+            assert cur.fetchall() == [(1, DATA), (2, {**DATA, "weight": 150})]
+    
+    def test_old_snapshots_pruned(self, conn, user_id):
+        """Only the last 20 versions are kept for merges"""
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        for weight in range(141, 166):
+            rpc_save(conn, {**DATA, "weight": weight}, user_id, merge_with_id=individual_id)
+        
+        with conn.cursor() as cur:
+            cur.execute("SELECT min(version), max(version), count(*) FROM individual_versions WHERE individual_id = %s",
+                        (individual_id,))
+            assert cur.fetchone() == (7, 26, 20)
+    
+    def test_stale_version_rejected(self, conn, user_id):
+        created = rpc_save(conn, DATA, user_id)["individual"]
+        rpc_save(conn, {**DATA, "weight": 150}, user_id, merge_with_id=created["id"])
+        
+        with pytest.raises(psycopg2.Error) as exc:
+            rpc_save(conn, {**DATA, "height": 66}, user_id, merge_with_id=created["id"], expected_version=1)
+        assert exc.value.pgcode == "40001"
+        assert count(conn, "interactions") == 2
+    
+    def test_failed_interaction_rolls_back_merge(self, conn, user_id):
+        """A failure after the update leaves the individual untouched"""
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        unknown_user = str(uuid.uuid4())  # Violates interactions.user_id foreign key
+        
+        with pytest.raises(psycopg2.IntegrityError):
+            rpc_save(conn, {**DATA, "name": "Renamed"}, unknown_user, merge_with_id=individual_id)
+        
+        assert fetch_individual(conn, individual_id)[0] == "Jane Smith"
+        assert count(conn, "interactions") == 1
+    
+    def test_legacy_path_was_not_atomic(self, conn, user_id):
+        """The previous multi-request flow left the update without an interaction"""
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        
+        with pytest.raises(psycopg2.IntegrityError):
+            legacy_save(conn, {**DATA, "name": "Renamed"}, str(uuid.uuid4()), merge_with_id=individual_id)
+        
+        assert fetch_individual(conn, individual_id)[0] == "Renamed"
+        assert count(conn, "interactions") == 1
+    
+    def test_single_round_trip(self, conn, user_id):
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        
+        conn.round_trips = 0
+        rpc_save(conn, {**DATA, "weight": 150}, user_id, merge_with_id=individual_id)
+        assert conn.round_trips == 1
+        
+        conn.round_trips = 0
+        legacy_save(conn, {**DATA, "weight": 155}, user_id, merge_with_id=individual_id)
+        assert conn.round_trips == 3
+
+
+class TestSaveIndividualsBatchFunction:
+    
+    def test_items_saved_in_order_in_one_round_trip(self, conn, user_id):
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        
+        conn.round_trips = 0
+        results = rpc_save_batch(conn, [
+            {"data": {**DATA, "name": "New Person"}},
+            {"data": {**DATA, "weight": 150}, "merge_with_id": individual_id, "expected_version": 1},
+            {"data": {**DATA, "weight": 150, "height": 64}, "merge_with_id": individual_id, "expected_version": 2},
+        ], user_id)
+        
+        assert conn.round_trips == 1
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert results[0]["interaction"]["changes"] == {**DATA, "name": "New Person"}
+        assert [r["interaction"]["changes"] for r in results[1:]] == [{"weight": 150}, {"height": 64}]
+        assert results[2]["individual"]["version"] == 3
+        assert count(conn, "interactions") == 4
+    
+    def test_deleted_target_not_recreated(self, conn, user_id):
+        individual_id = rpc_save(conn, DATA, user_id)["individual"]["id"]
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM interactions")
+            cur.execute("DELETE FROM individuals")
+        
+        result, saved = rpc_save_batch(conn, [
+            {"data": {**DATA, "weight": 150}, "merge_with_id": individual_id},
+            {"data": DATA},
+        ], user_id)
+        
+        assert result["errcode"] == "P0002" and "individual" not in result
+        assert "individual" in saved
+        assert count(conn, "individuals") == 1
+        assert fetch_individual(conn, individual_id) is None
+    
+    def test_stale_items_rejected_individually(self, conn, user_id):
+        created = rpc_save(conn, DATA, user_id)["individual"]
+        rpc_save(conn, {**DATA, "weight": 150}, user_id, merge_with_id=created["id"])
+        
+        by_version, by_updated_at = rpc_save_batch(conn, [
+            {"data": {**DATA, "height": 66}, "merge_with_id": created["id"], "expected_version": 1},
+            {"data": {**DATA, "height": 67}, "merge_with_id": created["id"],
+             "expected_updated_at": created["updated_at"]},
+        ], user_id)
+        
+        assert by_version["errcode"] == by_updated_at["errcode"] == "40001"
+        assert fetch_individual(conn, created["id"])[1] == {**DATA, "weight": 150}
+        assert count(conn, "interactions") == 2
+    
+    def test_unexpected_error_rolls_back_batch(self, conn, user_id):
+        """Anything but a missing target or stale precondition aborts every item"""
+        with pytest.raises(psycopg2.IntegrityError):
+            rpc_save_batch(conn, [{"data": DATA}, {"data": DATA}], str(uuid.uuid4()))
+        
+        assert count(conn, "individuals") == 0
+        assert count(conn, "interactions") == 0
@@ -0,0 +1,295 @@
+"""
+Tests for structured search filters (filter[<category>]= on GET /api/individuals)
+
+Parsing and the query built from it run with a mocked Supabase client; the
+DB tests (skipped unless TEST_DATABASE_URL is set) check the predicates
+PostgREST generates against the summaries table and its indexes (migration 013).
+"""
+import os
+import re
+import json
+import uuid
+import random
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from postgrest import SyncPostgrestClient
+from postgrest._sync.request_builder import SyncQueryRequestBuilder
+
+from main import app
+from api.auth import get_current_user
+from services.individual_service import IndividualService, JSON_NUMBER_MAX, parse_filters
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+CATEGORY_TYPES = {
+    "veteran_status": "single_select",
+    "height": "number",
+    "substance_abuse_history": "multi_select",
+    "last_shelter_visit": "date",
+    "photo_location": "location",
+    "Housing priority": "number"
+}
+
+app.dependency_overrides[get_current_user] = lambda: "test-user"
+
+
+def fake_supabase(tables):
+    """Supabase mock returning `tables[name]` for any query on that table"""
+    supabase = MagicMock()
+    queries = {}
+
+    def table(name):
+        query = MagicMock()
+        for method in ("select", "ilike", "like", "contains", "eq", "gte", "lte", "order", "range"):
+            getattr(query, method).return_value = query
+        rows = tables.get(name, [])
+        query.execute.return_value = MagicMock(data=rows, count=len(rows))
+        queries.setdefault(name, []).append(query)
+        return query
+
+    supabase.table.side_effect = table
+    supabase.queries = queries
+    return supabase
+
+
+class TestParseFilters:
+
+    def test_no_filters(self):
+        assert parse_filters({"search": "john"}, CATEGORY_TYPES) is None
+
+    def test_exact_values(self):
+        filters = parse_filters({
+            "filter[veteran_status]": "Yes",
+            "filter[substance_abuse_history]": "Mild, Severe",
+            "filter[height]": "72",
+            "filter[last_shelter_visit]": "2025-01-15"
+        }, CATEGORY_TYPES)
+
+        assert filters == {
+            "contains": {"last_shelter_visit": "2025-01-15"},
+            "conditions": [
+                ("data->>veteran_status", "eq", "Yes"),
+                ("data->substance_abuse_history", "contains", ["Mild", "Severe"]),
+                ("data->height", "eq", 72)
+            ]
+        }
+
+    def test_keys_without_path_are_containment(self):
+        filters = parse_filters({"filter[Housing priority]": "3", "filter[Shelter name]": "Next Door"},
+                                {**CATEGORY_TYPES, "Shelter name": "single_select"})
+
+        assert filters == {"contains": {"Housing priority": 3, "Shelter name": "Next Door"}, "conditions": []}
+
+    def test_ranges(self):
+        filters = parse_filters({
+            "filter[height]": "60.5..72",
+            "filter[display_score]": "70..",
+            "filter[danger_score]": "..20"
+        }, CATEGORY_TYPES)
+
+        assert filters["contains"] == {}
+        assert filters["conditions"] == [
+            ("data->height", "gte", 60.5),
+            ("data->height", "lte", 72),
+            ("display_score", "gte", 70),
+            ("danger_score", "lte", 20)
+        ]
+
+    def test_open_number_range_is_bounded(self):
+        filters = parse_filters({"filter[height]": "..30"}, CATEGORY_TYPES)
+
+        # Closed below too, so null and string values (which sort below numbers) don't match
+        assert filters["conditions"] == [
+            ("data->height", "gte", -JSON_NUMBER_MAX),
+            ("data->height", "lte", 30)
+        ]
+
+    @pytest.mark.parametrize("params", [
+        {"filter[unknown]": "x"},
+        {"filter[photo_location]": "x"},
+        {"filter[height]": "tall"},
+        {"filter[height]": ".."},
+        {"filter[display_score]": "high.."},
+        {"filter[Housing priority]": "1..3"}
+    ])
+    def test_invalid(self, params):
+        with pytest.raises(ValueError):
+            parse_filters(params, CATEGORY_TYPES)
+
+
+class TestSearchWithFilters:
+
+    @pytest.mark.asyncio
+    async def test_filters_applied_to_query(self):
+        supabase = fake_supabase({"individual_summaries": []})
+        filters = {
+            "contains": {"last_shelter_visit": "2025-01-15"},
+            "conditions": [
+                ("data->>veteran_status", "eq", "Yes"),
+                ("data->substance_abuse_history", "contains", ["Mild"]),
+                ("display_score", "gte", 70)
+            ]
+        }
+
+        await IndividualService(supabase).search_individuals(filters=filters)
+
+        query = supabase.queries["individual_summaries"][0]
+        query.contains.assert_any_call("data", {"last_shelter_visit": "2025-01-15"})
+        query.contains.assert_any_call("data->substance_abuse_history", '["Mild"]')
+        query.eq.assert_called_once_with("data->>veteran_status", "Yes")
+        query.gte.assert_called_once_with("display_score", 70)
+
+    def test_endpoint(self):
+        supabase = fake_supabase({
+            "categories": [{"name": name, "type": t} for name, t in CATEGORY_TYPES.items()],
+            "resource_versions": [{"version": 1}],
+            "individual_summaries": []
+        })
+        with patch("api.individuals.get_supabase_client", return_value=supabase):
+            response = TestClient(app).get("/api/individuals?filter[veteran_status]=Yes&filter[height]=60..")
+
+        assert response.status_code == 200
+        query = supabase.queries["individual_summaries"][0]
+        query.eq.assert_called_once_with("data->>veteran_status", "Yes")
+        query.gte.assert_called_once_with("data->height", 60)
+
+    def test_endpoint_unknown_category(self):
+        supabase = fake_supabase({"categories": []})
+        with patch("api.individuals.get_supabase_client", return_value=supabase):
+            response = TestClient(app).get("/api/individuals?filter[nope]=1")
+
+        assert response.status_code == 400
+        assert "nope" in response.json()["detail"]
+
+
+# SQL operators of the PostgREST filters search_individuals uses
+POSTGREST_OPERATORS = {"eq": "=", "gte": ">=", "lte": "<=", "cs": "@>"}
+
+
+def postgrest_query(filters):
+    """
+    The WHERE clause PostgREST builds for a filtered search: the request is
+    built by search_individuals with the real postgrest-py client (only the
+    HTTP call is stubbed) and its filter parameters translated as PostgREST
+    does, with the value an untyped literal cast to the column's type
+    """
+    captured = {}
+
+    def execute(builder):
+        captured["params"] = builder.params
+        return MagicMock(data=[], count=0)
+
+    supabase = MagicMock()
+    supabase.table.side_effect = SyncPostgrestClient("http://postgrest").from_
+    with patch.object(SyncQueryRequestBuilder, "execute", execute):
+        asyncio.run(IndividualService(supabase).search_individuals(filters=filters))
+
+    clauses, values = [], []
+    for key, value in captured["params"].multi_items():
+        if key in ("select", "order", "limit", "offset"):
+            continue
+        operator, operand = value.split(".", 1)
+        column = re.sub(r"->(>?)(\w+)$", r"->\1'\2'", key)  # data->>key -> data->>'key'
+        clauses.append(f"{column} {POSTGREST_OPERATORS[operator]} %s")
+        values.append(operand)
+    return " AND ".join(clauses), values
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestFiltersInDatabase:
+
+    @pytest.fixture(scope="class")
+    def conn(self):
+        psycopg2 = pytest.importorskip("psycopg2")
+        from benchmarks.save_individual_benchmark import apply_schema, MIGRATIONS_DIR
+
+        connection = psycopg2.connect(DATABASE_URL)
+        connection.autocommit = True
+        schema = f"test_{uuid.uuid4().hex[:12]}"
+        apply_schema(connection, schema)
+        with connection.cursor() as cur:
+            for migration in ("011_individual_summaries.sql", "012_search_sort_indexes.sql",
+                              "013_search_filters.sql"):
+                with open(os.path.join(MIGRATIONS_DIR, migration)) as f:
+                    cur.execute(f.read())
+
+            rng = random.Random(13)
+            for i in range(4000):
+                data = {
+                    "name": f"Person {i}",
+                    "height": rng.randint(48, 84),
+                    "veteran_status": rng.choice(["Yes", "No", "Unknown"]),
+                    "substance_abuse_history": rng.sample(["None", "Mild", "Moderate", "Severe"], rng.randint(0, 2))
+                }
+                if i % 500 == 0:
+                    data["intake_note"] = "Critical"
+                    data["height"] = 96
+                cur.execute(
+                    "INSERT INTO individuals (name, data, danger_score) VALUES (%s, %s, %s)",
+                    (data["name"], json.dumps(data), rng.randint(0, 100))
+                )
+            # Most recently seen: heights the AI didn't extract, or extracted as text
+            for i, height in enumerate([None, "tall", True] * 5):
+                cur.execute("INSERT INTO individuals (name, data) VALUES (%s, %s)",
+                            (f"Unmeasured {i}", json.dumps({"name": f"Unmeasured {i}", "height": height})))
+            cur.execute("ANALYZE individual_summaries")
+        yield connection
+        with connection.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        connection.close()
+
+    def query(self, conn, params, explain=False):
+        where, values = postgrest_query(parse_filters(params, {
+            "veteran_status": "single_select", "height": "number",
+            "substance_abuse_history": "multi_select", "intake_note": "text"
+        }))
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""{'EXPLAIN ' if explain else ''}SELECT data, display_score FROM individual_summaries
+                    WHERE {where} ORDER BY last_seen DESC, id DESC LIMIT 20""",
+                values
+            )
+            rows = cur.fetchall()
+        return "\n".join(r[0] for r in rows) if explain else rows
+
+    def test_filters_match_python_semantics(self, conn):
+        rows = self.query(conn, {
+            "filter[veteran_status]": "Yes",
+            "filter[substance_abuse_history]": "Mild",
+            "filter[height]": "60..72",
+            "filter[display_score]": "30.."
+        })
+
+        assert rows
+        for data, display_score in rows:
+            assert data["veteran_status"] == "Yes"
+            assert "Mild" in data["substance_abuse_history"]
+            assert 60 <= data["height"] <= 72
+            assert display_score >= 30
+
+    @pytest.mark.parametrize("height", ["..60", "80..", "50..70"])
+    def test_number_ranges_match_numbers_only(self, conn, height):
+        rows = self.query(conn, {"filter[height]": height})
+
+        assert rows
+        assert all(type(data["height"]) is int for data, _ in rows)
+
+    def test_selective_containment_uses_gin_index(self, conn):
+        explained = self.query(conn, {"filter[intake_note]": "Critical"}, explain=True)
+
+        assert "idx_individual_summaries_data" in explained, explained
+
+    def test_high_priority_number_category_is_indexed(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO categories (name, type, priority) VALUES ('height', 'number', 'high')")
+            cur.execute("ANALYZE individual_summaries")
+
+        explained = self.query(conn, {"filter[height]": "90.."}, explain=True)
+
+        assert "idx_individual_summaries_data_height" in explained, explained
+
+
+def teardown_module():
+    app.dependency_overrides.clear()
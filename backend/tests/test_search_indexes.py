@@ -0,0 +1,89 @@
+"""
+EXPLAIN tests for the search sort/prefix indexes (migration 012)
+
+Every sort_by in SORT_COLUMNS, in both directions, and name_prefix= must be
+served by an index scan on individual_summaries without a Sort node.
+Skipped unless TEST_DATABASE_URL is set (see test_save_individual_db.py).
+"""
+import os
+import uuid
+import json
+import random
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from benchmarks.save_individual_benchmark import apply_schema, MIGRATIONS_DIR
+from services.individual_service import SORT_COLUMNS
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+ROWS = 5000
+
+
+@pytest.fixture(scope="module")
+def conn():
+    connection = psycopg2.connect(DATABASE_URL)
+    connection.autocommit = True
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    apply_schema(connection, schema)
+    with connection.cursor() as cur:
+        for migration in ("011_individual_summaries.sql", "012_search_sort_indexes.sql"):
+            with open(os.path.join(MIGRATIONS_DIR, migration)) as f:
+                cur.execute(f.read())
+
+        rng = random.Random(12)
+        names = ["John", "jane", "Maria", "Robert", "sarah", "James", "Chen", "Olu"]
+        for i in range(ROWS):
+            name = f"{rng.choice(names)} {i}"
+            override = rng.choice([None, None, rng.randint(1, 100)])
+            cur.execute(
+                "INSERT INTO individuals (name, data, danger_score, danger_override) VALUES (%s, %s, %s, %s)",
+                (name, json.dumps({"name": name}), rng.randint(0, 100), override)
+            )
+        cur.execute("ANALYZE individual_summaries")
+    yield connection
+    with connection.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    connection.close()
+
+
+def plan(conn, where: str, order_column: str, direction: str) -> str:
+    """EXPLAIN of the query PostgREST runs for one search page"""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""EXPLAIN SELECT id, name, display_score FROM individual_summaries
+                {where}
+                ORDER BY {order_column} {direction}, id {direction}
+                LIMIT 20 OFFSET 40"""
+        )
+        return "\n".join(row[0] for row in cur.fetchall())
+
+
+class TestSearchIndexes:
+
+    @pytest.mark.parametrize("direction", ["ASC", "DESC"])
+    @pytest.mark.parametrize("sort_by", sorted(SORT_COLUMNS))
+    def test_sort_is_index_scan(self, conn, sort_by, direction):
+        explained = plan(conn, "", SORT_COLUMNS[sort_by], direction)
+
+        assert "Index Scan Backward using" in explained if direction == "DESC" else "Index Scan using" in explained
+        assert f"idx_individual_summaries_{SORT_COLUMNS[sort_by]} " in explained, explained
+        assert "Sort" not in explained, explained
+
+    def test_name_prefix_uses_pattern_index(self, conn):
+        explained = plan(conn, "WHERE name_key LIKE 'jane 12%'", "last_seen", "DESC")
+
+        assert "idx_individual_summaries_name_prefix" in explained, explained
+        assert "Seq Scan" not in explained, explained
+
+    def test_display_score_matches_expression(self, conn):
+        with conn.cursor() as cur:
+            cur.execute(
+                """SELECT count(*) FROM individual_summaries s JOIN individuals i USING (id)
+                   WHERE s.display_score <> COALESCE(NULLIF(i.danger_override, 0), i.danger_score)
+                      OR s.name_key <> lower(i.name)"""
+            )
+            assert cur.fetchone()[0] == 0
@@ -0,0 +1,166 @@
+"""
+Tests for ?fields= sparse field selection on individual endpoints
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from main import app
+from api.auth import get_current_user
+from services.individual_service import (
+    IndividualService,
+    parse_fields,
+    _select_columns,
+    DETAIL_FIELDS,
+    SUMMARY_FIELDS
+)
+
+
+def mock_get_current_user():
+    return "test-user-123"
+
+
+app.dependency_overrides[get_current_user] = mock_get_current_user
+
+ROW = {
+    "id": str(uuid4()), "name": "John Doe", "danger_score": 40, "danger_override": None,
+    "created_at": "2024-01-15T10:00:00", "version": 2
+}
+
+
+def fake_supabase(tables):
+    """Supabase mock returning `tables[name]` for any query on that table"""
+    supabase = MagicMock()
+    queries = {}
+    
+    def table(name):
+        query = MagicMock()
+        for method in ("select", "eq", "ilike", "order", "limit", "range"):
+            getattr(query, method).return_value = query
+        rows = tables.get(name, [])
+        query.execute.return_value = MagicMock(data=rows, count=len(rows))
+        queries.setdefault(name, []).append(query)
+        return query
+    
+    supabase.table.side_effect = table
+    supabase.queries = queries
+    return supabase
+
+
+class TestParseFields:
+    
+    def test_all_fields_when_absent(self):
+        assert parse_fields(None, SUMMARY_FIELDS) is None
+        assert parse_fields(" ", SUMMARY_FIELDS) is None
+    
+    def test_order_and_duplicates(self):
+        assert parse_fields("name, display_score,name", SUMMARY_FIELDS) == ["name", "display_score"]
+    
+    def test_unknown_field(self):
+        with pytest.raises(ValueError):
+            parse_fields("name,password", SUMMARY_FIELDS)
+    
+    def test_data_keys(self):
+        assert parse_fields("data.height", DETAIL_FIELDS, allow_data_keys=True) == ["data.height"]
+        with pytest.raises(ValueError):
+            parse_fields("data.height", SUMMARY_FIELDS)
+        with pytest.raises(ValueError):
+            parse_fields("data.x->>y", DETAIL_FIELDS, allow_data_keys=True)
+    
+    def test_select_columns(self):
+        assert _select_columns(["name", "display_score", "data.height", "recent_interactions"]) == \
+            "name, danger_score, danger_override, data__height:data->height"
+
+
+class TestServiceProjection:
+    
+    @pytest.mark.asyncio
+    async def test_detail_fields_skip_interactions(self):
+        supabase = fake_supabase({"individuals": [{"name": "John Doe", "danger_score": 40, "danger_override": 70,
+                                                   "data__height": 72}]})
+        
+        result = await IndividualService(supabase).get_individual_fields(
+            uuid4(), ["name", "display_score", "data.height"]
+        )
+        
+        assert result == {"individual": {"name": "John Doe", "display_score": 70, "data": {"height": 72}}}
+        supabase.queries["individuals"][0].select.assert_called_with(
+            "name, danger_score, danger_override, data__height:data->height"
+        )
+        assert "interactions" not in supabase.queries
+    
+    @pytest.mark.asyncio
+    async def test_zero_override_is_displayed(self):
+        """display_score is COALESCE(danger_override, danger_score), as in the summaries"""
+        supabase = fake_supabase({"individuals": [{"danger_score": 40, "danger_override": 0}]})
+        
+        result = await IndividualService(supabase).get_individual_fields(uuid4(), ["display_score"])
+        
+        assert result == {"individual": {"display_score": 0}}
+    
+    @pytest.mark.asyncio
+    async def test_detail_recent_interactions(self):
+        supabase = fake_supabase({
+            "individuals": [{"name": "John Doe"}],
+            "interactions": [{"id": "i1", "created_at": "2024-01-15T10:00:00", "user_name": "Demo User",
+                              "location": None, "transcription": "text"}]
+        })
+        
+        result = await IndividualService(supabase).get_individual_fields(uuid4(), ["name", "recent_interactions"])
+        
+        assert result["recent_interactions"][0]["has_transcription"] is True
+    
+    @pytest.mark.asyncio
+    async def test_search_fields(self):
+        supabase = fake_supabase({"individual_summaries": [{"name": "John Doe", "display_score": 40}]})
+        
+        result = await IndividualService(supabase).search_individuals(
+            sort_by="danger_score", fields=["name", "display_score"]
+        )
+        
+        assert result == {"individuals": [{"name": "John Doe", "display_score": 40}],
+                          "total": 1, "offset": 0, "limit": 20}
+        supabase.queries["individual_summaries"][0].select.assert_called_with(
+            "name, display_score", count="exact"
+        )
+
+
+class TestEndpoints:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    def test_detail_fields(self, client):
+        supabase = fake_supabase({"individuals": [{"name": "John Doe", "version": 2}]})
+        with patch("api.individuals.get_supabase_client", return_value=supabase):
+            response = client.get(f"/api/individuals/{uuid4()}?fields=name")
+        
+        assert response.status_code == 200
+        assert response.json() == {"individual": {"name": "John Doe"}}
+        assert response.headers["ETag"] == '"v2"'
+    
+    def test_detail_fields_not_found(self, client):
+        with patch("api.individuals.get_supabase_client", return_value=fake_supabase({})):
+            response = client.get(f"/api/individuals/{uuid4()}?fields=name")
+        assert response.status_code == 404
+    
+    def test_unknown_field_rejected(self, client):
+        with patch("api.individuals.get_supabase_client", return_value=fake_supabase({})):
+            assert client.get(f"/api/individuals/{uuid4()}?fields=secret").status_code == 400
+            assert client.get("/api/individuals?fields=data").status_code == 400
+    
+    def test_search_fields(self, client):
+        supabase = fake_supabase({"individual_summaries": [{"id": ROW["id"], "display_score": 40}],
+                                  "resource_versions": [{"version": 1}]})
+        with patch("api.individuals.get_supabase_client", return_value=supabase):
+            response = client.get("/api/individuals?fields=id,display_score&sort_by=name")
+        
+        assert response.status_code == 200
+        assert response.json()["individuals"] == [{"id": ROW["id"], "display_score": 40}]
+        assert "ETag" in response.headers
+
+
+def teardown_module():
+    app.dependency_overrides.clear()
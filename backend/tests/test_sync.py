@@ -0,0 +1,179 @@
+"""
+Tests for GET /api/sync delta sync
+Service/endpoint tests use a mocked Supabase; the database tests run the
+migration 010 functions and are skipped unless TEST_DATABASE_URL is set
+(see test_save_individual_db.py)
+"""
+import os
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from main import app
+from api.auth import get_current_user
+from services.sync_service import SyncService, parse_cursor
+
+
+def mock_get_current_user():
+    return "test-user-123"
+
+
+app.dependency_overrides[get_current_user] = mock_get_current_user
+
+
+def change_row(entity, seq, deleted=False):
+    return {
+        "entity": entity, "entity_id": str(uuid.uuid4()), "deleted": deleted,
+        "txid": 900, "seq": seq, "record": None if deleted else {"name": f"row {seq}"}
+    }
+
+
+def fake_supabase(rows):
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.return_value = MagicMock(data=rows)
+    return supabase
+
+
+class TestCursor:
+    
+    def test_full_sync(self):
+        assert parse_cursor(None) == (0, 0)
+        assert parse_cursor("") == (0, 0)
+    
+    def test_round_trip(self):
+        assert parse_cursor("900.42") == (900, 42)
+    
+    @pytest.mark.parametrize("cursor", ["abc", "1", "1.2.3", "-1.5", "2024-01-01T00:00:00"])
+    def test_invalid(self, cursor):
+        with pytest.raises(ValueError):
+            parse_cursor(cursor)
+
+
+class TestSyncService:
+    
+    @pytest.mark.asyncio
+    async def test_page_and_cursor(self):
+        supabase = fake_supabase([change_row("individual", 1), change_row("interaction", 2),
+                                  change_row("category", 3)])
+        
+        result = await SyncService(supabase).get_changes(since="800.7", limit=2)
+        
+        supabase.rpc.assert_called_once_with("sync_changes_since", {
+            "p_since_txid": 800, "p_since_seq": 7, "p_limit": 3
+        })
+        assert [c.entity for c in result.changes] == ["individual", "interaction"]
+        assert result.cursor == "900.2"
+        assert result.has_more is True
+    
+    @pytest.mark.asyncio
+    async def test_tombstone(self):
+        result = await SyncService(fake_supabase([change_row("individual", 5, deleted=True)])).get_changes()
+        
+        assert result.changes[0].deleted is True
+        assert result.changes[0].record is None
+        assert result.has_more is False
+    
+    @pytest.mark.asyncio
+    async def test_no_changes_keeps_cursor(self):
+        result = await SyncService(fake_supabase([])).get_changes(since="900.5")
+        assert result.changes == []
+        assert result.cursor == "900.5"
+
+
+class TestSyncEndpoint:
+    
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+    
+    def test_sync(self, client):
+        with patch("api.sync.get_supabase_client", return_value=fake_supabase([change_row("individual", 1)])):
+            response = client.get("/api/sync?since=1.0")
+        
+        assert response.status_code == 200
+        assert response.json()["cursor"] == "900.1"
+    
+    def test_invalid_cursor(self, client):
+        with patch("api.sync.get_supabase_client", return_value=fake_supabase([])):
+            response = client.get("/api/sync?since=yesterday")
+        assert response.status_code == 400
+
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestSyncChangesFunction:
+    
+    @pytest.fixture
+    def conn(self):
+        psycopg2 = pytest.importorskip("psycopg2")
+        from benchmarks.save_individual_benchmark import apply_schema, MIGRATIONS_DIR, CountingConnection
+        
+        connection = psycopg2.connect(DATABASE_URL, connection_factory=CountingConnection)
+        connection.autocommit = True
+        schema = f"test_{uuid.uuid4().hex[:12]}"
+        apply_schema(connection, schema)
+        with connection.cursor() as cur, open(os.path.join(MIGRATIONS_DIR, "010_sync_changes.sql")) as f:
+            cur.execute(f.read())
+        yield connection
+        with connection.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+        connection.close()
+    
+    @pytest.fixture
+    def user_id(self, conn):
+        user = str(uuid.uuid4())
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO auth.users (id) VALUES (%s)", (user,))
+        return user
+    
+    def sync(self, conn, since=(0, 0)):
+        with conn.cursor() as cur:
+            cur.execute("SELECT entity, entity_id::text, deleted, txid, seq, record FROM sync_changes_since(%s, %s)",
+                        since)
+            return cur.fetchall()
+    
+    def test_changes_and_tombstones(self, conn, user_id):
+        from benchmarks.save_individual_benchmark import rpc_save
+        created = rpc_save(conn, {"name": "A", "height": 1, "weight": 2, "skin_color": "x"}, user_id)
+        
+        changes = self.sync(conn)
+        assert [c[0] for c in changes] == ["individual", "interaction"]
+        assert changes[0][5]["name"] == "A"
+        cursor = changes[-1][3:5]
+        
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM interactions WHERE id = %s", (created["interaction"]["id"],))
+        
+        changes = self.sync(conn, cursor)
+        assert [(c[0], c[1], c[2], c[5]) for c in changes] == [
+            ("interaction", created["interaction"]["id"], True, None)
+        ]
+    
+    def test_open_transaction_holds_back_later_commits(self, conn, user_id):
+        """A change committed after a later transaction isn't skipped by the cursor"""
+        import psycopg2
+        from benchmarks.save_individual_benchmark import rpc_save
+        
+        with conn.cursor() as cur:
+            cur.execute("SHOW search_path")
+            search_path = cur.fetchone()[0]
+        slow = psycopg2.connect(DATABASE_URL)
+        try:
+            with slow.cursor() as cur:
+                cur.execute(f"SET search_path TO {search_path}")
+                cur.execute("INSERT INTO categories (name, type) VALUES ('Late', 'text')")
+            
+            rpc_save(conn, {"name": "B", "height": 1, "weight": 2, "skin_color": "x"}, user_id)
+            assert self.sync(conn) == []
+            
+            slow.commit()
+            assert [c[0] for c in self.sync(conn)] == ["category", "individual", "interaction"]
+        finally:
+            slow.close()
+
+
+def teardown_module():
+    app.dependency_overrides.clear()
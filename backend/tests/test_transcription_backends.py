@@ -0,0 +1,128 @@
+"""
+Tests for pluggable transcription backends
+"""
+import os
+import sys
+import types
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from services import transcription_backends
+from services.transcription_backends import (
+    get_transcription_backend,
+    WhisperAPIBackend,
+    LocalWhisperBackend,
+    TranscriptionBackend
+)
+from services.openai_service import OpenAIService
+from services.audio_utils import get_m4a_duration
+from benchmarks.transcription_benchmark import word_error_rate
+
+DEMO_AUDIO = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "mobile", "assets", "demo-audio", "john-market-street.m4a"
+)
+
+
+class FakeBackend(TranscriptionBackend):
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    async def transcribe(self, file_path):
+        self.calls.append(file_path)
+        return "Met John near Market Street"
+
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    """Install a stub faster_whisper module and clear the model cache"""
+    segment = Mock()
+    segment.text = " hello world "
+    model = Mock()
+    model.transcribe.return_value = ([segment], Mock())
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = Mock(return_value=model)
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setattr(transcription_backends, "_local_models", {})
+    return module
+
+
+class TestBackendSelection:
+    
+    def test_backend_must_implement_transcribe(self):
+        class Incomplete(TranscriptionBackend):
+            name = "incomplete"
+        
+        with pytest.raises(TypeError):
+            Incomplete()
+        with pytest.raises(TypeError):
+            TranscriptionBackend()
+    
+    def test_default_is_openai(self, monkeypatch):
+        monkeypatch.delenv("TRANSCRIPTION_BACKEND", raising=False)
+        assert isinstance(get_transcription_backend(Mock()), WhisperAPIBackend)
+    
+    def test_local_from_env(self, monkeypatch):
+        monkeypatch.setenv("TRANSCRIPTION_BACKEND", "local")
+        assert isinstance(get_transcription_backend(Mock()), LocalWhisperBackend)
+    
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_transcription_backend(Mock(), "nope")
+
+
+class TestLocalWhisperBackend:
+    
+    @pytest.mark.asyncio
+    async def test_model_loaded_once_per_worker(self, fake_faster_whisper):
+        """Two backend instances share one loaded model"""
+        first = LocalWhisperBackend(model_size="tiny.en")
+        second = LocalWhisperBackend(model_size="tiny.en")
+        
+        assert await first.transcribe("a.m4a") == "hello world"
+        assert await second.transcribe("b.m4a") == "hello world"
+        fake_faster_whisper.WhisperModel.assert_called_once()
+        assert fake_faster_whisper.WhisperModel.call_args.kwargs["device"] == "cpu"
+    
+    @pytest.mark.asyncio
+    async def test_missing_dependency(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "faster_whisper", None)
+        monkeypatch.setattr(transcription_backends, "_local_models", {})
+        with pytest.raises(RuntimeError, match="faster-whisper"):
+            await LocalWhisperBackend().transcribe("a.m4a")
+
+
+class TestOpenAIServiceDelegation:
+    
+    @pytest.mark.asyncio
+    async def test_transcribe_audio_file_uses_backend(self, monkeypatch):
+        monkeypatch.setenv("AUDIO_PREPROCESSING", "false")
+        backend = FakeBackend()
+        service = OpenAIService(client=Mock(), transcription_backend=backend)
+        
+        result = await service.transcribe_audio_file(DEMO_AUDIO)
+        
+        assert result == "Met John near Market Street"
+        assert backend.calls == [DEMO_AUDIO]
+    
+    @pytest.mark.asyncio
+    async def test_whisper_api_backend(self, tmp_path):
+        client = Mock()
+        client.audio.transcriptions.create = AsyncMock(return_value=" text \n")
+        audio = tmp_path / "a.m4a"
+        audio.write_bytes(b"\x00\x00\x00\x18ftypM4A ")
+        
+        assert await WhisperAPIBackend(client).transcribe(str(audio)) == "text"
+        assert client.audio.transcriptions.create.call_args.kwargs["model"] == "whisper-1"
+
+
+class TestBenchmarkHelpers:
+    
+    def test_m4a_duration(self):
+        assert get_m4a_duration(DEMO_AUDIO) == pytest.approx(13.95, abs=0.01)
+    
+    def test_word_error_rate(self):
+        assert word_error_rate("Met John, near Market.", "met john near market") == 0
+        assert word_error_rate("a b c d", "a x c") == 0.5
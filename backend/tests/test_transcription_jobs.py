@@ -0,0 +1,233 @@
+"""
+Tests for the background transcription job queue
+"""
+import os
+import base64
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from main import app
+from api import transcription
+from api.auth import get_current_user
+from api.transcription import TranscribeResponse, get_job_queue
+from services.transcription_jobs import (
+    JobStore,
+    TranscriptionJobQueue,
+    JOB_QUEUED,
+    JOB_PROCESSING,
+    JOB_COMPLETED,
+    JOB_FAILED
+)
+
+
+RESULT = {
+    "transcription": "Met John",
+    "categorized_data": {"Name": "John"},
+    "missing_required": [],
+    "potential_matches": []
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def make_queue(store, handler, **kwargs):
+    return TranscriptionJobQueue(store, handler, backoff_base=0.01, poll_interval=0.01, **kwargs)
+
+
+class TestJobQueue:
+    
+    @pytest.mark.asyncio
+    async def test_job_completes(self, store):
+        async def handler(payload):
+            return {"echo": payload["audio_url"]}
+        
+        queue = make_queue(store, handler)
+        job = await queue.enqueue("user-1", "openai", {"audio_url": "https://x.supabase.co/a.m4a"})
+        assert job["status"] == JOB_QUEUED
+        
+        await queue.run_job(store.claim_next())
+        
+        done = await queue.get(job["id"])
+        assert done["status"] == JOB_COMPLETED
+        assert done["result"] == {"echo": "https://x.supabase.co/a.m4a"}
+        assert done["attempts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_transient_error_retried_with_backoff(self, store):
+        async def handler(payload):
+            raise Exception("429 Too Many Requests")
+        
+        queue = make_queue(store, handler, max_attempts=2)
+        job = await queue.enqueue("user-1", "openai", {})
+        
+        await queue.run_job(store.claim_next())
+        retried = store.get(job["id"])
+        assert retried["status"] == JOB_QUEUED
+        assert retried["next_attempt_at"] > retried["created_at"]
+        
+        await asyncio.sleep(0.05)
+        await queue.run_job(store.claim_next())
+        assert store.get(job["id"])["status"] == JOB_FAILED
+    
+    @pytest.mark.asyncio
+    async def test_bad_input_not_retried(self, store):
+        async def handler(payload):
+            raise ValueError("File is not in M4A format")
+        
+        queue = make_queue(store, handler)
+        job = await queue.enqueue("user-1", "openai", {})
+        await queue.run_job(store.claim_next())
+        
+        failed = store.get(job["id"])
+        assert failed["status"] == JOB_FAILED
+        assert failed["error"] == "File is not in M4A format"
+    
+    def test_backoff_is_exponential_and_capped(self, store):
+        queue = TranscriptionJobQueue(store, None, backoff_base=2, backoff_max=10)
+        assert 1.6 <= queue.retry_delay(1) <= 2.4
+        assert 6.4 <= queue.retry_delay(3) <= 9.6
+        assert queue.retry_delay(10) <= 12
+    
+    @pytest.mark.asyncio
+    async def test_workers_bounded_by_concurrency(self, store):
+        running = 0
+        peak = 0
+        
+        async def handler(payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return {}
+        
+        queue = make_queue(store, handler, concurrency=2)
+        jobs = [await queue.enqueue("user-1", "openai", {}) for _ in range(5)]
+        await queue.start()
+        for _ in range(100):
+            if all(store.get(j["id"])["status"] == JOB_COMPLETED for j in jobs):
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        
+        assert all(store.get(j["id"])["status"] == JOB_COMPLETED for j in jobs)
+        assert peak == 2
+    
+    @pytest.mark.asyncio
+    async def test_audio_kept_as_file_until_done(self, store):
+        async def handler(payload):
+            with open(payload["audio_file"], "rb") as f:
+                return {"size": len(f.read())}
+        
+        queue = make_queue(store, handler)
+        job = await queue.enqueue("user-1", "openai", {}, audio=b"\x00" * 1000)
+        
+        assert os.path.getsize(job["payload"]["audio_file"]) == 1000
+        row = store._conn.execute("SELECT payload FROM transcription_jobs").fetchone()
+        assert len(row["payload"]) < 200
+        
+        await queue.run_job(store.claim_next())
+        assert store.get(job["id"])["result"] == {"size": 1000}
+        assert not os.path.exists(job["payload"]["audio_file"])
+    
+    @pytest.mark.asyncio
+    async def test_worker_survives_store_errors(self, store, monkeypatch):
+        """A job whose result can't be recorded doesn't take its worker down"""
+        async def handler(payload):
+            return {}
+        
+        queue = make_queue(store, handler, concurrency=1)
+        jobs = [await queue.enqueue("user-1", "openai", {}) for _ in range(2)]
+        complete = store.complete
+        calls = []
+        
+        def flaky_complete(job_id, result):
+            calls.append(job_id)
+            if len(calls) == 1:
+                raise Exception("database is locked")
+            complete(job_id, result)
+        
+        monkeypatch.setattr(store, "complete", flaky_complete)
+        await queue.start()
+        for _ in range(100):
+            if len(calls) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        
+        statuses = [store.get(job["id"])["status"] for job in jobs]
+        assert statuses == [JOB_PROCESSING, JOB_COMPLETED]
+    
+    def test_stale_jobs_requeued(self, store):
+        job = store.create("user-1", "openai", {})
+        store.claim_next()
+        assert store.requeue_stale() == 1
+        assert store.get(job["id"])["status"] == JOB_QUEUED
+
+
+class TestJobEndpoints:
+    
+    @pytest.fixture
+    def client(self, store):
+        queue = make_queue(store, transcription.process_transcription_job)
+        app.dependency_overrides[get_job_queue] = lambda: queue
+        app.dependency_overrides[get_current_user] = lambda: "test-user-123"
+        yield TestClient(app), queue
+        app.dependency_overrides.pop(get_job_queue)
+        app.dependency_overrides.pop(get_current_user)
+    
+    def test_create_and_poll_job(self, client):
+        client, queue = client
+        response = client.post(
+            "/api/transcribe/jobs",
+            json={"audio_url": "https://x.supabase.co/a.m4a"}
+        )
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        assert response.json()["status"] == "queued"
+        
+        with patch(
+            "api.transcription.run_transcription",
+            return_value=TranscribeResponse(**RESULT)
+        ), patch("api.transcription.get_openai_service"):
+            asyncio.run(queue.run_job(queue.store.claim_next()))
+        
+        status = client.get(f"/api/transcribe/jobs/{job_id}")
+        assert status.status_code == 200
+        assert status.json()["status"] == "completed"
+        assert status.json()["result"]["categorized_data"] == {"Name": "John"}
+    
+    def test_audio_data_stored_decoded(self, client):
+        client, queue = client
+        audio = b"\x00\x01" * 500
+        response = client.post(
+            "/api/transcribe/jobs",
+            json={"audio_data": "data:audio/m4a;base64," + base64.b64encode(audio).decode()}
+        )
+        assert response.status_code == 202
+        
+        job = queue.store.get(response.json()["id"])
+        assert "audio_data" not in job["payload"]
+        with open(job["payload"]["audio_file"], "rb") as f:
+            assert f.read() == audio
+    
+    def test_invalid_audio_data(self, client):
+        client, _ = client
+        response = client.post("/api/transcribe/jobs", json={"audio_data": "not a data url"})
+        assert response.status_code == 400
+    
+    def test_requires_audio(self, client):
+        client, _ = client
+        response = client.post("/api/transcribe/jobs", json={})
+        assert response.status_code == 400
+    
+    def test_unknown_job(self, client):
+        client, _ = client
+        assert client.get("/api/transcribe/jobs/nope").status_code == 404
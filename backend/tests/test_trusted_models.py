@@ -0,0 +1,90 @@
+"""
+Tests for trusted (unvalidated) construction of DB-sourced response models
+"""
+import pytest
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from api import individuals as individuals_api
+from services import individual_service
+from services.individual_service import db_model
+from db.models import IndividualSummary, SearchIndividualsResponse, IndividualDetailResponse, IndividualResponse
+
+ROW = {
+    "id": str(uuid4()),
+    "name": "John Doe",
+    "danger_score": 40,
+    "danger_override": None,
+    "display_score": 40,
+    "last_seen": "2024-01-15T10:00:00+00:00",
+    "last_location": None
+}
+
+
+def page():
+    return db_model(SearchIndividualsResponse, individuals=[db_model(IndividualSummary, **ROW)],
+                    total=1, offset=0, limit=20)
+
+
+class TestDbModel:
+    
+    def test_constructs_without_validation(self, monkeypatch):
+        monkeypatch.setattr(individual_service, "VALIDATE_DB_MODELS", False)
+        summary = db_model(IndividualSummary, **{**ROW, "danger_score": "not a number"})
+        assert summary.danger_score == "not a number"
+    
+    def test_debug_mode_validates(self, monkeypatch):
+        monkeypatch.setattr(individual_service, "VALIDATE_DB_MODELS", True)
+        with pytest.raises(ValidationError):
+            db_model(IndividualSummary, **{**ROW, "danger_score": "not a number"})
+
+
+class TestTrustedResponse:
+    
+    def test_serializes_constructed_model(self, monkeypatch):
+        monkeypatch.setattr(individual_service, "VALIDATE_DB_MODELS", False)
+        monkeypatch.setattr(individuals_api, "VALIDATE_DB_MODELS", False)
+        
+        response = individuals_api.trusted_response(page())
+        
+        assert isinstance(response, ORJSONResponse)
+        # Same JSON as the validated model, up to the timestamp's UTC spelling
+        validated = SearchIndividualsResponse(individuals=[IndividualSummary(**ROW)], total=1, offset=0, limit=20)
+        expected = validated.model_dump(mode="json")
+        expected["individuals"][0]["last_seen"] = ROW["last_seen"]
+        assert ORJSONResponse(expected).body == response.body
+    
+    def test_debug_mode_returns_model_for_fastapi_validation(self, monkeypatch):
+        monkeypatch.setattr(individuals_api, "VALIDATE_DB_MODELS", True)
+        model = page()
+        assert individuals_api.trusted_response(model) is model
+    
+    def test_plain_values_pass_through(self):
+        assert individuals_api.trusted_response({"individuals": []}) == {"individuals": []}
+    
+    def test_detail_model_sent_as_built(self, monkeypatch):
+        """get_individual doesn't re-validate the model the service built"""
+        from main import app
+        from api.auth import get_current_user
+        
+        monkeypatch.setattr(individuals_api, "VALIDATE_DB_MODELS", False)
+        individual = db_model(IndividualResponse, **{
+            **ROW, "data": {}, "created_at": "2024-01-15T10:00:00", "updated_at": "2024-01-15T10:00:00", "version": 3
+        })
+        detail = db_model(IndividualDetailResponse, individual=individual, recent_interactions=[])
+        
+        app.dependency_overrides[get_current_user] = lambda: "test-user-123"
+        try:
+            with patch("api.individuals.get_supabase_client"), \
+                 patch("api.individuals.IndividualService.get_individual_by_id", AsyncMock(return_value=detail)), \
+                 patch.object(IndividualDetailResponse, "model_validate", side_effect=AssertionError) as validate:
+                response = TestClient(app).get(f"/api/individuals/{ROW['id']}")
+        finally:
+            app.dependency_overrides.pop(get_current_user)
+        
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"v3"'
+        validate.assert_not_called()
@@ -0,0 +1,117 @@
+-- Geospatial index on last-known locations
+-- Radius / bounding-box queries ("who was seen near 6th & Market this week")
+-- run against a per-individual projection of the latest interaction location,
+-- kept current by a trigger and indexed with GiST.
+
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+-- Last-seen projection on individuals
+ALTER TABLE individuals
+    ADD COLUMN IF NOT EXISTS last_seen TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS last_location JSONB,
+    ADD COLUMN IF NOT EXISTS last_position geography(Point, 4326);
+
+CREATE INDEX IF NOT EXISTS idx_individuals_last_position ON individuals USING GIST(last_position);
+CREATE INDEX IF NOT EXISTS idx_individuals_last_seen ON individuals(last_seen);
+CREATE INDEX IF NOT EXISTS idx_interactions_individual_created ON interactions(individual_id, created_at DESC);
+
+-- LocationData JSON ({latitude, longitude, address}) -> geography point
+CREATE OR REPLACE FUNCTION location_to_geography(location JSONB)
+RETURNS geography
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN location ? 'latitude' AND location ? 'longitude' THEN
+            ST_SetSRID(ST_MakePoint(
+                (location->>'longitude')::float8,
+                (location->>'latitude')::float8
+            ), 4326)::geography
+    END
+$$;
+
+-- Advance the projection when a newer interaction is recorded
+CREATE OR REPLACE FUNCTION update_last_known_location()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE individuals
+    SET last_seen = NEW.created_at,
+        last_location = COALESCE(NEW.location, last_location),
+        last_position = COALESCE(location_to_geography(NEW.location), last_position)
+    WHERE id = NEW.individual_id
+      AND (last_seen IS NULL OR last_seen <= NEW.created_at);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS interactions_last_known_location ON interactions;
+CREATE TRIGGER interactions_last_known_location
+    AFTER INSERT ON interactions
+    FOR EACH ROW EXECUTE FUNCTION update_last_known_location();
+
+-- Backfill from existing interactions
+UPDATE individuals i
+SET last_seen = latest.created_at,
+    last_location = latest.location,
+    last_position = location_to_geography(latest.location)
+FROM (
+    SELECT DISTINCT ON (individual_id) individual_id, created_at, location
+    FROM interactions
+    ORDER BY individual_id, created_at DESC
+) latest
+WHERE latest.individual_id = i.id;
+
+-- Individuals whose last-known position is within radius_m metres, nearest first
+CREATE OR REPLACE FUNCTION individuals_within_radius(
+    lat float8,
+    lng float8,
+    radius_m float8,
+    seen_since TIMESTAMP DEFAULT NULL,
+    max_results INTEGER DEFAULT 100
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    danger_score INTEGER,
+    danger_override INTEGER,
+    last_seen TIMESTAMP,
+    last_location JSONB,
+    distance_m float8
+)
+LANGUAGE sql STABLE AS $$
+    SELECT i.id, i.name, i.danger_score, i.danger_override, i.last_seen, i.last_location,
+           ST_Distance(i.last_position, center.geog) AS distance_m
+    FROM individuals i,
+         (SELECT ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography AS geog) center
+    WHERE ST_DWithin(i.last_position, center.geog, radius_m)
+      AND (seen_since IS NULL OR i.last_seen >= seen_since)
+    ORDER BY i.last_position <-> center.geog
+    LIMIT max_results
+$$;
+
+-- Individuals whose last-known position falls inside a bounding box, most recent first
+CREATE OR REPLACE FUNCTION individuals_within_bbox(
+    min_lat float8,
+    min_lng float8,
+    max_lat float8,
+    max_lng float8,
+    seen_since TIMESTAMP DEFAULT NULL,
+    max_results INTEGER DEFAULT 100
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    danger_score INTEGER,
+    danger_override INTEGER,
+    last_seen TIMESTAMP,
+    last_location JSONB,
+    distance_m float8
+)
+LANGUAGE sql STABLE AS $$
+    SELECT i.id, i.name, i.danger_score, i.danger_override, i.last_seen, i.last_location,
+           NULL::float8 AS distance_m
+    FROM individuals i
+    WHERE ST_Intersects(i.last_position, ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)::geography)
+      AND (seen_since IS NULL OR i.last_seen >= seen_since)
+    ORDER BY i.last_seen DESC
+    LIMIT max_results
+$$;
@@ -0,0 +1,45 @@
+-- Server-side map clustering of last-known locations
+-- Aggregates the last-seen projection (migration 004) into a grid of
+-- grid_size x grid_size cells over a tile's bounding box, so the map
+-- receives one row per occupied cell instead of one per individual.
+
+CREATE OR REPLACE FUNCTION location_clusters(
+    min_lat float8,
+    min_lng float8,
+    max_lat float8,
+    max_lng float8,
+    grid_size INTEGER DEFAULT 8
+)
+RETURNS TABLE (
+    cell_x INTEGER,
+    cell_y INTEGER,
+    count BIGINT,
+    latitude float8,
+    longitude float8,
+    max_danger_score INTEGER,
+    individual_id UUID
+)
+LANGUAGE sql STABLE AS $$
+    WITH points AS (
+        SELECT i.id,
+               ST_Y(i.last_position::geometry) AS lat,
+               ST_X(i.last_position::geometry) AS lng,
+               COALESCE(i.danger_override, i.danger_score) AS display_score
+        FROM individuals i
+        WHERE ST_Intersects(i.last_position, ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)::geography)
+    ),
+    cells AS (
+        SELECT p.*,
+               LEAST(grid_size - 1, floor((p.lng - min_lng) / (max_lng - min_lng) * grid_size))::INTEGER AS cx,
+               LEAST(grid_size - 1, floor((max_lat - p.lat) / (max_lat - min_lat) * grid_size))::INTEGER AS cy
+        FROM points p
+    )
+    SELECT cx, cy,
+           COUNT(*) AS count,
+           AVG(lat) AS latitude,
+           AVG(lng) AS longitude,
+           MAX(display_score) AS max_danger_score,
+           CASE WHEN COUNT(*) = 1 THEN (array_agg(id))[1] END AS individual_id
+    FROM cells
+    GROUP BY cx, cy
+$$;
@@ -0,0 +1,74 @@
+-- Atomic save of an individual and its interaction
+-- save_individual() creates or merges the individual and records the
+-- interaction (with only the changed fields) in one transaction and one
+-- round trip, so a failure can't leave an update without its interaction.
+
+-- Columns written by the API that the initial schema didn't declare
+ALTER TABLE interactions
+    ADD COLUMN IF NOT EXISTS user_name TEXT,
+    ADD COLUMN IF NOT EXISTS audio_url TEXT,
+    ADD COLUMN IF NOT EXISTS changes JSONB NOT NULL DEFAULT '{}';
+
+-- Fields in new_data that are new or differ from old_data
+-- (same rules as IndividualService.get_changed_fields)
+CREATE OR REPLACE FUNCTION jsonb_changed_fields(old_data JSONB, new_data JSONB)
+RETURNS JSONB
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT COALESCE(jsonb_object_agg(n.key, n.value), '{}'::jsonb)
+    FROM jsonb_each(new_data) n
+    WHERE NOT (COALESCE(old_data, '{}'::jsonb) ? n.key)
+       OR old_data -> n.key IS DISTINCT FROM n.value
+$$;
+
+CREATE OR REPLACE FUNCTION save_individual(
+    p_name TEXT,
+    p_data JSONB,
+    p_danger_score INTEGER,
+    p_user_id UUID,
+    p_user_name TEXT,
+    p_merge_with_id UUID DEFAULT NULL,
+    p_location JSONB DEFAULT NULL,
+    p_transcription TEXT DEFAULT NULL,
+    p_audio_url TEXT DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_individual individuals%ROWTYPE;
+    v_interaction interactions%ROWTYPE;
+    v_changes JSONB;
+BEGIN
+    IF p_merge_with_id IS NOT NULL THEN
+        -- Lock the row so concurrent merges compute changes against committed data
+        SELECT * INTO v_individual FROM individuals WHERE id = p_merge_with_id FOR UPDATE;
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Individual not found: %', p_merge_with_id USING ERRCODE = 'P0002';
+        END IF;
+
+        v_changes := jsonb_changed_fields(v_individual.data, p_data);
+
+        UPDATE individuals
+        SET name = p_name,
+            danger_score = p_danger_score,
+            data = p_data,
+            updated_at = NOW()
+        WHERE id = p_merge_with_id
+        RETURNING * INTO v_individual;
+    ELSE
+        INSERT INTO individuals (name, danger_score, data)
+        VALUES (p_name, p_danger_score, p_data)
+        RETURNING * INTO v_individual;
+
+        v_changes := p_data;  -- All data for first interaction
+    END IF;
+
+    INSERT INTO interactions (individual_id, user_id, user_name, transcription, audio_url, location, changes)
+    VALUES (v_individual.id, p_user_id, p_user_name, p_transcription, p_audio_url, p_location, v_changes)
+    RETURNING * INTO v_interaction;
+
+    RETURN jsonb_build_object(
+        'individual', to_jsonb(v_individual) - 'last_position',
+        'interaction', to_jsonb(v_interaction)
+    );
+END;
+$$;
@@ -0,0 +1,65 @@
+-- Conditional merge in save_individual
+-- The merge is a single UPDATE guarded by the caller's last-seen updated_at
+-- (lost-update protection). Only when it matches no row do we look again, to
+-- tell "not found" (P0002) from "changed since you read it" (40001).
+
+DROP FUNCTION IF EXISTS save_individual(TEXT, JSONB, INTEGER, UUID, TEXT, UUID, JSONB, TEXT, TEXT);
+
+CREATE OR REPLACE FUNCTION save_individual(
+    p_name TEXT,
+    p_data JSONB,
+    p_danger_score INTEGER,
+    p_user_id UUID,
+    p_user_name TEXT,
+    p_merge_with_id UUID DEFAULT NULL,
+    p_location JSONB DEFAULT NULL,
+    p_transcription TEXT DEFAULT NULL,
+    p_audio_url TEXT DEFAULT NULL,
+    p_expected_updated_at TIMESTAMP DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_individual JSONB;
+    v_interaction interactions%ROWTYPE;
+    v_changes JSONB;
+BEGIN
+    IF p_merge_with_id IS NOT NULL THEN
+        UPDATE individuals i
+        SET name = p_name,
+            danger_score = p_danger_score,
+            data = p_data,
+            updated_at = NOW()
+        FROM (
+            SELECT id, data FROM individuals WHERE id = p_merge_with_id FOR UPDATE
+        ) old
+        WHERE i.id = old.id
+          AND (p_expected_updated_at IS NULL OR i.updated_at = p_expected_updated_at)
+        RETURNING to_jsonb(i) - 'last_position', jsonb_changed_fields(old.data, p_data)
+        INTO v_individual, v_changes;
+
+        IF NOT FOUND THEN
+            IF EXISTS (SELECT 1 FROM individuals WHERE id = p_merge_with_id) THEN
+                RAISE EXCEPTION 'Individual % was modified by another update', p_merge_with_id
+                    USING ERRCODE = '40001';
+            END IF;
+            RAISE EXCEPTION 'Individual not found: %', p_merge_with_id USING ERRCODE = 'P0002';
+        END IF;
+    ELSE
+        INSERT INTO individuals AS i (name, danger_score, data)
+        VALUES (p_name, p_danger_score, p_data)
+        RETURNING to_jsonb(i) - 'last_position' INTO v_individual;
+
+        v_changes := p_data;  -- All data for first interaction
+    END IF;
+
+    INSERT INTO interactions (individual_id, user_id, user_name, transcription, audio_url, location, changes)
+    VALUES ((v_individual->>'id')::UUID, p_user_id, p_user_name, p_transcription, p_audio_url, p_location, v_changes)
+    RETURNING * INTO v_interaction;
+
+    RETURN jsonb_build_object(
+        'individual', v_individual,
+        'interaction', to_jsonb(v_interaction)
+    );
+END;
+$$;
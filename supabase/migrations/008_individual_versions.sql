@@ -0,0 +1,115 @@
+-- Optimistic concurrency control for individuals
+-- Every change to an individual's profile bumps `version` (exposed as the
+-- ETag) and snapshots the resulting data in individual_versions, so a merge
+-- made against an older version can be field-level merged with the changes
+-- that happened since (see IndividualService.save_individual).
+
+ALTER TABLE individuals ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+CREATE TABLE IF NOT EXISTS individual_versions (
+    individual_id UUID NOT NULL REFERENCES individuals(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    data JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (individual_id, version)
+);
+
+INSERT INTO individual_versions (individual_id, version, data)
+SELECT id, version, data FROM individuals
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_individual_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION record_individual_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO individual_versions (individual_id, version, data)
+    VALUES (NEW.id, NEW.version, NEW.data)
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$;
+
+-- Only profile columns count as a new version; the last-seen projection
+-- (migration 004) is maintained separately and doesn't invalidate ETags
+DROP TRIGGER IF EXISTS individuals_bump_version ON individuals;
+CREATE TRIGGER individuals_bump_version
+    BEFORE UPDATE OF name, data, danger_score, danger_override ON individuals
+    FOR EACH ROW EXECUTE FUNCTION bump_individual_version();
+
+DROP TRIGGER IF EXISTS individuals_record_version ON individuals;
+CREATE TRIGGER individuals_record_version
+    AFTER INSERT OR UPDATE OF name, data, danger_score, danger_override ON individuals
+    FOR EACH ROW EXECUTE FUNCTION record_individual_version();
+
+-- save_individual gains a version precondition for merges
+DROP FUNCTION IF EXISTS save_individual(TEXT, JSONB, INTEGER, UUID, TEXT, UUID, JSONB, TEXT, TEXT, TIMESTAMP);
+
+CREATE OR REPLACE FUNCTION save_individual(
+    p_name TEXT,
+    p_data JSONB,
+    p_danger_score INTEGER,
+    p_user_id UUID,
+    p_user_name TEXT,
+    p_merge_with_id UUID DEFAULT NULL,
+    p_location JSONB DEFAULT NULL,
+    p_transcription TEXT DEFAULT NULL,
+    p_audio_url TEXT DEFAULT NULL,
+    p_expected_updated_at TIMESTAMP DEFAULT NULL,
+    p_expected_version INTEGER DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_individual JSONB;
+    v_interaction interactions%ROWTYPE;
+    v_changes JSONB;
+BEGIN
+    IF p_merge_with_id IS NOT NULL THEN
+        UPDATE individuals i
+        SET name = p_name,
+            danger_score = p_danger_score,
+            data = p_data,
+            updated_at = NOW()
+        FROM (
+            SELECT id, data FROM individuals WHERE id = p_merge_with_id FOR UPDATE
+        ) old
+        WHERE i.id = old.id
+          AND (p_expected_updated_at IS NULL OR i.updated_at = p_expected_updated_at)
+          AND (p_expected_version IS NULL OR i.version = p_expected_version)
+        RETURNING to_jsonb(i) - 'last_position', jsonb_changed_fields(old.data, p_data)
+        INTO v_individual, v_changes;
+
+        IF NOT FOUND THEN
+            IF EXISTS (SELECT 1 FROM individuals WHERE id = p_merge_with_id) THEN
+                RAISE EXCEPTION 'Individual % was modified by another update', p_merge_with_id
+                    USING ERRCODE = '40001';
+            END IF;
+            RAISE EXCEPTION 'Individual not found: %', p_merge_with_id USING ERRCODE = 'P0002';
+        END IF;
+    ELSE
+        INSERT INTO individuals AS i (name, danger_score, data)
+        VALUES (p_name, p_danger_score, p_data)
+        RETURNING to_jsonb(i) - 'last_position' INTO v_individual;
+
+        v_changes := p_data;  -- All data for first interaction
+    END IF;
+
+    INSERT INTO interactions (individual_id, user_id, user_name, transcription, audio_url, location, changes)
+    VALUES ((v_individual->>'id')::UUID, p_user_id, p_user_name, p_transcription, p_audio_url, p_location, v_changes)
+    RETURNING * INTO v_interaction;
+
+    RETURN jsonb_build_object(
+        'individual', v_individual,
+        'interaction', to_jsonb(v_interaction)
+    );
+END;
+$$;
@@ -0,0 +1,41 @@
+-- Change counters for HTTP conditional GETs
+-- Every write to a resource's tables bumps its counter (once per statement),
+-- so the API can answer If-None-Match with a single primary-key lookup instead
+-- of re-running the list query. "individuals" covers search results, which
+-- also depend on interactions (last seen / last location).
+
+CREATE TABLE IF NOT EXISTS resource_versions (
+    resource TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO resource_versions (resource) VALUES ('categories'), ('individuals')
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_resource_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE resource_versions
+    SET version = version + 1,
+        updated_at = NOW()
+    WHERE resource = TG_ARGV[0];
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS categories_bump_resource_version ON categories;
+CREATE TRIGGER categories_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('categories');
+
+DROP TRIGGER IF EXISTS individuals_bump_resource_version ON individuals;
+CREATE TRIGGER individuals_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON individuals
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('individuals');
+
+DROP TRIGGER IF EXISTS interactions_bump_resource_version ON interactions;
+CREATE TRIGGER interactions_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON interactions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('individuals');
@@ -0,0 +1,98 @@
+-- Delta sync for the mobile app's offline replica (GET /api/sync)
+-- Row triggers record the latest change to every individual, interaction and
+-- category in sync_changes (one row per entity, so it stays as small as the
+-- data; deletes leave a tombstone). A client's cursor is a position in
+-- (txid, seq) order.
+--
+-- updated_at/created_at can't be the cursor: NOW() is the transaction start
+-- time, so a transaction that commits late can land behind a cursor a client
+-- has already passed. Instead sync_changes() only serves changes from
+-- transactions older than every transaction still running
+-- (pg_snapshot_xmin); anything committed later has a higher txid and sorts
+-- after the cursor.
+
+CREATE TABLE IF NOT EXISTS sync_changes (
+    entity TEXT NOT NULL,        -- 'individual' | 'interaction' | 'category'
+    entity_id UUID NOT NULL,
+    deleted BOOLEAN NOT NULL DEFAULT false,
+    txid xid8 NOT NULL DEFAULT pg_current_xact_id(),
+    seq BIGSERIAL,
+    PRIMARY KEY (entity, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_changes_cursor ON sync_changes (txid, seq);
+
+CREATE OR REPLACE FUNCTION record_sync_change()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_id UUID := CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END;
+BEGIN
+    INSERT INTO sync_changes (entity, entity_id, deleted)
+    VALUES (TG_ARGV[0], v_id, TG_OP = 'DELETE')
+    ON CONFLICT (entity, entity_id) DO UPDATE
+    SET deleted = EXCLUDED.deleted,
+        txid = pg_current_xact_id(),
+        seq = nextval(pg_get_serial_sequence('sync_changes', 'seq'));
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS individuals_sync_change ON individuals;
+CREATE TRIGGER individuals_sync_change
+    AFTER INSERT OR UPDATE OR DELETE ON individuals
+    FOR EACH ROW EXECUTE FUNCTION record_sync_change('individual');
+
+DROP TRIGGER IF EXISTS interactions_sync_change ON interactions;
+CREATE TRIGGER interactions_sync_change
+    AFTER INSERT OR UPDATE OR DELETE ON interactions
+    FOR EACH ROW EXECUTE FUNCTION record_sync_change('interaction');
+
+DROP TRIGGER IF EXISTS categories_sync_change ON categories;
+CREATE TRIGGER categories_sync_change
+    AFTER INSERT OR UPDATE OR DELETE ON categories
+    FOR EACH ROW EXECUTE FUNCTION record_sync_change('category');
+
+-- Existing rows are part of every client's first (full) sync
+INSERT INTO sync_changes (entity, entity_id)
+SELECT 'category', id FROM categories
+UNION ALL SELECT 'individual', id FROM individuals
+UNION ALL SELECT 'interaction', id FROM interactions
+ON CONFLICT DO NOTHING;
+
+-- One page of changes after (p_since_txid, p_since_seq), oldest first, with
+-- each entity's current row (NULL for tombstones)
+CREATE OR REPLACE FUNCTION sync_changes_since(
+    p_since_txid BIGINT DEFAULT 0,
+    p_since_seq BIGINT DEFAULT 0,
+    p_limit INTEGER DEFAULT 500
+)
+RETURNS TABLE (
+    entity TEXT,
+    entity_id UUID,
+    deleted BOOLEAN,
+    txid BIGINT,
+    seq BIGINT,
+    record JSONB
+)
+LANGUAGE sql STABLE AS $$
+    SELECT c.entity,
+           c.entity_id,
+           c.deleted,
+           c.txid::text::bigint,
+           c.seq,
+           CASE
+               WHEN c.deleted THEN NULL
+               WHEN c.entity = 'individual' THEN
+                   (SELECT to_jsonb(i) - 'last_position' FROM individuals i WHERE i.id = c.entity_id)
+               WHEN c.entity = 'interaction' THEN
+                   (SELECT to_jsonb(x) FROM interactions x WHERE x.id = c.entity_id)
+               ELSE
+                   (SELECT to_jsonb(g) FROM categories g WHERE g.id = c.entity_id)
+           END
+    FROM sync_changes c
+    WHERE (c.txid, c.seq) > (p_since_txid::text::xid8, p_since_seq)
+      AND c.txid < pg_snapshot_xmin(pg_current_snapshot())
+    ORDER BY c.txid, c.seq
+    LIMIT p_limit
+$$;
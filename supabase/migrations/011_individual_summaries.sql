@@ -0,0 +1,201 @@
+-- Materialized list-view projection for GET /api/individuals
+-- individual_summaries holds exactly what IndividualSummary shows (name,
+-- scores, last seen, last location with abbreviated address), kept current by
+-- triggers on individuals and interactions, so listing/searching is a single
+-- indexed, paginated read instead of a per-individual interactions query and
+-- address abbreviation on every request.
+
+-- SQL port of services/individual_service._abbreviate_address (keep in sync;
+-- tests/test_individual_summaries.py compares the two on random addresses)
+CREATE OR REPLACE FUNCTION abbreviate_address(full_address TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql IMMUTABLE AS $$
+DECLARE
+    v_run TEXT;
+    v_words TEXT[];
+    v_separators TEXT[];
+    v_suffix TEXT;
+    v_last INTEGER;
+    v_first INTEGER;
+    v_street TEXT;
+    v_part TEXT;
+BEGIN
+    IF full_address IS NULL OR full_address = '' THEN
+        RETURN full_address;
+    END IF;
+
+    -- Strategy 1: Already has cross-street format
+    IF position(' & ' IN full_address) > 0 THEN
+        RETURN regexp_replace(replace(split_part(full_address, ',', 1), ' Street', ''), '^\s+|\s+$', '', 'g');
+    END IF;
+
+    -- Strategy 2: Extract main street - in the first run of whitespace-separated
+    -- words with a street suffix after its first word, everything up to the
+    -- last such suffix, skipping a leading house number
+    FOR v_run IN SELECT m[1] FROM regexp_matches(full_address, '(\w+(?:\s+\w+)*)', 'g') AS m LOOP
+        v_words := regexp_split_to_array(v_run, '\s+');
+        v_last := NULL;
+        FOR i IN REVERSE coalesce(array_length(v_words, 1), 0) .. 2 LOOP
+            v_suffix := substring(v_words[i] FROM '^(Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Way|Place|Pl)');
+            IF v_suffix IS NOT NULL THEN
+                v_last := i;
+                EXIT;
+            END IF;
+        END LOOP;
+        CONTINUE WHEN v_last IS NULL;
+
+        v_separators := ARRAY(SELECT s[1] FROM regexp_matches(v_run, '(\s+)', 'g') AS s);
+        v_first := CASE WHEN v_last >= 3 AND v_words[1] ~ '^\d+$' THEN 2 ELSE 1 END;
+        v_street := '';
+        FOR i IN v_first .. v_last - 1 LOOP
+            v_street := v_street || v_words[i] || v_separators[i];
+        END LOOP;
+        RETURN v_street || v_suffix;
+    END LOOP;
+
+    -- Strategy 3: First significant part (before comma)
+    v_part := split_part(full_address, ',', 1);
+    IF v_part <> '' AND length(v_part) <= 30 THEN
+        RETURN regexp_replace(v_part, '^\s+|\s+$', '', 'g');
+    END IF;
+
+    -- Strategy 4: Truncate
+    RETURN regexp_replace(left(full_address, 30), '^\s+|\s+$', '', 'g') || '...';
+END;
+$$;
+
+-- Interaction location as shown in lists: address abbreviated
+CREATE OR REPLACE FUNCTION summary_location(location JSONB)
+RETURNS JSONB
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN location IS NULL OR jsonb_typeof(location) <> 'object' THEN NULL
+        WHEN coalesce(location->>'address', '') = '' THEN location
+        ELSE jsonb_set(location, '{address}', to_jsonb(abbreviate_address(location->>'address')))
+    END
+$$;
+
+CREATE TABLE IF NOT EXISTS individual_summaries (
+    id UUID PRIMARY KEY REFERENCES individuals(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    danger_score INTEGER NOT NULL DEFAULT 0,
+    danger_override INTEGER,
+    display_score INTEGER NOT NULL DEFAULT 0,
+    last_seen TIMESTAMP NOT NULL,  -- Latest interaction, else when created
+    last_location JSONB,           -- Latest interaction's location
+    has_interactions BOOLEAN NOT NULL DEFAULT false,
+    search_text TEXT NOT NULL DEFAULT ''  -- lower(name + data) for ?search=
+);
+
+CREATE INDEX IF NOT EXISTS idx_individual_summaries_last_seen ON individual_summaries(last_seen, id);
+CREATE INDEX IF NOT EXISTS idx_individual_summaries_danger_score ON individual_summaries(danger_score, id);
+CREATE INDEX IF NOT EXISTS idx_individual_summaries_name ON individual_summaries(name, id);
+
+-- Substring search index where pg_trgm is available (it is on Supabase)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS idx_individual_summaries_search
+            ON individual_summaries USING GIN (search_text gin_trgm_ops);
+    END IF;
+END;
+$$;
+
+-- Rebuild one individual's summary from scratch (backfill, interaction edits/deletes)
+CREATE OR REPLACE FUNCTION refresh_individual_summary(p_individual_id UUID)
+RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO individual_summaries AS s (
+        id, name, danger_score, danger_override, display_score,
+        last_seen, last_location, has_interactions, search_text
+    )
+    SELECT i.id,
+           i.name,
+           coalesce(i.danger_score, 0),
+           i.danger_override,
+           -- Same as the API's `danger_override or danger_score`
+           coalesce(nullif(i.danger_override, 0), i.danger_score, 0),
+           coalesce(latest.created_at, i.created_at, NOW()),
+           summary_location(latest.location),
+           latest.created_at IS NOT NULL,
+           lower(i.name || ' ' || i.data::text)
+    FROM individuals i
+    LEFT JOIN LATERAL (
+        SELECT x.created_at, x.location
+        FROM interactions x
+        WHERE x.individual_id = i.id
+        ORDER BY x.created_at DESC
+        LIMIT 1
+    ) latest ON true
+    WHERE i.id = p_individual_id
+    ON CONFLICT (id) DO UPDATE
+    SET name = EXCLUDED.name,
+        danger_score = EXCLUDED.danger_score,
+        danger_override = EXCLUDED.danger_override,
+        display_score = EXCLUDED.display_score,
+        last_seen = EXCLUDED.last_seen,
+        last_location = EXCLUDED.last_location,
+        has_interactions = EXCLUDED.has_interactions,
+        search_text = EXCLUDED.search_text;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_summary_from_individual()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO individual_summaries (
+        id, name, danger_score, danger_override, display_score, last_seen, search_text
+    )
+    VALUES (
+        NEW.id,
+        NEW.name,
+        coalesce(NEW.danger_score, 0),
+        NEW.danger_override,
+        coalesce(nullif(NEW.danger_override, 0), NEW.danger_score, 0),
+        coalesce(NEW.created_at, NOW()),
+        lower(NEW.name || ' ' || NEW.data::text)
+    )
+    ON CONFLICT (id) DO UPDATE
+    SET name = EXCLUDED.name,
+        danger_score = EXCLUDED.danger_score,
+        danger_override = EXCLUDED.danger_override,
+        display_score = EXCLUDED.display_score,
+        search_text = EXCLUDED.search_text;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_summary_from_interaction()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE individual_summaries
+        SET last_seen = NEW.created_at,
+            last_location = summary_location(NEW.location),
+            has_interactions = true
+        WHERE id = NEW.individual_id
+          AND (NOT has_interactions OR last_seen <= NEW.created_at);
+    ELSE
+        PERFORM refresh_individual_summary(OLD.individual_id);
+        IF TG_OP = 'UPDATE' AND NEW.individual_id IS DISTINCT FROM OLD.individual_id THEN
+            PERFORM refresh_individual_summary(NEW.individual_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS individuals_sync_summary ON individuals;
+CREATE TRIGGER individuals_sync_summary
+    AFTER INSERT OR UPDATE OF name, data, danger_score, danger_override ON individuals
+    FOR EACH ROW EXECUTE FUNCTION sync_summary_from_individual();
+
+DROP TRIGGER IF EXISTS interactions_sync_summary ON interactions;
+CREATE TRIGGER interactions_sync_summary
+    AFTER INSERT OR UPDATE OF individual_id, location, created_at OR DELETE ON interactions
+    FOR EACH ROW EXECUTE FUNCTION sync_summary_from_interaction();
+
+-- Backfill
+SELECT refresh_individual_summary(id) FROM individuals;
@@ -0,0 +1,29 @@
+-- Index-backed sort orders and name-prefix search for GET /api/individuals
+-- Every supported sort_by is served by an index scan on individual_summaries
+-- in both directions, with id as the tiebreaker, so a page is read in index
+-- order and the LIMIT stops early instead of sorting every row:
+--   last_seen     -> idx_individual_summaries_last_seen (011)
+--   danger_score  -> idx_individual_summaries_danger_score (011)
+--   display_score -> COALESCE(danger_override, danger_score), materialized as
+--                    display_score
+--   name          -> lower(name), materialized as name_key (case-insensitive)
+-- PostgREST can only order and filter by columns, so the expressions are
+-- stored columns rather than expression indexes on individuals.
+
+ALTER TABLE individual_summaries
+    ADD COLUMN IF NOT EXISTS name_key TEXT GENERATED ALWAYS AS (lower(name)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_individual_summaries_display_score
+    ON individual_summaries(display_score, id);
+CREATE INDEX IF NOT EXISTS idx_individual_summaries_name_key
+    ON individual_summaries(name_key, id);
+
+-- LIKE 'prefix%' on name_key (name_prefix=); text_pattern_ops because the
+-- default collation's ordering can't serve prefix matches
+CREATE INDEX IF NOT EXISTS idx_individual_summaries_name_prefix
+    ON individual_summaries(name_key text_pattern_ops);
+
+-- Name sort is now on name_key
+DROP INDEX IF EXISTS idx_individual_summaries_name;
+
+ANALYZE individual_summaries;
@@ -0,0 +1,128 @@
+-- Structured category filters for GET /api/individuals (filter[<category>]=)
+-- Search reads individual_summaries (011), so the individual's data is carried
+-- there too, with the same kind of GIN index as idx_individuals_data:
+--   data @> '{"veteran_status": "Yes"}'                        (single_select, text)
+--   data @> '{"substance_abuse_history": ["Mild", "Severe"]}'   (multi_select)
+--   data->'height' >= '70'                                     (number ranges)
+-- jsonb_path_ops: smaller and faster than the default opclass, and
+-- containment is the only operator the filters use on it.
+--
+-- Range predicates need a btree on the key's expression. Those are created
+-- automatically for high-priority number categories (ensure_category_index).
+
+ALTER TABLE individual_summaries ADD COLUMN IF NOT EXISTS data JSONB NOT NULL DEFAULT '{}';
+
+UPDATE individual_summaries s SET data = i.data FROM individuals i WHERE i.id = s.id;
+
+CREATE INDEX IF NOT EXISTS idx_individual_summaries_data
+    ON individual_summaries USING GIN (data jsonb_path_ops);
+
+-- 011's maintenance functions, now also copying data
+CREATE OR REPLACE FUNCTION refresh_individual_summary(p_individual_id UUID)
+RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO individual_summaries AS s (
+        id, name, danger_score, danger_override, display_score,
+        last_seen, last_location, has_interactions, search_text, data
+    )
+    SELECT i.id,
+           i.name,
+           coalesce(i.danger_score, 0),
+           i.danger_override,
+           -- Same as the API's `danger_override or danger_score`
+           coalesce(nullif(i.danger_override, 0), i.danger_score, 0),
+           coalesce(latest.created_at, i.created_at, NOW()),
+           summary_location(latest.location),
+           latest.created_at IS NOT NULL,
+           lower(i.name || ' ' || i.data::text),
+           i.data
+    FROM individuals i
+    LEFT JOIN LATERAL (
+        SELECT x.created_at, x.location
+        FROM interactions x
+        WHERE x.individual_id = i.id
+        ORDER BY x.created_at DESC
+        LIMIT 1
+    ) latest ON true
+    WHERE i.id = p_individual_id
+    ON CONFLICT (id) DO UPDATE
+    SET name = EXCLUDED.name,
+        danger_score = EXCLUDED.danger_score,
+        danger_override = EXCLUDED.danger_override,
+        display_score = EXCLUDED.display_score,
+        last_seen = EXCLUDED.last_seen,
+        last_location = EXCLUDED.last_location,
+        has_interactions = EXCLUDED.has_interactions,
+        search_text = EXCLUDED.search_text,
+        data = EXCLUDED.data;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_summary_from_individual()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO individual_summaries (
+        id, name, danger_score, danger_override, display_score, last_seen, search_text, data
+    )
+    VALUES (
+        NEW.id,
+        NEW.name,
+        coalesce(NEW.danger_score, 0),
+        NEW.danger_override,
+        coalesce(nullif(NEW.danger_override, 0), NEW.danger_score, 0),
+        coalesce(NEW.created_at, NOW()),
+        lower(NEW.name || ' ' || NEW.data::text),
+        NEW.data
+    )
+    ON CONFLICT (id) DO UPDATE
+    SET name = EXCLUDED.name,
+        danger_score = EXCLUDED.danger_score,
+        danger_override = EXCLUDED.danger_override,
+        display_score = EXCLUDED.display_score,
+        search_text = EXCLUDED.search_text,
+        data = EXCLUDED.data;
+    RETURN NULL;
+END;
+$$;
+
+-- Btree on data->'<category>' so range filters on it are index scans.
+-- Only for keys that can appear in a PostgREST filter path (letters, digits,
+-- underscores); returns the index name, or NULL if not applicable.
+CREATE OR REPLACE FUNCTION ensure_category_index(p_category_name TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_index TEXT := left('idx_individual_summaries_data_' || lower(p_category_name), 63);
+BEGIN
+    IF p_category_name !~ '^[A-Za-z0-9_]+$' THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS %I ON individual_summaries ((data->%L))',
+        v_index, p_category_name
+    );
+    RETURN v_index;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION index_high_priority_category()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.priority = 'high' AND NEW.type = 'number' THEN
+        PERFORM ensure_category_index(NEW.name);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS categories_index_high_priority ON categories;
+CREATE TRIGGER categories_index_high_priority
+    AFTER INSERT OR UPDATE OF name, type, priority ON categories
+    FOR EACH ROW EXECUTE FUNCTION index_high_priority_category();
+
+SELECT ensure_category_index(name)
+FROM categories
+WHERE priority = 'high' AND type = 'number';
+
+ANALYZE individual_summaries;
@@ -0,0 +1,119 @@
+-- Managed per-category indexes on individual_summaries.data
+-- category_indexes is the registry of indexes provisioned for categories
+-- (POST /api/categories registers one, a background task builds it, GET
+-- /api/categories/indexes reports size and usage):
+--   number, single_select -> btree on (data->'<key>')  range/equality on the key
+--   multi_select          -> GIN on (data->'<key>')    containment on the key
+-- Replaces 013's categories trigger, which built the index inside the
+-- category insert; existing indexes from it are registered below.
+
+CREATE TABLE IF NOT EXISTS category_indexes (
+    category_name TEXT PRIMARY KEY,
+    index_name TEXT UNIQUE NOT NULL,
+    method TEXT NOT NULL,             -- 'btree' | 'gin'
+    status TEXT NOT NULL DEFAULT 'pending',  -- 'pending' | 'ready' | 'failed'
+    error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    ready_at TIMESTAMP
+);
+
+DROP TRIGGER IF EXISTS categories_index_high_priority ON categories;
+DROP FUNCTION IF EXISTS index_high_priority_category();
+DROP FUNCTION IF EXISTS ensure_category_index(TEXT);
+
+-- Add a category to the registry (pending). No row if its type has no index
+-- or its name can't be used in a PostgREST filter path.
+CREATE OR REPLACE FUNCTION register_category_index(p_category_name TEXT, p_type TEXT)
+RETURNS SETOF category_indexes
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF p_category_name !~ '^[A-Za-z0-9_]+$'
+       OR p_type NOT IN ('number', 'single_select', 'multi_select') THEN
+        RETURN;
+    END IF;
+    RETURN QUERY
+    INSERT INTO category_indexes (category_name, index_name, method)
+    VALUES (
+        p_category_name,
+        left('idx_individual_summaries_data_' || lower(p_category_name), 63),
+        CASE WHEN p_type = 'multi_select' THEN 'gin' ELSE 'btree' END
+    )
+    ON CONFLICT (category_name) DO UPDATE
+    -- Retry a failed build; keep a ready one
+    SET status = CASE WHEN category_indexes.status = 'ready' THEN 'ready' ELSE 'pending' END,
+        error = NULL
+    RETURNING *;
+END;
+$$;
+
+-- Build a registered index and mark it ready. Runs in the RPC's transaction,
+-- so CONCURRENTLY isn't available: writes to individual_summaries wait for
+-- the build (well under a second at 100k rows). SECURITY DEFINER because
+-- CREATE INDEX needs the table owner, not the API role.
+CREATE OR REPLACE FUNCTION build_category_index(p_category_name TEXT)
+RETURNS SETOF category_indexes
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+DECLARE
+    v_entry category_indexes;
+BEGIN
+    SELECT * INTO v_entry FROM category_indexes WHERE category_name = p_category_name FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'No managed index for category %', p_category_name USING ERRCODE = 'P0002';
+    END IF;
+
+    IF v_entry.method = 'gin' THEN
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS %I ON individual_summaries USING GIN ((data->%L) jsonb_path_ops)',
+            v_entry.index_name, p_category_name
+        );
+    ELSE
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS %I ON individual_summaries ((data->%L))',
+            v_entry.index_name, p_category_name
+        );
+    END IF;
+
+    RETURN QUERY
+    UPDATE category_indexes
+    SET status = 'ready', error = NULL, ready_at = NOW()
+    WHERE category_name = p_category_name
+    RETURNING *;
+END;
+$$;
+
+-- Registry with size and usage since the last stats reset
+CREATE OR REPLACE FUNCTION category_index_stats()
+RETURNS TABLE (
+    category_name TEXT,
+    index_name TEXT,
+    method TEXT,
+    status TEXT,
+    error TEXT,
+    created_at TIMESTAMP,
+    ready_at TIMESTAMP,
+    size_bytes BIGINT,
+    scans BIGINT,
+    tuples_read BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT r.category_name, r.index_name, r.method, r.status, r.error, r.created_at, r.ready_at,
+           pg_relation_size(s.indexrelid),
+           s.idx_scan,
+           s.idx_tup_read
+    FROM category_indexes r
+    LEFT JOIN pg_stat_user_indexes s
+        ON s.indexrelname = r.index_name AND s.relname = 'individual_summaries'
+       AND s.schemaname = current_schema()
+    ORDER BY r.category_name
+$$;
+
+-- Indexes 013 created for high-priority number categories
+INSERT INTO category_indexes (category_name, index_name, method, status, ready_at)
+SELECT c.name, i.indexname, 'btree', 'ready', NOW()
+FROM categories c
+JOIN pg_indexes i
+    ON i.indexname = left('idx_individual_summaries_data_' || lower(c.name), 63)
+   AND i.tablename = 'individual_summaries'
+   AND i.schemaname = current_schema()
+WHERE c.type = 'number'
+ON CONFLICT (category_name) DO NOTHING;
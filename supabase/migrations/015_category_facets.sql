@@ -0,0 +1,195 @@
+-- Per-option counts for select categories (GET /api/individuals/facets)
+-- category_facet_counts holds, for every single_select / multi_select
+-- category, how many individuals have each value. A trigger on individuals
+-- applies the difference between a row's old and new values on every save,
+-- so the unfiltered dashboard view is a read of this small table. Filtered
+-- facets (same filters as search) are grouped on the fly over the matching
+-- individual_summaries rows.
+
+CREATE TABLE IF NOT EXISTS category_facet_counts (
+    category TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, value)
+);
+
+-- (category, value) pairs of one individual's data, each once
+CREATE OR REPLACE FUNCTION facet_values(p_data JSONB)
+RETURNS TABLE (category TEXT, value TEXT)
+LANGUAGE sql STABLE AS $$
+    SELECT DISTINCT c.name, v.value
+    FROM categories c
+    CROSS JOIN LATERAL (
+        SELECT p_data->>c.name AS value
+        WHERE c.type = 'single_select'
+          AND jsonb_typeof(p_data->c.name) IN ('string', 'number', 'boolean')
+        UNION ALL
+        SELECT e.value
+        FROM jsonb_array_elements_text(
+            CASE WHEN c.type = 'multi_select' AND jsonb_typeof(p_data->c.name) = 'array'
+                 THEN p_data->c.name ELSE '[]' END
+        ) e(value)
+    ) v
+    WHERE c.type IN ('single_select', 'multi_select')
+      AND p_data ? c.name
+$$;
+
+CREATE OR REPLACE FUNCTION sync_facet_counts()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.data = OLD.data THEN
+        RETURN NULL;
+    END IF;
+
+    -- Values the row lost
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE category_facet_counts f
+        SET count = f.count - 1
+        FROM (
+            SELECT * FROM facet_values(OLD.data)
+            EXCEPT
+            SELECT * FROM facet_values(CASE WHEN TG_OP = 'UPDATE' THEN NEW.data ELSE '{}' END)
+        ) lost
+        WHERE f.category = lost.category AND f.value = lost.value;
+    END IF;
+
+    -- Values the row gained
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO category_facet_counts AS f (category, value, count)
+        SELECT category, value, 1
+        FROM (
+            SELECT * FROM facet_values(NEW.data)
+            EXCEPT
+            SELECT * FROM facet_values(CASE WHEN TG_OP = 'UPDATE' THEN OLD.data ELSE '{}' END)
+        ) gained
+        ORDER BY category, value  -- Consistent lock order between concurrent saves
+        ON CONFLICT (category, value) DO UPDATE SET count = f.count + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS individuals_sync_facet_counts ON individuals;
+CREATE TRIGGER individuals_sync_facet_counts
+    AFTER INSERT OR UPDATE OF data OR DELETE ON individuals
+    FOR EACH ROW EXECUTE FUNCTION sync_facet_counts();
+
+-- Recount one category from scratch (new, renamed, retyped or deleted categories)
+CREATE OR REPLACE FUNCTION refresh_category_facets(p_category TEXT)
+RETURNS void
+LANGUAGE sql AS $$
+    DELETE FROM category_facet_counts WHERE category = p_category;
+    INSERT INTO category_facet_counts (category, value, count)
+    SELECT v.category, v.value, count(*)
+    FROM individuals i
+    CROSS JOIN LATERAL facet_values(i.data) v
+    WHERE v.category = p_category
+    GROUP BY v.category, v.value;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_facet_categories()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_category_facets(OLD.name);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_category_facets(NEW.name);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS categories_sync_facet_counts ON categories;
+CREATE TRIGGER categories_sync_facet_counts
+    AFTER INSERT OR UPDATE OF name, type OR DELETE ON categories
+    FOR EACH ROW EXECUTE FUNCTION sync_facet_categories();
+
+-- Facet counts, optionally for the individuals matching search filters
+-- (see individual_service.parse_filters): p_contains is the containment on
+-- data, p_ranges a list of {"key": <data key> | "column": <score column>,
+-- "op": "eq" | "gte" | "lte", "value": <number>}, p_search matches
+-- search_text; NULL for none. Without filters the maintained counts are
+-- returned.
+CREATE OR REPLACE FUNCTION category_facets(
+    p_contains JSONB DEFAULT NULL,
+    p_ranges JSONB DEFAULT NULL,
+    p_search TEXT DEFAULT NULL
+)
+RETURNS TABLE (category TEXT, type TEXT, value TEXT, count BIGINT)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF p_contains IS NULL AND p_ranges IS NULL AND p_search IS NULL THEN
+        RETURN QUERY
+        SELECT f.category, c.type, f.value, f.count
+        FROM category_facet_counts f
+        JOIN categories c ON c.name = f.category
+        WHERE f.count > 0
+        ORDER BY f.category, f.count DESC, f.value;
+        RETURN;
+    END IF;
+
+    -- Single-selects grouped on the value, multi-selects on each element;
+    -- inlined rather than facet_values() per row
+    RETURN QUERY
+    WITH matching AS (
+        SELECT s.data
+        FROM individual_summaries s
+        WHERE (p_contains IS NULL OR s.data @> p_contains)
+          AND (p_search IS NULL OR strpos(s.search_text, lower(p_search)) > 0)
+          AND (p_ranges IS NULL OR NOT EXISTS (
+              SELECT 1
+              FROM jsonb_array_elements(p_ranges) r
+              CROSS JOIN LATERAL (
+                  SELECT CASE
+                      WHEN r ? 'key' THEN s.data->(r->>'key')
+                      WHEN r->>'column' = 'danger_score' THEN to_jsonb(s.danger_score)
+                      ELSE to_jsonb(s.display_score)
+                  END AS actual
+              ) a
+              WHERE NOT coalesce(CASE r->>'op'
+                  WHEN 'gte' THEN a.actual >= r->'value'
+                  WHEN 'lte' THEN a.actual <= r->'value'
+                  ELSE a.actual = r->'value'
+              END, false)
+          ))
+    ),
+    single AS (
+        SELECT c.name, m.data->>c.name AS value
+        FROM matching m
+        JOIN categories c ON c.type = 'single_select'
+        WHERE jsonb_typeof(m.data->c.name) IN ('string', 'number', 'boolean')
+    ),
+    multi AS (
+        SELECT c.name, e.value
+        FROM matching m
+        JOIN categories c ON c.type = 'multi_select'
+        CROSS JOIN LATERAL (
+            SELECT DISTINCT x.value
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(m.data->c.name) = 'array' THEN m.data->c.name ELSE '[]' END
+            ) x(value)
+        ) e
+    )
+    SELECT g.name, c.type, g.value, count(*)
+    FROM (
+        SELECT single.name, single.value FROM single
+        UNION ALL
+        SELECT multi.name, multi.value FROM multi
+    ) g
+    JOIN categories c ON c.name = g.name
+    GROUP BY g.name, c.type, g.value
+    ORDER BY g.name, count(*) DESC, g.value;
+END;
+$$;
+
+-- Backfill
+INSERT INTO category_facet_counts (category, value, count)
+SELECT v.category, v.value, count(*)
+FROM individuals i
+CROSS JOIN LATERAL facet_values(i.data) v
+GROUP BY v.category, v.value
+ON CONFLICT (category, value) DO UPDATE SET count = EXCLUDED.count;
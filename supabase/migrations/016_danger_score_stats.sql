@@ -0,0 +1,93 @@
+-- Danger score distribution analytics (GET /api/analytics/danger-scores)
+-- Histograms, percentiles and override rate of danger_score (calculated)
+-- and display_score (override if set, else calculated), computed in the
+-- database over individual_summaries so nothing is downloaded.
+--
+-- Population: every individual, or with a time window and/or worker, the
+-- individuals with an interaction in that window (by that worker). Scores
+-- are recalculated on every save, so a window after a weight change shows
+-- the scores made with the new weights. With p_by_worker each worker gets a
+-- slice of the individuals they saw.
+
+CREATE INDEX IF NOT EXISTS idx_interactions_user_created ON interactions(user_id, created_at);
+
+CREATE OR REPLACE FUNCTION danger_score_stats(
+    p_since TIMESTAMP DEFAULT NULL,
+    p_until TIMESTAMP DEFAULT NULL,
+    p_user_id UUID DEFAULT NULL,
+    p_by_worker BOOLEAN DEFAULT false,
+    p_bucket_width INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    user_id UUID,                  -- NULL for the overall slice
+    user_name TEXT,
+    individuals BIGINT,
+    overrides BIGINT,              -- Individuals with a (non-zero) override
+    mean_danger_score FLOAT8,
+    mean_display_score FLOAT8,
+    danger_score_percentiles FLOAT8[],   -- At 0.25, 0.5, 0.75, 0.9, 0.99
+    display_score_percentiles FLOAT8[],
+    danger_score_histogram JSONB,  -- {"<bucket start>": count}, empty buckets omitted
+    display_score_histogram JSONB
+)
+LANGUAGE sql STABLE AS $$
+    WITH population AS (
+        SELECT s.danger_score, s.danger_override, s.display_score,
+               NULL::UUID AS user_id, NULL::TEXT AS user_name
+        FROM individual_summaries s
+        WHERE p_since IS NULL AND p_until IS NULL AND p_user_id IS NULL AND NOT p_by_worker
+        UNION ALL
+        SELECT s.danger_score, s.danger_override, s.display_score, seen.user_id, seen.user_name
+        FROM (
+            SELECT x.individual_id,
+                   CASE WHEN p_by_worker THEN x.user_id END AS user_id,
+                   max(CASE WHEN p_by_worker THEN x.user_name END) AS user_name
+            FROM interactions x
+            WHERE (p_user_id IS NULL OR x.user_id = p_user_id)
+              AND (p_since IS NULL OR x.created_at >= p_since)
+              AND (p_until IS NULL OR x.created_at < p_until)
+            GROUP BY 1, 2
+        ) seen
+        JOIN individual_summaries s ON s.id = seen.individual_id
+        WHERE p_since IS NOT NULL OR p_until IS NOT NULL OR p_user_id IS NOT NULL OR p_by_worker
+    ),
+    buckets AS (
+        -- Bucket start; 100 falls in the last bucket
+        SELECT p.user_id,
+               least(greatest(p.danger_score, 0), 99) / p_bucket_width * p_bucket_width AS danger_bucket,
+               least(greatest(p.display_score, 0), 99) / p_bucket_width * p_bucket_width AS display_bucket
+        FROM population p
+    ),
+    danger_histograms AS (
+        SELECT h.user_id, jsonb_object_agg(h.bucket, h.n) AS histogram
+        FROM (SELECT b.user_id, b.danger_bucket AS bucket, count(*) AS n FROM buckets b GROUP BY 1, 2) h
+        GROUP BY h.user_id
+    ),
+    display_histograms AS (
+        SELECT h.user_id, jsonb_object_agg(h.bucket, h.n) AS histogram
+        FROM (SELECT b.user_id, b.display_bucket AS bucket, count(*) AS n FROM buckets b GROUP BY 1, 2) h
+        GROUP BY h.user_id
+    ),
+    stats AS (
+        SELECT p.user_id,
+               max(p.user_name) AS user_name,
+               count(*) AS individuals,
+               count(*) FILTER (WHERE coalesce(p.danger_override, 0) <> 0) AS overrides,
+               avg(p.danger_score)::FLOAT8 AS mean_danger_score,
+               avg(p.display_score)::FLOAT8 AS mean_display_score,
+               percentile_cont(ARRAY[0.25, 0.5, 0.75, 0.9, 0.99]) WITHIN GROUP (ORDER BY p.danger_score)
+                   AS danger_score_percentiles,
+               percentile_cont(ARRAY[0.25, 0.5, 0.75, 0.9, 0.99]) WITHIN GROUP (ORDER BY p.display_score)
+                   AS display_score_percentiles
+        FROM population p
+        GROUP BY p.user_id
+    )
+    SELECT st.user_id, st.user_name, st.individuals, st.overrides,
+           st.mean_danger_score, st.mean_display_score,
+           st.danger_score_percentiles, st.display_score_percentiles,
+           dh.histogram, ph.histogram
+    FROM stats st
+    JOIN danger_histograms dh ON dh.user_id IS NOT DISTINCT FROM st.user_id
+    JOIN display_histograms ph ON ph.user_id IS NOT DISTINCT FROM st.user_id
+    ORDER BY st.individuals DESC, st.user_id
+$$;
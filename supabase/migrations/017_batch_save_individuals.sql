@@ -0,0 +1,53 @@
+-- Atomic batch save (POST /api/individuals/batch)
+-- save_individuals_batch() saves every item of an offline-sync batch with
+-- save_individual() in one transaction and one round trip. Merges are the
+-- same conditional UPDATE as a single save, guarded by the item's
+-- expected_updated_at / expected_version, so a deleted target is reported
+-- rather than recreated and a stale item doesn't overwrite newer data.
+--
+-- Each item runs in its own savepoint: a missing target (P0002) or a failed
+-- precondition (40001) rolls back that item only and is reported in its
+-- result; any other error aborts the whole batch.
+
+CREATE OR REPLACE FUNCTION save_individuals_batch(
+    p_user_id UUID,
+    p_user_name TEXT,
+    p_items JSONB  -- [{index, name, data, danger_score, merge_with_id, location,
+                   --   transcription, audio_url, expected_updated_at, expected_version}]
+)
+RETURNS JSONB  -- [{index, individual, interaction} | {index, errcode, error}], in item order
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_item JSONB;
+    v_saved JSONB;
+    v_results JSONB := '[]'::jsonb;
+BEGIN
+    FOR v_item IN SELECT value FROM jsonb_array_elements(p_items)
+    LOOP
+        BEGIN
+            v_saved := save_individual(
+                p_name := v_item->>'name',
+                p_data := v_item->'data',
+                p_danger_score := (v_item->>'danger_score')::INTEGER,
+                p_user_id := p_user_id,
+                p_user_name := p_user_name,
+                p_merge_with_id := (v_item->>'merge_with_id')::UUID,
+                p_location := nullif(v_item->'location', 'null'::jsonb),
+                p_transcription := v_item->>'transcription',
+                p_audio_url := v_item->>'audio_url',
+                p_expected_updated_at := (v_item->>'expected_updated_at')::TIMESTAMP,
+                p_expected_version := (v_item->>'expected_version')::INTEGER
+            );
+            v_results := v_results || jsonb_build_array(
+                jsonb_build_object('index', v_item->'index') || v_saved
+            );
+        EXCEPTION WHEN SQLSTATE 'P0002' OR SQLSTATE '40001' THEN
+            v_results := v_results || jsonb_build_array(jsonb_build_object(
+                'index', v_item->'index', 'errcode', SQLSTATE, 'error', SQLERRM
+            ));
+        END;
+    END LOOP;
+
+    RETURN v_results;
+END;
+$$;
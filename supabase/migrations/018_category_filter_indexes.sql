@@ -0,0 +1,159 @@
+-- Managed category indexes that match the search filters, built concurrently
+-- Filters (individual_service.parse_filters) now use each category's own key
+-- instead of containment on the whole data column, so the managed indexes
+-- are on the expressions the API actually queries:
+--   number        -> btree on (data->'<key>')          data->key=gte.70 / eq.72
+--   single_select -> btree on (data->>'<key>')         data->>key=eq.Yes
+--   multi_select  -> GIN on (data->'<key>') path_ops   data->key=cs.["Mild"]
+--
+-- Builds no longer run in an RPC's transaction (plain CREATE INDEX, which
+-- blocks every save while it runs, since saves write individual_summaries).
+-- category_index_statements() returns the CREATE INDEX CONCURRENTLY statement,
+-- which CategoryIndexService runs on a direct database connection.
+
+DROP FUNCTION IF EXISTS build_category_index(TEXT);
+
+-- Statements to build a registered index: drop_invalid removes the invalid
+-- index a failed concurrent build leaves behind (NULL if there is none), so
+-- create_index's IF NOT EXISTS doesn't skip over it
+CREATE OR REPLACE FUNCTION category_index_statements(p_category_name TEXT)
+RETURNS TABLE (index_name TEXT, drop_invalid TEXT, create_index TEXT)
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    v_index_name TEXT;
+    v_type TEXT;
+BEGIN
+    SELECT r.index_name, c.type INTO v_index_name, v_type
+    FROM category_indexes r
+    JOIN categories c ON c.name = r.category_name
+    WHERE r.category_name = p_category_name;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'No managed index for category %', p_category_name USING ERRCODE = 'P0002';
+    END IF;
+
+    index_name := v_index_name;
+    drop_invalid := (
+        SELECT format('DROP INDEX CONCURRENTLY IF EXISTS %I.%I', n.nspname, c.relname)
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_index i ON i.indexrelid = c.oid
+        WHERE c.relname = v_index_name
+          AND n.nspname = current_schema()
+          AND NOT i.indisvalid
+    );
+    create_index := format(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS %I ON %I.individual_summaries %s',
+        v_index_name,
+        current_schema(),
+        CASE v_type
+            WHEN 'multi_select' THEN format('USING GIN ((data->%L) jsonb_path_ops)', p_category_name)
+            WHEN 'single_select' THEN format('((data->>%L))', p_category_name)
+            ELSE format('((data->%L))', p_category_name)
+        END
+    );
+    RETURN NEXT;
+END;
+$$;
+
+-- 014 built single_select indexes on (data->'<key>'), which the eq filter on
+-- data->>key can't use: drop them and queue a rebuild (CategoryIndexService
+-- builds pending indexes at startup)
+DO $$
+DECLARE
+    v_index TEXT;
+BEGIN
+    FOR v_index IN
+        SELECT r.index_name
+        FROM category_indexes r
+        JOIN categories c ON c.name = r.category_name
+        WHERE c.type = 'single_select'
+    LOOP
+        EXECUTE format('DROP INDEX IF EXISTS %I', v_index);
+    END LOOP;
+
+    UPDATE category_indexes r
+    SET status = 'pending', error = NULL, ready_at = NULL
+    FROM categories c
+    WHERE c.name = r.category_name AND c.type = 'single_select';
+END;
+$$;
+
+-- category_facets with the same conditions as search: p_conditions is a list
+-- of {"key": <data key> | "text_key": <data key, compared as text> |
+-- "column": <score column>, "op": "eq" | "gte" | "lte" | "contains",
+-- "value": <JSON value>}
+DROP FUNCTION IF EXISTS category_facets(JSONB, JSONB, TEXT);
+
+CREATE OR REPLACE FUNCTION category_facets(
+    p_contains JSONB DEFAULT NULL,
+    p_conditions JSONB DEFAULT NULL,
+    p_search TEXT DEFAULT NULL
+)
+RETURNS TABLE (category TEXT, type TEXT, value TEXT, count BIGINT)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF p_contains IS NULL AND p_conditions IS NULL AND p_search IS NULL THEN
+        RETURN QUERY
+        SELECT f.category, c.type, f.value, f.count
+        FROM category_facet_counts f
+        JOIN categories c ON c.name = f.category
+        WHERE f.count > 0
+        ORDER BY f.category, f.count DESC, f.value;
+        RETURN;
+    END IF;
+
+    -- Single-selects grouped on the value, multi-selects on each element;
+    -- inlined rather than facet_values() per row
+    RETURN QUERY
+    WITH matching AS (
+        SELECT s.data
+        FROM individual_summaries s
+        WHERE (p_contains IS NULL OR s.data @> p_contains)
+          AND (p_search IS NULL OR strpos(s.search_text, lower(p_search)) > 0)
+          AND (p_conditions IS NULL OR NOT EXISTS (
+              SELECT 1
+              FROM jsonb_array_elements(p_conditions) r
+              CROSS JOIN LATERAL (
+                  SELECT CASE
+                      WHEN r ? 'key' THEN s.data->(r->>'key')
+                      WHEN r ? 'text_key' THEN to_jsonb(s.data->>(r->>'text_key'))
+                      WHEN r->>'column' = 'danger_score' THEN to_jsonb(s.danger_score)
+                      ELSE to_jsonb(s.display_score)
+                  END AS actual
+              ) a
+              WHERE NOT coalesce(CASE r->>'op'
+                  WHEN 'gte' THEN a.actual >= r->'value'
+                  WHEN 'lte' THEN a.actual <= r->'value'
+                  WHEN 'contains' THEN a.actual @> (r->'value')
+                  ELSE a.actual = r->'value'
+              END, false)
+          ))
+    ),
+    single AS (
+        SELECT c.name, m.data->>c.name AS value
+        FROM matching m
+        JOIN categories c ON c.type = 'single_select'
+        WHERE jsonb_typeof(m.data->c.name) IN ('string', 'number', 'boolean')
+    ),
+    multi AS (
+        SELECT c.name, e.value
+        FROM matching m
+        JOIN categories c ON c.type = 'multi_select'
+        CROSS JOIN LATERAL (
+            SELECT DISTINCT x.value
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(m.data->c.name) = 'array' THEN m.data->c.name ELSE '[]' END
+            ) x(value)
+        ) e
+    )
+    SELECT g.name, c.type, g.value, count(*)
+    FROM (
+        SELECT single.name, single.value FROM single
+        UNION ALL
+        SELECT multi.name, multi.value FROM multi
+    ) g
+    JOIN categories c ON c.name = g.name
+    GROUP BY g.name, c.type, g.value
+    ORDER BY g.name, count(*) DESC, g.value;
+END;
+$$;
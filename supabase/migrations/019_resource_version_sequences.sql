@@ -0,0 +1,73 @@
+-- Lock-free resource versions
+-- 009's triggers UPDATEd one resource_versions row per resource, holding its
+-- row lock until commit, so every write transaction in the app queued on the
+-- 'individuals' row. The counters are now sequences: nextval() takes no row
+-- lock and never waits. resource_versions becomes a view over them, so the
+-- API's lookup (api/etags.get_resource_version) is unchanged.
+--
+-- Sequences aren't transactional, so the bump is deferred to commit
+-- (constraint triggers): a reader can only see a version whose data isn't
+-- visible yet while the writer is committing, and such an ETag is replaced
+-- on the resource's next write. A rolled-back write still bumps the version,
+-- which only costs clients one unnecessary full response.
+
+CREATE SEQUENCE IF NOT EXISTS resource_version_categories;
+CREATE SEQUENCE IF NOT EXISTS resource_version_individuals;
+
+-- Continue past the current versions, so no ETag a client holds comes back
+SELECT setval('resource_version_categories',
+              coalesce((SELECT version FROM resource_versions WHERE resource = 'categories'), 0) + 1);
+SELECT setval('resource_version_individuals',
+              coalesce((SELECT version FROM resource_versions WHERE resource = 'individuals'), 0) + 1);
+
+DROP TRIGGER IF EXISTS categories_bump_resource_version ON categories;
+DROP TRIGGER IF EXISTS individuals_bump_resource_version ON individuals;
+DROP TRIGGER IF EXISTS interactions_bump_resource_version ON interactions;
+DROP TABLE IF EXISTS resource_versions;
+
+CREATE VIEW resource_versions AS
+SELECT 'categories'::TEXT AS resource, last_value AS version FROM resource_version_categories
+UNION ALL
+SELECT 'individuals'::TEXT, last_value FROM resource_version_individuals;
+
+-- TG_ARGV[0]: the resource's sequence
+CREATE OR REPLACE FUNCTION bump_resource_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM nextval(TG_ARGV[0]::regclass);
+    RETURN NULL;
+END;
+$$;
+
+-- Constraint triggers are per row; nextval is cheap enough for that
+CREATE CONSTRAINT TRIGGER categories_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE ON categories
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_resource_version('resource_version_categories');
+
+CREATE CONSTRAINT TRIGGER individuals_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE ON individuals
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_resource_version('resource_version_individuals');
+
+CREATE CONSTRAINT TRIGGER interactions_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE ON interactions
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_resource_version('resource_version_individuals');
+
+-- TRUNCATE can't fire row triggers
+DROP TRIGGER IF EXISTS categories_truncate_resource_version ON categories;
+CREATE TRIGGER categories_truncate_resource_version
+    AFTER TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('resource_version_categories');
+
+DROP TRIGGER IF EXISTS individuals_truncate_resource_version ON individuals;
+CREATE TRIGGER individuals_truncate_resource_version
+    AFTER TRUNCATE ON individuals
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('resource_version_individuals');
+
+DROP TRIGGER IF EXISTS interactions_truncate_resource_version ON interactions;
+CREATE TRIGGER interactions_truncate_resource_version
+    AFTER TRUNCATE ON interactions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('resource_version_individuals');
@@ -0,0 +1,79 @@
+-- Compare tile and bounding-box bounds in lat/lng, not on the sphere
+-- 004/005 cast ST_MakeEnvelope(...) to geography, whose edges are great
+-- circles: the top and bottom of a box bulge towards the pole, so points
+-- just outside a tile were counted in it (and got a cell index of -1 or
+-- off the grid) while points just inside a neighbouring tile were missed.
+-- Map tiles and the bbox query are rectangles in lat/lng, so the test is
+-- now a planar && on the position's geometry, backed by a geometry GiST
+-- index, and cell indices are clamped to the grid on both sides.
+
+CREATE INDEX IF NOT EXISTS idx_individuals_last_position_geometry
+    ON individuals USING GIST ((last_position::geometry));
+
+CREATE OR REPLACE FUNCTION individuals_within_bbox(
+    min_lat float8,
+    min_lng float8,
+    max_lat float8,
+    max_lng float8,
+    seen_since TIMESTAMP DEFAULT NULL,
+    max_results INTEGER DEFAULT 100
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    danger_score INTEGER,
+    danger_override INTEGER,
+    last_seen TIMESTAMP,
+    last_location JSONB,
+    distance_m float8
+)
+LANGUAGE sql STABLE AS $$
+    SELECT i.id, i.name, i.danger_score, i.danger_override, i.last_seen, i.last_location,
+           NULL::float8 AS distance_m
+    FROM individuals i
+    WHERE i.last_position::geometry && ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+      AND (seen_since IS NULL OR i.last_seen >= seen_since)
+    ORDER BY i.last_seen DESC
+    LIMIT max_results
+$$;
+
+CREATE OR REPLACE FUNCTION location_clusters(
+    min_lat float8,
+    min_lng float8,
+    max_lat float8,
+    max_lng float8,
+    grid_size INTEGER DEFAULT 8
+)
+RETURNS TABLE (
+    cell_x INTEGER,
+    cell_y INTEGER,
+    count BIGINT,
+    latitude float8,
+    longitude float8,
+    max_danger_score INTEGER,
+    individual_id UUID
+)
+LANGUAGE sql STABLE AS $$
+    WITH points AS (
+        SELECT i.id,
+               ST_Y(i.last_position::geometry) AS lat,
+               ST_X(i.last_position::geometry) AS lng,
+               COALESCE(i.danger_override, i.danger_score) AS display_score
+        FROM individuals i
+        WHERE i.last_position::geometry && ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+    ),
+    cells AS (
+        SELECT p.*,
+               GREATEST(0, LEAST(grid_size - 1, floor((p.lng - min_lng) / (max_lng - min_lng) * grid_size)))::INTEGER AS cx,
+               GREATEST(0, LEAST(grid_size - 1, floor((max_lat - p.lat) / (max_lat - min_lat) * grid_size)))::INTEGER AS cy
+        FROM points p
+    )
+    SELECT cx, cy,
+           COUNT(*) AS count,
+           AVG(lat) AS latitude,
+           AVG(lng) AS longitude,
+           MAX(display_score) AS max_danger_score,
+           CASE WHEN COUNT(*) = 1 THEN (array_agg(id))[1] END AS individual_id
+    FROM cells
+    GROUP BY cx, cy
+$$;
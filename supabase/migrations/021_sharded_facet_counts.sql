@@ -0,0 +1,161 @@
+-- Facet counts maintained on save without a hot row per option
+-- 015's trigger incremented one category_facet_counts row per (category,
+-- value), so concurrent saves of individuals with a common option
+-- (veteran_status = 'No', ...) queued on that row's lock until commit.
+-- Each (category, value) now has up to FACET_COUNT_SHARDS rows; a save adds
+-- its +1/-1 deltas to the shard of its own backend, so concurrent saves
+-- (always on different backends) only share a row when their backend pids
+-- collide modulo the shard count. Reads sum the shards: the unfiltered
+-- facets stay a read of a table of (options x shards) rows.
+
+DROP TRIGGER IF EXISTS individuals_sync_facet_counts ON individuals;
+DROP TABLE IF EXISTS category_facet_counts;
+
+CREATE TABLE category_facet_counts (
+    category TEXT NOT NULL,
+    value TEXT NOT NULL,
+    shard SMALLINT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,  -- Delta sum; a shard can go negative
+    PRIMARY KEY (category, value, shard)
+);
+
+-- Shard of the current backend (FACET_COUNT_SHARDS = 16)
+CREATE OR REPLACE FUNCTION facet_count_shard()
+RETURNS SMALLINT
+LANGUAGE sql STABLE AS $$
+    SELECT (pg_backend_pid() % 16)::SMALLINT
+$$;
+
+CREATE OR REPLACE FUNCTION sync_facet_counts()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.data = OLD.data THEN
+        RETURN NULL;
+    END IF;
+
+    -- -1 for values the row lost, +1 for values it gained
+    INSERT INTO category_facet_counts AS f (category, value, shard, count)
+    SELECT d.category, d.value, facet_count_shard(), d.delta
+    FROM (
+        SELECT category, value, -1 AS delta
+        FROM (
+            SELECT * FROM facet_values(CASE WHEN TG_OP = 'INSERT' THEN '{}' ELSE OLD.data END)
+            EXCEPT
+            SELECT * FROM facet_values(CASE WHEN TG_OP = 'DELETE' THEN '{}' ELSE NEW.data END)
+        ) lost
+        UNION ALL
+        SELECT category, value, 1
+        FROM (
+            SELECT * FROM facet_values(CASE WHEN TG_OP = 'DELETE' THEN '{}' ELSE NEW.data END)
+            EXCEPT
+            SELECT * FROM facet_values(CASE WHEN TG_OP = 'INSERT' THEN '{}' ELSE OLD.data END)
+        ) gained
+    ) d
+    ORDER BY d.category, d.value  -- Consistent lock order between saves sharing a shard
+    ON CONFLICT (category, value, shard) DO UPDATE SET count = f.count + EXCLUDED.count;
+
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER individuals_sync_facet_counts
+    AFTER INSERT OR UPDATE OF data OR DELETE ON individuals
+    FOR EACH ROW EXECUTE FUNCTION sync_facet_counts();
+
+-- Recount one category from scratch into shard 0 (new, renamed, retyped or
+-- deleted categories; 015's trigger on categories calls this)
+CREATE OR REPLACE FUNCTION refresh_category_facets(p_category TEXT)
+RETURNS void
+LANGUAGE sql AS $$
+    DELETE FROM category_facet_counts WHERE category = p_category;
+    INSERT INTO category_facet_counts (category, value, shard, count)
+    SELECT v.category, v.value, 0, count(*)
+    FROM individuals i
+    CROSS JOIN LATERAL facet_values(i.data) v
+    WHERE v.category = p_category
+    GROUP BY v.category, v.value;
+$$;
+
+-- Same as 018's, reading the unfiltered counts from the shards
+CREATE OR REPLACE FUNCTION category_facets(
+    p_contains JSONB DEFAULT NULL,
+    p_conditions JSONB DEFAULT NULL,
+    p_search TEXT DEFAULT NULL
+)
+RETURNS TABLE (category TEXT, type TEXT, value TEXT, count BIGINT)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF p_contains IS NULL AND p_conditions IS NULL AND p_search IS NULL THEN
+        RETURN QUERY
+        SELECT f.category, c.type, f.value, sum(f.count)::BIGINT
+        FROM category_facet_counts f
+        JOIN categories c ON c.name = f.category
+        GROUP BY f.category, c.type, f.value
+        HAVING sum(f.count) > 0
+        ORDER BY f.category, sum(f.count) DESC, f.value;
+        RETURN;
+    END IF;
+
+    -- Single-selects grouped on the value, multi-selects on each element;
+    -- inlined rather than facet_values() per row
+    RETURN QUERY
+    WITH matching AS (
+        SELECT s.data
+        FROM individual_summaries s
+        WHERE (p_contains IS NULL OR s.data @> p_contains)
+          AND (p_search IS NULL OR strpos(s.search_text, lower(p_search)) > 0)
+          AND (p_conditions IS NULL OR NOT EXISTS (
+              SELECT 1
+              FROM jsonb_array_elements(p_conditions) r
+              CROSS JOIN LATERAL (
+                  SELECT CASE
+                      WHEN r ? 'key' THEN s.data->(r->>'key')
+                      WHEN r ? 'text_key' THEN to_jsonb(s.data->>(r->>'text_key'))
+                      WHEN r->>'column' = 'danger_score' THEN to_jsonb(s.danger_score)
+                      ELSE to_jsonb(s.display_score)
+                  END AS actual
+              ) a
+              WHERE NOT coalesce(CASE r->>'op'
+                  WHEN 'gte' THEN a.actual >= r->'value'
+                  WHEN 'lte' THEN a.actual <= r->'value'
+                  WHEN 'contains' THEN a.actual @> (r->'value')
+                  ELSE a.actual = r->'value'
+              END, false)
+          ))
+    ),
+    single AS (
+        SELECT c.name, m.data->>c.name AS value
+        FROM matching m
+        JOIN categories c ON c.type = 'single_select'
+        WHERE jsonb_typeof(m.data->c.name) IN ('string', 'number', 'boolean')
+    ),
+    multi AS (
+        SELECT c.name, e.value
+        FROM matching m
+        JOIN categories c ON c.type = 'multi_select'
+        CROSS JOIN LATERAL (
+            SELECT DISTINCT x.value
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(m.data->c.name) = 'array' THEN m.data->c.name ELSE '[]' END
+            ) x(value)
+        ) e
+    )
+    SELECT g.name, c.type, g.value, count(*)
+    FROM (
+        SELECT single.name, single.value FROM single
+        UNION ALL
+        SELECT multi.name, multi.value FROM multi
+    ) g
+    JOIN categories c ON c.name = g.name
+    GROUP BY g.name, c.type, g.value
+    ORDER BY g.name, count(*) DESC, g.value;
+END;
+$$;
+
+-- Backfill
+INSERT INTO category_facet_counts (category, value, shard, count)
+SELECT v.category, v.value, 0, count(*)
+FROM individuals i
+CROSS JOIN LATERAL facet_values(i.data) v
+GROUP BY v.category, v.value;
@@ -0,0 +1,64 @@
+-- Resource versions that become visible with the data they version
+-- 019's sequences were bumped by deferred triggers as the writer committed,
+-- but nextval() isn't transactional: between the bump and the commit a
+-- reader could take the new version with the old data and cache that body
+-- under the newest ETag, and every later conditional request matched it.
+-- The counters are back in a table, bumped in the writing transaction, so a
+-- version is visible exactly when its data is (and a rolled-back write no
+-- longer bumps it). As with 021's facet counts, each resource has up to
+-- RESOURCE_VERSION_SHARDS rows and a write bumps the shard of its own
+-- backend, so concurrent writers only share a row lock when their backend
+-- pids collide modulo the shard count. resource_versions stays a view, now
+-- summing the shards, so api/etags.get_resource_version is unchanged.
+
+CREATE TABLE IF NOT EXISTS resource_version_counts (
+    resource TEXT NOT NULL,
+    shard SMALLINT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (resource, shard)
+);
+
+-- Continue past the current versions, so no ETag a client holds comes back
+INSERT INTO resource_version_counts (resource, shard, count)
+SELECT resource, 0, version + 1 FROM resource_versions
+ON CONFLICT DO NOTHING;
+
+DROP TRIGGER IF EXISTS categories_bump_resource_version ON categories;
+DROP TRIGGER IF EXISTS individuals_bump_resource_version ON individuals;
+DROP TRIGGER IF EXISTS interactions_bump_resource_version ON interactions;
+DROP TRIGGER IF EXISTS categories_truncate_resource_version ON categories;
+DROP TRIGGER IF EXISTS individuals_truncate_resource_version ON individuals;
+DROP TRIGGER IF EXISTS interactions_truncate_resource_version ON interactions;
+DROP VIEW IF EXISTS resource_versions;
+DROP SEQUENCE IF EXISTS resource_version_categories;
+DROP SEQUENCE IF EXISTS resource_version_individuals;
+
+CREATE VIEW resource_versions AS
+SELECT resource, sum(count)::BIGINT AS version
+FROM resource_version_counts
+GROUP BY resource;
+
+-- TG_ARGV[0]: the resource (RESOURCE_VERSION_SHARDS = 16)
+CREATE OR REPLACE FUNCTION bump_resource_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO resource_version_counts AS v (resource, shard, count)
+    VALUES (TG_ARGV[0], (pg_backend_pid() % 16)::SMALLINT, 1)
+    ON CONFLICT (resource, shard) DO UPDATE SET count = v.count + 1;
+    RETURN NULL;
+END;
+$$;
+
+-- Once per statement, as in 009
+CREATE TRIGGER categories_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('categories');
+
+CREATE TRIGGER individuals_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON individuals
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('individuals');
+
+CREATE TRIGGER interactions_bump_resource_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON interactions
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('individuals');
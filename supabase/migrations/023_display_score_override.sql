@@ -0,0 +1,78 @@
+-- display_score = COALESCE(danger_override, danger_score)
+-- 011/013 copied the API's `danger_override or danger_score`, so an override
+-- of 0 ("reviewed, not dangerous") fell back to the calculated score. An
+-- override is now used whenever it is set, as the sort index (012) and the
+-- map clusters (005, 020) already assume. danger_score can still be NULL on
+-- individuals, hence the final 0 for the NOT NULL column.
+
+-- 013's maintenance functions with the new display_score
+CREATE OR REPLACE FUNCTION refresh_individual_summary(p_individual_id UUID)
+RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO individual_summaries AS s (
+        id, name, danger_score, danger_override, display_score,
+        last_seen, last_location, has_interactions, search_text, data
+    )
+    SELECT i.id,
+           i.name,
+           coalesce(i.danger_score, 0),
+           i.danger_override,
+           coalesce(i.danger_override, i.danger_score, 0),
+           coalesce(latest.created_at, i.created_at, NOW()),
+           summary_location(latest.location),
+           latest.created_at IS NOT NULL,
+           lower(i.name || ' ' || i.data::text),
+           i.data
+    FROM individuals i
+    LEFT JOIN LATERAL (
+        SELECT x.created_at, x.location
+        FROM interactions x
+        WHERE x.individual_id = i.id
+        ORDER BY x.created_at DESC
+        LIMIT 1
+    ) latest ON true
+    WHERE i.id = p_individual_id
+    ON CONFLICT (id) DO UPDATE
+    SET name = EXCLUDED.name,
+        danger_score = EXCLUDED.danger_score,
+        danger_override = EXCLUDED.danger_override,
+        display_score = EXCLUDED.display_score,
+        last_seen = EXCLUDED.last_seen,
+        last_location = EXCLUDED.last_location,
+        has_interactions = EXCLUDED.has_interactions,
+        search_text = EXCLUDED.search_text,
+        data = EXCLUDED.data;
+$$;
+
+CREATE OR REPLACE FUNCTION sync_summary_from_individual()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO individual_summaries (
+        id, name, danger_score, danger_override, display_score, last_seen, search_text, data
+    )
+    VALUES (
+        NEW.id,
+        NEW.name,
+        coalesce(NEW.danger_score, 0),
+        NEW.danger_override,
+        coalesce(NEW.danger_override, NEW.danger_score, 0),
+        coalesce(NEW.created_at, NOW()),
+        lower(NEW.name || ' ' || NEW.data::text),
+        NEW.data
+    )
+    ON CONFLICT (id) DO UPDATE
+    SET name = EXCLUDED.name,
+        danger_score = EXCLUDED.danger_score,
+        danger_override = EXCLUDED.danger_override,
+        display_score = EXCLUDED.display_score,
+        search_text = EXCLUDED.search_text,
+        data = EXCLUDED.data;
+    RETURN NULL;
+END;
+$$;
+
+-- Fix rows with an override of 0
+UPDATE individual_summaries
+SET display_score = coalesce(danger_override, danger_score)
+WHERE display_score <> coalesce(danger_override, danger_score);
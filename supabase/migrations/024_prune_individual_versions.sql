@@ -0,0 +1,30 @@
+-- Keep only the recent individual_versions snapshots
+-- 008 stored a full copy of an individual's data on every change and never
+-- removed one, so the table grew with every save. The snapshots are only
+-- read as the base of a three-way merge for a write made against an older
+-- version (IndividualService._merge_concurrent_changes), and a client that
+-- is more than a few versions behind should reload anyway: it gets "version
+-- unknown; reload and retry" as when a snapshot is missing. Each save now
+-- drops the snapshots more than INDIVIDUAL_VERSIONS_KEPT (= 20) versions
+-- old, one range delete on the primary key.
+
+CREATE OR REPLACE FUNCTION record_individual_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO individual_versions (individual_id, version, data)
+    VALUES (NEW.id, NEW.version, NEW.data)
+    ON CONFLICT DO NOTHING;
+
+    DELETE FROM individual_versions
+    WHERE individual_id = NEW.id
+      AND version <= NEW.version - 20;
+    RETURN NULL;
+END;
+$$;
+
+-- Prune the existing history
+DELETE FROM individual_versions v
+USING individuals i
+WHERE v.individual_id = i.id
+  AND v.version <= i.version - 20;